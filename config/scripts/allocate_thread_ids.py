@@ -0,0 +1,131 @@
+# Author: agent <agent@local>
+# Description:
+#   Allocate the AXI ID space of a crossbar among its slave interfaces (SI).
+#   Each SI owns the IDs in [BASE_ID, BASE_ID + 2^THREAD_ID_WIDTH), hence multi-ID masters (e.g. CDMA, HBUS accelerators)
+#   can keep up to 2^THREAD_ID_WIDTH transactions with different IDs in flight, while single-ID masters (e.g. cores) get a single ID.
+#   The allocation partitions the 2^ID_WIDTH IDs as follows:
+#       1) thread ID widths are either user-defined (THREAD_ID_WIDTH values) or derived (THREAD_ID_WIDTH,AUTO):
+#           - from MASTER_THREAD_ID_WIDTHS, for the masters
+#           - from the ID range allocated in the other bus, for the bus-to-bus SIs (e.g. MBUS on the HBUS, and the HBUS loopback
+#             on the MBUS), as they carry the IDs of the masters of that bus (see allocate_bus_thread_ids)
+#       2) if the requested IDs don't fit in ID_WIDTH, the widest requests are shrunk one bit at a time
+#       3) base IDs are assigned from the widest to the narrowest SI, so that each BASE_ID is aligned to 2^THREAD_ID_WIDTH,
+#          and the bus-to-bus SIs last, hence the ID range of the other SIs doesn't depend on them
+#   User-defined BASE_ID values are kept as they are, and they are only validated by check_config.
+
+####################
+# Import libraries #
+####################
+# to print logging and error messages in the shell
+import logging
+# Sub-scripts
+import configuration
+
+# Thread ID bits requested by each class of master, matched as prefix of MASTER_NAMES.
+# Masters not listed here (cores, SYS_MASTER, DBG_MASTER, etc.) issue a single ID.
+MASTER_THREAD_ID_WIDTHS = {
+    "CDMA"  : 2,    # Read and write channels of the datamover, with multiple outstanding bursts
+    "s_acc" : 2,    # Accelerators attached to the HBUS
+}
+
+# Get the requested thread ID width of a master
+def get_master_thread_id_width(master_name : str) -> int:
+    for prefix, width in MASTER_THREAD_ID_WIDTHS.items():
+        if master_name.startswith(prefix):
+            return width
+    return 0
+
+# Shrink the thread ID widths until all the SI ID ranges fit in 2^ID_WIDTH
+def fit_thread_id_widths(widths : list, id_width : int) -> list:
+    widths = widths.copy()
+    while sum(1 << w for w in widths) > (1 << id_width):
+        # Nothing left to shrink
+        if max(widths) == 0:
+            logging.error(f"{len(widths)} slave interfaces don't fit in ID_WIDTH={id_width}")
+            exit(1)
+        # Shrink the (first) widest request
+        widest = widths.index(max(widths))
+        widths[widest] -= 1
+        logging.warning(f"Not enough ID bits, shrinking THREAD_ID_WIDTH of S{widest:02d} to {widths[widest]}")
+    return widths
+
+# Assign aligned base IDs, from the widest to the narrowest SI, and the SIs in last (the bus-to-bus SIs) after the others
+def assign_base_ids(widths : list, last : list = []) -> list:
+    base_ids = [0] * len(widths)
+    next_id = 0
+    for i in sorted(range(len(widths)), key=lambda i: (i in last, -widths[i])):
+        # Align up, as the bus-to-bus SIs can follow narrower SIs
+        next_id = -(-next_id >> widths[i]) << widths[i]
+        base_ids[i] = next_id
+        next_id += 1 << widths[i]
+    return base_ids
+
+# Get the thread ID widths of the SIs of a configuration, None if left to the IP defaults
+#   @bus_widths: the widths of the bus-to-bus SIs, by master (bus) name
+def get_thread_id_widths(config : configuration.Configuration, bus_widths : dict) -> list:
+    if config.THREAD_ID_AUTO:
+        widths = [bus_widths[name] if name in bus_widths else get_master_thread_id_width(name) for name in config.MASTER_NAMES]
+    elif config.THREAD_ID_WIDTH != []:
+        widths = config.THREAD_ID_WIDTH
+    else:
+        return None
+    return fit_thread_id_widths(widths, config.ID_WIDTH)
+
+# Allocate THREAD_ID_WIDTH and BASE_ID for each SI of the configuration
+#   @bus_widths: the widths of the bus-to-bus SIs, by master (bus) name (see get_bus_thread_id_widths)
+def allocate_thread_ids(config : configuration.Configuration, bus_widths : dict = {}) -> configuration.Configuration:
+    # Nothing to allocate
+    if config.PROTOCOL in ["", "DISABLE", "AXI4LITE"] or config.NUM_SI == 0:
+        return config
+
+    # Thread ID widths
+    widths = get_thread_id_widths(config, bus_widths)
+    # Left to the IP defaults
+    if widths is None:
+        return config
+    config.THREAD_ID_WIDTH = widths
+
+    # Base IDs, unless set by the user
+    if config.BASE_ID == [] or config.BASE_ID_ALLOCATED:
+        last = [i for i, name in enumerate(config.MASTER_NAMES) if name in bus_widths]
+        config.BASE_ID = [f"0x{base_id:08x}" for base_id in assign_base_ids(widths, last)]
+        config.BASE_ID_ALLOCATED = True
+
+    return config
+
+# Get the end of the ID range a bus emits on its MIs, i.e. of its SIs but the ones from the buses in path,
+# whose traffic doesn't go back
+#   @buses: the bus configurations by name
+def get_bus_id_range_end(buses : dict, name : str, path : list) -> int:
+    config = buses[name]
+    if config.PROTOCOL == "AXI4LITE" or config.NUM_SI == 0:
+        return 1
+    path = path + [name]
+    bus_widths = {master: get_bus_thread_id_width(buses, master, path) for master in config.MASTER_NAMES if master in buses}
+    widths = get_thread_id_widths(config, bus_widths)
+    # Left to the IP defaults, any ID
+    if widths is None:
+        return 1 << config.ID_WIDTH
+    if config.BASE_ID != [] and not config.BASE_ID_ALLOCATED:
+        base_ids = [int(base_id, 16) for base_id in config.BASE_ID]
+    else:
+        base_ids = assign_base_ids(widths, [i for i, master in enumerate(config.MASTER_NAMES) if master in bus_widths])
+    return max([base_id + (1 << width) for base_id, width, master in zip(base_ids, widths, config.MASTER_NAMES) if master not in path] + [1])
+
+# Get the thread ID width of a SI from a bus, as the ID range of that bus (0 for the buses in path)
+def get_bus_thread_id_width(buses : dict, name : str, path : list) -> int:
+    if name in path:
+        return 0
+    return (get_bus_id_range_end(buses, name, path) - 1).bit_length()
+
+# Get the thread ID widths of the bus-to-bus SIs of a bus, by master (bus) name
+def get_bus_thread_id_widths(configs : list, name : str) -> dict:
+    buses = {c.CONFIG_NAME: c for c in configs if c.CONFIG_NAME != "SYS" and c.PROTOCOL not in ["", "DISABLE"]}
+    config = next((c for c in configs if c.CONFIG_NAME == name), None)
+    if config is None:
+        return {}
+    return {master: get_bus_thread_id_width(buses, master, [name]) for master in config.MASTER_NAMES if master in buses}
+
+# Allocate the ID space of all the bus configurations, with the bus-to-bus SIs sized from the other buses
+def allocate_bus_thread_ids(configs : list) -> list:
+    return [allocate_thread_ids(c, get_bus_thread_id_widths(configs, c.CONFIG_NAME)) for c in configs]
@@ -0,0 +1,142 @@
+# Author: agent <agent@local>
+# Description:
+#   Analyze the clock domain crossings (CDC) of the MBUS slaves and suggest domain assignments to minimize them.
+#   Each MBUS slave in a clock domain different from MAIN_CLOCK_DOMAIN needs an axi_clock_converter_wrapper instance,
+#   which adds latency to every transaction on that path. The analysis:
+#       1) groups the slaves by clock domain and counts the required clock converters
+#       2) suggests moving the high-traffic slaves that are not bound to a clock domain into the MAIN_CLOCK_DOMAIN
+#       3) suggests grouping the low-traffic slaves sharing a clock domain behind a sub-bus, sharing one converter
+#   The traffic class of each slave is declared in RANGE_TRAFFIC_CLASSES or derived from its name (see utils.get_traffic_class).
+#   Prints a human-readable report and writes a machine-readable (JSON) summary.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses
+#   Last: Output JSON summary file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Machine-readable summary
+import json
+# Sub-scripts
+import configuration
+from utils import *
+from check_config import MAIN_CLOCK_DOMAIN_SLAVES, DDR_CLOCK_DOMAIN_SLAVES, DDR_FREQUENCY
+
+# Rough latency added by each clock converter to a transaction, in main clock cycles
+CDC_LATENCY_CYCLES = 4
+# Number of clock converters for each crossing slave: the HBUS also needs one for the loopback to the MBUS
+CONVERTERS_PER_SLAVE = {
+    "HBUS" : 2,
+}
+
+# Get the clock domain a slave is bound to, if any
+def get_fixed_clock_domain(config : configuration.Configuration, name : str) -> int:
+    if name in MAIN_CLOCK_DOMAIN_SLAVES:
+        return config.MAIN_CLOCK_DOMAIN
+    if name in DDR_CLOCK_DOMAIN_SLAVES or name.startswith("DDR4CH"):
+        return DDR_FREQUENCY
+    return None
+
+# Analyze the clock domains of the MBUS configuration and return a summary dict
+def analyze_clock_domains(config : configuration.Configuration) -> dict:
+    main_clock_domain = config.MAIN_CLOCK_DOMAIN
+
+    # Slaves grouped by clock domain and clock converters
+    domains = {}
+    converters = []
+    for mi_index, (name, clock) in enumerate(zip(config.RANGE_NAMES, config.RANGE_CLOCK_DOMAINS)):
+        domains.setdefault(clock, []).append(name)
+        if clock != main_clock_domain:
+            converters.append(
+                {
+                    "slave": name,
+                    "clock_domain": clock,
+                    "instances": CONVERTERS_PER_SLAVE.get(name, 1),
+                    "traffic": get_traffic_class(config, mi_index),
+                    "fixed": get_fixed_clock_domain(config, name) is not None,
+                }
+            )
+
+    # Suggestions
+    suggestions = []
+    saved_instances = 0
+    # 1) High-traffic slaves, free to move, in the main clock domain
+    for c in converters:
+        if c["traffic"] == "HIGH" and not c["fixed"]:
+            suggestions.append(
+                {
+                    "slaves": [c["slave"]],
+                    "action": f"move to MAIN_CLOCK_DOMAIN ({main_clock_domain}MHz)",
+                    "saved_instances": c["instances"],
+                    "reason": f"high-traffic path, saves ~{CDC_LATENCY_CYCLES} cycles per transaction",
+                }
+            )
+            saved_instances += c["instances"]
+    # 2) Low-traffic slaves, free to move, sharing a clock domain: group them behind one sub-bus
+    for clock in sorted(domains):
+        group = [c for c in converters if c["clock_domain"] == clock and c["traffic"] == "LOW" and not c["fixed"]]
+        if len(group) > 1:
+            suggestions.append(
+                {
+                    "slaves": [c["slave"] for c in group],
+                    "action": f"group behind a {clock}MHz sub-bus",
+                    "saved_instances": sum(c["instances"] for c in group) - 1,
+                    "reason": "low-traffic slaves can share a single clock converter",
+                }
+            )
+            saved_instances += sum(c["instances"] for c in group) - 1
+
+    num_converters = sum(c["instances"] for c in converters)
+    return {
+        "main_clock_domain": main_clock_domain,
+        "domains": {str(clock): names for clock, names in sorted(domains.items())},
+        "converters": converters,
+        "num_converters": num_converters,
+        "suggestions": suggestions,
+        "num_converters_suggested": num_converters - saved_instances,
+    }
+
+# Render the summary as a human-readable report
+def render_report(summary : dict) -> str:
+    lines = [f"MAIN_CLOCK_DOMAIN: {summary['main_clock_domain']}MHz"]
+    lines.append("Clock domains:")
+    for clock, names in summary["domains"].items():
+        lines.append(f"  {clock:>4}MHz: {' '.join(names)}")
+    lines.append(f"Clock converters: {summary['num_converters']}")
+    for c in summary["converters"]:
+        fixed = "fixed" if c["fixed"] else "free"
+        lines.append(f"  {c['slave']:<12} {c['clock_domain']:>4}MHz x{c['instances']} ({c['traffic']} traffic, {fixed})")
+    if summary["suggestions"] == []:
+        lines.append("No avoidable clock domain crossings")
+    else:
+        lines.append(f"Suggestions ({summary['num_converters']} -> {summary['num_converters_suggested']} clock converters):")
+        for s in summary["suggestions"]:
+            lines.append(f"  {' '.join(s['slaves'])}: {s['action']}, {s['reason']}")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    config_file_names = sys.argv[1:-1]
+    output_json_file = sys.argv[-1]
+    configs = read_config(config_file_names)
+
+    # Only the MBUS slaves have their own clock domain
+    mbus_config = next((c for c in configs if c.CONFIG_NAME == "MBUS"), None)
+    if mbus_config is None:
+        print_error("No MBUS configuration found")
+        sys.exit(1)
+
+    summary = analyze_clock_domains(mbus_config)
+    print(render_report(summary))
+
+    write_output_file(output_json_file, json.dumps(summary, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
@@ -0,0 +1,277 @@
+# Author: agent <agent@local>
+# Description:
+#   Analyze a (very large) memory-access trace against the SoC address map, built from the bus configurations.
+#   Supported trace formats (TRACE_FORMAT):
+#       - spike: Spike commit log (--log-commits), instruction fetches (PC) and data accesses ("mem 0x<addr> [0x<data>]")
+#       - qemu:  QEMU execlog plugin output, instruction fetches (PC) and data accesses ("load|store, 0x<addr>")
+#       - ila:   ILA CSV export (write_hw_ila_data -csv_file, e.g. from the set_ila_trigger.tcl captures),
+#                one access for each AR/AW handshake of each AXI interface probed (*_araddr, *_arvalid, *_arready, ...)
+#       - bin:   raw binary dump of little-endian addresses, TRACE_ADDR_BYTES (4 or 8) each
+#   The trace is streamed with bounded memory: the file is memory-mapped and parsed in chunks of CHUNK_BYTES,
+#   each chunk is parsed and classified with vectorized (numpy) operations, i.e. no per-line Python code:
+#       1) the addresses are extracted with a regular expression over the whole chunk (text formats)
+#          and converted from hex with a lookup table on the digits matrix
+#       2) each address is classified with a binary search (searchsorted) on the sorted base addresses of the devices
+#       3) the counts and the bytes are accumulated with bincount
+#   Reports the access counts (fetch, read, write) and the bytes of each device and each bus (an access to a device
+#   traverses its bus and all the parent buses), and the hot regions (HOT_REGION_BITS-aligned regions with most accesses).
+#   Prints a human-readable report and writes a machine-readable (JSON) summary.
+# Args:
+#   1: Trace format (spike, qemu, ila, bin)
+#   2: Trace file
+#   3: Input configuration file for system
+#   4+: Input configuration files for buses
+#   Last: Output JSON summary file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Stream the trace
+import mmap
+import re
+# Vectorized parsing and classification
+import numpy as np
+import pandas as pd
+# Machine-readable summary
+import json
+# Sub-scripts
+import configuration
+from utils import *
+import bus_graph
+
+# Chunk size of the streamed trace
+CHUNK_BYTES = int(os.getenv("CHUNK_BYTES", 64 << 20))
+# Rows per chunk of the ILA CSV exports
+ILA_CHUNK_ROWS = 1 << 20
+# Size of the hot regions, and how many to report
+HOT_REGION_BITS = int(os.getenv("HOT_REGION_BITS", 12))
+NUM_HOT_REGIONS = 10
+# Bytes of each address in the raw binary dumps
+TRACE_ADDR_BYTES = int(os.getenv("TRACE_ADDR_BYTES", 8))
+
+# Access kinds
+KINDS = ["fetch", "read", "write"]
+FETCH, READ, WRITE = range(len(KINDS))
+# Bytes of an instruction fetch
+FETCH_BYTES = 4
+
+# Text trace formats: regular expressions extracting the hex addresses (without 0x) of each access kind
+TEXT_FORMATS = {
+    "spike" : {
+        FETCH : re.compile(rb"^core\s+\d+:\s+(?:\d\s+)?0x([0-9a-fA-F]+)\s+\(", re.M),
+        READ  : re.compile(rb" mem 0x([0-9a-fA-F]+)[ \t\r]*$", re.M),
+        WRITE : re.compile(rb" mem 0x([0-9a-fA-F]+) 0x"),
+    },
+    "qemu" : {
+        FETCH : re.compile(rb"^\d+, 0x([0-9a-fA-F]+), 0x", re.M),
+        READ  : re.compile(rb"load, 0x([0-9a-fA-F]+)"),
+        WRITE : re.compile(rb"store, 0x([0-9a-fA-F]+)"),
+    },
+}
+TRACE_FORMATS = list(TEXT_FORMATS) + ["ila", "bin"]
+
+# Value of each hex digit (ASCII), padding (\0) is 0
+HEX_DIGITS = np.zeros(256, dtype=np.uint64)
+for i, c in enumerate(b"0123456789abcdef"):
+    HEX_DIGITS[c] = i
+    HEX_DIGITS[ord(chr(c).upper())] = i
+
+###########
+# Parsing #
+###########
+
+# Convert hex strings (without 0x, up to 16 digits) to integers, vectorized
+def parse_hex(values) -> np.ndarray:
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    values = np.asarray(values, dtype="S16")
+    lengths = np.char.str_len(values).astype(np.int64)[:, None]
+    digits = HEX_DIGITS[values.view(np.uint8).reshape(-1, 16)]
+    positions = np.arange(16)[None, :]
+    shifts = (4 * np.clip(lengths - 1 - positions, 0, None)).astype(np.uint64)
+    return np.where(positions < lengths, digits << shifts, 0).sum(axis=1, dtype=np.uint64)
+
+# Iterate over the chunks of a memory-mapped file, split at the end of a line (text) or of a record (binary)
+def iterate_chunks(trace_file : str, record_bytes : int = 0):
+    with open(trace_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < len(mm):
+                end = min(start + CHUNK_BYTES, len(mm))
+                if end < len(mm):
+                    if record_bytes == 0:
+                        newline = mm.find(b"\n", end)
+                        end = len(mm) if newline == -1 else newline + 1
+                    else:
+                        end -= (end - start) % record_bytes
+                yield mm[start:end]
+                start = end
+
+# Parse a text trace, yields (addresses, kinds, sizes, samples) for each chunk
+def parse_text_trace(trace_file : str, trace_format : str, data_bytes : int):
+    for chunk in iterate_chunks(trace_file):
+        addresses, kinds = [], []
+        for kind, regex in TEXT_FORMATS[trace_format].items():
+            values = parse_hex(regex.findall(chunk))
+            addresses.append(values)
+            kinds.append(np.full(len(values), kind, dtype=np.int64))
+        kinds = np.concatenate(kinds)
+        sizes = np.where(kinds == FETCH, FETCH_BYTES, data_bytes)
+        yield np.concatenate(addresses), kinds, sizes, chunk.count(b"\n")
+
+# Parse a raw binary dump of addresses, yields (addresses, kinds, sizes, samples) for each chunk
+def parse_binary_trace(trace_file : str, data_bytes : int):
+    dtype = {4: "<u4", 8: "<u8"}[TRACE_ADDR_BYTES]
+    for chunk in iterate_chunks(trace_file, TRACE_ADDR_BYTES):
+        addresses = np.frombuffer(chunk, dtype=dtype).astype(np.uint64)
+        yield addresses, np.full(len(addresses), READ, dtype=np.int64), np.full(len(addresses), data_bytes), len(addresses)
+
+# Get the AXI interfaces probed in an ILA export, returns {prefix: {signal: column}}
+def get_ila_interfaces(columns : list) -> dict:
+    interfaces = {}
+    for column in columns:
+        match = re.fullmatch(r"(.*)_(araddr|arvalid|arready|arlen|arsize|awaddr|awvalid|awready|awlen|awsize)(\[.*\])?", column)
+        if match is not None:
+            interfaces.setdefault(match.group(1), {})[match.group(2)] = column
+    return interfaces
+
+# Parse an ILA CSV export, yields (addresses, kinds, sizes, samples) for each chunk
+def parse_ila_trace(trace_file : str, data_bytes : int):
+    # The second row holds the radix of each probe
+    for rows in pd.read_csv(trace_file, dtype=str, skiprows=[1], chunksize=ILA_CHUNK_ROWS):
+        addresses, kinds, sizes = [], [], []
+        for signals in get_ila_interfaces(list(rows.columns)).values():
+            for kind, channel in [(READ, "ar"), (WRITE, "aw")]:
+                if f"{channel}addr" not in signals or f"{channel}valid" not in signals:
+                    continue
+                handshake = rows[signals[f"{channel}valid"]].values == "1"
+                if f"{channel}ready" in signals:
+                    handshake &= rows[signals[f"{channel}ready"]].values == "1"
+                addresses.append(parse_hex(rows[signals[f"{channel}addr"]].values[handshake].astype("S16")))
+                kinds.append(np.full(int(handshake.sum()), kind, dtype=np.int64))
+                # Burst bytes, if probed
+                if f"{channel}len" in signals and f"{channel}size" in signals:
+                    length = parse_hex(rows[signals[f"{channel}len"]].values[handshake].astype("S16"))
+                    size = parse_hex(rows[signals[f"{channel}size"]].values[handshake].astype("S16"))
+                    sizes.append((length + 1) << size)
+                else:
+                    sizes.append(np.full(int(handshake.sum()), data_bytes, dtype=np.uint64))
+        if addresses == []:
+            print_error(f"No AXI address channels (*_araddr/*_arvalid, *_awaddr/*_awvalid) found in {trace_file}")
+            sys.exit(1)
+        yield np.concatenate(addresses), np.concatenate(kinds), np.concatenate(sizes), len(rows)
+
+############
+# Analysis #
+############
+
+# Analyze a trace, returns a summary dict
+def analyze_trace(trace_file : str, trace_format : str, configs : list) -> dict:
+    devices, graph = bus_graph.get_address_map(configs)
+    mbus_config = next(c for c in configs if c.CONFIG_NAME == "MBUS")
+    data_bytes = mbus_config.DATA_WIDTH // 8
+
+    bases = np.array([d["base"] for d in devices], dtype=np.uint64)
+    ends = np.array([d["end"] for d in devices], dtype=np.uint64)
+    # The last index is for the unmapped accesses
+    num_devices = len(devices) + 1
+    counts = np.zeros(num_devices * len(KINDS), dtype=np.int64)
+    num_bytes = np.zeros(num_devices, dtype=np.float64)
+    regions = {}
+    samples = 0
+
+    if trace_format in TEXT_FORMATS:
+        chunks = parse_text_trace(trace_file, trace_format, data_bytes)
+    elif trace_format == "ila":
+        chunks = parse_ila_trace(trace_file, data_bytes)
+    else:
+        chunks = parse_binary_trace(trace_file, data_bytes)
+
+    for addresses, kinds, sizes, chunk_samples in chunks:
+        samples += chunk_samples
+        if len(addresses) == 0:
+            continue
+        # Classify
+        index = np.searchsorted(bases, addresses, side="right") - 1
+        mapped = (index >= 0) & (addresses <= ends[np.clip(index, 0, None)])
+        index = np.where(mapped, index, num_devices - 1)
+        # Accumulate
+        counts += np.bincount(index * len(KINDS) + kinds, minlength=num_devices * len(KINDS))
+        num_bytes += np.bincount(index, weights=sizes.astype(np.float64), minlength=num_devices)
+        chunk_regions, chunk_counts = np.unique(addresses >> np.uint64(HOT_REGION_BITS), return_counts=True)
+        for region, count in zip(chunk_regions.tolist(), chunk_counts.tolist()):
+            regions[region] = regions.get(region, 0) + count
+
+    counts = counts.reshape(num_devices, len(KINDS))
+    summary_devices = []
+    summary_buses = {bus: {kind: 0 for kind in KINDS} | {"bytes": 0} for bus in graph["order"]}
+    for i, device in enumerate(devices + [{"name": "UNMAPPED", "bus": None}]):
+        entry = {"name": device["name"], "bus": device["bus"], **{kind: int(counts[i][k]) for k, kind in enumerate(KINDS)}, "bytes": int(num_bytes[i])}
+        summary_devices.append(entry)
+        for bus in bus_graph.get_bus_path(graph, device["bus"]) if device["bus"] is not None else []:
+            for key in KINDS + ["bytes"]:
+                summary_buses[bus][key] += entry[key]
+
+    # Hot regions, with the device they belong to
+    hot_regions = []
+    for region, count in sorted(regions.items(), key=lambda r: r[1], reverse=True)[:NUM_HOT_REGIONS]:
+        base = region << HOT_REGION_BITS
+        device = next((d["name"] for d in devices if d["base"] <= base <= d["end"]), "UNMAPPED")
+        hot_regions.append({"base": f"0x{base:x}", "size": 1 << HOT_REGION_BITS, "device": device, "accesses": count})
+
+    return {
+        "trace_file": trace_file,
+        "trace_format": trace_format,
+        "samples": samples,
+        "accesses": int(counts.sum()),
+        "devices": summary_devices,
+        "buses": summary_buses,
+        "hot_regions": hot_regions,
+    }
+
+# Render the summary as a human-readable report
+def render_report(summary : dict) -> str:
+    samples = max(summary["samples"], 1)
+    lines = [f"{summary['trace_file']} ({summary['trace_format']}): {summary['accesses']} accesses in {summary['samples']} samples"]
+    lines.append("Devices:")
+    for d in summary["devices"]:
+        if sum(d[kind] for kind in KINDS) == 0:
+            continue
+        bus = f" ({d['bus']})" if d["bus"] is not None else ""
+        lines.append(f"  {d['name'] + bus:<24} fetch {d['fetch']:>10} read {d['read']:>10} write {d['write']:>10} {d['bytes']:>12} B ({d['bytes'] / samples:.3f} B/sample)")
+    lines.append("Buses:")
+    for bus, b in summary["buses"].items():
+        lines.append(f"  {bus:<24} fetch {b['fetch']:>10} read {b['read']:>10} write {b['write']:>10} {b['bytes']:>12} B ({b['bytes'] / samples:.3f} B/sample)")
+    lines.append("Hot regions:")
+    for r in summary["hot_regions"]:
+        lines.append(f"  {r['base']:>18} +{r['size']} {r['device']:<12} {r['accesses']:>10}")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 5 or sys.argv[1] not in TRACE_FORMATS:
+        print(f"Usage: <TRACE_FORMAT ({', '.join(TRACE_FORMATS)})> <TRACE_FILE> <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    trace_format = sys.argv[1]
+    trace_file = sys.argv[2]
+    config_file_names = sys.argv[3:-1]
+    output_json_file = sys.argv[-1]
+    if not os.path.isfile(trace_file):
+        print_error(f"Trace file {trace_file} not found")
+        sys.exit(1)
+    configs = read_config(config_file_names)
+
+    summary = analyze_trace(trace_file, trace_format, configs)
+    print(render_report(summary))
+
+    write_output_file(output_json_file, json.dumps(summary, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
@@ -0,0 +1,125 @@
+# Author: agent <agent@local>
+# Description: graph model of the interconnect, built once from the bus configurations
+#   - nodes: the enabled buses (MBUS, PBUS, HBUS and any additional bus, e.g. PBUS1 from config_peripheral_bus_1.csv)
+#   - edges: the bus-to-bus slaves (MI), from the bus to the child bus, with the address ranges of the MI
+#   The graph is visited once (depth-first) from the root bus (MBUS), in O(V+E), classifying each edge as:
+#       tree edge: the parent of the child bus, whose address ranges must be contained in the ranges of the MI
+#       loopback: an edge back to an ancestor bus which is also a master of it (e.g. HBUS -> MBUS), not a child
+#   and collecting the errors of the model:
+#       cycles (edges back to an ancestor which is not a loopback), buses with multiple parents,
+#       buses unreachable from the root, and child address ranges not contained in their parent MI ranges
+
+####################
+# Import libraries #
+####################
+# Sub-scripts
+import configuration
+from utils import *
+
+# Constants
+ROOT_BUS = "MBUS"
+
+# Build the bus graph of the configurations, as follows
+# {
+#   "root": root bus name,
+#   "buses": {bus name: configuration},
+#   "edges": {bus name: [edge]}, the bus-to-bus MIs of each bus, each edge defined as
+#            {"parent": bus name, "child": bus name, "mi_index": MI index in the parent, "ranges": MI address ranges, "kind": TREE or LOOPBACK}
+#   "parent": {bus name: tree edge from the parent bus (None for the root)},
+#   "order": bus names in depth-first order from the root,
+#   "errors": list of error strings (an empty list for a valid graph)
+# }
+def get_bus_graph(configs : list) -> dict:
+    buses = {c.CONFIG_NAME: c for c in configs if c.CONFIG_NAME != "SYS" and c.PROTOCOL != "DISABLE"}
+
+    # Index the bus-to-bus MIs, with their address ranges
+    edges = {}
+    for name, config in buses.items():
+        edges[name] = []
+        mi_ranges = {}
+        for r in get_address_ranges(config.RANGE_NAMES, config.BASE_ADDR, config.RANGE_ADDR_WIDTH, config.ADDR_RANGES):
+            mi_ranges.setdefault(r["mi_index"], []).append(r)
+        for mi_index, slave in enumerate(config.RANGE_NAMES):
+            if slave in buses:
+                edges[name].append({"parent": name, "child": slave, "mi_index": mi_index, "ranges": mi_ranges.get(mi_index, []), "kind": None})
+
+    graph = {"root": ROOT_BUS, "buses": buses, "edges": edges, "parent": {}, "order": [], "errors": []}
+    if ROOT_BUS not in buses:
+        graph["errors"].append(f"No {ROOT_BUS} configuration found")
+        return graph
+
+    # Iterative depth-first visit: the buses on the stack are the ancestors of the current bus
+    graph["parent"][ROOT_BUS] = None
+    graph["order"].append(ROOT_BUS)
+    on_stack = {ROOT_BUS}
+    stack = [(ROOT_BUS, iter(edges[ROOT_BUS]))]
+    while stack != []:
+        bus, bus_edges = stack[-1]
+        edge = next(bus_edges, None)
+        if edge is None:
+            on_stack.remove(bus)
+            stack.pop()
+            continue
+
+        child = edge["child"]
+        if child in on_stack:
+            # Edge back to an ancestor: a loopback if it is wired as a master of the ancestor, a cycle otherwise
+            if bus in buses[child].MASTER_NAMES:
+                edge["kind"] = "LOOPBACK"
+            else:
+                graph["errors"].append(f"Cycle in the bus graph: {child} is an ancestor of {bus}, but {child} has no {bus} master for a loopback")
+        elif child in graph["parent"]:
+            graph["errors"].append(f"{child} is a slave of multiple buses ({graph['parent'][child]['parent']}, {bus})")
+        else:
+            edge["kind"] = "TREE"
+            graph["parent"][child] = edge
+            graph["order"].append(child)
+            graph["errors"] += check_containment(edge, buses[child], on_stack)
+            on_stack.add(child)
+            stack.append((child, iter(edges[child])))
+
+    for name in buses:
+        if name not in graph["parent"]:
+            graph["errors"].append(f"{name} is not reachable from {ROOT_BUS}")
+    return graph
+
+# Check that each address range of a child bus is contained in one of the address ranges of its MI in the parent bus,
+# in a single merge pass over the sorted ranges (address ranges of the same bus don't overlap, see check_intra_config)
+# The ranges of the child leading back to an ancestor bus (e.g. the HBUS loopback to the MBUS) are skipped
+def check_containment(edge : dict, child_config : configuration.Configuration, ancestors : set) -> list:
+    errors = []
+    parent_ranges = sorted(edge["ranges"], key=lambda r: r["base"])
+    child_ranges = get_address_ranges(child_config.RANGE_NAMES, child_config.BASE_ADDR, child_config.RANGE_ADDR_WIDTH, child_config.ADDR_RANGES)
+    child_ranges = sorted([r for r in child_ranges if r["device"] not in ancestors], key=lambda r: r["base"])
+    p = 0
+    for child_range in child_ranges:
+        while p < len(parent_ranges) and parent_ranges[p]["end"] < child_range["base"]:
+            p += 1
+        if p == len(parent_ranges) or not (parent_ranges[p]["base"] <= child_range["base"] and child_range["end"] <= parent_ranges[p]["end"]):
+            errors.append(f"Address of {edge['child']} ({child_range['name']}) is not properly contained in {edge['parent']}")
+    return errors
+
+# Get the buses traversed to reach a bus, from the root
+def get_bus_path(graph : dict, bus : str) -> list:
+    path = []
+    while bus is not None:
+        path.insert(0, bus)
+        edge = graph["parent"][bus]
+        bus = edge["parent"] if edge is not None else None
+    return path
+
+# Build the address map of the leaf devices, returns (devices, graph)
+#   devices: list of {name (range name), device, bus, base, end}, sorted by base address
+#   graph: the bus graph
+def get_address_map(configs : list) -> tuple:
+    graph = get_bus_graph(configs)
+
+    devices = []
+    for bus in graph["order"]:
+        config = graph["buses"][bus]
+        for r in get_address_ranges(config.RANGE_NAMES, config.BASE_ADDR, config.RANGE_ADDR_WIDTH, config.ADDR_RANGES):
+            # The ranges of a child bus (or of a loopback) are resolved by its own configuration
+            if r["device"] in graph["buses"]:
+                continue
+            devices.append({"name": r["name"], "device": r["device"], "bus": bus, "base": r["base"], "end": r["end"]})
+    return sorted(devices, key=lambda d: d["base"]), graph
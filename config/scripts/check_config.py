@@ -7,13 +7,35 @@
 #
 #       1) intra configuration checks:
 #           a) check the validity of the given axi protocol (AXI4, AXI4LITE)
-#           b) check the correspondence of NUM_MI with RANGE_NAMES, BASE_ADDR, and RANGE_ADDR_WIDTH (e.g. NUM_MI=2 -> len(RANGE_NAMES)=2 etc.)
+#           b) check the correspondence of NUM_MI with RANGE_NAMES, and of NUM_MI*ADDR_RANGES with BASE_ADDR and RANGE_ADDR_WIDTH
+#              (e.g. NUM_MI=2, ADDR_RANGES=2 -> len(RANGE_NAMES)=2, len(BASE_ADDR)=4 etc.)
 #           c) check the minimum width of each address range (12 if AXI4, 1 if AXI4LITE)
-#           d) check the validity of the address ranges, if they do not overlap each other and if the RANGE_ADDR_WIDTH match the BASE_ADDR
+#           d) check the validity of the address ranges, if they do not overlap (or alias, for ranges of the same slave) each other
+#              and if the RANGE_ADDR_WIDTH match the BASE_ADDR
+#           e) check the validity of the ID ranges of the slave interfaces (BASE_ID, THREAD_ID_WIDTH), if they fit in ID_WIDTH
+#              and if they do not collide with each other
 #
-#       2) inter configuration checks:
-#           a) for each bus check if it has a child bus, and if yes,
-#              verify that the total address range of the child is contained in the right address range of the parent
+#       2) inter configuration checks, on the bus graph (see bus_graph.py):
+#           a) check that each bus is reachable from the MBUS, with a single parent bus, and that the edges back to an
+#              ancestor bus are loopbacks (e.g. HBUS -> MBUS, with HBUS as a master of the MBUS) and not cycles
+#           b) for each child bus, verify that each address range of the child is contained in one of the address ranges
+#              of the parent
+#
+#       3) connectivity checks:
+#           a) check that the boot memory and the debug paths are still reachable with the READ/WRITE_CONNECTIVITY matrices
+#           b) warn about the high-traffic paths narrowed by the data-width converters (see plan_dwidth_converters.py)
+#
+#       4) interrupt checks:
+#           a) check that each PBUS interrupt source (INTERRUPT_NAMES) is a known peripheral of the PBUS
+#           b) check that each PLIC source (MBUS INTERRUPT_NAMES) is a PBUS interrupt or a known MBUS-level source,
+#              that the sources fit the PLIC lines, and that INTERRUPT_PRIORITIES match them
+#
+#       5) physical memory attributes checks (CORE_CV64A6, CORE_CV64A6_ARA only):
+#           a) check that the cached, execute and non-idempotent regions fit the CVA6 PMA rules
+#
+#       6) budget checks (optional, only if CHECK_BUDGET=1, failing without calibrated estimates, see estimate_crossbar.py):
+#           a) check that the estimated LUT/FF of each crossbar fit LUT_BUDGET/FF_BUDGET (if any)
+#           b) check that the estimated Fmax of each crossbar reaches the bus clock frequency
 #
 #    IMPORTANT NOTE: the address range of a child bus in its configuration .csv file must be an absolute address range,
 #                    this means that if the child bus is mapped in the parent bus at the address 0x1000 to 0x1FFF, then
@@ -29,10 +51,18 @@ import sys
 import os
 # Sub-scripts
 import configuration
+import infer_connectivity
+import estimate_crossbar
+import create_interrupts_rtl
+import create_cva6_pma_rtl
+import bus_graph
+import plan_dwidth_converters
+import select_crossbar_strategy
 from utils import *
 
 # Constants
-VALID_PROTOCOLS = ["AXI4", "AXI4LITE", "DISABLE"] # AXI3 not implemented yet
+from configuration import VALID_PROTOCOLS
+CHECK_BUDGET = os.getenv("CHECK_BUDGET", "0") == "1"
 MIN_AXI4_ADDR_WIDTH = 12
 MIN_AXI4LITE_ADDR_WIDTH = 1
 SOC_CONFIG = os.getenv("SOC_CONFIG", "embedded")
@@ -43,10 +73,52 @@ SUPPORTED_CLOCK_DOMAINS = {
     "embedded" : SUPPORTED_CLOCK_DOMAINS_EMBEDDED,
     "hpc"      : SUPPORTED_CLOCK_DOMAINS_HPC
 }
+# Cores of each XLEN, as the xlen_core_error check in rv_socket.sv
+XLEN_CORES = {
+    32 : ["CORE_PICORV32", "CORE_CV32E40P", "CORE_IBEX", "CORE_MICROBLAZEV_RV32", "CORE_DUAL_MICROBLAZEV_RV32"],
+    64 : ["CORE_CV64A6", "CORE_CV64A6_ARA", "CORE_MICROBLAZEV_RV64"],
+}
 # These slaves reside statically in the MAIN_CLOCK_DOMAIN
 MAIN_CLOCK_DOMAIN_SLAVES = ["BRAM", "DM_mem", "PLIC"]
-# The DDR clock must have the same frequency of the DDR board clock
-DDR_FREQUENCY = 300
+# These slaves reside statically in the DDR clock domain (DDR_FREQUENCY)
+# TOD143: decide a prefix for HBUS-attached accelerators here, maybe ACC_* or HBUS_*
+DDR_CLOCK_DOMAIN_SLAVES = ["DDR4CH0", "DDR4CH1", "DDR4CH2", "HBUS", "HLS_CONTROL"]
+
+# List of used address ranges of a bus configuration
+def get_config_address_ranges(config : configuration.Configuration) -> list:
+    return get_address_ranges(config.RANGE_NAMES, config.BASE_ADDR, config.RANGE_ADDR_WIDTH, config.ADDR_RANGES)
+
+# Check that the ID ranges of the slave interfaces [BASE_ID, BASE_ID + 2^THREAD_ID_WIDTH) are valid
+def check_thread_ids(config : configuration.Configuration, config_file_name: str) -> bool:
+    # Left to the IP defaults
+    if config.BASE_ID == []:
+        return True
+    if len(config.BASE_ID) != config.NUM_SI or (config.THREAD_ID_WIDTH != [] and len(config.THREAD_ID_WIDTH) != config.NUM_SI):
+        print_error(f"The NUM_SI value {config.NUM_SI} does not match the number of BASE_ID/THREAD_ID_WIDTH in {config_file_name}")
+        return False
+
+    # List of (first, last) ID for each SI
+    id_ranges = []
+    for i in range(config.NUM_SI):
+        thread_id_width = config.THREAD_ID_WIDTH[i] if config.THREAD_ID_WIDTH != [] else 0
+        first_id = int(config.BASE_ID[i], 16)
+        last_id = first_id + (1 << thread_id_width) - 1
+        # Must fit in the ID_WIDTH
+        if last_id >= (1 << config.ID_WIDTH):
+            print_error(f"ID range of {config.MASTER_NAMES[i]} [{first_id}, {last_id}] exceeds ID_WIDTH={config.ID_WIDTH} in {config_file_name}")
+            return False
+        # BASE_ID must be aligned to the thread ID range
+        if first_id % (1 << thread_id_width) != 0:
+            print_error(f"BASE_ID of {config.MASTER_NAMES[i]} is not aligned to THREAD_ID_WIDTH={thread_id_width} in {config_file_name}")
+            return False
+        # Must not collide with the previous SIs
+        for j in range(len(id_ranges)):
+            if first_id <= id_ranges[j][1] and id_ranges[j][0] <= last_id:
+                print_error(f"ID range of {config.MASTER_NAMES[i]} collides with {config.MASTER_NAMES[j]} in {config_file_name}")
+                return False
+        id_ranges.append((first_id, last_id))
+
+    return True
 
 #############################
 # Check intra configuration #
@@ -70,9 +142,9 @@ def check_intra_config(config : configuration.Configuration, config_file_name: s
         # Microblaze-V is not allowed when building for au280
         if (config.CORE_SELECTOR == "CORE_MICROBLAZEV_RV64" or config.CORE_SELECTOR == "CORE_MICROBLAZEV_RV32") and os.getenv("BOARD") == "au280":
             print_error(f"CORE_MICROBLAZEV is not allowed when building for au280")
-        # Match XLEN with MicroblazeV type
-        if ((config.CORE_SELECTOR == "CORE_MICROBLAZEV_RV64" and config.XLEN == 32) or \
-            (config.CORE_SELECTOR in {"CORE_MICROBLAZEV_RV32", "CORE_DUAL_MICROBLAZEV_RV32"} and config.XLEN == 64)):
+            return False
+        # Match XLEN with the core data width (the socket fails elaboration otherwise)
+        if any(config.CORE_SELECTOR in cores for xlen, cores in XLEN_CORES.items() if xlen != config.XLEN):
             print_error(f"XLEN={config.XLEN} doesn't match {config.CORE_SELECTOR} data width.")
             return False
 
@@ -92,25 +164,34 @@ def check_intra_config(config : configuration.Configuration, config_file_name: s
     if config.NUM_MI != len(config.RANGE_NAMES):
         print_error(f"The NUM_MI value {config.NUM_MI} does not match the number of RANGE_NAMES in {config_file_name}")
         return False
-    if config.NUM_MI != len(config.BASE_ADDR):
+    # Each slave exposes ADDR_RANGES address ranges
+    if config.NUM_MI * config.ADDR_RANGES != len(config.BASE_ADDR):
         print_info(config.BASE_ADDR)
-        print_error(f"The NUM_MI value {config.NUM_MI} does not match the number of BASE_ADDR in {config_file_name}")
+        print_error(f"The NUM_MI*ADDR_RANGES value {config.NUM_MI * config.ADDR_RANGES} does not match the number of BASE_ADDR in {config_file_name}")
         return False
-    if config.NUM_MI != len(config.RANGE_ADDR_WIDTH):
-        print_error(f"The NUM_MI value {config.NUM_MI} does not match the number of ADDR_WIDTH in {config_file_name}")
+    if config.NUM_MI * config.ADDR_RANGES != len(config.RANGE_ADDR_WIDTH):
+        print_error(f"The NUM_MI*ADDR_RANGES value {config.NUM_MI * config.ADDR_RANGES} does not match the number of ADDR_WIDTH in {config_file_name}")
         return False
     if config.CONFIG_NAME == "MBUS":
         if config.NUM_MI != len(config.RANGE_CLOCK_DOMAINS):
             print_error(f"The NUM_MI value {config.NUM_MI} does not match the number of RANGE_CLOCK_DOMAINS in {config_file_name}")
             return False
 
+    if config.RANGE_TRAFFIC_CLASSES != [] and config.NUM_MI != len(config.RANGE_TRAFFIC_CLASSES):
+        print_error(f"The NUM_MI value {config.NUM_MI} does not match the number of RANGE_TRAFFIC_CLASSES in {config_file_name}")
+        return False
+
     # Check the number of masters and relative master names
     if config.NUM_SI != len(config.MASTER_NAMES):
         print_error(f"The NUM_SI does not match MASTER_NAMES in {config_file_name}")
         return False
 
     # Check the minimum widths (AXI4 12, AXI4LITE 1)
-    for addr_width in config.RANGE_ADDR_WIDTH:
+    for i in range(len(config.RANGE_ADDR_WIDTH)):
+        addr_width = config.RANGE_ADDR_WIDTH[i]
+        # The first range of each slave is mandatory, the others can be left unused (0 width)
+        if addr_width == 0 and i % config.ADDR_RANGES != 0:
+            continue
         if addr_width > config.ADDR_WIDTH:
             print_error(f"RANGE_ADDR_WIDTH is greater than {config.ADDR_WIDTH} in {config_file_name}")
         if config.PROTOCOL == "AXI4" and addr_width < MIN_AXI4_ADDR_WIDTH:
@@ -120,42 +201,36 @@ def check_intra_config(config : configuration.Configuration, config_file_name: s
             print_error(f"RANGE_ADDR_WIDTH is less than {MIN_AXI4LITE_ADDR_WIDTH} in {config_file_name}")
             return False
 
-    # Check the address range
-    # List of base and end addresses for each slave (e.g. with range_width=12 -> base_addr: 0x0, end_add: 0xfff)
-    base_addresses = list()
-    end_addresses = list()
-    for i in range(len(config.BASE_ADDR)):
-        base_address = int(config.BASE_ADDR[i], 16)
-        end_address = base_address + ~(~1 << (config.RANGE_ADDR_WIDTH[i]-1))
+    # Check the address ranges
+    # List of used address ranges (e.g. with range_width=12 -> base: 0x0, end: 0xfff), see get_address_ranges()
+    address_ranges = get_config_address_ranges(config)
+    for i in range(len(address_ranges)):
+        current = address_ranges[i]
         # Check if the base addr does not fall into the addr range (e.g. base_addr: 0x100 is not allowed with range_width=12)
-        if (base_address & ~(~1 << (config.RANGE_ADDR_WIDTH[i]-1)) ) != 0:
-            print_error(f"BASE_ADDR does not match RANGE_ADDR_WIDTH in {config_file_name}")
+        if (current["base"] & ~(~1 << (current["width"]-1)) ) != 0:
+            print_error(f"BASE_ADDR of {current['name']} does not match RANGE_ADDR_WIDTH in {config_file_name}")
             return False
 
-        if i > 0:
-            # Check if the current address does not fall into the addr range one of the previous slaves
-            for j in range(len(base_addresses)):
-                if  ((base_address <= end_addresses[j])   and (base_address >= base_addresses[j])) or \
-                    ((end_address >= base_addresses[j])   and (base_address <= base_addresses[j])) or \
-                    ((base_address <= base_addresses[j])  and (end_address >= end_addresses[j])  ) or \
-                    ((base_address >= base_addresses[j])  and (end_address <= end_addresses[j])  ):
-
-                    print_error(f"Address of {config.RANGE_NAMES[i]} overlaps with {config.RANGE_NAMES[i-1]} in {config_file_name}")
-                    return False
-        base_addresses.append(base_address)
-        end_addresses.append(end_address)
+        # Check if the current range does not fall into one of the previous ranges
+        for j in range(i):
+            previous = address_ranges[j]
+            if current["base"] <= previous["end"] and previous["base"] <= current["end"]:
+                # Two ranges of the same slave alias each other
+                if current["mi_index"] == previous["mi_index"]:
+                    print_error(f"Address range {current['name']} aliases {previous['name']} in {config_file_name}")
+                else:
+                    print_error(f"Address of {current['name']} overlaps with {previous['name']} in {config_file_name}")
+                return False
 
     # Check valid main clock domain
     if config.CONFIG_NAME == "MBUS":
         if config.MAIN_CLOCK_DOMAIN not in SUPPORTED_CLOCK_DOMAINS[SOC_CONFIG]:
-            print_error(f"The clock domain {clok_domain}MHz is not supported")
+            print_error(f"The clock domain {config.MAIN_CLOCK_DOMAIN}MHz is not supported")
             return False
         # Check valid clock domains
         for i in range(len(config.RANGE_CLOCK_DOMAINS)):
             # Check if the clock frequency is valid (DDR has its own clock domain)
-            # TOD143: decide a prefix for HBUS-attached accelerators here, maybe ACC_* or HBUS_*
-            exclude_list = ["DDR4CH0", "DDR4CH1", "DDR4CH2", "HBUS", "HLS_CONTROL"]
-            if ( config.RANGE_CLOCK_DOMAINS[i] not in SUPPORTED_CLOCK_DOMAINS[SOC_CONFIG] ) and ( config.RANGE_NAMES[i] not in exclude_list):
+            if ( config.RANGE_CLOCK_DOMAINS[i] not in SUPPORTED_CLOCK_DOMAINS[SOC_CONFIG] ) and ( config.RANGE_NAMES[i] not in DDR_CLOCK_DOMAIN_SLAVES):
                 print_error(f"The clock domain {config.RANGE_CLOCK_DOMAINS[i]}MHz is not supported")
                 return False
             # Check if all the main_clock_domain slaves have the same frequency as MAIN_CLOCK_DOMAIN
@@ -164,13 +239,16 @@ def check_intra_config(config : configuration.Configuration, config_file_name: s
                     print_error(f"The {config.RANGE_NAMES[i]} frequency {config.RANGE_CLOCK_DOMAINS[i]} must be the same as MAIN_CLOCK_DOMAIN {config.MAIN_CLOCK_DOMAIN}")
                     return False
             # Check if the DDR has the right frequency
-            exclude_list = ["DDR4CH0", "DDR4CH1", "DDR4CH2", "HBUS", "HLS_CONTROL"]
-            if config.RANGE_NAMES[i] in exclude_list:
+            if config.RANGE_NAMES[i] in DDR_CLOCK_DOMAIN_SLAVES:
                 if config.RANGE_CLOCK_DOMAINS[i] != DDR_FREQUENCY:
                     # TODO143: for now, limit HBUS to DDR clock (this also impacts PR128)
                     print_error(f"The DDR and HBUS frequency {config.RANGE_CLOCK_DOMAINS[i]} must be the same of DDR board clock {DDR_FREQUENCY}")
                     return False
 
+    # Check the ID ranges of the slave interfaces
+    if not check_thread_ids(config, config_file_name):
+        return False
+
     # Check the presence of multiple BRAMs, for now a single occurrence of BRAM is supported
     # Assume BRAM as prefix for any BRAM declaration
     bram_name = "BRAM"
@@ -190,38 +268,164 @@ def check_intra_config(config : configuration.Configuration, config_file_name: s
 #############################
 # Check configuration validity between parent and child buses
 def check_inter_config(configs : list) -> bool:
+    # Build the bus graph, checking cycles, loopbacks, reachability and address containment in a single visit
+    graph = bus_graph.get_bus_graph(configs)
+    for error in graph["errors"]:
+        print_error(error)
+    return graph["errors"] == []
+
+######################
+# Check connectivity #
+######################
+# Check that the boot and debug paths are still reachable with the (inferred) connectivity matrices:
+#   a) the ports fetching the instructions must read the boot memory and the debug ROM (DM_mem)
+#   b) the system master must write the boot memory (binary loading)
+#   c) the debug master must read and write every slave
+# and warn about the high-traffic paths narrowed below the width of both their ends (e.g. 512-bit accelerator traffic to DDR through the MBUS)
+def check_connectivity(configs : list) -> bool:
+    sys_config = next((c for c in configs if c.CONFIG_NAME == "SYS"), None)
+    boot_memory = sys_config.BOOT_MEMORY_BLOCK if sys_config is not None else "BRAM"
+    core_selector = sys_config.CORE_SELECTOR if sys_config is not None else ""
+    bus_names = [c.CONFIG_NAME for c in configs if c.CONFIG_NAME != "SYS"]
 
-    # For each Configuration
     for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+
+        # Slaves on the boot path in this bus: the boot memory itself or the bus leading to it
+        boot_path = [boot_memory]
+        for child_config in configs:
+            if boot_memory in child_config.RANGE_NAMES and child_config.CONFIG_NAME in config.RANGE_NAMES:
+                boot_path.append(child_config.CONFIG_NAME)
+        boot_path = [name for name in boot_path if name in config.RANGE_NAMES]
+
+        for master in config.MASTER_NAMES:
+            # Required (read, write) slaves of this master
+            # The ports fetching the instructions (the data port of the cores with a single port)
+            if infer_connectivity.is_fetch_port(master, core_selector):
+                required = (boot_path + [name for name in config.RANGE_NAMES if name == "DM_mem"], [])
+            elif master == "SYS_MASTER":
+                required = ([], boot_path)
+            elif master == "DBG_MASTER":
+                required = (config.RANGE_NAMES, config.RANGE_NAMES)
+            # The bus loopback master (e.g. MBUS on HBUS) reaches the boot memory on behalf of the MBUS masters
+            elif master in bus_names:
+                required = (boot_path, boot_path)
+            else:
+                continue
+
+            for slave in required[0]:
+                if not infer_connectivity.is_connected(config, config.READ_CONNECTIVITY, master, slave):
+                    print_error(f"{master} can't read {slave} in {config.CONFIG_NAME}, check READ_CONNECTIVITY")
+                    return False
+            for slave in required[1]:
+                if not infer_connectivity.is_connected(config, config.WRITE_CONNECTIVITY, master, slave):
+                    print_error(f"{master} can't write {slave} in {config.CONFIG_NAME}, check WRITE_CONNECTIVITY")
+                    return False
+
+    for path in plan_dwidth_converters.get_narrowed_paths(plan_dwidth_converters.plan_dwidth_converters(configs)["paths"]):
+        print_warning(f"{path['master']} -> {path['slave']} is narrowed to {path['narrowed_to']} bits through {' '.join(path['route'])} ({path['bandwidth_mbps']} MB/s), see make config_dwidth_plan")
+    return True
+
+####################
+# Check interrupts #
+####################
+# Check the interrupt sources of the PBUS and the PLIC (MBUS)
+def check_interrupts(configs : list) -> bool:
+    pbus_config = next((c for c in configs if c.CONFIG_NAME == "PBUS" and c.PROTOCOL != "DISABLE"), configuration.Configuration())
+    mbus_config = next((c for c in configs if c.CONFIG_NAME == "MBUS"), None)
+    if mbus_config is None:
+        return True
+
+    # a) PBUS sources
+    for name in pbus_config.INTERRUPT_NAMES:
+        if name not in create_interrupts_rtl.PBUS_INTERRUPT_SIGNALS:
+            print_error(f"Unknown PBUS interrupt source {name}, expected one of {list(create_interrupts_rtl.PBUS_INTERRUPT_SIGNALS)}")
+            return False
+        if name not in pbus_config.RANGE_NAMES:
+            print_error(f"PBUS interrupt source {name} is not in the PBUS RANGE_NAMES")
+            return False
+    if len(set(pbus_config.INTERRUPT_NAMES)) != len(pbus_config.INTERRUPT_NAMES):
+        print_error(f"Duplicated PBUS interrupt sources {pbus_config.INTERRUPT_NAMES}")
+        return False
+
+    # b) PLIC sources
+    names = mbus_config.INTERRUPT_NAMES
+    slave_names = [name for c in configs if c.CONFIG_NAME != "SYS" and c.PROTOCOL != "DISABLE" for name in c.RANGE_NAMES]
+    for name in names:
+        if name in pbus_config.INTERRUPT_NAMES:
+            continue
+        if name not in create_interrupts_rtl.MBUS_INTERRUPT_SIGNALS:
+            print_error(f"Unknown PLIC interrupt source {name}, expected a PBUS interrupt or one of {list(create_interrupts_rtl.MBUS_INTERRUPT_SIGNALS)}")
+            return False
+        # The slave can be moved behind a sub-bus of the MBUS (see partition_buses.py)
+        if create_interrupts_rtl.MBUS_INTERRUPT_SLAVES[name] not in slave_names:
+            print_error(f"PLIC interrupt source {name} requires {create_interrupts_rtl.MBUS_INTERRUPT_SLAVES[name]} in the RANGE_NAMES of a bus")
+            return False
+    if len(set(names)) != len(names):
+        print_error(f"Duplicated PLIC interrupt sources {names}")
+        return False
+    if PLIC_FIRST_LINE + len(names) > PLIC_NUM_LINES:
+        print_error(f"Too many PLIC interrupt sources ({len(names)}), the PLIC has {PLIC_NUM_LINES - PLIC_FIRST_LINE} lines")
+        return False
+    if mbus_config.INTERRUPT_PRIORITIES != [] and len(mbus_config.INTERRUPT_PRIORITIES) != len(names):
+        print_error("The number of INTERRUPT_PRIORITIES does not match the number of INTERRUPT_NAMES in MBUS")
+        return False
+    for name in pbus_config.INTERRUPT_NAMES:
+        if name not in names:
+            print_warning(f"PBUS interrupt source {name} is not connected to the PLIC (MBUS INTERRUPT_NAMES)")
+    return True
+
+###########################################
+# Check physical memory attributes (CVA6) #
+###########################################
+# Cores with PMA rules
+PMA_CORES = ["CORE_CV64A6", "CORE_CV64A6_ARA"]
+
+# Check that the cached, execute and non-idempotent regions fit the CVA6 PMA rules
+def check_pma(configs : list) -> bool:
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+    if core_selector not in PMA_CORES:
+        return True
+
+    rules = create_cva6_pma_rtl.get_pma_rules(configs)
+    for attribute, attribute_rules in rules.items():
+        if len(attribute_rules) > create_cva6_pma_rtl.PMA_MAX_RULES:
+            print_error(f"Too many {attribute} regions ({len(attribute_rules)}) for {core_selector}, at most {create_cva6_pma_rtl.PMA_MAX_RULES} rules are supported: place them contiguously")
+            return False
+    if rules["EXECUTE"] == []:
+        print_error(f"No executable region for {core_selector}")
+        return False
+    return True
+
+#################
+# Check budgets #
+#################
+# Check the estimated area and frequency of each crossbar against its budget
+def check_budgets(configs : list) -> bool:
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), SOC_CONFIG)
+    # The default coefficients would pass or fail the budgets on made-up numbers
+    if not coefficients["CALIBRATED"]:
+        print_error(f"CHECK_BUDGET requires calibrated crossbar estimates, but they are {estimate_crossbar.UNCALIBRATED_NOTE}: "
+                    "ingest the reports of a build (make config_qor_ingest) or fill the calibration table (see estimate_crossbar.py)")
+        return False
 
-        # If the config is the System one, skip checks (not a bus)
-        if config.CONFIG_NAME == "SYS":
+    for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
             continue
 
-        # For each master of the current Configuration
-        for mi_index in range(config.NUM_MI):
-            # If a master is a bus (is in the CONFIG_NAME dict)
-            if config.RANGE_NAMES[mi_index] in CONFIG_NAMES.values():
-                # Find the child bus configuration
-                for child_config in configs:
-                    if child_config.CONFIG_NAME == config.RANGE_NAMES[mi_index] and child_config.CONFIG_NAME != "MBUS":
-                        # Compute the base and the end address of the parent bus
-                        parent_base_address = int(config.BASE_ADDR[mi_index], 16)
-                        parent_end_address = parent_base_address + ~(~1 << (config.RANGE_ADDR_WIDTH[mi_index]-1))
-
-                        # Compute the base and the end address of the child bus
-                        child_base_address = int(child_config.BASE_ADDR[0], 16)
-                        last_base_address = int(child_config.BASE_ADDR[-1], 16) # Base address of last MI interface of this child
-                        child_end_address = last_base_address + ~(~1 << (child_config.RANGE_ADDR_WIDTH[-1]-1))
-
-                        # Do the checks
-                        # Check if the address space of the child is containted in the address space of the parent
-                        if child_base_address < parent_base_address or child_end_address > parent_end_address:
-                            # Except for HBUS, which can loop back to MBUS
-                            # TODO: revise this, maybe assume only one (first?) HBUS MI to loop back and skip check for that one only
-                            if child_config.CONFIG_NAME != "HBUS":
-                                print_error(f"Address of {child_config.CONFIG_NAME} is not properly contained in {config.CONFIG_NAME}")
-                                return False
+        estimate = estimate_crossbar.estimate_crossbar(config, coefficients)
+        clock_domain = get_bus_clock_domain(configs, config)
+        print_info(f"{config.CONFIG_NAME}: ~{estimate['LUT']} LUT, ~{estimate['FF']} FF, Fmax ~{estimate['FMAX_MHZ']} MHz ({clock_domain} MHz required)")
+        if config.LUT_BUDGET != 0 and estimate["LUT"] > config.LUT_BUDGET:
+            print_error(f"{config.CONFIG_NAME} crossbar exceeds LUT_BUDGET ({estimate['LUT']} > {config.LUT_BUDGET})")
+            return False
+        if config.FF_BUDGET != 0 and estimate["FF"] > config.FF_BUDGET:
+            print_error(f"{config.CONFIG_NAME} crossbar exceeds FF_BUDGET ({estimate['FF']} > {config.FF_BUDGET})")
+            return False
+        if estimate["FMAX_MHZ"] < clock_domain:
+            print_error(f"{config.CONFIG_NAME} crossbar estimated Fmax is below its clock ({estimate['FMAX_MHZ']} < {clock_domain} MHz)")
+            return False
     return True
 
 ##############
@@ -232,8 +436,8 @@ def parse_args(argv : list) -> list:
     # CSV configuration file path
     config_file_names = CONFIG_NAMES
     if len(sys.argv) >= 5:
-        # Get the array of bus/system names from the second arg to the last but one
-        config_file_names = sys.argv[1:len(CONFIG_NAMES)+1]
+        # Get the array of bus/system names from the second arg, including the additional buses (e.g. config_peripheral_bus_1.csv)
+        config_file_names = sys.argv[1:]
     print_info("Parsing done!")
     return config_file_names
 
@@ -246,6 +450,18 @@ if __name__ == "__main__":
 
     status = True
 
+    # Infer the connectivity matrices (if requested), using the selected core
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+    for config in configs:
+        config = infer_connectivity.infer_connectivity(config, core_selector)
+
+    # Select the crossbars STRATEGY and R_REGISTER (if requested), for their bus clock
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), SOC_CONFIG)
+    configs = select_crossbar_strategy.select_crossbar_strategies(configs, coefficients)
+    for config in configs:
+        for line in config.STRATEGY_RATIONALE:
+            print_info(f"{config.CONFIG_NAME}: {line}")
+
     # Intra-config check
     print_info(f"Starting checking {len(configs)} config...")
     print_info("Checking intra config validity")
@@ -268,6 +484,39 @@ if __name__ == "__main__":
     if status == False:
         exit(1)
 
+    # Connectivity check
+    print_info("Checking connectivity")
+
+    status = check_connectivity(configs)
+    # Some check failed
+    if status == False:
+        exit(1)
+
+    # Interrupts check
+    print_info("Checking interrupts")
+
+    status = check_interrupts(configs)
+    # Some check failed
+    if status == False:
+        exit(1)
+
+    # PMA check
+    print_info("Checking physical memory attributes")
+
+    status = check_pma(configs)
+    # Some check failed
+    if status == False:
+        exit(1)
+
+    # Budget check
+    if CHECK_BUDGET:
+        print_info("Checking crossbar budgets")
+
+        status = check_budgets(configs)
+        # Some check failed
+        if status == False:
+            exit(1)
+
     # Success inter-config check
     print_info("Checking configuration done!")
     exit(0)
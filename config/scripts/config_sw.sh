@@ -31,18 +31,21 @@ OUTPUT_MK_FILE=$2
 # Script #
 ##########
 
-xlen_value=$(grep "XLEN" ${CONFIG_SYS_CSV} | grep -v RANGE | awk -F "," '{print $2}');
+# Import utility functions
+source $(dirname ${BASH_SOURCE[0]})/utils.sh
+
+xlen_value=$(get_property ${CONFIG_SYS_CSV} XLEN);
 
 # TODO: 64 supported yet
 # if [[ "$xlen_value" == "32" || "$xlen_value" == "64" ]]; then
 if [[ "$xlen_value" == "32" || "$xlen_value" == "64" ]]; then
 
     echo "[CONFIG_SW] Setting XLEN to ${xlen_value} "
-    sed -E -i "s/XLEN.?\?=.+/XLEN \?= ${xlen_value}/g" ${OUTPUT_MK_FILE};
+    sed_atomic "s/XLEN.?\?=.+/XLEN \?= ${xlen_value}/g" ${OUTPUT_MK_FILE};
 
 else
     echo "[CONFIG_SW][ERROR] Invalid XLEN=$xlen_value value; no toolchain is supported for this XLEN value";
     exit 1;
 fi
 
-echo "[CONFIG_SW] Output file is at ${OUTPUT_MK_FILE}"
+echo "[CONFIG_SW] Output file is at $(get_output_file_name ${OUTPUT_MK_FILE})"
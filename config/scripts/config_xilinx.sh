@@ -37,6 +37,9 @@ OUTPUT_MK_FILE=$5
 # Script #
 ##########
 
+# Import utility functions
+source $(dirname ${BASH_SOURCE[0]})/utils.sh
+
 # Arrays of target values to parse from input and update in output
 sys_target_values=(
         CORE_SELECTOR
@@ -60,12 +63,12 @@ bus_target_values=(
 # Loop over system targets
 for target in ${sys_target_values[*]}; do
     # Search in the system_config.csv
-    target_value=$(grep "${target}" ${CONFIG_SYS_CSV} | grep -v RANGE | awk -F "," '{print $2}');
+    target_value=$(get_property ${CONFIG_SYS_CSV} ${target});
     # Info print
     echo "[CONFIG_XILINX] Updating ${target} = ${target_value} "
 
     # Replace in target file
-    sed -E -i "s/${target}.?\?=.+/${target} \?= ${target_value}/g" ${OUTPUT_MK_FILE};
+    sed_atomic "s/${target}.?\?=.+/${target} \?= ${target_value}/g" ${OUTPUT_MK_FILE};
 
     # Save XLEN for later
     if [[ "$target" == "XLEN" ]]; then
@@ -97,26 +100,29 @@ for target in ${bus_target_values[*]}; do
             ;;
     esac
 
-    # Search for value
-    target_value=$(grep "${grep_target}" ${source_config} | awk -F "," '{print $2}');
+    # Search for value (the whole property name, e.g. ID_WIDTH does not match THREAD_ID_WIDTH)
+    target_value=$(get_property ${source_config} ${grep_target});
 
     # Info print
     echo "[CONFIG_XILINX] Updating ${target} = ${target_value} "
 
     # Replace in target file
-    sed -E -i "s/${target}.?\?=.+/${target} \?= ${target_value}/g" ${OUTPUT_MK_FILE};
+    sed_atomic "s/${target}.?\?=.+/${target} \?= ${target_value}/g" ${OUTPUT_MK_FILE};
 done
 
 #################
 # BRAM RESIZING #
 #################
 
+# Number of address ranges for each slave (default 1), RANGE_ADDR_WIDTH and RANGE_BASE_ADDR hold ADDR_RANGES values per slave
+addr_ranges=$(get_property ${CONFIG_MAIN_CSV} ADDR_RANGES 1);
+
 # Assume each BRAM name starts with BRAM
 bram_name=BRAM
 # Get all slave names
-slaves=$(grep "RANGE_NAMES" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}');
+slaves=$(get_property ${CONFIG_MAIN_CSV} RANGE_NAMES);
 # Get all slave range address widths
-range_addr_widths=($(grep "RANGE_ADDR_WIDTH" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}'));
+range_addr_widths=($(get_property ${CONFIG_MAIN_CSV} RANGE_ADDR_WIDTH));
 
 # For loop variables
 let cnt=0
@@ -128,7 +134,8 @@ for slave in ${slaves[*]}; do
     # TODO74: need legal name convention each BRAM in the CSV must have the index as suffix, e.g. BRAM_0, BRAM_1, ...
     # Assume each BRAM name starts with BRAM and they are ordered in the CSV
     if [[ ${slave:0:$prefix_len} == $bram_name ]]; then
-        range_width=${range_addr_widths[$cnt]}
+        # Use the first range of this slave
+        range_width=${range_addr_widths[$(( cnt * addr_ranges ))]}
         bram_depth=$(( (1 << $range_width ) / $XLEN_bytes ))
 
         # Get the target file
@@ -136,7 +143,7 @@ for slave in ${slaves[*]}; do
 
         # Replace in the target file
         # NOTE: this will trigger the rebuild of the IP
-        sed -E -i "s#(set bram_depth)[[:space:]]*\{[^}]+\}#\1 {${bram_depth}}#g" "${bram_config}"
+        sed_atomic "s#(set bram_depth)[[:space:]]*\{[^}]+\}#\1 {${bram_depth}}#g" "${bram_config}"
         echo "[CONFIG_XILINX] Updating BRAM_DEPTH = ${bram_depth} for BRAM ${cnt}"
     fi
 
@@ -152,13 +159,13 @@ done
 ddr_prefix=DDR
 
 # Extract all slave names from the main CSV
-slaves=$(grep "RANGE_NAMES" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}')
+slaves=$(get_property ${CONFIG_MAIN_CSV} RANGE_NAMES)
 
 # Extract all corresponding range widths
-range_addr_widths=($(grep "RANGE_ADDR_WIDTH" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}'))
+range_addr_widths=($(get_property ${CONFIG_MAIN_CSV} RANGE_ADDR_WIDTH))
 
 # Extract all base addresses
-range_base_addrs=($(grep "RANGE_BASE_ADDR" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}'))
+range_base_addrs=($(get_property ${CONFIG_MAIN_CSV} RANGE_BASE_ADDR))
 
 # Counter for iterating over slaves
 cnt=0
@@ -168,22 +175,23 @@ for slave in ${slaves[*]}; do
     # Check if this slave is DDR
     if [[ "$slave" == "$ddr_prefix"* ]]; then
         # Remove possible 0x prefix from base address
-        ddr_base_hex=${range_base_addrs[$cnt]#0x}
+        # Use the first range of this slave
+        ddr_base_hex=${range_base_addrs[$(( cnt * addr_ranges ))]#0x}
         ddr_base=$((0x$ddr_base_hex))  # Convert to number
 
         # Calculate the high address: base + (2^range_width) - 1
-        range_width=${range_addr_widths[$cnt]}
+        range_width=${range_addr_widths[$(( cnt * addr_ranges ))]}
         ddr_high=$(( ddr_base + (1 << range_width) - 1 ))
 
         # Path to the system cache TCL config
         cache_config=${XILINX_IPS_ROOT}/hpc/xlnx_system_cache_0/config.tcl
 
         # Update CACHE_BASEADDR in TCL
-        sed -E -i "s#(set CACHE_BASEADDR)[[:space:]]*\{[^}]+\}#\1 {0x$(printf '%x' $ddr_base)}#g" "${cache_config}"
+        sed_atomic "s#(set CACHE_BASEADDR)[[:space:]]*\{[^}]+\}#\1 {0x$(printf '%x' $ddr_base)}#g" "${cache_config}"
         echo "[CONFIG_XILINX] Updating CACHE_BASEADDR = 0x$(printf '%x' $ddr_base)"
 
         # Update CACHE_HIGHADDR in TCL
-        sed -E -i "s#(set CACHE_HIGHADDR)[[:space:]]*\{[^}]+\}#\1 {0x$(printf '%x' $ddr_high)}#g" "${cache_config}"
+        sed_atomic "s#(set CACHE_HIGHADDR)[[:space:]]*\{[^}]+\}#\1 {0x$(printf '%x' $ddr_high)}#g" "${cache_config}"
         echo "[CONFIG_XILINX] Updating CACHE_HIGHADDR = 0x$(printf '%x' $ddr_high)"
     fi
 
@@ -197,13 +205,13 @@ done
 #################
 
 # Get the main clock domain
-main_clock_domain=$(grep "MAIN_CLOCK_DOMAIN" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}');
+main_clock_domain=$(get_property ${CONFIG_MAIN_CSV} MAIN_CLOCK_DOMAIN);
 
 # Get all clock domains
-clock_domains=$(grep "RANGE_CLOCK_DOMAINS" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}');
+clock_domains=$(get_property ${CONFIG_MAIN_CSV} RANGE_CLOCK_DOMAINS);
 
 # Get all slave names as list (not string)
-slaves=($(grep "RANGE_NAMES" ${CONFIG_MAIN_CSV} | awk -F "," '{print $2}'));
+slaves=($(get_property ${CONFIG_MAIN_CSV} RANGE_NAMES));
 
 # Clock domains different from the main domain (litterally new clock domains)
 clock_domains_list=MAIN_CLOCK_DOMAIN
@@ -227,13 +235,13 @@ for clock_domain in ${clock_domains[*]}; do
 done
 
 # Replace in target MK file
-sed -E -i "s/MAIN_CLOCK_FREQ_MHZ.?\?=.+/MAIN_CLOCK_FREQ_MHZ \?= ${main_clock_domain}/g" ${OUTPUT_MK_FILE};
-sed -E -i "s/RANGE_CLOCK_DOMAINS.?\?=.+/RANGE_CLOCK_DOMAINS \?= ${clock_domains_list}/g" ${OUTPUT_MK_FILE};
+sed_atomic "s/MAIN_CLOCK_FREQ_MHZ.?\?=.+/MAIN_CLOCK_FREQ_MHZ \?= ${main_clock_domain}/g" ${OUTPUT_MK_FILE};
+sed_atomic "s/RANGE_CLOCK_DOMAINS.?\?=.+/RANGE_CLOCK_DOMAINS \?= ${clock_domains_list}/g" ${OUTPUT_MK_FILE};
 if [[ ${SOC_CONFIG} == "embedded" ]]; then
     # Replace in AXI Lite UART
     # NOTE: this will trigger the rebuild of the IP
     AXI_UARTLITE_CONFIG=${XILINX_IPS_ROOT}/embedded/xlnx_axi_uartlite/config.tcl
-    sed -E -i "s/CONFIG.C_S_AXI_ACLK_FREQ_HZ ?\{[[:digit:]]+\}/CONFIG.C_S_AXI_ACLK_FREQ_HZ {${PBUS_CLOCK_FREQ_MHZ}000000}/g" ${AXI_UARTLITE_CONFIG};
+    sed_atomic "s/CONFIG.C_S_AXI_ACLK_FREQ_HZ ?\{[[:digit:]]+\}/CONFIG.C_S_AXI_ACLK_FREQ_HZ {${PBUS_CLOCK_FREQ_MHZ}000000}/g" ${AXI_UARTLITE_CONFIG};
 fi
 
 # Info print
@@ -242,4 +250,4 @@ echo "[CONFIG_XILINX] Updating RANGE_CLOCK_DOMAINS = ${clock_domains_list} "
 echo "[CONFIG_XILINX] Updating PBUS_CLOCK_FREQ_MHZ = ${PBUS_CLOCK_FREQ_MHZ} "
 
 # Done
-echo "[CONFIG_XILINX] Output file is at ${OUTPUT_MK_FILE}"
+echo "[CONFIG_XILINX] Output file is at $(get_output_file_name ${OUTPUT_MK_FILE})"
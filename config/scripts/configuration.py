@@ -7,6 +7,13 @@
 # to print logging and error messages in the shell
 import logging
 
+# Valid AXI protocols
+VALID_PROTOCOLS = ["AXI4", "AXI4LITE", "DISABLE"] # AXI3 not implemented yet
+
+# Get the kind of a bus (MBUS, PBUS, HBUS) from its name, additional buses of the same kind are numbered (e.g. PBUS1 -> PBUS)
+def get_bus_kind(config_name : str) -> str:
+	return config_name.rstrip("0123456789")
+
 # Wrapper class for configuration properties
 class Configuration:
 	def __init__(self):
@@ -15,6 +22,8 @@ class Configuration:
                                   "CORE_MICROBLAZEV_RV64", "CORE_CV64A6", "CORE_CV64A6_ARA"]
 		self.CORE_SELECTOR		 : str = ""		# (Mandatory) No default core
 		self.VIO_RESETN_DEFAULT	 : int = 1      # Reset using Xilinx VIO
+		self.BOOT_MEMORY_BLOCK	 : str = "BRAM" # Memory device to use for boot
+		self.DMA_POOL_SIZE		 : int = 0x1000 # Bytes of each DMA buffer pool (see dma_pools.py), 0 for none
 		self.PROTOCOL			 : str = ""		# AXI PROTOCOL used, use "MOCK" to skip checks
 		self.XLEN                : int = 32		# MBUS, CPU and Toolchain data width
 		self.PHYSICAL_ADDR_WIDTH : int = 32 	# MBUS physical address width
@@ -31,14 +40,24 @@ class Configuration:
 		self.RANGE_ADDR_WIDTH	 : list = [] 	# the width of each Range of each Master
 		self.READ_CONNECTIVITY	 : list = [] 	# the enable option for each MI_to_SI possible Connection for Read Operations
 		self.WRITE_CONNECTIVITY	 : list = [] 	# the enable option for each MI_to_SI possible Connection for Write Operations
+		self.READ_CONNECTIVITY_AUTO	 : bool = False # Infer READ_CONNECTIVITY from the masters reachability (READ_CONNECTIVITY,AUTO)
+		self.WRITE_CONNECTIVITY_AUTO : bool = False # Infer WRITE_CONNECTIVITY from the masters reachability (WRITE_CONNECTIVITY,AUTO)
+		self.MASTER_REACHABILITY : dict = {}    # Slaves reachable by each master, used to infer the connectivity
+		self.MASTER_TRAFFIC_PROFILE : dict = {} # Read and write demand of each master (transactions per cycle), used to tune the depths
 		self.STRATEGY			 : int = 0 		# Implementation strategy, Minimize Area (1), Maximize Performance (2)
 		self.R_REGISTER			 : int = 0 		# Internal Registers division
+		self.STRATEGY_AUTO		 : bool = False # Select STRATEGY from the bus clock, ports and width (STRATEGY,AUTO)
+		self.R_REGISTER_AUTO	 : bool = False # Select R_REGISTER from the bus clock, ports and width (R_REGISTER,AUTO)
+		self.REGISTER_SLICES	 : list = [] 	# Ports needing an external register slice, found by the AUTO selection
+		self.STRATEGY_RATIONALE	 : list = [] 	# Rationale of the AUTO selection, one line for each decision
 		self.Slave_Priorities	 : list = [] 	# Scheduling Priority for each Slave
 		self.SI_READ_ACCEPTANCE	 : list = [] 	# Number of possible Active Read Transaction at the same time for each Slave
 		self.SI_WRITE_ACCEPTANCE : list = [] 	# Number of possible Active Write Transaction at the same time for each Slave
 		self.THREAD_ID_WIDTH	 : list = [] 	# Number of ID bits used by each SI for thei respective Threads
+		self.THREAD_ID_AUTO		 : bool = False # Derive THREAD_ID_WIDTH from the master names (THREAD_ID_WIDTH,AUTO)
 		self.SINGLE_THREAD		 : list = [] 	# Enable options for each SI in regards to the Single Thread Option
 		self.BASE_ID			 : list = [] 	# Base ID for each SI
+		self.BASE_ID_ALLOCATED	 : bool = False # BASE_ID allocated from THREAD_ID_WIDTH, not set by the user (see allocate_thread_ids.py)
 		self.MI_READ_ISSUING	 : list = [] 	# Number of possible Active Read Transaction at the same time for each Master
 		self.MI_WRITE_ISSUING    : list = [] 	# Number of possible Active Write Transaction at the same time for each Master
 		self.SECURE				 : list = [] 	# Master SECURE mode
@@ -49,6 +68,11 @@ class Configuration:
 		self.BUSER_WIDTH		 : int = 0		# AXI  B User width
 		self.MAIN_CLOCK_DOMAIN   : int = 100    # Core + mbus clock domain (the main clock domain)
 		self.RANGE_CLOCK_DOMAINS       : list = []    # MBUS slaves clock domains
+		self.RANGE_TRAFFIC_CLASSES     : list = []    # Slaves traffic classes (HIGH, LOW), derived from the names if missing
+		self.LUT_BUDGET          : int = 0      # Crossbar LUT budget for the estimate (CHECK_BUDGET), 0 for none
+		self.FF_BUDGET           : int = 0      # Crossbar FF budget for the estimate (CHECK_BUDGET), 0 for none
+		self.INTERRUPT_NAMES     : list = []    # Interrupt sources in line order (PBUS: output lines from 0, MBUS: PLIC lines from 1)
+		self.INTERRUPT_PRIORITIES : list = []   # PLIC priority of each MBUS interrupt source, 1 if missing
 
     ###########
     # Setters #
@@ -0,0 +1,245 @@
+# Author: agent <agent@local>
+# Description:
+#   Generate the clock wizard tcl configuration file and the matching clock wizard instance (sys_master_clk_wiz.svinc).
+#   Only the clock domains actually referenced by MAIN_CLOCK_DOMAIN and RANGE_CLOCK_DOMAINS are generated by the clock wizard,
+#   the DDR clock domain (DDR_FREQUENCY) is generated by the DDR IP and it is skipped.
+#   The clock outputs of the sys_master (its clk_<N>MHz_o ports) not generated by the clock wizard are tied to zero, together with their resets.
+#   The MMCM settings tuned by hand for the clock domains of each SoC (VCO, output dividers, jitter and phase error) are kept
+#   when all the clock domains in use are known, otherwise the clock wizard computes them from the requested frequencies.
+#   The clock domains are then assigned to the slaves by declare_and_assign_clocks_rtl.py (uninasoc_clk_assignments.svinc).
+# Args:
+#   1: Input configuration file for the MBUS
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Parse the sys_master ports
+import re
+# Sub-scripts
+import configuration
+from utils import *
+from check_config import SOC_CONFIG, DDR_CLOCK_DOMAIN_SLAVES
+
+# Clock wizard IP of each SoC, the input clock and reset connections in the sys_master, and the input properties of the IP
+CLK_WIZ_IPS = {
+    "embedded" : {
+        "ip_name"   : "xlnx_clk_wiz",
+        "clk_in"    : "sys_clock_i",
+        "resetn"    : "~sys_reset_i",
+        "properties": [
+            "CONFIG.CLK_IN1_BOARD_INTERFACE {Custom}",
+            "CONFIG.RESET_BOARD_INTERFACE {Custom}",
+            "CONFIG.RESET_TYPE {Active_Low}",
+            "CONFIG.PRIM_SOURCE {No_buffer}",
+            "CONFIG.USE_RESET {true}",
+        ],
+    },
+    "hpc" : {
+        "ip_name"   : "xlnx_clk_wiz_hpc",
+        "clk_in"    : "axi_aclk",
+        "resetn"    : "axi_aresetn",
+        "properties": [
+            "CONFIG.CLKIN1_JITTER_PS {40.0}",
+            "CONFIG.MMCM_CLKIN1_PERIOD {4.000}",
+            "CONFIG.MMCM_CLKIN2_PERIOD {10.0}",
+            "CONFIG.PRIM_IN_FREQ {250.000}",
+            "CONFIG.RESET_PORT {resetn}",
+            "CONFIG.RESET_TYPE {ACTIVE_LOW}",
+        ],
+    },
+}
+
+# Hand-tuned MMCM settings of each SoC: the VCO (multiplier and input divider) and, for each clock domain (MHz),
+# the output divider, jitter and phase error (None if left to the clock wizard)
+MMCM_SETTINGS = {
+    "embedded" : {
+        # 100 MHz input, 1000 MHz VCO
+        "CLKFBOUT_MULT_F"   : 10.0,
+        "DIVCLK_DIVIDE"     : 1,
+        "outputs"           : {
+            100 : (10,  None,    None  ),
+            50  : (20,  132.683, 87.180),
+            20  : (50,  162.167, 87.180),
+            10  : (100, 188.586, 87.180),
+        },
+    },
+    "hpc" : {
+        # 250 MHz input, 1000 MHz VCO
+        "CLKFBOUT_MULT_F"   : 4.0,
+        "DIVCLK_DIVIDE"     : 1,
+        "outputs"           : {
+            250 : (4,   89.528,  85.928),
+            100 : (10,  107.111, 85.928),
+            50  : (20,  123.073, 85.928),
+            20  : (50,  148.005, 85.928),
+            10  : (100, 169.738, 85.928),
+        },
+    },
+}
+
+# Output files
+OUTPUT_FILES = {
+    "TCL"     : f"{os.environ.get('XILINX_ROOT')}/ips/{SOC_CONFIG}/{CLK_WIZ_IPS[SOC_CONFIG]['ip_name']}/config.tcl",
+    "SVINC"   : f"{os.environ.get('XILINX_ROOT')}/rtl/sys_master_clk_wiz.svinc",
+}
+
+# The sys_master RTL, declaring a clock output for each clock domain
+SYS_MASTER_FILE = f"{os.environ.get('XILINX_ROOT')}/rtl/sys_master.sv"
+
+# Template strings
+tcl_template_str = r"""# This file is auto-generated with {current_file_path}
+# Import IP
+create_ip -name clk_wiz -vendor xilinx.com -library ip -version 6.0 -module_name $::env(IP_NAME)
+
+# Configure IP, with one output clock for each clock domain in use: {clock_domains_list}
+set_property -dict [list \
+{properties_block}
+] [get_ips $::env(IP_NAME)]
+"""
+
+rtl_template_str = r"""// This file is auto-generated with {current_file_path}
+
+/////////////////////////////////////
+// Clock wizard and resets syncs   //
+/////////////////////////////////////
+
+// Clock wizard, generating only the clock domains in use: {clock_domains_list}
+{ip_name} clkwiz_u (
+    .clk_in1  ( {clk_in} ),
+    .resetn   ( {resetn} ),
+    .locked   ( locked ),
+{ports_block}
+);
+
+{resets_block}
+
+// Unused clock domains
+{unused_block}
+"""
+
+# Get the sorted list of the clock domains (in MHz) generated by the clock wizard
+def get_used_clock_domains(config: configuration.Configuration) -> list:
+    clock_domains = {config.MAIN_CLOCK_DOMAIN}
+    for clock, name in zip(config.RANGE_CLOCK_DOMAINS, config.RANGE_NAMES):
+        # The DDR clock domain is generated by the DDR IP
+        if name in DDR_CLOCK_DOMAIN_SLAVES or name.startswith("DDR4CH"):
+            continue
+        clock_domains.add(clock)
+    return sorted(clock_domains)
+
+# Get the sorted list of the clock domains (in MHz) of the sys_master, from its clock outputs
+def get_sys_master_clock_domains(file_name: str) -> list:
+    with open(file_name, "r") as f:
+        rtl = f.read()
+    return sorted(int(clock) for clock in set(re.findall(r"output\s+logic\s+clk_(\d+)MHz_o", rtl)))
+
+# Render the clock wizard properties, one output for each clock domain, from the fastest to the slowest.
+# The tuned MMCM settings are used if all the clock domains are known, as they share the VCO
+def render_tcl_properties(clock_domains: list) -> str:
+    properties = CLK_WIZ_IPS[SOC_CONFIG]["properties"].copy()
+    mmcm = MMCM_SETTINGS[SOC_CONFIG]
+    tuned = all(clock in mmcm["outputs"] for clock in clock_domains)
+    if tuned:
+        properties.append(f"CONFIG.MMCM_CLKFBOUT_MULT_F {{{mmcm['CLKFBOUT_MULT_F']:.3f}}}")
+        properties.append(f"CONFIG.MMCM_DIVCLK_DIVIDE {{{mmcm['DIVCLK_DIVIDE']}}}")
+    for i, clock in enumerate(sorted(clock_domains, reverse=True), start=1):
+        properties.append(f"CONFIG.CLKOUT{i}_USED {{true}}")
+        properties.append(f"CONFIG.CLK_OUT{i}_PORT {{clk_{clock}}}")
+        properties.append(f"CONFIG.CLKOUT{i}_REQUESTED_OUT_FREQ {{{clock:.3f}}}")
+        if not tuned:
+            continue
+        divide, jitter, phase_error = mmcm["outputs"][clock]
+        # Only the first MMCM output has a fractional divider
+        if i == 1:
+            properties.append(f"CONFIG.MMCM_CLKOUT0_DIVIDE_F {{{divide:.3f}}}")
+        else:
+            properties.append(f"CONFIG.MMCM_CLKOUT{i-1}_DIVIDE {{{divide}}}")
+        if jitter is not None:
+            properties.append(f"CONFIG.CLKOUT{i}_JITTER {{{jitter:.3f}}}")
+            properties.append(f"CONFIG.CLKOUT{i}_PHASE_ERROR {{{phase_error:.3f}}}")
+    properties.append(f"CONFIG.NUM_OUT_CLKS {{{len(clock_domains)}}}")
+    return "\n".join(f"    {p} \\" for p in properties)
+
+# Render the clock wizard ports, one for each clock domain
+def render_ports(clock_domains: list) -> str:
+    lines = []
+    for clock in sorted(clock_domains, reverse=True):
+        lines.append(f"    .clk_{clock}  ( clk_{clock}MHz_o )")
+    return ",\n".join(lines)
+
+# Render a reset synchronizer for each clock domain
+def render_resets(clock_domains: list) -> str:
+    lines = []
+    for clock in clock_domains:
+        lines.append(f"// Reset sync for {clock} MHz clock")
+        lines.append(f"xpm_cdc_async_rst #(")
+        lines.append(f"    .DEST_SYNC_FF    ( 4 ), // Use 4 sync registers")
+        lines.append(f"    .RST_ACTIVE_HIGH ( 0 )  // Use active low reset")
+        lines.append(f") xpm_cdc_async_rst_{clock}MHz_u (")
+        lines.append(f"    .src_arst  ( locked ),")
+        lines.append(f"    .dest_clk  ( clk_{clock}MHz_o ),")
+        lines.append(f"    .dest_arst ( rstn_{clock}MHz_o )")
+        lines.append(f");")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+# Tie the unused clock domains to zero
+def render_unused(clock_domains: list, sys_master_clock_domains: list) -> str:
+    lines = []
+    for clock in sys_master_clock_domains:
+        if clock in clock_domains:
+            continue
+        lines.append(f"assign clk_{clock}MHz_o = 1'b0;")
+        lines.append(f"assign rstn_{clock}MHz_o = 1'b0;")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    config_file_names = sys.argv[1:]
+    configs = read_config(config_file_names)
+
+    # Get the MBUS configuration
+    mbus_config = next((c for c in configs if c.CONFIG_NAME == "MBUS"), None)
+    if mbus_config is None:
+        sys.exit(0)
+
+    # Get clock domains
+    clock_domains = get_used_clock_domains(mbus_config)
+    clock_domains_list = " ".join(f"{clock}MHz" for clock in clock_domains)
+    print_info(f"Clock wizard outputs: {clock_domains_list}")
+
+    # The clock domains in use must be clock outputs of the sys_master
+    sys_master_clock_domains = get_sys_master_clock_domains(SYS_MASTER_FILE)
+    missing_clock_domains = [clock for clock in clock_domains if clock not in sys_master_clock_domains]
+    if missing_clock_domains:
+        print_error(f"Clock domains {missing_clock_domains} MHz are not clock outputs of the sys_master ({SYS_MASTER_FILE})")
+        sys.exit(1)
+    if not all(clock in MMCM_SETTINGS[SOC_CONFIG]["outputs"] for clock in clock_domains):
+        print_warning(f"No tuned MMCM settings for {clock_domains_list}, the clock wizard computes them")
+
+    rendered_tcl = tcl_template_str.format(
+        current_file_path=os.path.basename(__file__),
+        clock_domains_list=clock_domains_list,
+        properties_block=render_tcl_properties(clock_domains),
+    )
+    write_output_file(OUTPUT_FILES["TCL"], rendered_tcl)
+    print(f"[CONFIG] Output file is at {get_output_file_name(OUTPUT_FILES['TCL'])}")
+
+    rendered_rtl = rtl_template_str.format(
+        current_file_path=os.path.basename(__file__),
+        clock_domains_list=clock_domains_list,
+        ip_name=CLK_WIZ_IPS[SOC_CONFIG]["ip_name"],
+        clk_in=CLK_WIZ_IPS[SOC_CONFIG]["clk_in"],
+        resetn=CLK_WIZ_IPS[SOC_CONFIG]["resetn"],
+        ports_block=render_ports(clock_domains),
+        resets_block=render_resets(clock_domains),
+        unused_block=render_unused(clock_domains, sys_master_clock_domains),
+    )
+    write_output_file(OUTPUT_FILES["SVINC"], rendered_rtl)
+    print(f"[CONFIG] Output file is at {get_output_file_name(OUTPUT_FILES['SVINC'])}")
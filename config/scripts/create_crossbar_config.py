@@ -6,8 +6,11 @@
 # Note:
 #   Addresses overlaps are not sanitized.
 # Args:
-#   1: Input configuration file
-#   2: Output generated tcl file
+#   1: System configuration file
+#   2: Bus configuration file
+#   3: Output generated tcl file
+#   4: (Optional) MBUS configuration file, for the bus clock of STRATEGY,AUTO and R_REGISTER,AUTO
+#   5+: (Optional) Configuration files of all the buses (CONFIG_BUS_CSVS), for the ID ranges of the bus-to-bus SIs
 
 ####################
 # Import libraries #
@@ -15,12 +18,18 @@
 # Parse args
 import os
 import sys
-# Manipulate CSV
-import pandas as pd
+# Compose the TCL file in memory
+import io
 # Sub-scripts
 import parse_properties_wrapper
 import write_tcl
 import configuration
+import allocate_thread_ids
+import infer_connectivity
+import estimate_crossbar
+import select_crossbar_strategy
+import property_store
+import utils
 
 ##############
 # Parse args #
@@ -42,6 +51,16 @@ config_tcl_file_name = 'hw/xilinx/ips/common/xlnx_axi_crossbar/config.tcl'
 if len(sys.argv) >= 4:
 	config_tcl_file_name = sys.argv[3]
 
+# CSV MBUS configuration file path (the bus itself if not provided)
+mbus_config_file_name = bus_config_file_name
+if len(sys.argv) >= 5:
+	mbus_config_file_name = sys.argv[4]
+
+# CSV configuration files of all the buses (the bus and the MBUS if not provided)
+bus_config_file_names = list(dict.fromkeys([mbus_config_file_name, bus_config_file_name]))
+if len(sys.argv) >= 6:
+	bus_config_file_names = sys.argv[5:]
+
 ###############
 # Environment #
 ###############
@@ -60,19 +79,11 @@ def compose_index ( index_int : int ):
     # Return
     return index_string
 
-# Avoid Pandas print truncations
-# pd.set_option('display.max_colwidth', 1000)
-
 # Init configuration
 config = configuration.Configuration()
 
-# Assign config bus name
-if "main_bus" in bus_config_file_name:
-    config.CONFIG_NAME = "MBUS"
-elif "peripheral_bus" in bus_config_file_name:
-    config.CONFIG_NAME = "PBUS"
-elif "highperformance_bus" in bus_config_file_name:
-    config.CONFIG_NAME = "HBUS"
+# Assign config bus name (e.g. MBUS, or PBUS1 for config_peripheral_bus_1.csv)
+config.CONFIG_NAME = utils.get_config_name(bus_config_file_name)
 
 # TODO127:
 # In the previous version we first read the sys config and then the bus config
@@ -84,15 +95,15 @@ elif "highperformance_bus" in bus_config_file_name:
 ###################
 # Read Bus config #
 ###################
-# Read CSV file
-config_df = pd.read_csv(bus_config_file_name, sep=",")
+# Read CSV file, with its layers
+bus_store = property_store.load_store(bus_config_file_name)
 
 ########################
 # Update configuration #
 ########################
 # Update configuration by calling wrapper function for each property
-for index, row in config_df.iterrows():
-    config = parse_properties_wrapper.parse_property(config, row["Property"], row["Value"])
+for property_name, value in bus_store.parse_items():
+    config = parse_properties_wrapper.parse_property(config, property_name, value)
 
 # Skip DISABLE buses
 if config.PROTOCOL == "DISABLE":
@@ -103,10 +114,26 @@ if config.PROTOCOL == "DISABLE":
 # Read Sys config #
 ###################
 
-config_df = pd.read_csv(sys_config_file_name, sep=",")
+sys_store = property_store.load_store(sys_config_file_name)
+
+for property_name, value in sys_store.parse_items():
+    config = parse_properties_wrapper.parse_property(config, property_name, value)
 
-for index, row in config_df.iterrows():
-    config = parse_properties_wrapper.parse_property(config, row["Property"], row["Value"])
+# Partition the ID space among the slave interfaces, the bus-to-bus ones from the ID ranges of the other buses
+bus_widths = allocate_thread_ids.get_bus_thread_id_widths(utils.read_config(bus_config_file_names), config.CONFIG_NAME)
+config = allocate_thread_ids.allocate_thread_ids(config, bus_widths)
+
+# Prune the unused paths
+config = infer_connectivity.infer_connectivity(config, config.CORE_SELECTOR)
+
+# Select STRATEGY and R_REGISTER for the bus clock, if AUTO
+if config.STRATEGY_AUTO or config.R_REGISTER_AUTO:
+	mbus_configs = utils.read_config([mbus_config_file_name]) if mbus_config_file_name != bus_config_file_name else []
+	clock_domain = utils.get_bus_clock_domain(mbus_configs + [config], config)
+	coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), os.getenv("SOC_CONFIG", "embedded"))
+	config = select_crossbar_strategy.select_crossbar_strategy(config, clock_domain, coefficients)
+	for line in config.STRATEGY_RATIONALE:
+		utils.print_info(f"{config.CONFIG_NAME}: {line}")
 
 ####################
 # Prepare commands #
@@ -223,8 +250,8 @@ config_list.extend(BASE_ID_config_list)
 # Write TCL file #
 ##################
 
-# Creates the actual TCL file
-file = open(config_tcl_file_name,  "w")
+# Compose the TCL file in memory, then write it at once
+file = io.StringIO()
 # Write header lines
 write_tcl.initialize_File(file, os.path.basename(__file__))
 
@@ -237,8 +264,13 @@ for command in config_list:
 # Write closing lines
 write_tcl.end_File(file)
 
-# Close file
-file.close
+# Record the rationale of the AUTO selection
+for line in config.STRATEGY_RATIONALE:
+	file.write(f"\n# {line}")
+
+# Write the actual TCL file
+utils.write_output_file(config_tcl_file_name, file.getvalue())
+file.close()
 
 # Print filename
-print("[CONFIG] Output file is at " + config_tcl_file_name)
+print("[CONFIG] Output file is at " + utils.get_output_file_name(config_tcl_file_name))
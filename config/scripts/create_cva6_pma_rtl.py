@@ -0,0 +1,91 @@
+# Author: agent <agent@local>
+# Description: utility functions to write the physical memory attributes (PMA) of CVA6 (CORE_CV64A6, CORE_CV64A6_ARA),
+#   derived from the address map of the MBUS and HBUS (see cv64a6_config_pkg.sv in hw/units/custom_cv64a6*)
+#   - cached regions: the memories (BRAM, HBM, DDR4CH*)
+#   - execute regions: the memories and the debug memory (DM_mem)
+#   - non-idempotent regions: all the other slaves (e.g. PBUS, PLIC, CDMA, HLS_CONTROL), never accessed speculatively
+#   Adjacent ranges with the same attributes are merged in a single rule, as CVA6 supports PMA_MAX_RULES rules per attribute.
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Sub-scripts
+import configuration
+from utils import *
+
+# Constants
+
+# Max number of rules per attribute (1024-bit AddrBase/Length vectors of 64-bit rules, see CVA6 config_pkg)
+PMA_MAX_RULES = 16
+PMA_RULE_WIDTH = 64
+# Executable slaves, other than the memories
+EXECUTE_SLAVES = ["DM_mem"]
+
+# RTL files to edit
+RTL_FILES = {
+    "PMA" : f"{os.environ.get('XILINX_ROOT')}/rtl/uninasoc_pma.svinc",
+}
+
+# File comments
+FILE_HEADER = f"// This file is auto-generated with {os.path.basename(__file__)}\n\n"
+
+# Merge adjacent (or overlapping) ranges, as a sorted list of (base, end)
+def merge_ranges(ranges : list) -> list:
+    rules = []
+    for base, end in sorted(ranges):
+        if rules != [] and base <= rules[-1][1] + 1:
+            rules[-1] = (rules[-1][0], max(rules[-1][1], end))
+        else:
+            rules.append((base, end))
+    return rules
+
+# Get the PMA rules of the MBUS and HBUS slaves, as {"CACHED": [(base, end)], "EXECUTE": [...], "NON_IDEMPOTENT": [...]}
+def get_pma_rules(configs : list) -> dict:
+    ranges = {"CACHED": [], "EXECUTE": [], "NON_IDEMPOTENT": []}
+    for config in configs:
+        if config.CONFIG_NAME not in ["MBUS", "HBUS"] or config.PROTOCOL == "DISABLE":
+            continue
+        for r in get_address_ranges(config.RANGE_NAMES, config.BASE_ADDR, config.RANGE_ADDR_WIDTH, config.ADDR_RANGES):
+            # The slaves of the HBUS are listed in its own config, and the MBUS loopback of the HBUS is the MBUS itself
+            if r["device"] in ["MBUS", "HBUS"]:
+                continue
+            if is_memory(r["device"]):
+                ranges["CACHED"].append((r["base"], r["end"]))
+                ranges["EXECUTE"].append((r["base"], r["end"]))
+            elif r["device"] in EXECUTE_SLAVES:
+                ranges["EXECUTE"].append((r["base"], r["end"]))
+            else:
+                ranges["NON_IDEMPOTENT"].append((r["base"], r["end"]))
+    return {attribute: merge_ranges(attribute_ranges) for attribute, attribute_ranges in ranges.items()}
+
+# Pack the rules in a 1024-bit vector, rule 0 in the LSBs
+def pack_rules(values : list) -> str:
+    if values == []:
+        return f"{PMA_MAX_RULES * PMA_RULE_WIDTH}'(0)"
+    return f"{PMA_MAX_RULES * PMA_RULE_WIDTH}'({{" + ", ".join(f"64'h{v:016x}" for v in reversed(values)) + "})"
+
+# Declare the PMA rules (cv64a6_config_pkg.sv)
+def declare_pma_rules(rules : dict) -> str:
+    lines = [FILE_HEADER]
+    for attribute, attribute_rules in rules.items():
+        lines.append(f"// {attribute.replace('_', '-').lower()} regions\n")
+        for base, end in attribute_rules:
+            lines.append(f"//   [0x{base:x}, 0x{end:x}]\n")
+        lines.append(f"localparam int unsigned PMA_NR_{attribute}_RULES = {len(attribute_rules)};\n")
+        lines.append(f"localparam logic [{PMA_MAX_RULES * PMA_RULE_WIDTH - 1}:0] PMA_{attribute}_ADDR_BASE = {pack_rules([base for base, _ in attribute_rules])};\n")
+        lines.append(f"localparam logic [{PMA_MAX_RULES * PMA_RULE_WIDTH - 1}:0] PMA_{attribute}_LENGTH = {pack_rules([end - base + 1 for base, end in attribute_rules])};\n")
+        lines.append("\n")
+    return "".join(lines).rstrip("\n") + "\n"
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    config_file_names = sys.argv[1:]
+    configs = read_config(config_file_names)
+
+    write_output_file(RTL_FILES["PMA"], declare_pma_rules(get_pma_rules(configs)))
@@ -0,0 +1,191 @@
+# Author: agent <agent@local>
+# Description:
+#   Generate the FreeRTOS port header and linker script fragment from the configuration (see sw/SoC/projects/freertos):
+#       - the CPU clock, from the MAIN_CLOCK_DOMAIN
+#       - the heap (configAPPLICATION_ALLOCATED_HEAP), in the fastest memory for the core data master, i.e. the highest
+#         bandwidth path (see plan_dwidth_converters.get_paths) and then the lowest latency, sized on that memory
+#       - the system tick timer, the first PBUS TIM with a PLIC line: base address, clock and PLIC line
+#       - the stack sizes, scaled to XLEN: the task stacks are in words of XLEN bits, the interrupt stack in bytes
+#   Both outputs are plain definitions, so that the header can also be included in assembly sources.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses
+#   Second to last: Output header file
+#   Last: Output linker script fragment
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# For basename
+import os
+# Sub-scripts
+import configuration
+import infer_connectivity
+import bus_graph
+import plan_dwidth_converters
+from tune_crossbar_depths import SLAVE_LATENCIES, DEFAULT_SLAVE_LATENCY, get_by_prefix
+from utils import *
+
+# Constants
+
+# Data master of the core
+CORE_DATA_MASTER = "RV_SOCKET_DATA"
+# The heap takes a quarter of its memory, up to MAX_HEAP_SIZE bytes
+HEAP_FRACTION = 4
+MAX_HEAP_SIZE = 0x100000
+HEAP_ALIGN = 16
+# Minimal task stack (words of XLEN bits, i.e. 1 KiB on RV32 and 2 KiB on RV64)
+MINIMAL_STACK_WORDS = 256
+# Interrupt stack, in bytes on RV32, doubled on RV64
+IRQ_STACK_SIZE_RV32 = 0x1000
+
+# Get the address ranges of the enabled buses, by device name (first range)
+def get_device_ranges(configs : list) -> dict:
+    ranges = {}
+    for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        for r in get_address_ranges(config.RANGE_NAMES, config.BASE_ADDR, config.RANGE_ADDR_WIDTH, config.ADDR_RANGES):
+            ranges.setdefault(r["device"], r)
+    return ranges
+
+# Get the fastest memory for the core: highest bandwidth, then lowest latency (slave and bus hops)
+# Falls back to the boot memory if the core data master reaches no memory
+def get_heap_memory(configs : list, sys_config : configuration.Configuration) -> dict:
+    graph = bus_graph.get_bus_graph(configs)
+    widths = plan_dwidth_converters.get_bus_widths(graph, sys_config.XLEN)
+    clocks = plan_dwidth_converters.get_bus_clocks(graph)
+    paths = [p for p in plan_dwidth_converters.get_paths(graph, widths, clocks) if p["master"] == CORE_DATA_MASTER and is_memory(p["slave"])]
+    if paths == []:
+        return {"memory": sys_config.BOOT_MEMORY_BLOCK, "bandwidth_mbps": None, "latency": None}
+    for p in paths:
+        p["latency"] = get_by_prefix(SLAVE_LATENCIES, p["slave"], DEFAULT_SLAVE_LATENCY) + len(p["route"]) - 1
+    fastest = min(paths, key=lambda p: (-p["bandwidth_mbps"], p["latency"]))
+    return {"memory": fastest["slave"], "bandwidth_mbps": fastest["bandwidth_mbps"], "latency": fastest["latency"]}
+
+# Get the system tick timer: the first PBUS TIM with a PLIC line, as {"name", "bus", "base", "clock_hz", "line"}, None if none
+def get_tick_timer(configs : list, ranges : dict) -> dict:
+    mbus_config = next((c for c in configs if c.CONFIG_NAME == "MBUS"), None)
+    if mbus_config is None:
+        return None
+    lines = {s["name"]: s["line"] for s in get_plic_sources(mbus_config.INTERRUPT_NAMES, mbus_config.INTERRUPT_PRIORITIES)}
+    for config in configs:
+        if configuration.get_bus_kind(config.CONFIG_NAME) != "PBUS" or config.PROTOCOL == "DISABLE":
+            continue
+        for name in config.RANGE_NAMES:
+            if name.startswith("TIM") and name in lines:
+                return {
+                    "name": name,
+                    "bus": config.CONFIG_NAME,
+                    "base": ranges[name]["base"],
+                    "clock_hz": get_bus_clock_domain(configs, config) * 1000000,
+                    "line": lines[name],
+                }
+    return None
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 5:
+        print("Usage: <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_HEADER_FILE> <OUTPUT_LD_FILE>")
+        sys.exit(1)
+
+    config_file_names = sys.argv[1:-2]
+    output_header_file = sys.argv[-2]
+    output_ld_file = sys.argv[-1]
+    configs = read_config(config_file_names)
+    sys_config = next((c for c in configs if c.CONFIG_NAME == "SYS"), configuration.Configuration())
+    configs = [infer_connectivity.infer_connectivity(c, sys_config.CORE_SELECTOR) for c in configs]
+    mbus_config = next(c for c in configs if c.CONFIG_NAME == "MBUS")
+    ranges = get_device_ranges(configs)
+
+    # Heap, sized on its memory
+    heap = get_heap_memory(configs, sys_config)
+    heap_size = min((1 << ranges[heap["memory"]]["width"]) // HEAP_FRACTION, MAX_HEAP_SIZE) & ~(HEAP_ALIGN - 1)
+    if heap["bandwidth_mbps"] is not None:
+        heap_reason = f"the fastest memory for {CORE_DATA_MASTER} ({heap['bandwidth_mbps']} MB/s, {heap['latency']} cycles)"
+    else:
+        heap_reason = "the boot memory"
+    print_info(f"FreeRTOS heap: {heap_size} bytes in {heap['memory']}, {heap_reason}")
+
+    # Tick timer
+    timer = get_tick_timer(configs, ranges)
+    if timer is None:
+        print_warning("No PBUS TIM with a PLIC line for the FreeRTOS tick, the timer constants are not generated")
+        timer_block = "// No PBUS TIM with a PLIC line, the tick timer is up to the application"
+    else:
+        print_info(f"FreeRTOS tick timer: {timer['name']} on {timer['bus']}, PLIC line {timer['line']}")
+        timer_block = "\n".join([
+            f"// System tick timer: {timer['name']} on {timer['bus']}",
+            f"#define configUNINASOC_TIMER_BASE_ADDRESS   0x{timer['base']:x}",
+            f"#define configUNINASOC_TIMER_CLOCK_HZ       {timer['clock_hz']}",
+            f"#define configUNINASOC_TIMER_INTERRUPT      {timer['line']}",
+        ])
+
+    # Stacks, scaled to XLEN
+    irq_stack_size = IRQ_STACK_SIZE_RV32 * sys_config.XLEN // 32
+    minimal_stack_bytes = MINIMAL_STACK_WORDS * sys_config.XLEN // 8
+
+    header_template_str = """/* File generated by {current_file_path} */
+
+#ifndef __UNINASOC_FREERTOS_H__
+#define __UNINASOC_FREERTOS_H__
+
+// CPU clock, from the MAIN_CLOCK_DOMAIN ({main_clock_domain} MHz)
+#define configCPU_CLOCK_HZ                  ( ( unsigned long ) {cpu_clock_hz} )
+
+// Heap in {heap_memory}, {heap_reason}, placed by uninasoc_freertos.ld
+#define configTOTAL_HEAP_SIZE               {heap_size}
+#define configAPPLICATION_ALLOCATED_HEAP    1
+
+// Minimal task stack, in words of XLEN ({xlen}) bits, i.e. {minimal_stack_bytes} bytes
+#define configMINIMAL_STACK_SIZE            {minimal_stack_words}
+
+{timer_block}
+
+#endif // __UNINASOC_FREERTOS_H__
+"""
+
+    ld_template_str = """/* Auto-generated with {current_file_path} */
+
+/* Interrupt stack size (bytes), for XLEN {xlen} */
+__freertos_irq_stack_size = 0x{irq_stack_size:x};
+
+/* FreeRTOS heap (configAPPLICATION_ALLOCATED_HEAP) in {heap_memory}, see uninasoc_freertos.h */
+SECTIONS
+{{
+    .freertos_heap (NOLOAD) : ALIGN({heap_align})
+    {{
+        ucHeap = .;
+        . += 0x{heap_size:x};
+        __freertos_heap_end = .;
+    }}> {heap_memory}
+}}
+"""
+
+    write_output_file(output_header_file, header_template_str.format(
+        current_file_path=os.path.basename(__file__),
+        main_clock_domain=mbus_config.MAIN_CLOCK_DOMAIN,
+        cpu_clock_hz=mbus_config.MAIN_CLOCK_DOMAIN * 1000000,
+        heap_memory=heap["memory"],
+        heap_reason=heap_reason,
+        heap_size=heap_size,
+        xlen=sys_config.XLEN,
+        minimal_stack_bytes=minimal_stack_bytes,
+        minimal_stack_words=MINIMAL_STACK_WORDS,
+        timer_block=timer_block,
+    ))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_header_file)}")
+
+    write_output_file(output_ld_file, ld_template_str.format(
+        current_file_path=os.path.basename(__file__),
+        xlen=sys_config.XLEN,
+        irq_stack_size=irq_stack_size,
+        heap_memory=heap["memory"],
+        heap_align=HEAP_ALIGN,
+        heap_size=heap_size,
+    ))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_ld_file)}")
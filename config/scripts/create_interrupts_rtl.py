@@ -0,0 +1,102 @@
+# Author: agent <agent@local>
+# Description: utility functions to write RTL files for the interrupts mapping, from the INTERRUPT_NAMES of the PBUS and MBUS
+#   - the PBUS interrupt lines: PBUS_<NAME>_INTERRUPT localparams, and the assignment of the peripherals interrupts (peripheral_bus.sv)
+#   - the PLIC interrupt lines: PLIC_<NAME>_INTERRUPT localparams, and the assignment of the PBUS and MBUS-level interrupts (uninasoc.sv)
+#   The same mapping is written into the HAL header (see create_uninasoc_conf_header.py)
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Sub-scripts
+import configuration
+from utils import *
+
+# Constants
+
+# Interrupt signals of the PBUS peripherals (peripheral_bus.sv)
+PBUS_INTERRUPT_SIGNALS = {
+    "UART"      : "uart_int",
+    "TIM0"      : "tim0_int",
+    "TIM1"      : "tim1_int",
+    "GPIO_in"   : "gpio_in_int",
+}
+
+# Interrupt signals of the MBUS-level sources (uninasoc.sv), and the MBUS slave each source requires
+MBUS_INTERRUPT_SIGNALS = {
+    "CDMA"      : "irq_cdma_to_plic",
+    "HLS"       : "hls_interrupt_to_plic",
+}
+MBUS_INTERRUPT_SLAVES = {
+    "CDMA"      : "CDMA",
+    "HLS"       : "HLS_CONTROL",
+}
+
+# RTL files to edit
+RTL_FILES = {
+    "PKG"  : f"{os.environ.get('XILINX_ROOT')}/rtl/uninasoc_interrupts.svinc",
+    "PBUS" : f"{os.environ.get('XILINX_ROOT')}/rtl/pbus_interrupts.svinc",
+    "MBUS" : f"{os.environ.get('XILINX_ROOT')}/rtl/mbus_interrupts.svinc",
+}
+
+# File comments
+FILE_HEADER = f"// This file is auto-generated with {os.path.basename(__file__)}\n\n"
+
+# Get the localparam name of an interrupt line, e.g. PLIC_GPIO_IN_INTERRUPT
+def get_interrupt_param(bus_name : str, source_name : str) -> str:
+    return f"{bus_name}_{source_name.upper()}_INTERRUPT"
+
+# Declare the interrupt lines (uninasoc_pkg.sv)
+def declare_interrupts(pbus_config : configuration.Configuration, plic_sources : list) -> str:
+    lines = [FILE_HEADER]
+    lines.append("// Peripheral Bus interrupts\n")
+    # At least one line, to keep the interrupt vectors valid
+    lines.append(f"localparam int unsigned PBUS_NUM_INTERRUPTS = {max(1, len(pbus_config.INTERRUPT_NAMES))};\n")
+    for line, name in enumerate(pbus_config.INTERRUPT_NAMES):
+        lines.append(f"localparam int unsigned {get_interrupt_param('PBUS', name)} = {line};\n")
+
+    lines.append("\n// PLIC interrupts\n")
+    lines.append(f"localparam int unsigned PLIC_NUM_INTERRUPTS = {len(plic_sources)};\n")
+    lines.append("localparam int unsigned PLIC_RESERVED_INTERRUPT = 0;\n")
+    for source in plic_sources:
+        lines.append(f"localparam int unsigned {get_interrupt_param('PLIC', source['name'])} = {source['line']};\n")
+
+    return "".join(lines)
+
+# Assign the peripherals interrupts to the PBUS lines (peripheral_bus.sv)
+def assign_pbus_interrupts(pbus_config : configuration.Configuration) -> str:
+    lines = [FILE_HEADER]
+    for name in pbus_config.INTERRUPT_NAMES:
+        lines.append(f"pbus_int[{get_interrupt_param('PBUS', name)}] = {PBUS_INTERRUPT_SIGNALS[name]};\n")
+    return "".join(lines)
+
+# Assign the PBUS and MBUS-level interrupts to the PLIC lines (uninasoc.sv)
+def assign_plic_interrupts(pbus_config : configuration.Configuration, plic_sources : list) -> str:
+    lines = [FILE_HEADER]
+    lines.append("plic_int_line[PLIC_RESERVED_INTERRUPT] = 1'b0;\n")
+    for source in plic_sources:
+        if source["name"] in pbus_config.INTERRUPT_NAMES:
+            signal = f"pbus_int_line[{get_interrupt_param('PBUS', source['name'])}]"
+        else:
+            signal = MBUS_INTERRUPT_SIGNALS[source["name"]]
+        lines.append(f"plic_int_line[{get_interrupt_param('PLIC', source['name'])}] = {signal};\n")
+    return "".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    config_file_names = sys.argv[1:]
+    configs = read_config(config_file_names)
+
+    # A disabled PBUS has no interrupts
+    pbus_config = next((c for c in configs if c.CONFIG_NAME == "PBUS" and c.PROTOCOL != "DISABLE"), configuration.Configuration())
+    mbus_config = next(c for c in configs if c.CONFIG_NAME == "MBUS")
+    plic_sources = get_plic_sources(mbus_config.INTERRUPT_NAMES, mbus_config.INTERRUPT_PRIORITIES)
+
+    write_output_file(RTL_FILES["PKG"], declare_interrupts(pbus_config, plic_sources))
+    write_output_file(RTL_FILES["PBUS"], assign_pbus_interrupts(pbus_config))
+    write_output_file(RTL_FILES["MBUS"], assign_plic_interrupts(pbus_config, plic_sources))
@@ -4,6 +4,7 @@
 # Author: Giuseppe Capasso <giuseppe.capasso17@studenti.unina.it>
 # Description:
 #   Generate a linker script file from the CSV configuration.
+#   The DMA buffer pools (see dma_pools.py) are placed as NOLOAD sections in their memories.
 # Note:
 #   Addresses overlaps are not sanitized.
 # Args:
@@ -17,8 +18,8 @@
 
 import sys # Parse args
 import os # For basename
-import csv # Manipulate CSVs
 import utils # Utils function
+import dma_pools # DMA buffer pools
 
 ##############
 # Parse args #
@@ -39,33 +40,33 @@ ld_file_name = sys.argv[-1]
 ###############
 
 # Read system CSV file
-BOOT_MEMORY_BLOCK = "BRAM"
-with open(config_system_file_name, "r") as file:
-    reader = csv.reader(file)
-    BOOT_MEMORY_BLOCK = utils.get_value_by_property(reader, "BOOT_MEMORY_BLOCK")
+BOOT_MEMORY_BLOCK = utils.get_value_by_property(config_system_file_name, "BOOT_MEMORY_BLOCK")
 
 # Read CSV files for each bus
 range_names = []
-range_base_addr = []
-range_addr_width = []
+address_ranges = []
 
 for fname in config_bus_file_names:
-    # Open the configuration files and parse them as csv
-    with open(fname, "r") as file:
-        reader = csv.reader(file)
+    # Properties can be looked up in any order (see property_store.py)
+    protocol = utils.get_value_by_property(fname, "PROTOCOL")
+    if protocol == "DISABLE":
+        continue
 
-        # next gets a single value
-        protocol = utils.get_value_by_property(reader, "PROTOCOL")
-        if protocol == "DISABLE":
-            continue
+    names = utils.get_value_by_property(fname, "RANGE_NAMES").split(" ")
+    base_addr = utils.get_value_by_property(fname, "RANGE_BASE_ADDR").split(" ")
+    addr_width = utils.get_value_by_property(fname, "RANGE_ADDR_WIDTH").split(" ")
+    addr_ranges = int(utils.get_value_by_property(fname, "ADDR_RANGES", "1"))
 
-        range_names += utils.get_value_by_property(reader, "RANGE_NAMES").split(" ")
-        range_base_addr += utils.get_value_by_property(reader, "RANGE_BASE_ADDR").split(" ")
-        range_addr_width += utils.get_value_by_property(reader, "RANGE_ADDR_WIDTH").split(" ")
+    range_names += names
+    # One entry for each used address range of each slave
+    address_ranges += utils.get_address_ranges(names, base_addr, addr_width, addr_ranges)
 
 # Make sure BOOT_MEMORY_BLOCK is enabled
 assert( BOOT_MEMORY_BLOCK in range_names )
 
+# DMA buffer pools in the memories reachable by the DMA masters
+pools = dma_pools.get_dma_pools(utils.read_config([config_system_file_name] + config_bus_file_names))["pools"]
+
 ##########################
 # Generate memory blocks #
 ##########################
@@ -74,21 +75,22 @@ device_dict = {
     "memory": [],
 }
 
-# For each range_name, if it's  memory device (BRAM, HBM or starts with DDR4CH) add it to the map
-for name, base_addr, addr_width in zip(range_names, range_base_addr, range_addr_width):
+# For each address range, if it's memory device (BRAM, HBM or starts with DDR4CH) add it to the map
+# Slaves with multiple address ranges (ADDR_RANGES > 1) get one memory block per range, e.g. DDR4CH0 and DDR4CH0_A01
+for r in address_ranges:
     # memory blocks
     # TODO77: extend for multiple BRAMs
-    if name in ["BRAM", "HBM"] or name.startswith("DDR4CH"):
+    if utils.is_memory(r["device"]):
         device_dict["memory"].append(
             {
-                "device": name,
+                "device": r["name"],
                 "permissions": "xrw",
-                "base": int(base_addr, 16),
-                "range": 1 << int(addr_width),
+                "base": r["base"],
+                "range": 1 << r["width"],
             }
         )
 
-# Select memory device for boot
+# Select memory device for boot (first range of BOOT_MEMORY_BLOCK)
 boot_memory_device = next(d for d in device_dict["memory"] if d["device"] == BOOT_MEMORY_BLOCK)
 
 # Set dict of global symbols names and values
@@ -137,6 +139,32 @@ for s in device_dict["global_symbols"]:
     lines.append(f"PROVIDE({name} = 0x{value:016x});")
 globals_block = "\n".join(lines)
 
+# Render the DMA buffer pools as NOLOAD sections. Each pool is defined as follows
+# {
+#   "memory": name,
+#   "align": bytes,
+#   "size": bytes,
+#   "masters": DMA master names,
+# }
+# The statically allocated buffers (input section .dma_pool_<MEMORY>) come first, followed by the
+# DMA_POOL_SIZE bytes of the pool, between _dma_pool_<MEMORY>_start and _dma_pool_<MEMORY>_end
+lines = []
+for pool in pools:
+    name = pool["memory"]
+    align = pool["align"]
+    lines.append(f"""
+    /* DMA buffer pool for {" ".join(pool["masters"])} */
+    .dma_pool_{name} (NOLOAD) :
+    {{
+        . = ALIGN({align});
+        *(.dma_pool_{name})
+        . = ALIGN({align});
+        _dma_pool_{name}_start = .;
+        . += 0x{pool["size"]:x};
+        _dma_pool_{name}_end = .;
+    }}> {name}""")
+pools_block = "\n".join(lines)
+
 # Template string
 ld_template_str = """/* Auto-generated with {current_file_path} */
 
@@ -167,6 +195,7 @@ SECTIONS
         . = ALIGN(32);
         _text_end = .;
     }}> {initial_memory_name}
+{pools_block}
 }}
 """
 
@@ -176,9 +205,12 @@ rendered = ld_template_str.format(
     current_file_path=os.path.basename(__file__),
     memory_block=memory_block,
     globals_block=globals_block,
+    pools_block=pools_block,
     initial_memory_name=boot_memory_device["device"],
 )
 
 # Write the output
-with open(ld_file_name, "w") as f:
-    f.write(rendered)
+utils.write_output_file(ld_file_name, rendered)
+
+# Print filename
+print("[CONFIG] Output file is at " + utils.get_output_file_name(ld_file_name))
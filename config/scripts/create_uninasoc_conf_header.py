@@ -2,71 +2,106 @@
 # Author: Vincenzo Maisto <vincenzo.maisto2@unina.it>
 # Author: Giuseppe Capasso <giuseppe.capasso17@studenti.unina.it>
 # Description: Parse PBUS config and generate HAL header
+# Args:
+#   1: (Optional) Input configuration file for system, for the DMA buffer pools
+#   2+: Input configuration files for buses
+#   Last: Output HAL header file
 
-import csv
 import sys
 import os
 import utils
+import configuration
+import dma_pools
 
 # Check for correct number of arguments
-if len(sys.argv) != 5:
-    print("Usage: <CONFIG_PERIPHERALS_CSV> <CONFIG_MAIN_BUS_CSV> <CONFIG_HIGH_PERFORMANCE_BUS_CSV> <OUTPUT_HAL_CONF_FILE>")
+if len(sys.argv) < 5:
+    print("Usage: [<CONFIG_SYSTEM_CSV>] <CONFIG_PERIPHERALS_CSV> <CONFIG_MAIN_BUS_CSV> <CONFIG_HIGH_PERFORMANCE_BUS_CSV> [<CONFIG_ADDITIONAL_BUS_CSV> ...] <OUTPUT_HAL_CONF_FILE>")
     sys.exit(1)
 
 config_file_names = sys.argv[1 : -1]
 output_hal_conf_file = sys.argv[-1]
 
-range_names = []
-range_base_addr = []
-range_addr_width = []
+# List of used address ranges
+address_ranges = []
 # List of device peripherals, needs to be a set to avoid duplicates
 devices = set()
+# List of PLIC interrupt sources
+plic_sources = []
+# Names of the devices of each peripheral bus (PBUS and the additional ones, e.g. PBUS1)
+pbus_names = {}
+# Clock tree (MHz): the main clock domain (core + MBUS) and the clock domain of each MBUS slave
+main_clock_domain = 0
+range_clock_domains = {}
+
+# Common tick rates (Hz) for the timers reload values
+TICK_RATES = [1, 10, 50, 100, 1000]
+# Standard UART baud rates, and the maximum baud rate error for a divisor
+BAUD_RATES = [9600, 19200, 38400, 57600, 115200]
+MAX_BAUD_ERROR = 0.015
+# UART oversampling (16x)
+UART_OVERSAMPLING = 16
+# Extra clock cycles of each AXI timer period (the timer period is TLR + 2 cycles)
+TIM_RELOAD_CYCLES = 2
 
 for fname in config_file_names:
-    # Open the configuration files and parse them as csv
-    with open(fname, "r") as file:
-        reader = csv.reader(file)
+    # The system configuration is only used for the DMA buffer pools
+    if utils.get_config_name(fname) == "SYS":
+        continue
+
+    # Properties can be looked up in any order (see property_store.py)
+    protocol = utils.get_value_by_property(fname, "PROTOCOL")
+    if protocol == "DISABLE":
+        continue
 
-        # next gets a single value
-        protocol = utils.get_value_by_property(reader, "PROTOCOL")
-        if protocol == "DISABLE":
-            continue
+    # read the rows we need
+    names = utils.get_value_by_property(fname, "RANGE_NAMES").split(" ")
+    base_addr = utils.get_value_by_property(fname, "RANGE_BASE_ADDR").split(" ")
+    addr_width = utils.get_value_by_property(fname, "RANGE_ADDR_WIDTH").split(" ")
+    addr_ranges = int(utils.get_value_by_property(fname, "ADDR_RANGES", "1"))
 
-        # read the rows we need
-        names = utils.get_value_by_property(reader, "RANGE_NAMES").split(" ")
-        base_addr = utils.get_value_by_property(reader, "RANGE_BASE_ADDR").split(" ")
-        addr_width = utils.get_value_by_property(reader, "RANGE_ADDR_WIDTH").split(" ")
+    # take peripherals and add them to the devices set
+    bus_name = utils.get_config_name(fname)
+    if configuration.get_bus_kind(bus_name) == "PBUS":
+        pbus_names[bus_name] = names
+        for name in names:
+            # Use a generic TIM to enable timer driver
+            if name.startswith("TIM"):
+                devices.add("TIM")
+            else:
+                devices.add(name)
 
-        # take peripherals and add them to the devices set
-        if "peripheral" in fname:
-            for name in names:
-                # Use a generic TIM to enable timer driver
-                if name.startswith("TIM"):
-                    devices.add("TIM")
-                else:
-                    devices.add(name)
+    # take the PLIC interrupt sources, in line order
+    if "main" in fname:
+        interrupt_names = utils.get_value_by_property(fname, "INTERRUPT_NAMES", "").split()
+        interrupt_priorities = utils.get_value_by_property(fname, "INTERRUPT_PRIORITIES", "").split()
+        plic_sources = utils.get_plic_sources(interrupt_names, interrupt_priorities)
 
-        # add the "Value" property to the correnspoding list
-        range_names += names
-        range_base_addr += base_addr
-        range_addr_width += addr_width
+        # take the clock tree
+        main_clock_domain = int(utils.get_value_by_property(fname, "MAIN_CLOCK_DOMAIN"))
+        clock_domains = utils.get_value_by_property(fname, "RANGE_CLOCK_DOMAINS", "").split()
+        range_clock_domains = {name: int(clock) for name, clock in zip(names, clock_domains)}
 
+    # add one entry for each used address range of each slave
+    address_ranges += utils.get_address_ranges(names, base_addr, addr_width, addr_ranges)
 
 
-assert len(range_names) == len(range_base_addr) == len(range_addr_width)
 # build the peripheral list
+# Slaves with multiple address ranges (ADDR_RANGES > 1) get one entry per range, e.g. DDR4CH0 and DDR4CH0_A01
 peripherals = []
-for name, addr, width in zip(range_names, range_base_addr, range_addr_width):
-    # not a peripheral
-    if name.endswith("BUS"):
+for r in address_ranges:
+    # not a peripheral (a bus, e.g. PBUS or PBUS1)
+    if configuration.get_bus_kind(r["device"]).endswith("BUS"):
         continue
 
     peripherals.append({
-        "device": name,
-        "base": int(addr, 16),
-        "range": int(width)
+        "device": r["name"],
+        "base": r["base"],
+        "range": r["width"]
     })
 
+# DMA buffer pools in the memories reachable by the DMA masters, as in the linker script
+pools = dma_pools.get_dma_pools(utils.read_config(config_file_names))
+
 # Convert the set in a list
 devices = list(devices)
 # Extract base name and make it a valid macro name for the include guard
@@ -86,6 +121,19 @@ hal_template_str = r"""/* File generated by {current_file_path} */
 // Enabled devices
 {device_block}
 
+// Clock frequencies (Hz), from the configured clock domains
+{clock_block}
+
+// DMA buffer pools (see dma_pool.h), from the linker script
+{dma_pool_block}
+
+// PLIC interrupt sources (line 0 is reserved)
+{interrupt_block}
+
+// PLIC handlers, dispatched by plic_dispatch() through PLIC_HANDLERS
+// Weak references: the handlers that are not defined are NULL, and their interrupts are just completed
+{handler_block}
+
 #endif // {include_guard}
 """
 
@@ -122,6 +170,78 @@ for p in peripherals:
 peripheral_block = "\n".join(lines)
 
 
+# Creates a new string based on the clock tree: the core runs in the main clock domain,
+# the devices of each peripheral bus in the clock domain of their bus (in the MBUS RANGE_CLOCK_DOMAINS)
+# Produces C preprocessor defines with:
+# "#define <DEVICE_NAME>_CLOCK_HZ <frequency>"
+# "#define <TIMER_NAME>_RELOAD_<RATE>HZ <reload value>", for the common tick rates
+# "#define UART_DIVISOR_<BAUD> <divisor>", for the standard baud rates that the UART clock can generate
+cpu_clock_hz = main_clock_domain * 1000000
+lines = [f"#define CPU_CLOCK_HZ {cpu_clock_hz}u"]
+for bus_name in pbus_names:
+    lines.append(f"#define {bus_name}_CLOCK_HZ {range_clock_domains.get(bus_name, main_clock_domain) * 1000000}u")
+for bus_name, names in pbus_names.items():
+    pbus_clock_hz = range_clock_domains.get(bus_name, main_clock_domain) * 1000000
+    for name in names:
+        lines.append(f"#define {name.upper()}_CLOCK_HZ {pbus_clock_hz}u")
+    for name in names:
+        if name.startswith("TIM"):
+            for rate in TICK_RATES:
+                lines.append(f"#define {name.upper()}_RELOAD_{rate}HZ {pbus_clock_hz // rate - TIM_RELOAD_CYCLES}u")
+    if "UART" in names:
+        for baud in BAUD_RATES:
+            divisor = round(pbus_clock_hz / (UART_OVERSAMPLING * baud))
+            if divisor > 0 and abs(pbus_clock_hz / (UART_OVERSAMPLING * divisor) - baud) / baud <= MAX_BAUD_ERROR:
+                lines.append(f"#define UART_DIVISOR_{baud} {divisor}u")
+clock_block = "\n".join(lines)
+
+
+# Creates a new string based on the DMA buffer pools. `pools` is defined as in dma_pools.get_dma_pools
+# Produces C preprocessor defines and declarations with:
+# "#define DMA_POOL_<MEMORY>_ALIGN <alignment>"
+# "extern uint8_t _dma_pool_<MEMORY>_start[];"
+# "extern uint8_t _dma_pool_<MEMORY>_end[];"
+# "#define <DMA_MASTER>_DMA_POOL <MEMORY>", the pool with the highest bandwidth for each DMA master
+lines = []
+for pool in pools["pools"]:
+    name = pool["memory"]
+    lines.append(f"#define DMA_POOL_{name}_ALIGN {pool['align']}u")
+    lines.append(f"extern uint8_t _dma_pool_{name}_start[];")
+    lines.append(f"extern uint8_t _dma_pool_{name}_end[];")
+for master, memory in pools["masters"].items():
+    lines.append(f"#define {master.upper()}_DMA_POOL {memory}")
+dma_pool_block = "\n".join(lines)
+
+
+# Creates a new string based on the PLIC sources list. `plic_sources` is a list of source objects
+# {
+#     "name": name,
+#     "line": int(line),
+#     "priority": int(priority)
+# }
+# Produces C preprocessor defines with:
+# "#define PLIC_<SOURCE_NAME>_INTERRUPT <line>"
+# "#define PLIC_ENABLE_MASK <mask of the source lines>"
+# "#define PLIC_PRIORITIES { 0, <priority of each line> }"
+lines = [f"#define PLIC_NUM_INTERRUPTS {len(plic_sources)}"]
+for source in plic_sources:
+    lines.append(f"#define PLIC_{source['name'].upper()}_INTERRUPT {source['line']}")
+enable_mask = sum(1 << source["line"] for source in plic_sources)
+lines.append(f"#define PLIC_ENABLE_MASK 0x{enable_mask:08x}u")
+lines.append("#define PLIC_PRIORITIES { " + ", ".join(["0"] + [str(source["priority"]) for source in plic_sources]) + " }")
+interrupt_block = "\n".join(lines)
+
+
+# Produces the handlers declarations, and the jump table indexed by PLIC line:
+# "void _plic_<SOURCE_NAME>_handler(void) __attribute__((weak));"
+# "#define PLIC_HANDLERS { 0, _plic_<SOURCE_NAME>_handler, ... }"
+lines = []
+for source in plic_sources:
+    lines.append(f"void _plic_{source['name']}_handler(void) __attribute__((weak));")
+lines.append("#define PLIC_HANDLERS { " + ", ".join(["0"] + [f"_plic_{source['name']}_handler" for source in plic_sources]) + " }")
+handler_block = "\n".join(lines)
+
+
 # The hal_template_str is a string which can be formatted (same as f-string). Provide {variable}
 # as strings. This is why we call render_* functions
 rendered = hal_template_str.format(
@@ -129,8 +249,14 @@ rendered = hal_template_str.format(
     peripheral_block=peripheral_block,
     include_guard=include_guard,
     device_block=device_block,
+    clock_block=clock_block,
+    dma_pool_block=dma_pool_block,
+    interrupt_block=interrupt_block,
+    handler_block=handler_block,
 )
 
 # === Output to file ===
-with open(output_hal_conf_file, "w") as f:
-    f.write(rendered)
+utils.write_output_file(output_hal_conf_file, rendered)
+
+# Print filename
+print("[CONFIG] Output file is at " + utils.get_output_file_name(output_hal_conf_file))
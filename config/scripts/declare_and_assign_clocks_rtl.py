@@ -98,5 +98,4 @@ if __name__ == "__main__":
         main_clock_domain=config.MAIN_CLOCK_DOMAIN,
     )
 
-    with open(RTL_FILES["UNINASOC"], "w") as f:
-        f.write(rendered)
+    write_output_file(RTL_FILES["UNINASOC"], rendered)
@@ -68,6 +68,10 @@ RTL_FILES                = {
     "HBUS" : f"{os.environ.get('XILINX_ROOT')}/rtl/hbus_buses.svinc"
 }
 
+# RTL file of a bus, additional buses follow the same naming (e.g. pbus1_buses.svinc)
+def get_rtl_file(config_name : str) -> str:
+    return RTL_FILES.get(config_name, f"{os.environ.get('XILINX_ROOT')}/rtl/{config_name.lower()}_buses.svinc")
+
 # Get the correct bus suffix depending on bus name
 def GET_BUS_SUFFIX(busname) -> None:
 
@@ -89,19 +93,19 @@ def concat_buses(lines : list, buses : list, is_master : bool, config : configur
 
     # If is master
     if is_master:
-        match (config.CONFIG_NAME):
+        match (configuration.get_bus_kind(config.CONFIG_NAME)):
             case "PBUS":
                 bus_cnt_str    = "1"                               # The width of the bus array in case of PBUS (1 since the PBUS has just a master)
                 concat_prefix  = CONCAT_AXILITE_MASTER_BUS_PREFIX  # The concatenation prefix in case of a PBUS
                 declare_prefix = DECLARE_AXILITE_BUS_ARRAY_PREFIX  # The declaration prefix in case of a PBUS
             case  "MBUS":
                 declare_prefix = DECLARE_BUS_ARRAY_PREFIX          # The declaration prefix in case of MBUS
-                bus_cnt_str    = "MBUS_NUM_SI"                     # The width of the bus array in case of MBUS
+                bus_cnt_str    = f"{config.CONFIG_NAME}_NUM_SI"    # The width of the bus array in case of MBUS
                 concat_prefix  = CONCAT_MASTER_BUS_PREFIX          # The concatenation prefix in case of MBUS
             case  "HBUS":
                 declare_prefix = DECLARE_BUS_ARRAY_PREFIX          # The declaration prefix in case of MBUS
                 # TODO: only MBUS and one accelerator interfaces supported for now
-                bus_cnt_str    = "HBUS_NUM_SI"                     # The width of the bus array in case of MBUS
+                bus_cnt_str    = f"{config.CONFIG_NAME}_NUM_SI"    # The width of the bus array in case of MBUS
                 concat_prefix  = CONCAT_MASTER_BUS_PREFIX          # The concatenation prefix in case of MBUS
 
         # The suffix of the bus array
@@ -109,20 +113,20 @@ def concat_buses(lines : list, buses : list, is_master : bool, config : configur
 
     # If is slave
     else:
-        match (config.CONFIG_NAME):
+        match (configuration.get_bus_kind(config.CONFIG_NAME)):
             case "PBUS":
-                bus_cnt_str    = "PBUS_NUM_MI"                     # The width of the bus array in case of PBUS
+                bus_cnt_str    = f"{config.CONFIG_NAME}_NUM_MI"    # The width of the bus array in case of PBUS
                 concat_prefix  = CONCAT_AXILITE_SLAVE_BUS_PREFIX   # The concatenation prefix in case of a PBUS
                 declare_prefix = DECLARE_AXILITE_BUS_ARRAY_PREFIX  # The declaration prefix in case of a PBUS
             case  "MBUS":
                 declare_prefix = DECLARE_BUS_ARRAY_PREFIX          # The declaration prefix in case of MBUS
-                bus_cnt_str    = "MBUS_NUM_MI"                     # The width of the bus array in case of MBUS
+                bus_cnt_str    = f"{config.CONFIG_NAME}_NUM_MI"    # The width of the bus array in case of MBUS
                 concat_prefix  = CONCAT_SLAVE_BUS_PREFIX           # The concatenation prefix in case of MBUS
             case  "HBUS":
                 declare_prefix = DECLARE_BUS_ARRAY_PREFIX          # The declaration prefix in case of HBUS
                 # NOTE: loopback to MBUS + 1 DDR
                 # TODO125: only one DDR channel supported for now
-                bus_cnt_str    = "HBUS_NUM_MI"                     # The width of the bus array in case of HBUS
+                bus_cnt_str    = f"{config.CONFIG_NAME}_NUM_MI"    # The width of the bus array in case of HBUS
                 concat_prefix  = CONCAT_SLAVE_BUS_PREFIX           # The concatenation prefix in case of HBUS
 
         # The suffix of the bus array
@@ -163,17 +167,17 @@ def declare_buses(lines : list, is_master : bool, config : configuration.Configu
             # If not is master the bus declaration is: BUS_NAME_to_SLAVE_NAME
             buses.append(f"{config.CONFIG_NAME}_to_{config.RANGE_NAMES[i]}")
 
-        if config.CONFIG_NAME == "PBUS":
+        if configuration.get_bus_kind(config.CONFIG_NAME) == "PBUS":
             # If the bus is PBUS declare an AXILITE bus using the last created bus name
             lines.append(f"{DECLARE_AXILITE_BUS_PREFIX}{buses[-1]}{GET_BUS_SUFFIX(config.CONFIG_NAME)}")
-        elif config.CONFIG_NAME in {"MBUS", "HBUS"}:
+        elif configuration.get_bus_kind(config.CONFIG_NAME) in {"MBUS", "HBUS"}:
             # If the bus is not PBUS declare an AXI4 bus using the last created bus name
             lines.append(f"{DECLARE_BUS_PREFIX}{buses[-1]}{GET_BUS_SUFFIX(config.CONFIG_NAME)}")
     return buses
 
 
-# Declare and concatenate the buses
-def declare_and_concat_buses(file, config : configuration.Configuration) -> None:
+# Declare and concatenate the buses, returns the content of the rtl file
+def declare_and_concat_buses(config : configuration.Configuration) -> str:
     lines        = list()
     slave_buses  = list()
     master_buses = list()
@@ -197,9 +201,7 @@ def declare_and_concat_buses(file, config : configuration.Configuration) -> None
     lines.append(FILE_SLAVE_CONCAT_HEADER)
     concat_buses(lines, slave_buses, is_master=False, config=config)
 
-    # Write the file back
-    file.seek(0)
-    file.writelines(lines)
+    return "".join(lines)
 
 ########
 # MAIN #
@@ -209,7 +211,5 @@ if __name__ == "__main__":
     configs = read_config(config_file_names)
 
     for config in configs:
-        file = open(RTL_FILES[config.CONFIG_NAME], "w")
-        declare_and_concat_buses(file, config)
-        file.close()
+        write_output_file(get_rtl_file(config.CONFIG_NAME), declare_and_concat_buses(config))
 
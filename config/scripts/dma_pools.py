@@ -0,0 +1,54 @@
+# Author: agent <agent@local>
+# Description:
+#   Derive the DMA buffer pools, shared by the linker script and the HAL header generators.
+#   A pool of DMA_POOL_SIZE bytes is placed in each memory (BRAM, HBM, DDR4CH*) reachable by a DMA master
+#   (the CDMA and the HBUS accelerator), following the connectivity across the buses (see plan_dwidth_converters.get_paths).
+#   Each pool is aligned to the widest beat on the paths of its DMA masters (e.g. 64 bytes through the 512-bit HBUS),
+#   as a misaligned buffer splits the bursts into narrow beats at the data-width converters.
+#   Each DMA master is assigned the pool with the highest bandwidth on its path (the first memory on ties).
+
+####################
+# Import libraries #
+####################
+# Sub-scripts
+import configuration
+import infer_connectivity
+import bus_graph
+import plan_dwidth_converters
+from utils import *
+
+# Constants
+
+# Masters moving data on their own
+DMA_MASTERS = ["CDMA", "s_acc"]
+# Get the DMA buffer pools of the configurations (system and buses), as follows
+# {
+#   "pools": [{"memory": memory name, "align": bytes, "size": bytes, "masters": DMA master names}], sorted by memory
+#   "masters": {DMA master name: memory name of its pool}
+# }
+def get_dma_pools(configs : list) -> dict:
+    sys_config = next((c for c in configs if c.CONFIG_NAME == "SYS"), configuration.Configuration())
+    if sys_config.DMA_POOL_SIZE == 0:
+        return {"pools": [], "masters": {}}
+
+    configs = [infer_connectivity.infer_connectivity(c, sys_config.CORE_SELECTOR) for c in configs]
+    graph = bus_graph.get_bus_graph(configs)
+    widths = plan_dwidth_converters.get_bus_widths(graph, sys_config.XLEN)
+    clocks = plan_dwidth_converters.get_bus_clocks(graph)
+
+    pools = {}
+    best_paths = {}
+    for path in plan_dwidth_converters.get_paths(graph, widths, clocks):
+        if path["master"] not in DMA_MASTERS or not is_memory(path["slave"]):
+            continue
+        pool = pools.setdefault(path["slave"], {"memory": path["slave"], "align": 0, "size": sys_config.DMA_POOL_SIZE, "masters": []})
+        pool["align"] = max(pool["align"], max(link["width"] for link in path["links"]) // 8)
+        if path["master"] not in pool["masters"]:
+            pool["masters"].append(path["master"])
+        if path["master"] not in best_paths or path["bandwidth_mbps"] > best_paths[path["master"]]["bandwidth_mbps"]:
+            best_paths[path["master"]] = path
+
+    return {
+        "pools": sorted(pools.values(), key=lambda pool: pool["memory"]),
+        "masters": {master: path["slave"] for master, path in sorted(best_paths.items())},
+    }
@@ -0,0 +1,296 @@
+# Author: agent <agent@local>
+# Description:
+#   Pre-synthesis estimate of the LUT/FF/BRAM usage and of the achievable frequency (Fmax) of each generated axi_crossbar.
+#   The estimate is a linear model on a few structural features of the crossbar, computed from the bus configuration
+#   (NUM_SI, NUM_MI, DATA_WIDTH, ADDR_WIDTH, ID_WIDTH, ADDR_RANGES, CONNECTIVITY_MODE, STRATEGY, R_REGISTER,
+#   READ/WRITE_CONNECTIVITY, acceptance and issuing depths):
+#       - MUX_LUTS:      LUTs of the datapath muxes (LUT6 as 4:1 mux), for each channel and each mux fan-in
+#       - DECODER_LUTS:  LUTs of the address decoders
+#       - TRACKING_BITS: bits of the transaction tracking (thread) tables, from the acceptance and issuing depths
+#       - REGISTER_BITS: bits of the register slices (R_REGISTER) and of the arbiters
+#       - LOGIC_LEVELS:  logic levels of the critical path (decoder, arbiter, widest mux)
+#   and:
+#       LUT  = LUT_0 + LUT_MUX * MUX_LUTS + LUT_DECODER * DECODER_LUTS + LUT_TRACKING * TRACKING_BITS
+#       FF   = FF_0 + FF_REGISTER * REGISTER_BITS + FF_TRACKING * TRACKING_BITS
+#       BRAM = BRAM_0
+#       1000 / FMAX_MHZ = T_0 + T_LEVEL * LOGIC_LEVELS (ns, per SOC_CONFIG, i.e. per FPGA family)
+#   The coefficients are calibrated (least squares) from the previous synthesis results, if there are enough of them:
+#       - the rows of CALIBRATION_FILE
+#       - the results ingested in the QoR database (QOR_DATABASE_FILE, see qor_database.py), the implementation ones if any
+#   otherwise the rough DEFAULT_* coefficients are used, and the results are CALIBRATED False: the budget check in check_config
+#   (CHECK_BUDGET, see check_budgets) and the topology search (explore_topologies.py) refuse to run, while the STRATEGY and
+#   R_REGISTER AUTO selection ignores the estimates (see select_crossbar_strategy.py).
+#   When run as a script, prints the estimates of each bus and the calibration row (features) of each bus:
+#   after a synthesis run, ingest the reports in the QoR database (make config_qor_ingest), or append the row with the
+#   measured LUT, FF, BRAM and FMAX_MHZ to CALIBRATION_FILE.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# for math operations
+import math
+# Read the calibration table
+import csv
+# Read the QoR database
+import sqlite3
+# Sub-scripts
+import configuration
+import infer_connectivity
+import select_crossbar_strategy
+from utils import *
+
+# Calibration table, one row per previous synthesis run
+CALIBRATION_FILE = os.getenv("CALIBRATION_FILE", f"{os.path.dirname(os.path.abspath(__file__))}/../calibration/axi_crossbar.csv")
+# QoR database, the results of the ingested builds (see qor_database.py)
+QOR_DATABASE_FILE = os.getenv("QOR_DATABASE_FILE", f"{os.path.dirname(os.path.abspath(__file__))}/../reports/qor.sqlite")
+FEATURE_NAMES = ["MUX_LUTS", "DECODER_LUTS", "TRACKING_BITS", "REGISTER_BITS", "LOGIC_LEVELS"]
+RESULT_NAMES = ["LUT", "FF", "BRAM", "FMAX_MHZ"]
+# Note of the reports built on the default coefficients
+UNCALIBRATED_NOTE = "uncalibrated estimates, from the default coefficients (not enough results in config/calibration/axi_crossbar.csv and in the QoR database)"
+
+# Default (uncalibrated) coefficients, rough first-order values
+DEFAULT_LUT_COEFFICIENTS  = [200, 1.0, 1.0, 0.5]    # LUT_0, LUT_MUX, LUT_DECODER, LUT_TRACKING
+DEFAULT_FF_COEFFICIENTS   = [100, 1.0, 1.0]         # FF_0, FF_REGISTER, FF_TRACKING
+DEFAULT_BRAM_COEFFICIENTS = [0]                     # BRAM_0, the crossbar has no memories
+DEFAULT_TIMING_COEFFICIENTS = {                     # T_0, T_LEVEL (ns)
+    "embedded" : [2.5, 0.9],                        # 7-series
+    "hpc"      : [1.0, 0.4],                        # UltraScale+
+}
+
+# AXI IP defaults for missing acceptance/issuing depths
+DEFAULT_ACCEPTANCE = 2
+DEFAULT_ISSUING = 4
+# Address channel bits, besides address and ID: LEN, SIZE, BURST, LOCK, CACHE, PROT, QOS
+ADDR_CHANNEL_CONTROL_BITS = 8 + 3 + 2 + 1 + 4 + 3 + 4
+# Logic levels of the arbiters
+ARBITER_LEVELS = 1
+
+############
+# Features #
+############
+
+# LUTs per bit of a mux with fan_in inputs (tree of LUT6 4:1 muxes)
+def mux_luts_per_bit(fan_in : int) -> int:
+    if fan_in <= 1:
+        return 0
+    return math.ceil((fan_in - 1) / (infer_connectivity.MUX_INPUTS_PER_LUT - 1))
+
+# Check if the crossbar shares a single datapath (SASD)
+def is_shared_datapath(config : configuration.Configuration) -> bool:
+    return config.STRATEGY == 1 or (config.STRATEGY == 0 and config.CONNECTIVITY_MODE == "SASD")
+
+# Get the fan-ins of the muxes of a connectivity matrix: for each SI (per_si) or for each MI
+def get_fan_ins(config : configuration.Configuration, connectivity : list, per_si : bool) -> list:
+    if connectivity == []:
+        connectivity = [1] * (config.NUM_MI * config.NUM_SI)
+    if per_si:
+        return [sum(connectivity[config.NUM_SI * mi + si] for mi in range(config.NUM_MI)) for si in range(config.NUM_SI)]
+    return [sum(connectivity[config.NUM_SI * mi + si] for si in range(config.NUM_SI)) for mi in range(config.NUM_MI)]
+
+# Get a per-interface depth, or its default
+def get_depths(values : list, num : int, default : int) -> list:
+    return values if len(values) == num else [default] * num
+
+# Compute the features of a crossbar configuration
+def get_features(config : configuration.Configuration) -> dict:
+    # Channel widths
+    r_bits = config.DATA_WIDTH + config.ID_WIDTH + 3 + config.RUSER_WIDTH
+    w_bits = config.DATA_WIDTH + config.DATA_WIDTH // 8 + 1 + config.WUSER_WIDTH
+    a_bits = config.ADDR_WIDTH + config.ID_WIDTH + ADDR_CHANNEL_CONTROL_BITS + max(config.ARUSER_WIDTH, config.AWUSER_WIDTH)
+    b_bits = config.ID_WIDTH + 2 + config.BUSER_WIDTH
+    addr_ranges = int(config.ADDR_RANGES)
+    decoder_luts_per_range = math.ceil(config.ADDR_WIDTH / 6)
+    decoder_levels = infer_connectivity.mux_levels(math.ceil(config.ADDR_WIDTH / 6)) + 1
+
+    if is_shared_datapath(config):
+        # A single mux for each channel, a single decoder, one transaction at a time
+        r_fan_ins = b_fan_ins = [config.NUM_MI]
+        ar_fan_ins = aw_fan_ins = w_fan_ins = [config.NUM_SI]
+        decoder_luts = config.NUM_MI * addr_ranges * decoder_luts_per_range
+        tracking_bits = config.ID_WIDTH
+        # R_REGISTER: full register slices on the shared datapath
+        register_bits = 2 * (r_bits + w_bits + 2 * a_bits + b_bits) * config.R_REGISTER
+    else:
+        # A mux for each SI (R, B) and each MI (AR, AW, W), a decoder for each SI
+        r_fan_ins  = get_fan_ins(config, config.READ_CONNECTIVITY, per_si=True)
+        b_fan_ins  = get_fan_ins(config, config.WRITE_CONNECTIVITY, per_si=True)
+        ar_fan_ins = get_fan_ins(config, config.READ_CONNECTIVITY, per_si=False)
+        aw_fan_ins = w_fan_ins = get_fan_ins(config, config.WRITE_CONNECTIVITY, per_si=False)
+        decoder_luts = config.NUM_SI * config.NUM_MI * addr_ranges * decoder_luts_per_range
+        # Thread tables: each outstanding transaction of each SI tracks its ID and target MI, each MI counts its transactions
+        acceptance = get_depths(config.SI_READ_ACCEPTANCE, config.NUM_SI, DEFAULT_ACCEPTANCE) \
+                   + get_depths(config.SI_WRITE_ACCEPTANCE, config.NUM_SI, DEFAULT_ACCEPTANCE)
+        issuing = get_depths(config.MI_READ_ISSUING, config.NUM_MI, DEFAULT_ISSUING) \
+                + get_depths(config.MI_WRITE_ISSUING, config.NUM_MI, DEFAULT_ISSUING)
+        tracking_bits = sum(acceptance) * (config.ID_WIDTH + math.ceil(math.log2(config.NUM_MI + 1))) \
+                      + sum(math.ceil(math.log2(depth + 1)) for depth in issuing)
+        register_bits = 0
+
+    # Arbiters state, one grant per SI for each MI
+    register_bits += 2 * config.NUM_SI * config.NUM_MI
+
+    mux_luts = sum(mux_luts_per_bit(n) for n in r_fan_ins) * r_bits \
+             + sum(mux_luts_per_bit(n) for n in b_fan_ins) * b_bits \
+             + sum(mux_luts_per_bit(n) for n in ar_fan_ins + aw_fan_ins) * a_bits \
+             + sum(mux_luts_per_bit(n) for n in w_fan_ins) * w_bits
+
+    # Critical path: decoder, arbiter and widest mux, split by the register slices
+    widest_mux_levels = max(infer_connectivity.mux_levels(n) for n in r_fan_ins + b_fan_ins + ar_fan_ins + aw_fan_ins + w_fan_ins)
+    if config.R_REGISTER == 1:
+        logic_levels = max(decoder_levels + ARBITER_LEVELS, widest_mux_levels)
+    else:
+        logic_levels = decoder_levels + ARBITER_LEVELS + widest_mux_levels
+
+    return {
+        "MUX_LUTS": mux_luts,
+        "DECODER_LUTS": decoder_luts,
+        "TRACKING_BITS": tracking_bits,
+        "REGISTER_BITS": register_bits,
+        "LOGIC_LEVELS": logic_levels,
+    }
+
+###############
+# Calibration #
+###############
+
+# Read the calibration rows, from the calibration table and the QoR database
+#   - the rows with a blank or invalid feature or result (e.g. not yet completed after synthesis) are skipped
+def read_calibration(file_name : str = CALIBRATION_FILE, database_file : str = QOR_DATABASE_FILE) -> list:
+    rows = read_qor_calibration(database_file)
+    if not os.path.isfile(file_name):
+        return rows
+    with open(file_name, "r") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                values = [float(row[name]) for name in FEATURE_NAMES + RESULT_NAMES]
+            except (TypeError, ValueError):
+                print_error(f"{os.path.normpath(file_name)}:{reader.line_num}: blank or invalid value in {row.get('BUS')}, row skipped")
+                continue
+            if values[-1] <= 0:
+                print_error(f"{os.path.normpath(file_name)}:{reader.line_num}: FMAX_MHZ must be positive in {row.get('BUS')}, row skipped")
+                continue
+            rows.append(row)
+    return rows
+
+# Read the calibration rows from the QoR database, one for each ingested result with a timing:
+#   - the implementation results of a configuration replace its synthesis ones, as the synthesis timing is optimistic
+def read_qor_calibration(file_name : str = QOR_DATABASE_FILE) -> list:
+    if not os.path.isfile(file_name):
+        return []
+    columns = ", ".join(["BUS", "SOC_CONFIG"] + FEATURE_NAMES + RESULT_NAMES)
+    not_null = " AND ".join(f"{name} IS NOT NULL" for name in FEATURE_NAMES + RESULT_NAMES)
+    db = sqlite3.connect(file_name)
+    db.row_factory = sqlite3.Row
+    try:
+        rows = db.execute(f"""
+            SELECT {columns} FROM qor_view AS q WHERE {not_null} AND FMAX_MHZ > 0 AND (STAGE = 'post_impl'
+                OR NOT EXISTS (SELECT 1 FROM qor WHERE qor.CONFIG_HASH = q.CONFIG_HASH AND qor.STAGE = 'post_impl'))
+        """).fetchall()
+    except sqlite3.Error as e:
+        print_error(f"Invalid QoR database {os.path.normpath(file_name)}: {e}")
+        return []
+    finally:
+        db.close()
+    return [dict(row) for row in rows]
+
+# Solve a linear system by Gaussian elimination with partial pivoting, returns None if singular
+def solve(a : list, b : list) -> list:
+    n = len(b)
+    m = [a[i] + [b[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-9:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col:
+                factor = m[r][col] / m[col][col]
+                m[r] = [x - factor * y for x, y in zip(m[r], m[col])]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+# Fit the coefficients of a linear model (least squares, normal equations),
+# or return the defaults if there are not enough rows
+def fit(rows : list, feature_names : list, result_name : str, defaults : list) -> tuple:
+    if len(rows) < len(defaults):
+        return defaults, False
+    x = [[1.0] + [float(row[name]) for name in feature_names] for row in rows]
+    y = [float(row[result_name]) for row in rows]
+    xtx = [[sum(r[i] * r[j] for r in x) for j in range(len(defaults))] for i in range(len(defaults))]
+    xty = [sum(r[i] * v for r, v in zip(x, y)) for i in range(len(defaults))]
+    coefficients = solve(xtx, xty)
+    # Under-determined, e.g. all the rows with the same features
+    if coefficients is None:
+        return defaults, False
+    return coefficients, True
+
+# Calibrate the coefficients of the model for a SoC
+def calibrate(rows : list, soc_config : str) -> dict:
+    # The period is linear with the logic levels, and depends on the FPGA family
+    soc_rows = [dict(row, PERIOD_NS=1000 / float(row["FMAX_MHZ"])) for row in rows if row["SOC_CONFIG"] == soc_config]
+    lut, lut_calibrated = fit(rows, ["MUX_LUTS", "DECODER_LUTS", "TRACKING_BITS"], "LUT", DEFAULT_LUT_COEFFICIENTS)
+    ff, ff_calibrated = fit(rows, ["REGISTER_BITS", "TRACKING_BITS"], "FF", DEFAULT_FF_COEFFICIENTS)
+    bram, bram_calibrated = fit(rows, [], "BRAM", DEFAULT_BRAM_COEFFICIENTS)
+    timing, timing_calibrated = fit(soc_rows, ["LOGIC_LEVELS"], "PERIOD_NS", DEFAULT_TIMING_COEFFICIENTS[soc_config])
+    return {
+        "LUT": lut,
+        "FF": ff,
+        "BRAM": bram,
+        "TIMING": timing,
+        "CALIBRATED": lut_calibrated and ff_calibrated and bram_calibrated and timing_calibrated,
+    }
+
+############
+# Estimate #
+############
+
+# Estimate LUT, FF, BRAM and FMAX_MHZ of a crossbar configuration
+def estimate_crossbar(config : configuration.Configuration, coefficients : dict) -> dict:
+    features = get_features(config)
+    lut = coefficients["LUT"]
+    ff = coefficients["FF"]
+    timing = coefficients["TIMING"]
+    period = timing[0] + timing[1] * features["LOGIC_LEVELS"]
+    return {
+        "LUT": round(lut[0] + lut[1] * features["MUX_LUTS"] + lut[2] * features["DECODER_LUTS"] + lut[3] * features["TRACKING_BITS"]),
+        "FF": round(ff[0] + ff[1] * features["REGISTER_BITS"] + ff[2] * features["TRACKING_BITS"]),
+        "BRAM": round(coefficients["BRAM"][0]),
+        "FMAX_MHZ": round(1000 / period),
+    }
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    config_file_names = sys.argv[1:]
+    configs = read_config(config_file_names)
+    soc_config = os.getenv("SOC_CONFIG", "embedded")
+
+    coefficients = calibrate(read_calibration(), soc_config)
+    if not coefficients["CALIBRATED"]:
+        print_warning(f"Not enough calibration data in {os.path.normpath(CALIBRATION_FILE)} and {os.path.normpath(QOR_DATABASE_FILE)}, using the default coefficients (rough estimate)")
+
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+    configs = [infer_connectivity.infer_connectivity(c, core_selector) for c in configs]
+    configs = select_crossbar_strategy.select_crossbar_strategies(configs, coefficients)
+    rows = []
+    for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        estimate = estimate_crossbar(config, coefficients)
+        print_info(f"{config.CONFIG_NAME}: ~{estimate['LUT']} LUT, ~{estimate['FF']} FF, {estimate['BRAM']} BRAM, Fmax ~{estimate['FMAX_MHZ']} MHz")
+        features = get_features(config)
+        rows.append(",".join([config.CONFIG_NAME, soc_config] + [str(features[name]) for name in FEATURE_NAMES]))
+
+    # Calibration rows, to complete with the synthesis results
+    print_info(f"Calibration rows (append the measured {','.join(RESULT_NAMES)} after synthesis):")
+    print(",".join(["BUS", "SOC_CONFIG"] + FEATURE_NAMES + RESULT_NAMES))
+    for row in rows:
+        print(row + "," * len(RESULT_NAMES))
@@ -0,0 +1,475 @@
+# Author: agent <agent@local>
+# Description:
+#   Multi-objective search of the interconnect topology, for the Pareto front of:
+#       - the estimated bandwidth (MB/s, maximized): the bandwidth reaching the endpoints, i.e. for each slave which is not a
+#         bus, the throughput of the analytic model (transactions per cycle, see tune_crossbar_depths.get_slave_throughputs)
+#         times the bus data width and clock, i.e. single-beat transactions, capped by the link from the parent bus
+#       - the estimated area (LUT of all the crossbars, minimized, see estimate_crossbar.py)
+#       - the Fmax margin (MHz, maximized): the lowest estimated Fmax minus the bus clock among the crossbars with a searched
+#         clock, negative if a crossbar is expected to miss its clock. The HBUS is in the DDR clock domain (DDR_FREQUENCY),
+#         which is not a knob, hence its margin is only reported
+#   The knobs of a candidate topology are:
+#       - bus membership: each candidate slave of the MBUS (see partition_buses.get_candidate_slaves) stays on the MBUS or
+#         moves behind a sub-bus, one for each clock domain
+#       - clock domains: the MAIN_CLOCK_DOMAIN and the RANGE_CLOCK_DOMAINS of the MBUS slaves not bound to a clock
+#         (see MAIN_CLOCK_DOMAIN_SLAVES and DDR_CLOCK_DOMAIN_SLAVES in check_config.py), among the SUPPORTED_CLOCK_DOMAINS
+#       - datapath: the CONNECTIVITY_MODE (SAMD, SASD) of the crossbars with multiple masters and STRATEGY 0, while the
+#         connectivity masks are inferred from it (see infer_connectivity.py)
+#       - depths: the acceptance and the issuing depths of each crossbar, uniform across its ports
+#   The bus data widths are not knobs, as they follow the bus kind and the XLEN of the core (see parse_XLEN): the width of a
+#   path only changes with the bus membership of its slave.
+#   Evolutionary search, over SEARCH_GENERATIONS generations of SEARCH_POPULATION candidates, from the current configuration:
+#       1) each new candidate is pruned with the config_check checks (intra, inter, connectivity, interrupts and PMA)
+#       2) the remaining candidates are estimated, in parallel on a process pool (SEARCH_JOBS processes)
+#       3) all the candidates so far are ranked by Pareto front (non-dominated sorting), and the best half are the parents of
+#          the next generation, by uniform crossover and mutation of the knobs (SEARCH_SEED for reproducibility)
+#   Writes the CSV set of each candidate on the Pareto front, i.e. the resolved system and bus CSVs (see property_store.py) and
+#   the sub-bus CSVs, if any, ready to be copied in configs/<SOC_CONFIG>. As for PARTITION_APPLY, the CSV set of a candidate
+#   with sub-buses is only written if the hand-written RTL is wired for them (see partition_buses.get_build_errors): otherwise
+#   the candidate is a proposal only, with the reasons in its build_errors.
+#   Prints the Pareto front and writes a machine-readable (JSON) summary.
+#   The area and the Fmax margin need calibrated estimates (see estimate_crossbar.py): without them, the search refuses to run.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses
+#   Second to last: Output directory of the CSV sets
+#   Last: Output JSON summary file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars, file names
+import os
+# Machine-readable summary, candidate keys
+import json
+import hashlib
+# Search
+import random
+import time
+# Process pool
+import concurrent.futures
+# Capture the check messages
+import io
+import contextlib
+import logging
+# Sub-scripts
+import configuration
+import infer_connectivity
+import estimate_crossbar
+import select_crossbar_strategy
+import bus_graph
+import plan_dwidth_converters
+import partition_buses
+import tune_crossbar_depths
+import check_config
+import property_store
+import allocate_thread_ids
+from utils import *
+
+# Constants
+
+# Search parameters
+SEARCH_GENERATIONS = int(os.getenv("SEARCH_GENERATIONS", "20"))
+SEARCH_POPULATION = int(os.getenv("SEARCH_POPULATION", "32"))
+SEARCH_SEED = int(os.getenv("SEARCH_SEED", "0"))
+SEARCH_JOBS = int(os.getenv("SEARCH_JOBS", str(os.cpu_count())))
+# Probability of mutation of each knob of a child
+MUTATION_RATE = 0.2
+# Maximum attempts to breed a new (not yet evaluated) child, for each child, as the space can be small
+MAX_BREED_ATTEMPTS = 10
+# Searched depths, as in tune_crossbar_depths
+DEPTHS = [1 << i for i in range(tune_crossbar_depths.MAX_DEPTH.bit_length())]
+# Bus membership of a candidate slave
+MEMBERSHIPS = ["MBUS", "SUB_BUS"]
+
+############
+# CSV rows #
+############
+
+# Set a property in a list of [property, value] rows, replacing it or appending it
+def set_row(rows : list, name : str, value : str) -> None:
+    for row in rows:
+        if row[0] == name:
+            row[1] = value
+            return
+    rows.append([name, value])
+
+#########
+# Knobs #
+#########
+
+# Get the knobs of the configurations, as a list of {"name", "values"}, and the current configuration as a genome
+# (the value of each knob, None to keep the current depths)
+def get_knobs(configs : list) -> tuple:
+    bus_names = [c.CONFIG_NAME for c in configs]
+    clock_domains = check_config.SUPPORTED_CLOCK_DOMAINS[check_config.SOC_CONFIG]
+    knobs = []
+    genome = []
+
+    mbus_config = next(c for c in configs if c.CONFIG_NAME == "MBUS")
+    # Bus membership
+    for mi_index in partition_buses.get_candidate_slaves(mbus_config, bus_names):
+        knobs.append({"name": f"MBUS.{mbus_config.RANGE_NAMES[mi_index]}.BUS", "values": MEMBERSHIPS})
+        genome.append("MBUS")
+    # Clock domains
+    knobs.append({"name": "MBUS.MAIN_CLOCK_DOMAIN", "values": clock_domains})
+    genome.append(mbus_config.MAIN_CLOCK_DOMAIN)
+    for mi_index, name in enumerate(mbus_config.RANGE_NAMES):
+        if name in check_config.MAIN_CLOCK_DOMAIN_SLAVES or name in check_config.DDR_CLOCK_DOMAIN_SLAVES or mbus_config.RANGE_CLOCK_DOMAINS == []:
+            continue
+        knobs.append({"name": f"MBUS.{name}.CLOCK", "values": clock_domains})
+        genome.append(mbus_config.RANGE_CLOCK_DOMAINS[mi_index])
+
+    for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        # Datapath
+        if config.NUM_SI > 1 and config.STRATEGY == 0 and config.R_REGISTER == 0 and not (config.STRATEGY_AUTO or config.R_REGISTER_AUTO):
+            knobs.append({"name": f"{config.CONFIG_NAME}.CONNECTIVITY_MODE", "values": ["SAMD", "SASD"]})
+            genome.append(config.CONNECTIVITY_MODE)
+        # Depths, the issuing is forced on AXI4-Lite (see tune_crossbar_depths.get_tunable_properties)
+        knobs.append({"name": f"{config.CONFIG_NAME}.ACCEPTANCE", "values": [None] + DEPTHS})
+        genome.append(None)
+        if config.PROTOCOL not in ["AXI3", "AXI4LITE"]:
+            knobs.append({"name": f"{config.CONFIG_NAME}.ISSUING", "values": [None] + DEPTHS})
+            genome.append(None)
+    return knobs, tuple(genome)
+
+# Get the key of a genome
+def get_genome_key(genome : tuple) -> str:
+    return hashlib.sha1(json.dumps(genome).encode()).hexdigest()[:8]
+
+# Apply a genome to the rows of the configurations, returns the rows of the candidate by file name (with the sub-bus files)
+# @context: the search context (see get_context)
+def apply_genome(context : dict, genome : tuple) -> dict:
+    values = {knob["name"]: value for knob, value in zip(context["knobs"], genome)}
+    rows = {file_name: [list(row) for row in file_rows] for file_name, file_rows in context["rows"].items()}
+    mbus_file_name = context["file_names"]["MBUS"]
+
+    # Clock domains, the MAIN_CLOCK_DOMAIN_SLAVES follow the MAIN_CLOCK_DOMAIN
+    mbus_config = partition_buses.parse_rows("MBUS", rows[mbus_file_name])
+    main_clock_domain = values["MBUS.MAIN_CLOCK_DOMAIN"]
+    set_row(rows[mbus_file_name], "MAIN_CLOCK_DOMAIN", str(main_clock_domain))
+    if mbus_config.RANGE_CLOCK_DOMAINS != []:
+        clock_domains = [
+            main_clock_domain if name in check_config.MAIN_CLOCK_DOMAIN_SLAVES else values.get(f"MBUS.{name}.CLOCK", clock_domain)
+            for name, clock_domain in zip(mbus_config.RANGE_NAMES, mbus_config.RANGE_CLOCK_DOMAINS)
+        ]
+        set_row(rows[mbus_file_name], "RANGE_CLOCK_DOMAINS", " ".join(str(c) for c in clock_domains))
+
+    # Bus membership
+    mbus_config = partition_buses.parse_rows("MBUS", rows[mbus_file_name])
+    moved = [name for name in mbus_config.RANGE_NAMES if values.get(f"MBUS.{name}.BUS") == "SUB_BUS"]
+    if moved != []:
+        sub_buses = partition_buses.get_sub_buses(mbus_config, context["bus_names"], context["first_sub_bus_index"], moved)
+        rows[mbus_file_name] = partition_buses.partition_mbus_rows(rows[mbus_file_name], mbus_config, sub_buses)
+        for sub_bus in sub_buses:
+            file_name = os.path.join(os.path.dirname(mbus_file_name), f"config_peripheral_bus_{sub_bus['name'].removeprefix('PBUS')}.csv")
+            rows[file_name] = partition_buses.get_sub_bus_rows(sub_bus, mbus_config, context["sub_bus_id_width"])
+
+    # Datapath and depths, the CONNECTIVITY_MODE is set before the depths, as the acceptance depends on it
+    for bus_name, file_name in context["file_names"].items():
+        if f"{bus_name}.CONNECTIVITY_MODE" in values:
+            set_row(rows[file_name], "CONNECTIVITY_MODE", values[f"{bus_name}.CONNECTIVITY_MODE"])
+        config = partition_buses.parse_rows(bus_name, rows[file_name])
+        if bus_name == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        for property_name in tune_crossbar_depths.get_tunable_properties(config):
+            depth = values.get(f"{bus_name}.{'ACCEPTANCE' if property_name.startswith('SI') else 'ISSUING'}")
+            if depth is not None:
+                num = config.NUM_SI if property_name.startswith("SI") else config.NUM_MI
+                set_row(rows[file_name], property_name, " ".join([str(depth)] * num))
+    return rows
+
+##############
+# Evaluation #
+##############
+
+# Search context of the worker processes
+worker_context = None
+
+# Initialize a worker process
+def init_worker(context : dict) -> None:
+    global worker_context
+    worker_context = context
+    # The parser warnings are the same for each candidate, and already printed while reading the configuration
+    logging.disable(logging.WARNING)
+
+# Evaluate a candidate (worker): check it and estimate its objectives
+def evaluate_candidate(genome : tuple) -> dict:
+    context = worker_context
+    result = {"key": get_genome_key(genome), "genome": genome, "valid": False, "errors": []}
+    messages = io.StringIO()
+    with contextlib.redirect_stdout(messages):
+        try:
+            rows = apply_genome(context, genome)
+            configs = [partition_buses.parse_rows(get_config_name(file_name), file_rows) for file_name, file_rows in rows.items()]
+            configs = allocate_thread_ids.allocate_bus_thread_ids(configs)
+            configs = [infer_connectivity.infer_connectivity(c, context["core_selector"]) for c in configs]
+            configs = select_crossbar_strategy.select_crossbar_strategies(configs, context["coefficients"])
+            result["valid"] = all(check_config.check_intra_config(c, f) for c, f in zip(configs, rows)) \
+                and check_config.check_inter_config(configs) \
+                and check_config.check_connectivity(configs) \
+                and check_config.check_interrupts(configs) \
+                and check_config.check_pma(configs)
+        # The parsers exit on invalid values
+        except SystemExit:
+            result["valid"] = False
+    if not result["valid"]:
+        result["errors"] = [line for line in messages.getvalue().splitlines() if PRINT_ERROR_PREFIX in line]
+        return result
+
+    # Objectives
+    sys_config = next(c for c in configs if c.CONFIG_NAME == "SYS")
+    graph = bus_graph.get_bus_graph(configs)
+    widths = plan_dwidth_converters.get_bus_widths(graph, sys_config.XLEN)
+    buses = {}
+    slave_bandwidths = {}
+    for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        clock_domain = get_bus_clock_domain(configs, config)
+        estimate = estimate_crossbar.estimate_crossbar(config, context["coefficients"])
+        throughputs = tune_crossbar_depths.get_slave_throughputs(config)
+        slave_bandwidths[config.CONFIG_NAME] = [t * (widths[config.CONFIG_NAME] // 8) * clock_domain for t in throughputs]
+        buses[config.CONFIG_NAME] = {
+            "clock_mhz": clock_domain,
+            "fixed_clock": config.CONFIG_NAME in check_config.DDR_CLOCK_DOMAIN_SLAVES,
+            "data_width": widths[config.CONFIG_NAME],
+            "throughput": round(sum(throughputs), 4),
+            "bandwidth_mbps": round(sum(slave_bandwidths[config.CONFIG_NAME]), 1),
+            **estimate,
+        }
+    # Bandwidth reaching the endpoints: the bus-to-bus slaves are not counted, and a child bus is capped by its link from the
+    # parent bus (e.g. the MBUS traffic to the PBUS is counted once, at the PBUS slaves)
+    scales = {}
+    for name in graph["order"]:
+        edge = graph["parent"][name]
+        scales[name] = 1
+        if edge is not None and sum(slave_bandwidths[name]) > 0:
+            link = scales[edge["parent"]] * slave_bandwidths[edge["parent"]][edge["mi_index"]]
+            scales[name] = min(1, link / sum(slave_bandwidths[name]))
+        endpoints = [b for b, slave in zip(slave_bandwidths[name], graph["buses"][name].RANGE_NAMES) if slave not in graph["buses"]]
+        buses[name]["endpoint_bandwidth_mbps"] = round(scales[name] * sum(endpoints), 1)
+    # The clock of the HBUS is the DDR board clock (see check_config), not a knob, hence its Fmax margin can't change
+    # with the clocks: it only follows its crossbar, and it is reported but not an objective
+    searched = [b for b in buses.values() if not b["fixed_clock"]]
+    result["objectives"] = {
+        "bandwidth_mbps": round(sum(b["endpoint_bandwidth_mbps"] for b in buses.values()), 1),
+        "lut": sum(b["LUT"] for b in buses.values()),
+        "ff": sum(b["FF"] for b in buses.values()),
+        "fmax_margin_mhz": round(min(b["FMAX_MHZ"] - b["clock_mhz"] for b in searched), 1),
+    }
+    result["buses"] = buses
+    return result
+
+##########
+# Pareto #
+##########
+
+# Check if the objectives a dominate the objectives b
+def dominates(a : dict, b : dict) -> bool:
+    no_worse = a["bandwidth_mbps"] >= b["bandwidth_mbps"] and a["lut"] <= b["lut"] and a["fmax_margin_mhz"] >= b["fmax_margin_mhz"]
+    better = a["bandwidth_mbps"] > b["bandwidth_mbps"] or a["lut"] < b["lut"] or a["fmax_margin_mhz"] > b["fmax_margin_mhz"]
+    return no_worse and better
+
+# Sort the valid results in Pareto fronts (non-dominated sorting), the first one is the Pareto front
+def get_fronts(results : list) -> list:
+    fronts = []
+    remaining = list(results)
+    while remaining != []:
+        front = [r for r in remaining if not any(dominates(o["objectives"], r["objectives"]) for o in remaining)]
+        fronts.append(front)
+        remaining = [r for r in remaining if r not in front]
+    return fronts
+
+##########
+# Search #
+##########
+
+# Get a random genome
+def get_random_genome(knobs : list, rng : random.Random) -> tuple:
+    return tuple(rng.choice(knob["values"]) for knob in knobs)
+
+# Breed a child from two parents, by uniform crossover and mutation
+def breed(knobs : list, a : tuple, b : tuple, rng : random.Random) -> tuple:
+    child = []
+    for knob, gene_a, gene_b in zip(knobs, a, b):
+        gene = gene_a if rng.random() < 0.5 else gene_b
+        if rng.random() < MUTATION_RATE:
+            gene = rng.choice(knob["values"])
+        child.append(gene)
+    return tuple(child)
+
+# Select the parents of the next generation: the best half of the candidates, by Pareto front
+def select_parents(results : list, count : int, rng : random.Random) -> list:
+    parents = []
+    for front in get_fronts(results):
+        front = list(front)
+        rng.shuffle(front)
+        parents += front[:count - len(parents)]
+        if len(parents) >= count:
+            break
+    return [r["genome"] for r in parents]
+
+# Search the Pareto front, returns all the evaluated results
+def search(context : dict, pool : concurrent.futures.Executor, rng : random.Random) -> list:
+    knobs = context["knobs"]
+    results = {}
+
+    # The current configuration and random candidates
+    population = [context["genome"]]
+    for _ in range(SEARCH_POPULATION * MAX_BREED_ATTEMPTS):
+        if len(population) >= SEARCH_POPULATION:
+            break
+        genome = get_random_genome(knobs, rng)
+        if genome not in population:
+            population.append(genome)
+
+    for generation in range(SEARCH_GENERATIONS):
+        new = [genome for genome in population if get_genome_key(genome) not in results]
+        for result in pool.map(evaluate_candidate, new, chunksize=max(1, len(new) // (4 * SEARCH_JOBS))):
+            results[result["key"]] = result
+        valid = [r for r in results.values() if r["valid"]]
+        print_info(f"Generation {generation}: {len(new)} new candidates, {len(valid)}/{len(results)} valid, "
+                   f"{len(get_fronts(valid)[0]) if valid != [] else 0} on the Pareto front")
+        if valid == []:
+            break
+
+        # Next generation, from the best half
+        parents = select_parents(valid, max(2, SEARCH_POPULATION // 2), rng)
+        population = []
+        for _ in range(SEARCH_POPULATION * MAX_BREED_ATTEMPTS):
+            if len(population) >= SEARCH_POPULATION:
+                break
+            child = breed(knobs, rng.choice(parents), rng.choice(parents), rng)
+            if get_genome_key(child) not in results and child not in population:
+                population.append(child)
+        # The space is exhausted
+        if population == []:
+            break
+    return list(results.values())
+
+# Get the search context: the resolved rows of the configurations and the knobs
+def get_context(config_file_names : list) -> dict:
+    configs = read_config(config_file_names)
+    sys_config = next((c for c in configs if c.CONFIG_NAME == "SYS"), configuration.Configuration())
+    pbus_config = next((c for c in configs if c.CONFIG_NAME == "PBUS"), configuration.Configuration())
+    bus_names = [c.CONFIG_NAME for c in configs]
+    # Number the sub-buses after the existing additional peripheral buses
+    first_sub_bus_index = max([int(name.removeprefix("PBUS")) for name in bus_names if name.startswith("PBUS") and name != "PBUS"] + [0]) + 1
+    knobs, genome = get_knobs(configs)
+    return {
+        "rows": {f: [list(row) for row in property_store.load_store(f).items()] for f in config_file_names},
+        "file_names": {c.CONFIG_NAME: f for c, f in zip(configs, config_file_names)},
+        "bus_names": bus_names,
+        "first_sub_bus_index": first_sub_bus_index,
+        "sub_bus_id_width": pbus_config.ID_WIDTH,
+        "core_selector": sys_config.CORE_SELECTOR,
+        "coefficients": estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), check_config.SOC_CONFIG),
+        "knobs": knobs,
+        "genome": genome,
+    }
+
+# Get the knobs of a genome differing from the current configuration
+def get_changes(context : dict, genome : tuple) -> dict:
+    return {knob["name"]: value for knob, value, current in zip(context["knobs"], genome, context["genome"]) if value != current}
+
+# Get the Pareto front of the valid results, by bandwidth, keeping one candidate for each point, i.e. the fewest changes
+# (e.g. the depths of a shared datapath have no effect)
+def get_pareto_front(context : dict, results : list) -> list:
+    valid = [r for r in results if r["valid"]]
+    if valid == []:
+        return []
+    points = {}
+    for result in sorted(get_fronts(valid)[0], key=lambda r: (len(get_changes(context, r["genome"])), r["key"])):
+        points.setdefault(tuple(result["objectives"].values()), result)
+    return sorted(points.values(), key=lambda r: -r["objectives"]["bandwidth_mbps"])
+
+# Get the reasons why the SoC of a genome can't be built, i.e. its sub-buses not wired in the RTL (see partition_buses.get_build_errors)
+# @rows: the rows of the genome (see apply_genome)
+def get_build_errors(context : dict, rows : dict) -> list:
+    sub_buses = {}
+    for file_name, file_rows in rows.items():
+        if file_name not in context["rows"]:
+            config = partition_buses.parse_rows(get_config_name(file_name), file_rows)
+            sub_buses[config.CONFIG_NAME] = config.RANGE_NAMES
+    return partition_buses.get_build_errors(sub_buses) if sub_buses != {} else []
+
+# Get a point of the Pareto front, writing its CSV set in output_dir/<name> if it can be built
+def write_point(context : dict, result : dict, output_dir : str) -> dict:
+    name = f"topology_{result['key']}"
+    rows = apply_genome(context, result["genome"])
+    build_errors = get_build_errors(context, rows)
+    csv_files = []
+    if build_errors == []:
+        for file_name, file_rows in rows.items():
+            csv_file = f"{output_dir}/{name}/{os.path.basename(file_name)}"
+            write_output_file(csv_file, partition_buses.render_rows(file_rows))
+            csv_files.append(get_output_file_name(csv_file))
+    return {
+        "name": name,
+        "changes": get_changes(context, result["genome"]),
+        "objectives": result["objectives"],
+        "buses": result["buses"],
+        "csv_files": csv_files,
+        "build_errors": build_errors,
+    }
+
+# Render the Pareto front as a human-readable report
+def render_report(summary : dict) -> str:
+    lines = [f"Candidates: {summary['evaluated']} evaluated, {summary['pruned']} pruned by the checks, "
+             f"{len(summary['front'])} on the Pareto front"]
+    for point in summary["front"]:
+        o = point["objectives"]
+        current = " (current)" if point["changes"] == {} else ""
+        lines.append(f"{point['name']}{current}: ~{o['bandwidth_mbps']} MB/s, ~{o['lut']} LUT, ~{o['ff']} FF, Fmax margin ~{o['fmax_margin_mhz']} MHz")
+        for bus_name, bus in point["buses"].items():
+            if bus["fixed_clock"]:
+                lines.append(f"    {bus_name} (fixed {bus['clock_mhz']} MHz clock, not searched): Fmax margin ~{round(bus['FMAX_MHZ'] - bus['clock_mhz'], 1)} MHz")
+        for name, value in point["changes"].items():
+            lines.append(f"    {name}: {value}")
+        if point["build_errors"] != []:
+            lines.append(f"    proposal only, no CSV set: the RTL is not wired for the sub-buses ({len(point['build_errors'])} issues, see build_errors)")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 5:
+        print("Usage: <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_DIR> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    config_file_names = sys.argv[1:-2]
+    output_dir = sys.argv[-2]
+    output_json_file = sys.argv[-1]
+
+    start = time.perf_counter()
+    context = get_context(config_file_names)
+    if not context["coefficients"]["CALIBRATED"]:
+        print_error(f"The area and Fmax objectives require calibrated crossbar estimates, but they are {estimate_crossbar.UNCALIBRATED_NOTE}: "
+                    "ingest the reports of a build (make config_qor_ingest) or fill the calibration table (see estimate_crossbar.py)")
+        sys.exit(1)
+    print_info(f"Searching {len(context['knobs'])} knobs: {', '.join(knob['name'] for knob in context['knobs'])}")
+    rng = random.Random(SEARCH_SEED)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=SEARCH_JOBS, initializer=init_worker, initargs=(context,)) as pool:
+        results = search(context, pool, rng)
+
+    front = get_pareto_front(context, results)
+    summary = {
+        "evaluated": len(results),
+        "pruned": len([r for r in results if not r["valid"]]),
+        "knobs": context["knobs"],
+        "front": [],
+    }
+    for result in front:
+        summary["front"].append(write_point(context, result, output_dir))
+
+    print(render_report(summary))
+    print_info(f"Topology search done in {time.perf_counter() - start:.2f}s")
+
+    write_output_file(output_json_file, json.dumps(summary, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
@@ -0,0 +1,181 @@
+# Author: agent <agent@local>
+# Description:
+#   Infer sparse READ_CONNECTIVITY/WRITE_CONNECTIVITY matrices from the reachability of each master.
+#   With READ_CONNECTIVITY,AUTO and/or WRITE_CONNECTIVITY,AUTO in a bus CSV, each master (SI) is only connected
+#   to the slaves (MI) it actually needs to reach, pruning the unused crossbar paths.
+#   The reachability of each master is either:
+#       1) declared in the MASTER_REACHABILITY property, e.g. MASTER_REACHABILITY,RV_SOCKET_INSTR:BRAM+DM_mem CDMA:*
+#       2) derived from the default rules, based on the master name and on the selected core (see get_default_reachability)
+#   A bus master (e.g. the HBUS on the MBUS) never reaches the slave leading back to its own bus (e.g. the HBUS slave),
+#   as that path would loop back through the other bus (HBUS -> MBUS -> HBUS).
+#   When run as a script, prints a report of the pruned paths with a rough estimate of the area and timing savings.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# for math operations
+import math
+# Sub-scripts
+import configuration
+from utils import *
+
+# Slaves on the memory path, i.e. memories and the buses leading to memories
+MEMORY_PATH_PREFIXES = ["BRAM", "DDR4CH", "HBM", "HBUS", "MBUS"]
+# Debug module memory (debug ROM), fetched by the cores in debug mode
+DEBUG_MEMORY = "DM_mem"
+# Cores with a single AXI port for both instructions and data, attached to the data port of the socket
+# (the instruction port is tied off, see rv_socket.sv)
+UNIFIED_PORT_CORES = ["CORE_CV64A6", "CORE_CV64A6_ARA"]
+
+# Rough LUT6 estimate: each LUT6 implements a 4:1 mux for one bit
+MUX_INPUTS_PER_LUT = 4
+
+# Check if a slave is on the memory path
+def is_memory_path(slave_name : str) -> bool:
+    return any(slave_name.startswith(prefix) for prefix in MEMORY_PATH_PREFIXES)
+
+# Check if a master is a port tied off in the socket, i.e. the instruction port of the cores with a single port
+def is_unused_port(master_name : str, core_selector : str) -> bool:
+    return core_selector in UNIFIED_PORT_CORES and master_name.startswith("RV_SOCKET") and "INSTR" in master_name
+
+# Check if a master fetches instructions: the instruction ports, or the data port of the cores with a single port
+def is_fetch_port(master_name : str, core_selector : str) -> bool:
+    if is_unused_port(master_name, core_selector):
+        return False
+    return "INSTR" in master_name or (core_selector in UNIFIED_PORT_CORES and master_name.startswith("RV_SOCKET") and "DATA" in master_name)
+
+# Get the slaves of a master but the one leading back to the bus of the master, if any (a loop path)
+def get_loop_free_slaves(master_name : str, range_names : list) -> list:
+    return [name for name in range_names if name != master_name]
+
+# Get the default (read, write) reachable slaves of a master
+# @master_name: the name of the master (from MASTER_NAMES)
+# @range_names: the names of all the slaves of the bus
+# @core_selector: the selected core (from the system config)
+def get_default_reachability(master_name : str, range_names : list, core_selector : str) -> tuple:
+    # Bus master: not the slave leading back to its own bus
+    range_names = get_loop_free_slaves(master_name, range_names)
+    # Instruction port tied off (the core has a single port, on the data port): nothing
+    if is_unused_port(master_name, core_selector):
+        return [], []
+    # Instruction port: memories and debug ROM, read-only
+    if "INSTR" in master_name:
+        read_slaves = [name for name in range_names if is_memory_path(name) or name == DEBUG_MEMORY]
+        return read_slaves, []
+    # DMA: memory to memory only
+    if master_name.startswith("CDMA"):
+        slaves = [name for name in range_names if is_memory_path(name)]
+        return slaves, slaves
+    # Cores data ports, debug module, system master, buses: everything
+    return range_names, range_names
+
+# Get the (read, write) reachable slaves of a master, declared in MASTER_REACHABILITY or derived from the default rules
+def get_reachability(config : configuration.Configuration, master_name : str, core_selector : str) -> tuple:
+    read_slaves, write_slaves = get_default_reachability(master_name, config.RANGE_NAMES, core_selector)
+    if master_name in config.MASTER_REACHABILITY:
+        declared = config.MASTER_REACHABILITY[master_name]
+        if declared == ["*"]:
+            declared = get_loop_free_slaves(master_name, config.RANGE_NAMES)
+        # Instruction ports never write, even if declared
+        read_slaves = declared
+        write_slaves = declared if write_slaves != [] else []
+    return read_slaves, write_slaves
+
+# Build a NUM_MI*NUM_SI connectivity matrix (flattened as in the crossbar, index NUM_SI*mi+si)
+def build_connectivity(config : configuration.Configuration, reachability : list) -> list:
+    connectivity = []
+    for mi_index in range(config.NUM_MI):
+        for si_index in range(config.NUM_SI):
+            connectivity.append(1 if config.RANGE_NAMES[mi_index] in reachability[si_index] else 0)
+    return connectivity
+
+# Infer the connectivity matrices of a bus configuration, if requested with AUTO
+def infer_connectivity(config : configuration.Configuration, core_selector : str) -> configuration.Configuration:
+    # Nothing to infer
+    if not (config.READ_CONNECTIVITY_AUTO or config.WRITE_CONNECTIVITY_AUTO) or config.PROTOCOL == "DISABLE":
+        return config
+
+    reachability = [get_reachability(config, name, core_selector) for name in config.MASTER_NAMES]
+    if config.READ_CONNECTIVITY_AUTO:
+        config.READ_CONNECTIVITY = build_connectivity(config, [r[0] for r in reachability])
+    if config.WRITE_CONNECTIVITY_AUTO:
+        config.WRITE_CONNECTIVITY = build_connectivity(config, [r[1] for r in reachability])
+    return config
+
+# Check if a master reaches a slave, the missing matrices are full
+def is_connected(config : configuration.Configuration, connectivity : list, master_name : str, slave_name : str) -> bool:
+    if connectivity == []:
+        return True
+    si_index = config.MASTER_NAMES.index(master_name)
+    mi_index = config.RANGE_NAMES.index(slave_name)
+    return connectivity[config.NUM_SI * mi_index + si_index] == 1
+
+##########
+# Report #
+##########
+
+# Number of LUT levels of a mux with fan_in inputs
+def mux_levels(fan_in : int) -> int:
+    if fan_in <= 1:
+        return 0
+    return math.ceil(math.log(fan_in, MUX_INPUTS_PER_LUT))
+
+# Compose the report of the pruned paths of a bus configuration.
+# The savings are a rough estimate, considering only the crossbar datapath muxes:
+#   - each pruned read path removes an input of the R mux of the SI (DATA_WIDTH + ID_WIDTH + RRESP + RLAST bits)
+#   - each pruned write path removes an input of the W mux of the MI (DATA_WIDTH + WSTRB + WLAST bits)
+#   - the timing is estimated as the number of LUT levels of the widest mux
+def render_report(config : configuration.Configuration) -> str:
+    lines = [f"{config.CONFIG_NAME}: {config.NUM_SI} masters x {config.NUM_MI} slaves"]
+
+    read_bits = config.DATA_WIDTH + config.ID_WIDTH + 3
+    write_bits = config.DATA_WIDTH + config.DATA_WIDTH // 8 + 1
+    for channel, connectivity, bits in [("read", config.READ_CONNECTIVITY, read_bits), ("write", config.WRITE_CONNECTIVITY, write_bits)]:
+        total_paths = config.NUM_MI * config.NUM_SI
+        if connectivity == []:
+            lines.append(f"  {channel}: full connectivity ({total_paths} paths)")
+            continue
+
+        # Pruned paths
+        pruned = []
+        for mi_index in range(config.NUM_MI):
+            for si_index in range(config.NUM_SI):
+                if connectivity[config.NUM_SI * mi_index + si_index] == 0:
+                    pruned.append(f"{config.MASTER_NAMES[si_index]} -> {config.RANGE_NAMES[mi_index]}")
+        lines.append(f"  {channel}: {total_paths - len(pruned)}/{total_paths} paths, {len(pruned)} pruned")
+        for path in pruned:
+            lines.append(f"    - {path}")
+
+        # Widest mux: R mux of each SI (fan-in = connected MIs), W mux of each MI (fan-in = connected SIs)
+        if channel == "read":
+            fan_ins = [sum(connectivity[config.NUM_SI * mi + si] for mi in range(config.NUM_MI)) for si in range(config.NUM_SI)]
+            full_fan_in = config.NUM_MI
+        else:
+            fan_ins = [sum(connectivity[config.NUM_SI * mi + si] for si in range(config.NUM_SI)) for mi in range(config.NUM_MI)]
+            full_fan_in = config.NUM_SI
+        max_fan_in = max(fan_ins, default=0)
+        lut_savings = len(pruned) * math.ceil(bits / MUX_INPUTS_PER_LUT)
+        lines.append(f"  {channel}: ~{lut_savings} LUTs saved, widest mux {full_fan_in} -> {max_fan_in} inputs ({mux_levels(full_fan_in)} -> {mux_levels(max_fan_in)} LUT levels)")
+
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    config_file_names = sys.argv[1:]
+    configs = read_config(config_file_names)
+
+    # Get the selected core
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+
+    for config in configs:
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        config = infer_connectivity(config, core_selector)
+        print(render_report(config))
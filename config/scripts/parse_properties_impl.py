@@ -12,10 +12,10 @@
 import logging
 # for math operations
 import math
-# configuration Class declaration
+# to parse structured values
+import re
+# configuration Class declaration (and valid protocols)
 from configuration import *
-# Valid protocols
-from check_config import VALID_PROTOCOLS
 
 def parse_CORE_SELECTOR (
 		config,
@@ -27,6 +27,30 @@ def parse_CORE_SELECTOR (
 
 	return config
 
+def parse_BOOT_MEMORY_BLOCK (
+		config,
+		property_name : str,
+		property_value: str,
+	):
+	value = str(property_value)
+	config.BOOT_MEMORY_BLOCK = value
+
+	return config
+
+def parse_DMA_POOL_SIZE (
+		config,
+		property_name : str,
+		property_value: str,
+	):
+	# Reads the size of each DMA buffer pool, in bytes (decimal or hex)
+	# 0 => no pools
+	value = int(str(property_value), 0)
+	if (value < 0):
+		logging.error("Invalid " + property_name + " value " + str(property_value) + ", expected >= 0")
+		exit(1)
+	config.DMA_POOL_SIZE = value
+	return config
+
 def parse_VIO_RESETN_DEFAULT (
 		config,
 		property_name : str,
@@ -51,8 +75,8 @@ def parse_Interfaces (
 			case "NUM_SI":
 				config.NUM_SI = value
 				# Assert PBUS has only one master
-				if ( config.CONFIG_NAME == "PBUS" ) and ( value != 1 ):
-					logging.error(property_name  + " must be 1 for PBUS, not " + str(value))
+				if ( get_bus_kind(config.CONFIG_NAME) == "PBUS" ) and ( value != 1 ):
+					logging.error(property_name  + " must be 1 for " + config.CONFIG_NAME + ", not " + str(value))
 					exit(1)
 			case "NUM_MI":
 				config.NUM_MI = value
@@ -71,7 +95,11 @@ def parse_STRATEGY (
 	# 0 => Use configuration STRATEGY in the Connectivity Mode property_name
 	# 1 => SASD
 	# 2 => SAMD
+	# AUTO => selected from the bus clock, ports and width (see select_crossbar_strategy.py)
 	# If the value is missing or is incorrect in the csv file,  default value is used
+	if (str(property_value).strip() == "AUTO"):
+		config.STRATEGY_AUTO = True
+		return config
 	value = int(property_value)
 	if (value in range(0, 3)):
 		config.STRATEGY = value
@@ -87,7 +115,11 @@ def parse_R_REGISTER (
 	# Reads the R_REGISTER value
 	# The range of possible values is (0, 1) whith 0 as deafault value
 	# 1 => only if SASD configuration STRATEGY is selected
+	# AUTO => selected from the bus clock, ports and width (see select_crossbar_strategy.py)
 	# If the value is missing or is incorrect in the csv file,  default or coherent value is used
+	if (str(property_value).strip() == "AUTO"):
+		config.R_REGISTER_AUTO = True
+		return config
 	value = int(property_value)
 	if (config.STRATEGY == 2):
 		config.R_REGISTER = 0
@@ -124,7 +156,7 @@ def parse_XLEN (
 		# No-op
 		return config
 	# Set BUS-related parameters
-	match config.CONFIG_NAME:
+	match get_bus_kind(config.CONFIG_NAME):
 		# Main bus, use XLEN
 		case "MBUS":
 			value = int(property_value)
@@ -160,7 +192,7 @@ def parse_PHYSICAL_ADDR_WIDTH (
 ):
 
 	# When parsing the Peripheral Bus, fix the Address Width to 32
-	if config.CONFIG_NAME == "PBUS":
+	if get_bus_kind(config.CONFIG_NAME) == "PBUS":
 		config.PHYISICAL_ADDR_WIDTH = 32
 		config.set_ADDR_WIDTH(32)
 	# Otherwise parse the property
@@ -235,8 +267,11 @@ def parse_CONNECTIVITY_MODE (
 	# The two possible values are SAMD and SASD
 	# [configuration STRATEGY = 1 or R_REGISTER = 1] => SASD
 	# [configuration STRATEGY = 2] => SAMD
+	# With STRATEGY,AUTO the Connectivity Mode follows the selected STRATEGY (see select_crossbar_strategy.py)
 	# If the value is missing or is incorrect in the csv file,  default or coherent value is used
-	if ((config.STRATEGY == 1) or (config.R_REGISTER == 1)):
+	if (config.STRATEGY_AUTO and property_value in ["SASD", "SAMD"]):
+		config.CONNECTIVITY_MODE = property_value
+	elif ((config.STRATEGY == 1) or (config.R_REGISTER == 1)):
 		config.CONNECTIVITY_MODE = "SASD"
 		logging.warning("configuration STRATEGY or R_REGISTER set to 1. By default Connectivity Mode is SASD. input ignored.")
 	elif (config.STRATEGY == 2):
@@ -330,27 +365,24 @@ def parse_THREAD_ID_WIDTH (
 		property_value: str,
 	):
 	# Reads the number of ID bits used by each Slave Interface for its Thread IDs
-	# For the moment whe don't use the and these numbers are set to 0,  the default value (input validity check is done for the single Slave)
+	# The range of possible values is [0 ; ID_WIDTH] whith 0 as deafault value (input validity check is done for the single Slave)
+	# AUTO => the widths are derived from the master names (see allocate_thread_ids.py)
+	# BASE_ID values and collisions between ID ranges are handled by allocate_thread_ids.py and check_config.py
+	if (str(property_value).strip() == "AUTO"):
+		config.THREAD_ID_AUTO = True
+		return config
 	values = property_value.split()
-	Bits_Available = math.floor(config.ID_WIDTH - math.log2(config.NUM_SI))
-	if (Bits_Available < 0):
-		Bits_Available = 0
-	Bits_Available = 0 # At the moment we don't need them
-	if (Bits_Available == 0):
-		for i in range(config.NUM_SI):
-			config.THREAD_ID_WIDTH.append(0)
-		logging.info("There are no bits available for Thread IDs. Setting all values to 0")
-	elif ((len(values) == config.NUM_SI)):
+	if ((len(values) == config.NUM_SI)):
 		for i in range(config.NUM_SI):
 			number = int(values[i])
-			if (number in range(1, Bits_Available+1)):
+			if (number in range(0, config.ID_WIDTH+1)):
 				config.THREAD_ID_WIDTH.append(number)
 			else:
 				config.THREAD_ID_WIDTH.append(0)
 				if (i < 10):
-					logging.warning("A Thread ID value is out-of-range [0 ; Bits_Available]. Using default value for this Slave." + " - S0" + str(i))
+					logging.warning("A Thread ID value is out-of-range [0 ; ID_WIDTH]. Using default value for this Slave." + " - S0" + str(i))
 				else:
-					logging.warning("A Thread ID value is out-of-range [0 ; Bits_Available]. Using default value for this Slave." + " - S" + str(i))
+					logging.warning("A Thread ID value is out-of-range [0 ; ID_WIDTH]. Using default value for this Slave." + " - S" + str(i))
 	else:
 		for i in range(config.NUM_SI):
 			config.THREAD_ID_WIDTH.append(0)
@@ -572,6 +604,9 @@ def parse_RANGE_ADDR_WIDTH (
 					number = int(values[config.ADDR_RANGES*i+j])
 					if ((number in range(1, 65)) and (number <= config.ADDR_WIDTH)):
 						config.RANGE_ADDR_WIDTH.append(number)
+					elif ((j > 0) and (number == 0)):
+						# Unused range
+						config.RANGE_ADDR_WIDTH.append(0)
 					elif (j == 0):
 						config.RANGE_ADDR_WIDTH.append(12)
 						if (i < 10):
@@ -590,6 +625,9 @@ def parse_RANGE_ADDR_WIDTH (
 					number = int(values[config.ADDR_RANGES*i+j])
 					if ((number in range(12, 65)) and (number <= config.ADDR_WIDTH)):
 						config.RANGE_ADDR_WIDTH.append(number)
+					elif ((j > 0) and (number == 0)):
+						# Unused range
+						config.RANGE_ADDR_WIDTH.append(0)
 					elif (j == 0):
 						config.RANGE_ADDR_WIDTH.append(12)
 						if (i < 10):
@@ -616,7 +654,15 @@ def parse_Connectivity (
 	# The range of possible values is (0, 1) whith 1 as deafault value
 	# 0 => Connection Activated
 	# 1 => Connection Deactivated
+	# AUTO => the connectivity is inferred from the masters reachability (see infer_connectivity.py)
 	# If the value is missing or is incorrect in the csv file,  default value is used (input validity check is done for the single Connection)
+	if (str(property_value).strip() == "AUTO"):
+		match property_name :
+			case "READ_CONNECTIVITY":
+				config.READ_CONNECTIVITY_AUTO = True
+			case "WRITE_CONNECTIVITY":
+				config.WRITE_CONNECTIVITY_AUTO = True
+		return config
 	values = property_value.split()
 	if ((len(values) == config.NUM_MI*config.NUM_SI)):
 		for i in range(config.NUM_MI):
@@ -688,4 +734,89 @@ def parse_RANGE_CLOCK_DOMAINS(
 ):
 	values = [int(prop) for prop in property_value.split()]
 	config.RANGE_CLOCK_DOMAINS = values.copy()
-	return config
\ No newline at end of file
+	return config
+
+def parse_MASTER_REACHABILITY(
+	config,
+	property_name : str,
+	property_value: str,
+):
+	# Reads the slaves reachable by each master, as MASTER:SLAVE+SLAVE entries, e.g. RV_SOCKET_INSTR:BRAM+DM_mem CDMA:*
+	# Masters not listed use the default reachability rules
+	for entry in property_value.split():
+		if (":" not in entry):
+			logging.error("Wrong MASTER_REACHABILITY format " + entry + ", expected MASTER:SLAVE+SLAVE")
+			exit(1)
+		master, slaves = entry.split(":", 1)
+		config.MASTER_REACHABILITY[master] = slaves.split("+")
+	return config
+
+def parse_MASTER_TRAFFIC_PROFILE(
+	config,
+	property_name : str,
+	property_value: str,
+):
+	# Reads the traffic profile of each master, as MASTER:READ+WRITE entries, e.g. CDMA:0.5+0.5 RV_SOCKET_DATA:0.2+0.1
+	# READ and WRITE are the demanded transactions per cycle, in [0 ; 1]
+	for entry in property_value.split():
+		match = re.fullmatch(r"([^:]+):([0-9.]+)\+([0-9.]+)", entry)
+		if (match is None) or (float(match.group(2)) > 1) or (float(match.group(3)) > 1):
+			logging.error("Wrong MASTER_TRAFFIC_PROFILE format " + entry + ", expected MASTER:READ+WRITE with values in [0 ; 1]")
+			exit(1)
+		config.MASTER_TRAFFIC_PROFILE[match.group(1)] = (float(match.group(2)), float(match.group(3)))
+	return config
+
+def parse_RANGE_TRAFFIC_CLASSES(
+	config,
+	property_name : str,
+	property_value: str,
+):
+	# Reads the traffic class of each slave
+	# The possible values are HIGH (e.g. memories) and LOW (e.g. peripherals)
+	values = property_value.split()
+	for value in values:
+		if (value not in ["HIGH", "LOW"]):
+			logging.error("Invalid RANGE_TRAFFIC_CLASSES value " + value + ", expected HIGH or LOW")
+			exit(1)
+	config.RANGE_TRAFFIC_CLASSES = values.copy()
+	return config
+
+def parse_INTERRUPT_NAMES(
+	config,
+	property_name : str,
+	property_value: str,
+):
+	# Reads the interrupt sources, in line order
+	# PBUS => the peripherals driving the PBUS interrupt lines, from line 0
+	# MBUS => the sources of the PLIC (PBUS peripherals or MBUS-level sources, e.g. CDMA), from line 1 (line 0 is reserved)
+	values = property_value.split()
+	config.INTERRUPT_NAMES = values.copy()
+	return config
+
+def parse_INTERRUPT_PRIORITIES(
+	config,
+	property_name : str,
+	property_value: str,
+):
+	# Reads the PLIC priority of each interrupt source, in [1 ; 7] (0 would never raise the interrupt)
+	values = [int(prop) for prop in property_value.split()]
+	for value in values:
+		if (value not in range(1, 8)):
+			logging.error("Invalid INTERRUPT_PRIORITIES value " + str(value) + ", expected in [1 ; 7]")
+			exit(1)
+	config.INTERRUPT_PRIORITIES = values.copy()
+	return config
+
+def parse_LUT_BUDGET_FF_BUDGET(
+	config,
+	property_name : str,
+	property_value: str,
+):
+	# Reads the area budget of the crossbar, checked against the estimate (see estimate_crossbar.py)
+	# 0 (default) => no budget
+	value = int(property_value)
+	if (value < 0):
+		logging.error("Invalid " + property_name + " value " + property_value + ", expected >= 0")
+		exit(1)
+	setattr(config, property_name, value)
+	return config
@@ -39,9 +39,10 @@ def parse_property (
 		# CORE_SELECTOR, STRATEGY, R_REGISTER, PROTOCOL, XLEN, Connectivity Mode Acquisition,
 		# Slave Priorities, Slave Thread IDs Width, Slave Single Thread Modes, Slave Base IDs,
 		# Master SECURE Modes, Ranges' Base Address, Ranges' Width Acquisition
-		case "CORE_SELECTOR" | "VIO_RESETN_DEFAULT" | "XLEN" | "PHYSICAL_ADDR_WIDTH" | "STRATEGY" | "R_REGISTER" | "PROTOCOL" | "CONNECTIVITY_MODE" | \
+		case "CORE_SELECTOR" | "VIO_RESETN_DEFAULT" | "BOOT_MEMORY_BLOCK" | "DMA_POOL_SIZE" | "XLEN" | "PHYSICAL_ADDR_WIDTH" | "STRATEGY" | "R_REGISTER" | "PROTOCOL" | "CONNECTIVITY_MODE" | \
 			"Slave_Priority" | "THREAD_ID_WIDTH" | "SINGLE_THREAD" | "BASE_ID" | "SECURE" | "RANGE_BASE_ADDR" | "RANGE_ADDR_WIDTH" | "RANGE_NAMES" | "MASTER_NAMES" | \
-			"MAIN_CLOCK_DOMAIN" | "RANGE_CLOCK_DOMAINS":
+			"MAIN_CLOCK_DOMAIN" | "RANGE_CLOCK_DOMAINS" | "MASTER_REACHABILITY" | "MASTER_TRAFFIC_PROFILE" | "RANGE_TRAFFIC_CLASSES" | \
+			"INTERRUPT_NAMES" | "INTERRUPT_PRIORITIES":
 			func_name = base_func_name + property_name
 
 		# ID Width Acquisition
@@ -65,6 +66,9 @@ def parse_property (
 		# Read and Write Connectivity Acquisition
 		case "READ_CONNECTIVITY" | "WRITE_CONNECTIVITY":
 			func_name = base_func_name + "Connectivity"
+		# Crossbar Area Budgets Acquisition
+		case "LUT_BUDGET" | "FF_BUDGET":
+			func_name = base_func_name + "LUT_BUDGET_FF_BUDGET"
 		# Unsupported Parameters
 		case _:
 			skip_call = True
@@ -0,0 +1,350 @@
+# Author: agent <agent@local>
+# Description:
+#   Partition the MBUS, moving the slow slaves behind AXI4-Lite sub-buses to shrink the main crossbar.
+#   A smaller MBUS crossbar has shallower decoders and muxes (hence a higher Fmax, see estimate_crossbar.py),
+#   and less arbitration on the hot paths (memories, HBUS).
+#   Partitioning:
+#       - candidates: the MBUS slaves of the LOW traffic class (see utils.get_traffic_class) with an AXI4-Lite control
+#         interface (AXI4LITE_SLAVES), i.e. not the memories, the buses and the AXI4-only slaves (e.g. DM_mem, and the PLIC,
+#         whose wrapper is a full AXI4 slave with IDs)
+#       - the candidates are grouped by clock domain (RANGE_CLOCK_DOMAINS): each group of at least MIN_SUB_BUS_SLAVES slaves
+#         is moved behind a new sub-bus in the same clock domain, hence without new clock crossings
+#       - each sub-bus is an additional peripheral bus (PBUS<N>, config_peripheral_bus_<N>.csv, see bus_graph.py) and it
+#         replaces its slaves in the MBUS with a single MI, whose address ranges are the ranges of the moved slaves
+#         (ADDR_RANGES grows if needed), so the slaves keep their addresses and the address containment still holds
+#   Prints the proposal with the estimated MBUS crossbar before and after, and writes a machine-readable (JSON) summary.
+#   With PARTITION_APPLY=1, the MBUS CSV is rewritten, the sub-bus CSVs are written next to it, and the *_buses.svinc
+#   declarations of the MBUS and of the sub-buses are regenerated. The crossbar IPs, the RTL instances and the protocol
+#   converters of the sub-buses are not generated: the apply refuses to write anything unless the hand-written RTL already
+#   wires the result (see get_build_errors), as the MBUS declarations would drop the links of the moved slaves.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses (the MBUS one is rewritten with PARTITION_APPLY=1)
+#   Last: Output JSON summary file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Machine-readable summary
+import json
+# Read and write the CSVs
+import csv
+import glob
+# Find the links in the RTL
+import re
+# Sub-scripts
+import configuration
+import parse_properties_wrapper
+import allocate_thread_ids
+import infer_connectivity
+import estimate_crossbar
+import select_crossbar_strategy
+import declare_and_concat_buses_rtl
+import property_store
+from utils import *
+
+# Constants
+
+# MBUS slaves with an AXI4-Lite control interface, which can be moved behind an AXI4-Lite sub-bus
+AXI4LITE_SLAVES = ["CDMA", "HLS_CONTROL"]
+# Minimum number of slaves of a sub-bus (a single slave would just move the MI)
+MIN_SUB_BUS_SLAVES = 2
+# Maximum number of address ranges of a crossbar MI
+MAX_ADDR_RANGES = 16
+# Master of the sub-buses: the protocol converter from the MBUS, as for the PBUS
+SUB_BUS_MASTER = "PROT_CONV"
+# Apply the partitioning
+PARTITION_APPLY = os.getenv("PARTITION_APPLY", "0") == "1"
+# Hand-written RTL, where the buses are instanced and wired (the generated *.svinc are not included)
+RTL_FILES = sorted(glob.glob(f"{os.environ.get('XILINX_ROOT')}/rtl/*.sv"))
+# Crossbar IPs, one directory for each bus (e.g. xlnx_main_crossbar for the MBUS)
+IP_DIRS = sorted(glob.glob(f"{os.environ.get('XILINX_ROOT')}/ips/*/xlnx_*_crossbar"))
+
+# MBUS properties with one value per slave (MI), and with ADDR_RANGES values per slave
+MI_PROPERTIES = ["RANGE_NAMES", "RANGE_CLOCK_DOMAINS", "RANGE_TRAFFIC_CLASSES", "MI_READ_ISSUING", "MI_WRITE_ISSUING", "SECURE"]
+RANGE_PROPERTIES = ["RANGE_BASE_ADDR", "RANGE_ADDR_WIDTH"]
+CONNECTIVITY_PROPERTIES = ["READ_CONNECTIVITY", "WRITE_CONNECTIVITY"]
+
+############
+# CSV rows #
+############
+
+# Read a CSV as a list of [property, value] rows
+def read_rows(config_file_name : str) -> list:
+    with open(config_file_name, "r") as f:
+        return [row for row in csv.reader(f)][1:]
+
+# Render a list of [property, value] rows as a CSV
+def render_rows(rows : list) -> str:
+    return "\n".join(["Property,Value"] + [f"{name},{value}" for name, value in rows]) + "\n"
+
+# Parse a list of [property, value] rows in a configuration, as read_config does
+def parse_rows(config_name : str, rows : list) -> configuration.Configuration:
+    config = configuration.Configuration()
+    config.CONFIG_NAME = config_name
+    for name, value in property_store.get_parse_order(rows):
+        config = parse_properties_wrapper.parse_property(config, name, value)
+    return allocate_thread_ids.allocate_thread_ids(config)
+
+################
+# Partitioning #
+################
+
+# Get the MI indexes of the candidate slaves of the MBUS, i.e. the LOW traffic AXI4-Lite slaves
+def get_candidate_slaves(mbus_config : configuration.Configuration, bus_names : list) -> list:
+    return [mi_index for mi_index, name in enumerate(mbus_config.RANGE_NAMES)
+            if name not in bus_names and name in AXI4LITE_SLAVES and get_traffic_class(mbus_config, mi_index) == "LOW"]
+
+# Group the candidate slaves of the MBUS (or only the slave_names among them, if given) by clock domain, returns the sub-buses as
+# {"name": sub-bus name, "clock_domain": MHz, "slaves": [MI indexes in the MBUS], "ranges": [address ranges of the slaves]}
+def get_sub_buses(mbus_config : configuration.Configuration, bus_names : list, first_index : int, slave_names : list = None) -> list:
+    ranges = get_address_ranges(mbus_config.RANGE_NAMES, mbus_config.BASE_ADDR, mbus_config.RANGE_ADDR_WIDTH, mbus_config.ADDR_RANGES)
+    groups = {}
+    for mi_index in get_candidate_slaves(mbus_config, bus_names):
+        if slave_names is not None and mbus_config.RANGE_NAMES[mi_index] not in slave_names:
+            continue
+        groups.setdefault(mbus_config.RANGE_CLOCK_DOMAINS[mi_index], []).append(mi_index)
+
+    sub_buses = []
+    for clock_domain, slaves in sorted(groups.items()):
+        slave_ranges = [r for r in ranges if r["mi_index"] in slaves]
+        if len(slaves) < MIN_SUB_BUS_SLAVES or len(slave_ranges) > MAX_ADDR_RANGES:
+            continue
+        sub_buses.append({
+            "name": f"PBUS{first_index + len(sub_buses)}",
+            "clock_domain": clock_domain,
+            "slaves": slaves,
+            "ranges": sorted(slave_ranges, key=lambda r: r["base"]),
+        })
+    return sub_buses
+
+# Rewrite the MBUS rows, replacing the slaves of each sub-bus with a single MI
+def partition_mbus_rows(rows : list, mbus_config : configuration.Configuration, sub_buses : list) -> list:
+    values = {name: value for name, value in rows}
+    moved = [mi_index for sub_bus in sub_buses for mi_index in sub_bus["slaves"]]
+    kept = [mi_index for mi_index in range(mbus_config.NUM_MI) if mi_index not in moved]
+    addr_ranges = max([mbus_config.ADDR_RANGES] + [len(sub_bus["ranges"]) for sub_bus in sub_buses])
+    num_si = mbus_config.NUM_SI
+
+    new_values = {"NUM_MI": str(len(kept) + len(sub_buses))}
+    if addr_ranges != mbus_config.ADDR_RANGES or "ADDR_RANGES" in values:
+        new_values["ADDR_RANGES"] = str(addr_ranges)
+
+    # One value per MI: the sub-buses take the clock domain of their slaves, the LOW class and the deepest issuing
+    for name in MI_PROPERTIES:
+        if name not in values:
+            continue
+        mi_values = values[name].split()
+        sub_bus_values = []
+        for sub_bus in sub_buses:
+            match name:
+                case "RANGE_NAMES":
+                    sub_bus_values.append(sub_bus["name"])
+                case "RANGE_CLOCK_DOMAINS":
+                    sub_bus_values.append(str(sub_bus["clock_domain"]))
+                case "RANGE_TRAFFIC_CLASSES":
+                    sub_bus_values.append("LOW")
+                case _:
+                    sub_bus_values.append(max((mi_values[i] for i in sub_bus["slaves"]), key=int))
+        new_values[name] = " ".join([mi_values[i] for i in kept] + sub_bus_values)
+
+    # ADDR_RANGES values per MI, the unused ranges are padded with a 0 width
+    for name in RANGE_PROPERTIES:
+        if name not in values:
+            continue
+        range_values = values[name].split()
+        unused = "0xffffffffffffffff" if name == "RANGE_BASE_ADDR" else "0"
+        mi_values = []
+        for i in kept:
+            used = range_values[mbus_config.ADDR_RANGES * i:mbus_config.ADDR_RANGES * (i + 1)]
+            mi_values += used + [unused] * (addr_ranges - len(used))
+        for sub_bus in sub_buses:
+            used = [f"0x{r['base']:x}" if name == "RANGE_BASE_ADDR" else str(r["width"]) for r in sub_bus["ranges"]]
+            mi_values += used + [unused] * (addr_ranges - len(used))
+        new_values[name] = " ".join(mi_values)
+
+    # Explicit connectivity matrices (NUM_SI values per MI): a master reaches the sub-bus if it reached any of its slaves
+    for name in CONNECTIVITY_PROPERTIES:
+        if name not in values or values[name].strip() == "AUTO":
+            continue
+        matrix = values[name].split()
+        mi_values = []
+        for i in kept:
+            mi_values += matrix[num_si * i:num_si * (i + 1)]
+        for sub_bus in sub_buses:
+            mi_values += [str(max(int(matrix[num_si * i + j]) for i in sub_bus["slaves"])) for j in range(num_si)]
+        new_values[name] = " ".join(mi_values)
+
+    # Reachability: the masters reaching a moved slave reach its sub-bus
+    if "MASTER_REACHABILITY" in values:
+        renamed = {mbus_config.RANGE_NAMES[i]: sub_bus["name"] for sub_bus in sub_buses for i in sub_bus["slaves"]}
+        entries = []
+        for entry in values["MASTER_REACHABILITY"].split():
+            master, slaves = entry.split(":", 1)
+            slaves = list(dict.fromkeys(renamed.get(slave, slave) for slave in slaves.split("+")))
+            entries.append(f"{master}:{'+'.join(slaves)}")
+        new_values["MASTER_REACHABILITY"] = " ".join(entries)
+
+    # A new ADDR_RANGES is written before the ranges it sizes
+    new_rows = []
+    for name, value in rows:
+        if name == "RANGE_BASE_ADDR" and "ADDR_RANGES" in new_values and "ADDR_RANGES" not in values:
+            new_rows.append(["ADDR_RANGES", new_values["ADDR_RANGES"]])
+        new_rows.append([name, new_values.get(name, value)])
+    return new_rows
+
+# Get the rows of a sub-bus
+def get_sub_bus_rows(sub_bus : dict, mbus_config : configuration.Configuration, id_width : int) -> list:
+    slave_names = [mbus_config.RANGE_NAMES[i] for i in sub_bus["slaves"]]
+    addr_ranges = max(r["range_index"] for r in sub_bus["ranges"]) + 1
+    rows = [
+        ["PROTOCOL", "AXI4LITE"],
+        ["ID_WIDTH", str(id_width)],
+        ["NUM_SI", "1"],
+        ["NUM_MI", str(len(slave_names))],
+        ["MASTER_NAMES", SUB_BUS_MASTER],
+        ["RANGE_NAMES", " ".join(slave_names)],
+    ]
+    if addr_ranges > 1:
+        rows.append(["ADDR_RANGES", str(addr_ranges)])
+    base_addrs = []
+    addr_widths = []
+    for i in sub_bus["slaves"]:
+        slave_ranges = {r["range_index"]: r for r in sub_bus["ranges"] if r["mi_index"] == i}
+        for range_index in range(addr_ranges):
+            r = slave_ranges.get(range_index)
+            base_addrs.append(f"0x{r['base']:x}" if r is not None else "0xffffffffffffffff")
+            addr_widths.append(str(r["width"]) if r is not None else "0")
+    rows.append(["RANGE_BASE_ADDR", " ".join(base_addrs)])
+    rows.append(["RANGE_ADDR_WIDTH", " ".join(addr_widths)])
+    return rows
+
+# Get the reasons why the partitioned SoC can't be built, i.e. the links of the hand-written RTL (RTL_FILES) and the crossbar
+# IPs (IP_DIRS) not matching the sub-buses: the moved slaves must no longer be wired to the MBUS, and each sub-bus needs its
+# crossbar IP (xlnx_<sub-bus>_crossbar), and its links from the MBUS (through the protocol converter) and to its slaves
+# @sub_buses: the slave names of each sub-bus, as {sub-bus name: [slave names]}
+def get_build_errors(sub_buses : dict, rtl_files : list = None, ip_dirs : list = None) -> list:
+    rtl_files = RTL_FILES if rtl_files is None else rtl_files
+    ip_dirs = IP_DIRS if ip_dirs is None else ip_dirs
+    rtl = {}
+    for file_name in rtl_files:
+        with open(file_name, "r") as f:
+            rtl[file_name] = f.read().splitlines()
+
+    # Get the first reference to a link, as file:line
+    def find_link(link : str) -> str:
+        pattern = re.compile(rf"\b{link}_axi")
+        for file_name, lines in rtl.items():
+            for line_number, line in enumerate(lines, 1):
+                if pattern.search(line):
+                    return f"{os.path.basename(file_name)}:{line_number}"
+        return None
+
+    ip_names = [os.path.basename(d) for d in ip_dirs]
+    errors = []
+    for name, slaves in sub_buses.items():
+        for slave in slaves:
+            location = find_link(f"MBUS_to_{slave}")
+            if location is not None:
+                errors.append(f"{slave} is still wired to the MBUS ({location}), instead of {name}_to_{slave}")
+            elif find_link(f"{name}_to_{slave}") is None:
+                errors.append(f"{slave} is not wired to {name} ({name}_to_{slave} not found in the RTL)")
+        if find_link(f"MBUS_to_{name}") is None:
+            errors.append(f"{name} is not wired to the MBUS (MBUS_to_{name} not found in the RTL)")
+        if f"xlnx_{name.lower()}_crossbar" not in ip_names:
+            errors.append(f"{name} has no crossbar IP (xlnx_{name.lower()}_crossbar)")
+    return errors
+
+# Estimate the MBUS crossbar
+def get_estimate(config : configuration.Configuration, core_selector : str, coefficients : dict) -> dict:
+    config = infer_connectivity.infer_connectivity(config, core_selector)
+    config = select_crossbar_strategy.select_crossbar_strategy(config, config.MAIN_CLOCK_DOMAIN, coefficients)
+    return estimate_crossbar.estimate_crossbar(config, coefficients) | {"NUM_MI": config.NUM_MI, "ADDR_RANGES": config.ADDR_RANGES}
+
+# Render the summary as a human-readable report
+def render_report(summary : dict) -> str:
+    lines = [f"Note: {estimate_crossbar.UNCALIBRATED_NOTE}"] if not summary["calibrated"] else []
+    if summary["sub_buses"] == []:
+        return "\n".join(lines + ["MBUS: no slaves to offload"])
+    for sub_bus in summary["sub_buses"]:
+        lines.append(f"{sub_bus['name']} ({sub_bus['clock_domain']} MHz): {' '.join(sub_bus['slaves'])}")
+    before, after = summary["before"], summary["after"]
+    lines.append(f"MBUS before: {before['NUM_MI']} MI, {before['ADDR_RANGES']} ranges, ~{before['LUT']} LUT, ~{before['FF']} FF, Fmax ~{before['FMAX_MHZ']} MHz")
+    lines.append(f"MBUS after:  {after['NUM_MI']} MI, {after['ADDR_RANGES']} ranges, ~{after['LUT']} LUT, ~{after['FF']} FF, Fmax ~{after['FMAX_MHZ']} MHz")
+    if summary["build_errors"] != []:
+        lines.append(f"Proposal only: the RTL is not wired for the sub-buses ({len(summary['build_errors'])} issues, see build_errors)")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    config_file_names = sys.argv[1:-1]
+    output_json_file = sys.argv[-1]
+    configs = read_config(config_file_names)
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), os.getenv("SOC_CONFIG", "embedded"))
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+
+    mbus_index = next(i for i, c in enumerate(configs) if c.CONFIG_NAME == "MBUS")
+    mbus_config = configs[mbus_index]
+    mbus_file_name = config_file_names[mbus_index]
+    config_dir = os.path.dirname(os.path.abspath(mbus_file_name))
+    pbus_config = next((c for c in configs if c.CONFIG_NAME == "PBUS"), configuration.Configuration())
+
+    # Number the sub-buses after the existing additional peripheral buses
+    existing = [get_config_name(f) for f in glob.glob(f"{config_dir}/config_peripheral_bus_*.csv")]
+    first_index = max([int(name.removeprefix("PBUS")) for name in existing] + [0]) + 1
+    sub_buses = get_sub_buses(mbus_config, [c.CONFIG_NAME for c in configs], first_index)
+
+    mbus_rows = partition_mbus_rows(read_rows(mbus_file_name), mbus_config, sub_buses)
+    summary = {
+        "sub_buses": [{
+            "name": sub_bus["name"],
+            "clock_domain": sub_bus["clock_domain"],
+            "slaves": [mbus_config.RANGE_NAMES[i] for i in sub_bus["slaves"]],
+            "ranges": [[f"0x{r['base']:x}", r["width"]] for r in sub_bus["ranges"]],
+        } for sub_bus in sub_buses],
+        "before": get_estimate(mbus_config, core_selector, coefficients),
+        "after": get_estimate(parse_rows("MBUS", mbus_rows), core_selector, coefficients),
+        "calibrated": coefficients["CALIBRATED"],
+    }
+    summary["build_errors"] = get_build_errors({sub_bus["name"]: sub_bus["slaves"] for sub_bus in summary["sub_buses"]})
+    print(render_report(summary))
+
+    if PARTITION_APPLY and sub_buses != []:
+        # Only the proposal can be written until the RTL is wired for the sub-buses
+        if summary["build_errors"] != []:
+            for error in summary["build_errors"]:
+                print_error(error)
+            print_error(f"PARTITION_APPLY refused: the partitioned SoC can't be built, {mbus_file_name} is unchanged")
+            write_output_file(output_json_file, json.dumps(summary, indent=4))
+            sys.exit(1)
+        # The properties set by an overlay shadow the written values (see property_store.py)
+        store = property_store.load_store(mbus_file_name)
+        original = dict(read_rows(mbus_file_name))
+        for name, value in mbus_rows:
+            if original.get(name) != value and store.is_overridden(name):
+                print_warning(f"{name} is set in {store.get_provenance(name)}, the value written to {mbus_file_name} is shadowed")
+        sub_bus_files = {}
+        for sub_bus in sub_buses:
+            file_name = f"{config_dir}/config_peripheral_bus_{sub_bus['name'].removeprefix('PBUS')}.csv"
+            sub_bus_files[file_name] = get_sub_bus_rows(sub_bus, mbus_config, pbus_config.ID_WIDTH)
+        for file_name, rows in [(mbus_file_name, mbus_rows)] + list(sub_bus_files.items()):
+            write_file_atomic(file_name, render_rows(rows))
+            property_store.invalidate_store(file_name)
+            print(f"[CONFIG] Updated {file_name}")
+        # Bus declarations
+        for file_name in [mbus_file_name] + list(sub_bus_files):
+            config = read_config([file_name])[0]
+            write_output_file(declare_and_concat_buses_rtl.get_rtl_file(config.CONFIG_NAME), declare_and_concat_buses_rtl.declare_and_concat_buses(config))
+
+    write_output_file(output_json_file, json.dumps(summary, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
@@ -0,0 +1,272 @@
+# Author: agent <agent@local>
+# Description:
+#   Plan the AXI data-width converters of the interconnect, on the bus graph (see bus_graph.py).
+#   The bus widths are fixed by the bus kind: the MBUS follows XLEN, the PBUS is 32 bits and the HBUS 512 bits,
+#   while masters and slaves have their own native width (e.g. 512 bits for the DDR channels and the HBUS accelerator).
+#   The planner:
+#       1) enumerates every master-to-slave path across the buses, following the connectivity (see infer_connectivity.py),
+#          the child buses and the loopbacks (e.g. RV_SOCKET_DATA -> MBUS -> HBUS -> DDR4CH0, s_acc -> HBUS -> MBUS -> BRAM)
+#       2) places an upsizer or a downsizer at each boundary with a width change, and derives the bandwidth cap of the
+#          path as its narrowest link (width * clock), i.e. the bottleneck
+#       3) flags the high-traffic paths (see utils.get_traffic_class) narrowed below the width of both their ends,
+#          e.g. 512-bit accelerator traffic funneled through the MBUS to a DDR channel
+#       4) proposes to reach the slave of each narrowed path from the bus of its master, when that bus is wide enough,
+#          with the bandwidth caps of all the masters of that slave before and after the move
+#   Prints a human-readable report and writes a machine-readable (JSON) plan, with the converter of each boundary.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses
+#   Last: Output JSON plan file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Machine-readable summary
+import json
+# Copy the configurations
+import copy
+# Sub-scripts
+import configuration
+import parse_properties_wrapper
+import infer_connectivity
+import bus_graph
+from utils import *
+
+# Constants
+SOC_CONFIG = os.getenv("SOC_CONFIG", "embedded")
+
+# Native data width of the masters and slaves not matching the width of their bus (the others match it)
+NATIVE_DATA_WIDTHS = {
+    "s_acc"         : 512,  # HLS accelerator, HBUS master
+    "CDMA"          : 32,   # CDMA_DATA_WIDTH in xlnx_axi_cdma (the control interface is AXI4-Lite)
+    "PLIC"          : 32,
+    "HLS_CONTROL"   : 32,
+    "HBM"           : 256,
+}
+DDR4_DATA_WIDTH = 512
+# The system master is the XDMA on hpc (64 bits) and the JTAG2AXI on embedded (32 bits)
+SYS_MASTER_DATA_WIDTHS = {
+    "hpc"       : 64,
+    "embedded"  : 32,
+}
+
+# Get the native data width of a master or slave
+def get_native_data_width(name : str, bus_width : int) -> int:
+    if name.startswith("DDR4CH"):
+        return DDR4_DATA_WIDTH
+    if name == "SYS_MASTER":
+        return SYS_MASTER_DATA_WIDTHS.get(SOC_CONFIG, bus_width)
+    return NATIVE_DATA_WIDTHS.get(name, bus_width)
+
+# Get the data width of each bus, set by the system XLEN as in the crossbar configuration (see parse_XLEN)
+def get_bus_widths(graph : dict, xlen : int) -> dict:
+    return {name: parse_properties_wrapper.parse_property(copy.copy(config), "XLEN", xlen).DATA_WIDTH for name, config in graph["buses"].items()}
+
+# Get the clock (MHz) of each bus: the main clock domain for the MBUS, the clock domain of its MI in the parent bus otherwise
+def get_bus_clocks(graph : dict) -> dict:
+    clocks = {}
+    for name in graph["order"]:
+        edge = graph["parent"][name]
+        if edge is None:
+            clocks[name] = graph["buses"][name].MAIN_CLOCK_DOMAIN
+            continue
+        parent_config = graph["buses"][edge["parent"]]
+        if parent_config.RANGE_CLOCK_DOMAINS != []:
+            clocks[name] = parent_config.RANGE_CLOCK_DOMAINS[edge["mi_index"]]
+        else:
+            clocks[name] = clocks[edge["parent"]]
+    return clocks
+
+# Get the master entering a bus from another bus: the bus itself for loopbacks and buses wired as masters (e.g. MBUS on HBUS),
+# the only master otherwise (e.g. the protocol converter of the PBUS)
+def get_entry_master(config : configuration.Configuration, from_bus : str) -> str:
+    if from_bus in config.MASTER_NAMES:
+        return from_bus
+    return config.MASTER_NAMES[0] if config.NUM_SI == 1 else None
+
+#########
+# Paths #
+#########
+
+# Build a path from a master to a slave through a list of buses, as
+# {"master", "slave", "route": bus names, "traffic", "links": [{"name", "width", "clock"}], "converters", "bandwidth_mbps", "bottleneck", "narrowed_to"}
+def get_path(master : str, route : list, slave : str, slave_clock : int, traffic : str, widths : dict, clocks : dict) -> dict:
+    links = [{"name": master, "width": get_native_data_width(master, widths[route[0]]), "clock": clocks[route[0]]}]
+    links += [{"name": bus, "width": widths[bus], "clock": clocks[bus]} for bus in route]
+    links.append({"name": slave, "width": get_native_data_width(slave, widths[route[-1]]), "clock": slave_clock})
+
+    # A converter at each width change
+    converters = []
+    for a, b in zip(links, links[1:]):
+        if a["width"] != b["width"]:
+            converters.append({
+                "location": f"{a['name']} -> {b['name']}",
+                "kind": "upsizer" if b["width"] > a["width"] else "downsizer",
+                "si_width": a["width"],
+                "mi_width": b["width"],
+            })
+
+    # The bandwidth cap (MB/s) is the narrowest link
+    bottleneck = min(links, key=lambda link: link["width"] * link["clock"])
+    end_width = min(links[0]["width"], links[-1]["width"])
+    narrowest = min(link["width"] for link in links)
+    return {
+        "master": master,
+        "slave": slave,
+        "route": route,
+        "traffic": traffic,
+        "links": links,
+        "converters": converters,
+        "bandwidth_mbps": bottleneck["width"] // 8 * bottleneck["clock"],
+        "bottleneck": bottleneck["name"],
+        "narrowed_to": narrowest if narrowest < end_width else None,
+    }
+
+# Enumerate the master-to-slave paths, visiting the buses depth-first from the bus of each master (buses are not revisited)
+def get_paths(graph : dict, widths : dict, clocks : dict) -> list:
+    buses = graph["buses"]
+    paths = []
+    for bus in graph["order"]:
+        parent_edge = graph["parent"][bus]
+        for master in buses[bus].MASTER_NAMES:
+            # Buses and the entries from the parent bus (e.g. the PBUS protocol converter) are not masters on their own
+            if master in buses or (parent_edge is not None and master == get_entry_master(buses[bus], parent_edge["parent"])):
+                continue
+            stack = [(bus, master, [bus])]
+            while stack != []:
+                current, si_name, route = stack.pop()
+                config = buses[current]
+                for mi_index, slave in enumerate(config.RANGE_NAMES):
+                    if not (infer_connectivity.is_connected(config, config.READ_CONNECTIVITY, si_name, slave) or
+                            infer_connectivity.is_connected(config, config.WRITE_CONNECTIVITY, si_name, slave)):
+                        continue
+                    if slave in buses:
+                        entry_master = get_entry_master(buses[slave], current)
+                        if slave not in route and entry_master is not None:
+                            stack.append((slave, entry_master, route + [slave]))
+                        continue
+                    slave_clock = config.RANGE_CLOCK_DOMAINS[mi_index] if config.RANGE_CLOCK_DOMAINS != [] else clocks[current]
+                    paths.append(get_path(master, route, slave, slave_clock, get_traffic_class(config, mi_index), widths, clocks))
+    return sorted(paths, key=lambda p: (p["master"], p["slave"]))
+
+# Get the narrowed high-traffic paths
+def get_narrowed_paths(paths : list) -> list:
+    return [p for p in paths if p["narrowed_to"] is not None and p["traffic"] == "HIGH"]
+
+# Get the shortest route between two buses, through the child buses and the loopbacks
+def get_route(graph : dict, from_bus : str, to_bus : str) -> list:
+    routes = {from_bus: [from_bus]}
+    queue = [from_bus]
+    while queue != []:
+        bus = queue.pop(0)
+        if bus == to_bus:
+            return routes[bus]
+        for edge in graph["edges"][bus]:
+            if edge["kind"] is not None and edge["child"] not in routes:
+                routes[edge["child"]] = routes[bus] + [edge["child"]]
+                queue.append(edge["child"])
+    return None
+
+##############
+# Placements #
+##############
+
+# Propose to move the slave of each narrowed path to the bus of its master, if wide enough for both ends,
+# with the bandwidth caps of all the masters of that slave before and after the move
+def get_proposals(graph : dict, paths : list, widths : dict, clocks : dict) -> list:
+    proposals = []
+    for narrowed in get_narrowed_paths(paths):
+        slave = narrowed["slave"]
+        to_bus = narrowed["route"][0]
+        from_bus = narrowed["route"][-1]
+        end_width = min(narrowed["links"][0]["width"], narrowed["links"][-1]["width"])
+        if to_bus == from_bus or widths[to_bus] < end_width or slave in [p["slave"] for p in proposals]:
+            continue
+        masters = []
+        for p in paths:
+            if p["slave"] != slave:
+                continue
+            route = get_route(graph, p["route"][0], to_bus)
+            if route is None:
+                continue
+            after = get_path(p["master"], route, slave, clocks[to_bus], p["traffic"], widths, clocks)
+            masters.append({"master": p["master"], "before_mbps": p["bandwidth_mbps"], "after_mbps": after["bandwidth_mbps"], "route": route})
+        proposals.append({
+            "slave": slave,
+            "from_bus": from_bus,
+            "to_bus": to_bus,
+            "reason": f"{narrowed['master']} -> {slave} is narrowed to {narrowed['narrowed_to']} bits",
+            "masters": masters,
+        })
+    return proposals
+
+# Plan the data-width converters of the configurations and return a summary dict
+def plan_dwidth_converters(configs : list) -> dict:
+    sys_config = next((c for c in configs if c.CONFIG_NAME == "SYS"), configuration.Configuration())
+    graph = bus_graph.get_bus_graph(configs)
+    widths = get_bus_widths(graph, sys_config.XLEN)
+    clocks = get_bus_clocks(graph)
+    paths = get_paths(graph, widths, clocks)
+
+    # One converter for each boundary, shared by all the paths through it
+    converters = {}
+    for p in paths:
+        for c in p["converters"]:
+            converters.setdefault(c["location"], c)
+
+    return {
+        "buses": {name: {"width": widths[name], "clock": clocks[name]} for name in graph["order"]},
+        "converters": list(converters.values()),
+        "paths": paths,
+        "narrowed": [f"{p['master']} -> {p['slave']}" for p in get_narrowed_paths(paths)],
+        "proposals": get_proposals(graph, paths, widths, clocks),
+    }
+
+# Render the summary as a human-readable report
+def render_report(summary : dict) -> str:
+    lines = ["Buses:"]
+    for name, bus in summary["buses"].items():
+        lines.append(f"  {name:<8} {bus['width']:>4} bits @ {bus['clock']}MHz")
+    lines.append(f"Data-width converters: {len(summary['converters'])}")
+    for c in summary["converters"]:
+        lines.append(f"  {c['location']:<28} {c['kind']:<9} {c['si_width']:>4} -> {c['mi_width']} bits")
+    lines.append("Paths:")
+    for p in summary["paths"]:
+        narrowed = f", narrowed to {p['narrowed_to']} bits" if p["narrowed_to"] is not None else ""
+        lines.append(f"  {p['master'] + ' -> ' + p['slave']:<32} via {' '.join(p['route']):<16} {p['bandwidth_mbps']:>6} MB/s ({p['bottleneck']}{narrowed})")
+    if summary["narrowed"] == []:
+        lines.append("No narrowed high-traffic paths")
+    else:
+        lines.append(f"Narrowed high-traffic paths: {', '.join(summary['narrowed'])}")
+    if summary["proposals"] != []:
+        lines.append("Proposals:")
+        for proposal in summary["proposals"]:
+            lines.append(f"  {proposal['slave']}: move from {proposal['from_bus']} to {proposal['to_bus']}, {proposal['reason']}")
+            for m in proposal["masters"]:
+                lines.append(f"    {m['master']:<20} {m['before_mbps']:>6} -> {m['after_mbps']} MB/s")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    config_file_names = sys.argv[1:-1]
+    output_json_file = sys.argv[-1]
+    configs = read_config(config_file_names)
+
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+    configs = [infer_connectivity.infer_connectivity(c, core_selector) for c in configs]
+
+    summary = plan_dwidth_converters(configs)
+    print(render_report(summary))
+
+    write_output_file(output_json_file, json.dumps(summary, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
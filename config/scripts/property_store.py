@@ -0,0 +1,148 @@
+# Author: agent <agent@local>
+# Description:
+#   Indexed property store of the CSV configurations, shared by the generators (see utils.read_config).
+#   Each CSV is read once per process, in a single pass, into a {property: value} map, so that the properties are looked up
+#   in constant time and in any order.
+#   A configuration is layered, from the lowest priority:
+#       1) base: the CSV of the same name in CONFIG_BASE_DIR (e.g. configs/common), if any
+#       2) the configuration CSV itself (e.g. configs/${SOC_CONFIG}/config_main_bus.csv)
+#       3) overlays: the CSVs of the same name in each of CONFIG_OVERLAY_DIRS (e.g. a board, a local override, a sweep variant)
+#   Each layer only lists the properties it overrides or adds, e.g. a sweep variant is a one-line delta.
+#   Overridden properties keep their position, added properties are appended.
+#   The parsers are order-dependent (e.g. RANGE_BASE_ADDR holds ADDR_RANGES values per MI), hence the properties are parsed in a
+#   canonical order (see get_parse_order): the properties others depend on first, e.g. an ADDR_RANGES added by an overlay.
+#   Each value records its provenance, i.e. the file and the line it comes from.
+#   The shell scripts resolve the layers in the same way (see get_property in utils.sh).
+# Args (to print the resolved properties and their provenance):
+#   1+: Input configuration files
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Layer directories
+import os
+# Read the CSVs
+import csv
+
+# Header row of the CSVs
+CSV_HEADER = ["Property", "Value"]
+
+# Get the layer directories from the environment (see the Makefile), as (CONFIG_BASE_DIR, CONFIG_OVERLAY_DIRS)
+# They are read at each call, as the configuration matrix changes them for each cell (see run_config_matrix.py)
+def get_layer_dirs() -> tuple:
+    return os.environ.get("CONFIG_BASE_DIR", ""), tuple(os.environ.get("CONFIG_OVERLAY_DIRS", "").split())
+
+# Get the layers of a configuration file, from the lowest priority
+def get_layers(file_name : str) -> list:
+    base_dir, overlay_dirs = get_layer_dirs()
+    base_name = os.path.basename(file_name)
+    layers = []
+    if base_dir != "":
+        layers.append(os.path.join(base_dir, base_name))
+    layers.append(file_name)
+    layers += [os.path.join(overlay_dir, base_name) for overlay_dir in overlay_dirs]
+
+    # Keep the existing files, once each (e.g. the system CSV is in the base directory)
+    existing = []
+    for layer in layers:
+        if os.path.isfile(layer) and not any(os.path.samefile(layer, e) for e in existing):
+            existing.append(layer)
+    return existing
+
+# Read the rows of a layer, as (property, value, line) tuples
+def read_layer(file_name : str) -> list:
+    rows = []
+    with open(file_name, "r", newline="") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if row == [] or row == CSV_HEADER:
+                continue
+            if len(row) != 2:
+                raise ValueError(f"Invalid row {','.join(row)} in {file_name}:{reader.line_num}, expected <Property>,<Value>")
+            rows.append((row[0], row[1], reader.line_num))
+    return rows
+
+# Properties the parsing of other properties depends on, parsed first and in this order (see parse_properties_impl.py):
+# the interfaces, the widths and the ranges size the per-interface values, the STRATEGY and R_REGISTER set the CONNECTIVITY_MODE,
+# and the CONNECTIVITY_MODE forces the per-SI values in SASD
+PARSE_ORDER = ["PROTOCOL", "NUM_SI", "NUM_MI", "ID_WIDTH", "ADDR_RANGES", "XLEN", "PHYSICAL_ADDR_WIDTH", "STRATEGY", "R_REGISTER", "CONNECTIVITY_MODE"]
+
+# Sort (property, value) pairs in parse order: the PARSE_ORDER properties first, then the others in their order
+def get_parse_order(items : list) -> list:
+    return sorted(items, key=lambda item: PARSE_ORDER.index(item[0]) if item[0] in PARSE_ORDER else len(PARSE_ORDER))
+
+# Resolved properties of a layered configuration
+class PropertyStore:
+    def __init__(self, file_name : str):
+        self.file_name = file_name
+        self.layers = get_layers(file_name)
+        # Index of the configuration file in the layers, the following ones are overlays
+        self.own_layer = next(i for i, layer in enumerate(self.layers) if os.path.samefile(layer, file_name))
+        # Property -> value, in CSV order
+        self.values = {}
+        # Property -> (layer index, line)
+        self.provenance = {}
+        for index, layer in enumerate(self.layers):
+            for name, value, line in read_layer(layer):
+                self.values[name] = value
+                self.provenance[name] = (index, line)
+
+    def __contains__(self, name : str) -> bool:
+        return name in self.values
+
+    # Get the value of a property, the default is returned for a missing (optional) property
+    def get(self, name : str, default : str = None) -> str:
+        if name in self.values:
+            return self.values[name]
+        if default is not None:
+            return default
+        raise KeyError(f"Missing property {name} in {self.file_name}")
+
+    # Get the (property, value) pairs, in CSV order
+    def items(self) -> list:
+        return list(self.values.items())
+
+    # Get the (property, value) pairs, in parse order (see get_parse_order)
+    def parse_items(self) -> list:
+        return get_parse_order(self.items())
+
+    # Get the provenance of a property, as "file:line"
+    def get_provenance(self, name : str) -> str:
+        index, line = self.provenance[name]
+        return f"{self.layers[index]}:{line}"
+
+    # Check if a property is set by an overlay, i.e. a value written to the configuration file would be shadowed
+    def is_overridden(self, name : str) -> bool:
+        return name in self.provenance and self.provenance[name][0] > self.own_layer
+
+# The stores of this process, by absolute path and layer directories
+stores = {}
+
+# Get the store of a configuration file, read once per process (and layer directories)
+def load_store(file_name : str) -> PropertyStore:
+    key = (os.path.abspath(file_name), get_layer_dirs())
+    if key not in stores:
+        stores[key] = PropertyStore(file_name)
+    return stores[key]
+
+# Drop the stores of a configuration file, e.g. after writing it back
+def invalidate_store(file_name : str) -> None:
+    for key in [k for k in stores if k[0] == os.path.abspath(file_name)]:
+        stores.pop(key)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: <CONFIG_CSVS>")
+        sys.exit(1)
+
+    for file_name in sys.argv[1:]:
+        store = load_store(file_name)
+        print(f"{file_name} ({' -> '.join(store.layers)})")
+        width = max([len(name) for name in store.values] + [0])
+        for name, value in store.items():
+            print(f"    {name:<{width}} = {value:<40} ({store.get_provenance(name)})")
@@ -0,0 +1,391 @@
+# Author: agent <agent@local>
+# Description:
+#   Local database (SQLite) of the Quality of Results (QoR) of the generated crossbars, i.e. a config-to-QoR dataset.
+#   Two commands:
+#       ingest: parse the Vivado reports of a build and join them with the Configuration that produced it:
+#           - report_utilization (hierarchical, from build_bitstream.tcl, or flat, from the out-of-context IP runs):
+#             LUT, FF and BRAM of each crossbar (xlnx_main_crossbar, xlnx_peripheral_crossbar, xlnx_highperformance_crossbar)
+#           - report_timing_summary: design WNS/TNS/WHS and the WNS of the bus clock of each crossbar,
+#             i.e. of all the paths in that clock domain, an upper bound for the crossbar paths.
+#             Each utilization report takes the timing summary of its run (same directory), otherwise the only one of its
+#             stage: multiple candidates are rejected, as the results can't be joined
+#           Each bus Configuration is identified by the hash of its inputs (see get_config_hash) and stored once in the
+#           "configs" table, together with the crossbar estimate features (see estimate_crossbar.py),
+#           while each (report, bus) is a row of the "qor" table. Ingesting the same report twice is a no-op.
+#       query: run an SQL query on the database and print the result as CSV, e.g. WNS vs NUM_MI for SAMD at 250 MHz:
+#           SELECT NUM_MI, CLOCK_WNS_NS FROM qor_view WHERE CONNECTIVITY_MODE = 'SAMD' AND CLOCK_MHZ = 250 ORDER BY NUM_MI
+#   The "qor_view" view joins the two tables, the columns used by the queries are indexed.
+# Args:
+#   1: Database file
+#   2: Command (ingest, query)
+#   ingest:
+#       3: Input configuration file for system
+#       4+: Input configuration files for buses
+#       Last: Vivado reports directory (searched recursively for *utilization*.rpt and *timing_summary*.rpt)
+#   query:
+#       3: SQL query
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars, find the reports
+import os
+# Local store
+import sqlite3
+# Input hashes
+import hashlib
+import json
+# Parse the reports
+import re
+# Sub-scripts
+import configuration
+import infer_connectivity
+import estimate_crossbar
+import select_crossbar_strategy
+from utils import *
+
+# Crossbar IP (Vivado module) of each bus
+CROSSBAR_IPS = {
+    "MBUS" : "xlnx_main_crossbar",
+    "PBUS" : "xlnx_peripheral_crossbar",
+    "HBUS" : "xlnx_highperformance_crossbar",
+}
+
+# Configuration columns stored in the "configs" table, besides the hash and the estimate features
+CONFIG_COLUMNS = {
+    "BUS"               : "TEXT",
+    "SOC_CONFIG"        : "TEXT",
+    "BOARD"             : "TEXT",
+    "CORE_SELECTOR"     : "TEXT",
+    "XLEN"              : "INTEGER",
+    "PROTOCOL"          : "TEXT",
+    "NUM_SI"            : "INTEGER",
+    "NUM_MI"            : "INTEGER",
+    "ADDR_WIDTH"        : "INTEGER",
+    "DATA_WIDTH"        : "INTEGER",
+    "ID_WIDTH"          : "INTEGER",
+    "ADDR_RANGES"       : "INTEGER",
+    "CONNECTIVITY_MODE" : "TEXT",
+    "STRATEGY"          : "INTEGER",
+    "R_REGISTER"        : "INTEGER",
+    "CLOCK_MHZ"         : "INTEGER",
+}
+
+# Results columns stored in the "qor" table
+QOR_COLUMNS = {
+    "STAGE"             : "TEXT",
+    "LUT"               : "INTEGER",
+    "FF"                : "INTEGER",
+    "BRAM"              : "REAL",
+    "WNS_NS"            : "REAL",
+    "TNS_NS"            : "REAL",
+    "WHS_NS"            : "REAL",
+    "CLOCK_NAME"        : "TEXT",
+    "CLOCK_WNS_NS"      : "REAL",
+    "FMAX_MHZ"          : "REAL",
+}
+
+# Indexed columns of the "configs" table
+INDEXED_COLUMNS = [
+    ["BUS", "SOC_CONFIG"],
+    ["CONNECTIVITY_MODE", "CLOCK_MHZ"],
+    ["NUM_MI"],
+    ["NUM_SI"],
+]
+
+###############
+# Input hash  #
+###############
+
+# Get the effective connectivity mode of a crossbar, i.e. forced by STRATEGY
+def get_connectivity_mode(config : configuration.Configuration) -> str:
+    return {1: "SASD", 2: "SAMD"}.get(config.STRATEGY, config.CONNECTIVITY_MODE)
+
+# Hash of the inputs of a bus crossbar: all the parsed (and inferred) properties of the bus, and the SoC
+def get_config_hash(config : configuration.Configuration, soc_config : str) -> str:
+    inputs = dict(vars(config), SOC_CONFIG=soc_config)
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+#################
+# Parse reports #
+#################
+
+# Parse the leading number of a report cell, e.g. "1234", "1234(1.95%)", "0.5"
+def parse_number(cell : str) -> float:
+    match = re.match(r"\s*(-?[0-9.]+)", cell)
+    return float(match.group(1)) if match is not None else None
+
+# Split a report table row into cells
+def split_row(line : str) -> list:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+# Get the stage of a report from its name
+def get_stage(file_name : str) -> str:
+    for stage in ["post_impl", "post_synth"]:
+        if stage in os.path.basename(file_name):
+            return stage
+    # Out-of-context IP runs
+    return "synth"
+
+# Parse the utilization of each crossbar from a report_utilization file, returns {bus: {LUT, FF, BRAM}}
+def parse_utilization(file_name : str) -> dict:
+    with open(file_name, "r") as f:
+        lines = f.read().splitlines()
+    results = {}
+
+    # Hierarchical report: one row for each instance, with the module name
+    header = next((split_row(line) for line in lines if re.match(r"\|\s*Instance\s*\|\s*Module\s*\|", line)), None)
+    if header is not None:
+        columns = {name: i for i, name in enumerate(header)}
+        for line in lines:
+            if not line.startswith("|"):
+                continue
+            cells = split_row(line)
+            if len(cells) != len(header):
+                continue
+            module = cells[columns["Module"]].strip("()")
+            for bus, ip in CROSSBAR_IPS.items():
+                if module == ip and bus not in results:
+                    results[bus] = {
+                        "LUT": int(parse_number(cells[columns["Total LUTs"]])),
+                        "FF": int(parse_number(cells[columns["FFs"]])),
+                        "BRAM": parse_number(cells[columns["RAMB36"]]) + parse_number(cells[columns["RAMB18"]]) / 2,
+                    }
+        return results
+
+    # Flat report of an out-of-context IP run, the IP name is in the file name
+    bus = next((bus for bus, ip in CROSSBAR_IPS.items() if os.path.basename(file_name).startswith(ip)), None)
+    if bus is None:
+        return results
+    site_types = {}
+    for line in lines:
+        if not line.startswith("|"):
+            continue
+        cells = split_row(line)
+        if len(cells) >= 2:
+            # Keep the first (summary) occurrence
+            site_types.setdefault(cells[0].rstrip("*").strip(), cells[1])
+    lut = site_types.get("Slice LUTs", site_types.get("CLB LUTs"))
+    ff = site_types.get("Slice Registers", site_types.get("CLB Registers"))
+    if lut is not None and ff is not None:
+        results[bus] = {
+            "LUT": int(parse_number(lut)),
+            "FF": int(parse_number(ff)),
+            "BRAM": parse_number(site_types.get("Block RAM Tile", "0")),
+        }
+    return results
+
+# Get the lines of a report_timing_summary section
+def get_section(lines : list, title : str) -> list:
+    for i, line in enumerate(lines):
+        if line.startswith(f"| {title}"):
+            section = []
+            for line in lines[i + 3:]:
+                if line.startswith("| "):
+                    break
+                section.append(line)
+            return section
+    return []
+
+# Parse a report_timing_summary file, returns {WNS_NS, TNS_NS, WHS_NS, CLOCKS: {name: {FREQUENCY_MHZ, PERIOD_NS, WNS_NS}}}
+def parse_timing_summary(file_name : str) -> dict:
+    with open(file_name, "r") as f:
+        lines = f.read().splitlines()
+    results = {"WNS_NS": None, "TNS_NS": None, "WHS_NS": None, "CLOCKS": {}}
+
+    # Design summary: header, dashes, values
+    section = [line for line in get_section(lines, "Design Timing Summary") if line.strip() != ""]
+    if len(section) >= 3:
+        values = section[2].split()
+        results["WNS_NS"], results["TNS_NS"], results["WHS_NS"] = parse_number(values[0]), parse_number(values[1]), parse_number(values[4])
+
+    # Clocks: name, waveform, period and frequency
+    for line in get_section(lines, "Clock Summary"):
+        match = re.match(r"\s*(\S+)\s+\{.*\}\s+([0-9.]+)\s+([0-9.]+)", line)
+        if match is not None:
+            results["CLOCKS"][match.group(1)] = {
+                "PERIOD_NS": float(match.group(2)),
+                "FREQUENCY_MHZ": float(match.group(3)),
+                "WNS_NS": None,
+            }
+
+    # Intra-clock WNS, the clocks without timed paths only report the pulse width (4 values)
+    for line in get_section(lines, "Intra Clock Table"):
+        values = line.split()
+        if len(values) >= 9 and values[0] in results["CLOCKS"]:
+            results["CLOCKS"][values[0]]["WNS_NS"] = parse_number(values[1])
+    return results
+
+# Get the timed clock of a clock domain (MHz) with the worst slack, returns (name, clock)
+def get_clock(timing : dict, clock_domain : int) -> tuple:
+    clocks = [(name, clock) for name, clock in timing["CLOCKS"].items()
+              if round(clock["FREQUENCY_MHZ"]) == clock_domain and clock["WNS_NS"] is not None]
+    if clocks == []:
+        return None, None
+    return min(clocks, key=lambda c: c[1]["WNS_NS"])
+
+# Find the reports in a directory, returns {stage: {"utilization": [files], "timing_summary": [files]}}
+def find_reports(reports_dir : str) -> dict:
+    reports = {}
+    for dir_path, _, file_names in os.walk(reports_dir):
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".rpt"):
+                continue
+            path = os.path.join(dir_path, file_name)
+            for kind in ["utilization", "timing_summary"]:
+                if kind in file_name:
+                    reports.setdefault(get_stage(path), {"utilization": [], "timing_summary": []})[kind].append(path)
+    return reports
+
+# Get the timing summary of a utilization report: the one of the same run (directory), otherwise the only one of the stage
+# (e.g. the design of a build), raises ValueError if ambiguous
+def get_timing_report(files : dict, report_file : str) -> str:
+    same_run = [f for f in files["timing_summary"] if os.path.dirname(f) == os.path.dirname(report_file)]
+    candidates = same_run if same_run != [] else files["timing_summary"]
+    if len(candidates) > 1:
+        raise ValueError(f"multiple timing summaries for {report_file}: {', '.join(candidates)}")
+    return candidates[0] if candidates != [] else None
+
+############
+# Database #
+############
+
+# Open the database, creating the tables, the indexes and the view if needed
+def open_database(file_name : str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
+    db = sqlite3.connect(file_name)
+    config_columns = ", ".join(f"{name} {sql_type}" for name, sql_type in CONFIG_COLUMNS.items())
+    feature_columns = ", ".join(f"{name} INTEGER" for name in estimate_crossbar.FEATURE_NAMES)
+    qor_columns = ", ".join(f"{name} {sql_type}" for name, sql_type in QOR_COLUMNS.items())
+    db.executescript(f"""
+        CREATE TABLE IF NOT EXISTS configs (CONFIG_HASH TEXT PRIMARY KEY, {config_columns}, {feature_columns}, CONFIG_JSON TEXT);
+        CREATE TABLE IF NOT EXISTS qor (
+            CONFIG_HASH TEXT REFERENCES configs(CONFIG_HASH), REPORT_HASH TEXT, REPORT_FILE TEXT, {qor_columns},
+            UNIQUE(REPORT_HASH, CONFIG_HASH)
+        );
+        CREATE INDEX IF NOT EXISTS qor_config_hash ON qor(CONFIG_HASH);
+        CREATE VIEW IF NOT EXISTS qor_view AS SELECT * FROM qor JOIN configs USING (CONFIG_HASH);
+    """)
+    for columns in INDEXED_COLUMNS:
+        db.execute(f"CREATE INDEX IF NOT EXISTS configs_{'_'.join(columns).lower()} ON configs({', '.join(columns)})")
+    return db
+
+# Insert a bus configuration, returns its hash
+def insert_config(db : sqlite3.Connection, configs : list, config : configuration.Configuration, sys_config : configuration.Configuration) -> str:
+    soc_config = os.getenv("SOC_CONFIG", "embedded")
+    config_hash = get_config_hash(config, soc_config)
+    row = {
+        "CONFIG_HASH": config_hash,
+        "BUS": config.CONFIG_NAME,
+        "SOC_CONFIG": soc_config,
+        "BOARD": os.getenv("BOARD", ""),
+        "CORE_SELECTOR": sys_config.CORE_SELECTOR,
+        "XLEN": sys_config.XLEN,
+        "PROTOCOL": config.PROTOCOL,
+        "NUM_SI": config.NUM_SI,
+        "NUM_MI": config.NUM_MI,
+        "ADDR_WIDTH": config.ADDR_WIDTH,
+        "DATA_WIDTH": config.DATA_WIDTH,
+        "ID_WIDTH": config.ID_WIDTH,
+        "ADDR_RANGES": int(config.ADDR_RANGES),
+        "CONNECTIVITY_MODE": get_connectivity_mode(config),
+        "STRATEGY": config.STRATEGY,
+        "R_REGISTER": config.R_REGISTER,
+        "CLOCK_MHZ": get_bus_clock_domain(configs, config),
+        **estimate_crossbar.get_features(config),
+        "CONFIG_JSON": json.dumps(vars(config), sort_keys=True, default=str),
+    }
+    db.execute(f"INSERT OR IGNORE INTO configs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", list(row.values()))
+    return config_hash
+
+# Insert the results of a report, for a bus configuration
+def insert_qor(db : sqlite3.Connection, config_hash : str, report_file : str, results : dict) -> bool:
+    with open(report_file, "rb") as f:
+        report_hash = hashlib.sha256(f.read()).hexdigest()
+    row = {"CONFIG_HASH": config_hash, "REPORT_HASH": report_hash, "REPORT_FILE": os.path.abspath(report_file), **results}
+    cursor = db.execute(f"INSERT OR IGNORE INTO qor ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", list(row.values()))
+    return cursor.rowcount == 1
+
+# Ingest the reports of a build, for the bus configurations that produced it
+def ingest(db : sqlite3.Connection, configs : list, reports_dir : str) -> int:
+    sys_config = next((c for c in configs if c.CONFIG_NAME == "SYS"), configuration.Configuration())
+    bus_configs = {c.CONFIG_NAME: c for c in configs if c.CONFIG_NAME in CROSSBAR_IPS and c.PROTOCOL != "DISABLE"}
+
+    # Pair each utilization report with its timing summary, before ingesting anything
+    reports = []
+    for stage, files in sorted(find_reports(reports_dir).items()):
+        for report_file in files["utilization"]:
+            reports.append((stage, report_file, get_timing_report(files, report_file)))
+
+    config_hashes = {bus: insert_config(db, configs, config, sys_config) for bus, config in bus_configs.items()}
+
+    num_rows = 0
+    timings = {}
+    for stage, report_file, timing_file in reports:
+        # Timing of the run, parsed once
+        if timing_file is not None and timing_file not in timings:
+            timings[timing_file] = parse_timing_summary(timing_file)
+        timing = timings.get(timing_file)
+        for bus, utilization in parse_utilization(report_file).items():
+            if bus not in bus_configs:
+                print_warning(f"{bus} found in {report_file}, but not in the configuration, skipping")
+                continue
+            results = {"STAGE": stage, **utilization}
+            if timing is not None:
+                clock_name, clock = get_clock(timing, get_bus_clock_domain(configs, bus_configs[bus]))
+                results.update(WNS_NS=timing["WNS_NS"], TNS_NS=timing["TNS_NS"], WHS_NS=timing["WHS_NS"], CLOCK_NAME=clock_name)
+                if clock is not None:
+                    results.update(CLOCK_WNS_NS=clock["WNS_NS"], FMAX_MHZ=round(1000 / (clock["PERIOD_NS"] - clock["WNS_NS"]), 1))
+            if insert_qor(db, config_hashes[bus], report_file, results):
+                print_info(f"{bus} ({stage}): {utilization['LUT']} LUT, {utilization['FF']} FF, {utilization['BRAM']} BRAM, WNS {results.get('CLOCK_WNS_NS')} ns")
+                num_rows += 1
+    db.commit()
+    return num_rows
+
+# Run a query and return the rows as CSV lines
+def query(db : sqlite3.Connection, sql : str) -> list:
+    cursor = db.execute(sql)
+    lines = [",".join(column[0] for column in cursor.description)] if cursor.description is not None else []
+    for row in cursor:
+        lines.append(",".join("" if value is None else str(value) for value in row))
+    return lines
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[2] not in ["ingest", "query"]:
+        print("Usage: <DATABASE_FILE> ingest <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <REPORTS_DIR>")
+        print("       <DATABASE_FILE> query <SQL>")
+        sys.exit(1)
+
+    database_file = sys.argv[1]
+    command = sys.argv[2]
+    db = open_database(database_file)
+
+    if command == "ingest":
+        reports_dir = sys.argv[-1]
+        if not os.path.isdir(reports_dir):
+            print_error(f"Reports directory {reports_dir} not found")
+            sys.exit(1)
+        configs = read_config(sys.argv[3:-1])
+        core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+        for config in configs:
+            config = infer_connectivity.infer_connectivity(config, core_selector)
+        coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), os.getenv("SOC_CONFIG", "embedded"))
+        configs = select_crossbar_strategy.select_crossbar_strategies(configs, coefficients)
+        try:
+            num_rows = ingest(db, configs, reports_dir)
+        except ValueError as e:
+            print_error(f"Ambiguous reports in {reports_dir}: {e}")
+            sys.exit(1)
+        print_info(f"Ingested {num_rows} new results from {reports_dir}")
+        print(f"[CONFIG] Output file is at {database_file}")
+    else:
+        try:
+            print("\n".join(query(db, sys.argv[3])))
+        except sqlite3.Error as e:
+            print_error(f"Invalid query: {e}")
+            sys.exit(1)
@@ -0,0 +1,243 @@
+# Author: agent <agent@local>
+# Description:
+#   Validate the whole configuration matrix in parallel, i.e. each combination of (the boards of each SoC from settings.sh):
+#       SOC_CONFIG x BOARD x CORE_SELECTOR (SUPPORTED_CORES) x XLEN
+#   The flow is split in two phases, both running on a process pool:
+#       1) check: each cell runs the check_config checks (intra, inter and connectivity) in-process, on a copy of the models.
+#          The CSVs are parsed once per SOC_CONFIG and BOARD (overlay, see property_store.py), and only the SYS model
+#          (CORE_SELECTOR, XLEN) changes between cells.
+#          Cells rejected by the checks (e.g. MicroBlaze-V on au280, XLEN not matching the core as in rv_socket.sv) are reported as INVALID.
+#       2) generate: each valid cell runs the full config flow (make), out-of-tree in its own OUTPUT_ROOT (see the Makefile).
+#          The cell is a system overlay (CORE_SELECTOR and XLEN only) on top of the configuration layers (see property_store.py).
+#          The generated files don't depend on BOARD (unless the board has an overlay), hence the cells differing only by BOARD
+#          share a single generation.
+#   Prints a pass/fail matrix with per-cell timings, and writes a machine-readable (JSON) summary.
+#   Exits with 1 if any valid cell fails the generation.
+# Args:
+#   1: Output JSON summary file
+#   2: Number of parallel jobs (optional, defaults to the number of CPUs)
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars, run make
+import os
+import subprocess
+# Additional bus configurations
+import glob
+# Parse the boards in settings.sh
+import re
+# Process pool
+import concurrent.futures
+# Copy the models, capture the check messages, measure timings
+import copy
+import io
+import contextlib
+import time
+# Machine-readable summary
+import json
+# Sub-scripts
+import configuration
+from utils import *
+import check_config
+import infer_connectivity
+
+# Assignments of SOC_CONFIG and BOARD in settings.sh
+SETTINGS_EXPORT_REGEX = re.compile(r"^\s*export (SOC_CONFIG|BOARD)=(\S+)", re.M)
+# XLEN values
+XLENS = [32, 64]
+# Config Makefile targets of the full flow
+GENERATE_TARGETS = ["all"]
+# Root of the per-cell output directories
+MATRIX_BUILD_DIR = f"{os.environ.get('CONFIG_ROOT')}/build/matrix"
+
+# Get the CSV configuration files of a SoC
+def get_config_file_names(soc_config : str) -> list:
+    config_root = os.environ.get("CONFIG_ROOT")
+    return [
+        f"{config_root}/configs/common/config_system.csv",
+        f"{config_root}/configs/{soc_config}/config_main_bus.csv",
+        f"{config_root}/configs/{soc_config}/config_peripheral_bus.csv",
+        f"{config_root}/configs/{soc_config}/config_highperformance_bus.csv",
+    ] + sorted(glob.glob(f"{config_root}/configs/{soc_config}/config_*_bus_*.csv"))
+
+# Get the boards of each SoC from settings.sh, i.e. each BOARD exported after its SOC_CONFIG,
+# keeping the boards with a constraints file (BOARD is the name of the .xdc, see settings.sh)
+def get_boards() -> dict:
+    with open(f"{ROOT_DIR}/settings.sh", "r") as f:
+        settings = f.read()
+    boards = {}
+    soc_config = None
+    for name, value in SETTINGS_EXPORT_REGEX.findall(settings):
+        if name == "SOC_CONFIG":
+            soc_config = value
+            boards.setdefault(soc_config, [])
+        elif soc_config is not None and value not in boards[soc_config] \
+                and os.path.isfile(f"{os.environ.get('XILINX_ROOT')}/synth/constraints/{value}.xdc"):
+            boards[soc_config].append(value)
+    return boards
+
+# Enumerate the cells of the matrix
+def get_cells() -> list:
+    cells = []
+    for soc_config, boards in get_boards().items():
+        for board in boards:
+            for core in configuration.Configuration().SUPPORTED_CORES:
+                for xlen in XLENS:
+                    cells.append(
+                        {
+                            "id": f"{soc_config}_{board}_{core}_rv{xlen}",
+                            "soc_config": soc_config,
+                            "board": board,
+                            "core": core,
+                            "xlen": xlen,
+                        }
+                    )
+    return cells
+
+# Get the overlay directories of a cell, as CONFIG_OVERLAY_DIRS in the Makefile
+def get_overlay_dirs(cell : dict) -> list:
+    config_root = os.environ.get("CONFIG_ROOT")
+    return [f"{config_root}/configs/boards/{cell['board']}", f"{config_root}/configs/local"]
+
+# The models parsed from the CSVs, once per SOC_CONFIG, BOARD (overlay) and process
+models_cache = {}
+
+# Get a private copy of the models of a cell
+def get_cell_models(cell : dict) -> list:
+    os.environ["CONFIG_OVERLAY_DIRS"] = " ".join(get_overlay_dirs(cell))
+    key = (cell["soc_config"], cell["board"])
+    if key not in models_cache:
+        models_cache[key] = read_config(get_config_file_names(cell["soc_config"]))
+    configs = copy.deepcopy(models_cache[key])
+    for config in configs:
+        if config.CONFIG_NAME == "SYS":
+            config.CORE_SELECTOR = cell["core"]
+            config.XLEN = cell["xlen"]
+    return configs
+
+# Run the check_config checks on a cell, returns (valid, messages)
+def run_checks(cell : dict) -> tuple:
+    # The checks read BOARD and SOC_CONFIG
+    os.environ["BOARD"] = cell["board"]
+    os.environ["SOC_CONFIG"] = cell["soc_config"]
+    check_config.SOC_CONFIG = cell["soc_config"]
+
+    messages = io.StringIO()
+    with contextlib.redirect_stdout(messages):
+        try:
+            configs = get_cell_models(cell)
+            for config in configs:
+                config = infer_connectivity.infer_connectivity(config, cell["core"])
+            config_file_names = get_config_file_names(cell["soc_config"])
+            valid = all(check_config.check_intra_config(config, name) for config, name in zip(configs, config_file_names)) \
+                    and check_config.check_inter_config(configs) \
+                    and check_config.check_connectivity(configs)
+        # The parsers exit on invalid values
+        except SystemExit:
+            valid = False
+    return valid, messages.getvalue()
+
+# Check a cell (worker)
+def check_cell(cell : dict) -> dict:
+    start = time.perf_counter()
+    valid, messages = run_checks(cell)
+    errors = [line for line in messages.splitlines() if PRINT_ERROR_PREFIX in line]
+    return {
+        "valid": valid,
+        "check_time": time.perf_counter() - start,
+        "errors": errors,
+    }
+
+# Key of the generated files of a cell, the cells with the same key share the generation
+# The generated files don't depend on BOARD, unless the board has an overlay
+def get_generate_key(cell : dict) -> str:
+    if os.path.isdir(get_overlay_dirs(cell)[0]):
+        return f"{cell['soc_config']}_{cell['board']}_{cell['core']}_rv{cell['xlen']}"
+    return f"{cell['soc_config']}_{cell['core']}_rv{cell['xlen']}"
+
+# Run the full config flow for a cell, out-of-tree (worker)
+def generate_cell(cell : dict) -> dict:
+    start = time.perf_counter()
+    output_root = f"{MATRIX_BUILD_DIR}/{get_generate_key(cell)}"
+
+    # System overlay of the cell, only the properties changing between the cells (see property_store.py)
+    overlay_dir = f"{output_root}/config/overlay"
+    os.makedirs(overlay_dir, exist_ok=True)
+    write_file_atomic(f"{overlay_dir}/config_system.csv", f"Property,Value\nCORE_SELECTOR,{cell['core']}\nXLEN,{cell['xlen']}\n")
+
+    # Drop the variables of a parent make (e.g. make config_matrix), as each cell is an independent build
+    env = {k: v for k, v in os.environ.items() if k not in ["MAKEFLAGS", "MFLAGS", "MAKELEVEL", "OUTPUT_ROOT", "OUTPUT_MANIFEST_FILE"]}
+    env.update(SOC_CONFIG=cell["soc_config"], BOARD=cell["board"], CONFIG_OVERLAY_DIRS=" ".join(get_overlay_dirs(cell) + [overlay_dir]))
+    result = subprocess.run(
+        ["make", "-C", os.environ.get("CONFIG_ROOT"), *GENERATE_TARGETS,
+            f"PYTHON={sys.executable}",
+            f"OUTPUT_ROOT={output_root}"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    write_file_atomic(f"{output_root}/config.log", result.stdout)
+    return {
+        "passed": result.returncode == 0,
+        "generate_time": time.perf_counter() - start,
+        "output_root": output_root,
+    }
+
+# Render the matrix as a human-readable report
+def render_report(cells : list) -> str:
+    lines = []
+    width = max(len(cell["id"]) for cell in cells)
+    for cell in cells:
+        timing = f"check {cell['check_time'] * 1000:7.1f}ms"
+        if "generate_time" in cell:
+            shared = "" if cell["generate_owner"] else " (shared)"
+            timing += f", generate {cell['generate_time']:6.2f}s{shared}"
+        lines.append(f"{cell['id']:<{width}} {cell['status']:<7} {timing}")
+        for error in cell["errors"]:
+            lines.append(f"    {error}")
+    statuses = [cell["status"] for cell in cells]
+    lines.append(f"Cells: {len(cells)}, PASS: {statuses.count('PASS')}, INVALID: {statuses.count('INVALID')}, FAIL: {statuses.count('FAIL')}")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: <OUTPUT_JSON_FILE> [<JOBS>]")
+        sys.exit(1)
+
+    output_json_file = sys.argv[1]
+    jobs = int(sys.argv[2]) if len(sys.argv) >= 3 else os.cpu_count()
+
+    cells = get_cells()
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        # 1) Check
+        for cell, result in zip(cells, pool.map(check_cell, cells)):
+            cell.update(result)
+
+        # 2) Generate, once per key
+        owners = {}
+        for cell in cells:
+            if cell["valid"] and get_generate_key(cell) not in owners:
+                owners[get_generate_key(cell)] = cell
+        generated = dict(zip(owners, pool.map(generate_cell, owners.values())))
+
+    for cell in cells:
+        if not cell["valid"]:
+            cell["status"] = "INVALID"
+            continue
+        cell.update(generated[get_generate_key(cell)])
+        cell["generate_owner"] = owners[get_generate_key(cell)] is cell
+        cell["status"] = "PASS" if cell["passed"] else "FAIL"
+
+    print(render_report(cells))
+    print_info(f"Configuration matrix done in {time.perf_counter() - start:.2f}s")
+
+    write_output_file(output_json_file, json.dumps(cells, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
+
+    if any(cell["status"] == "FAIL" for cell in cells):
+        sys.exit(1)
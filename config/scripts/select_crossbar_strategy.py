@@ -0,0 +1,128 @@
+# Author: agent <agent@local>
+# Description:
+#   Select the STRATEGY, the R_REGISTER (and hence the CONNECTIVITY_MODE) of a crossbar with STRATEGY,AUTO and/or R_REGISTER,AUTO.
+#   Each candidate implementation is estimated (see estimate_crossbar.py), and the selection:
+#       1) keeps the candidates whose estimated Fmax reaches the bus clock (see utils.get_bus_clock_domain) with TIMING_MARGIN,
+#          and which fit the LUT_BUDGET/FF_BUDGET of the bus (if any)
+#       2) prefers SAMD (STRATEGY 2, parallel paths) for the AXI4 buses with multiple masters, SASD (STRATEGY 1, shared datapath)
+#          otherwise, as a single master or an AXI4-Lite bus gains nothing from the parallel paths
+#       3) prefers no read register slice (R_REGISTER 0), as the slice adds a cycle to each read, unless timing requires it
+#   If the candidates reaching the bus clock exceed the budgets, the smallest of them is selected.
+#   If no candidate reaches the bus clock, the fastest one is selected and the ports on the widest muxes are listed in
+#   REGISTER_SLICES, to be cut with an external register slice (the crossbar IP has no per-port register slices).
+#   Without calibrated estimates (see estimate_crossbar.py), the timing and the budgets are not checked: the selection
+#   falls back to 2) and 3) only, with a warning.
+#   Each decision is recorded in STRATEGY_RATIONALE.
+
+####################
+# Import libraries #
+####################
+# Copy the configurations
+import copy
+# Sub-scripts
+import configuration
+import estimate_crossbar
+from utils import *
+
+# Constants
+
+# Fraction of the bus clock to keep as timing margin on the estimated Fmax
+TIMING_MARGIN = 0.1
+# Implementation of each STRATEGY, as in parse_CONNECTIVITY_MODE (0 follows CONNECTIVITY_MODE, unless R_REGISTER forces SASD)
+STRATEGY_NAMES = {
+    0 : "custom",
+    1 : "minimize area",
+    2 : "maximize performance",
+}
+
+# Get the candidate (STRATEGY, R_REGISTER) pairs of a configuration, the non-AUTO values are kept
+def get_candidates(config : configuration.Configuration) -> list:
+    strategies = [1, 2] if config.STRATEGY_AUTO else [config.STRATEGY]
+    r_registers = [0, 1] if config.R_REGISTER_AUTO else [config.R_REGISTER]
+    # STRATEGY 2 forces R_REGISTER 0 (see parse_R_REGISTER)
+    return [(strategy, r_register) for strategy in strategies for r_register in r_registers if not (strategy == 2 and r_register == 1)]
+
+# Get a copy of the configuration with a candidate STRATEGY and R_REGISTER
+def apply_candidate(config : configuration.Configuration, strategy : int, r_register : int) -> configuration.Configuration:
+    candidate = copy.copy(config)
+    candidate.STRATEGY = strategy
+    candidate.R_REGISTER = r_register
+    if strategy == 1 or r_register == 1:
+        candidate.CONNECTIVITY_MODE = "SASD"
+    elif strategy == 2:
+        candidate.CONNECTIVITY_MODE = "SAMD"
+    return candidate
+
+# Get the ports on the widest muxes (SIs on the R/B muxes, MIs on the AR/AW/W muxes) of a configuration
+def get_register_slices(config : configuration.Configuration) -> list:
+    si_fan_ins = estimate_crossbar.get_fan_ins(config, config.READ_CONNECTIVITY, per_si=True)
+    mi_fan_ins = estimate_crossbar.get_fan_ins(config, config.WRITE_CONNECTIVITY, per_si=False)
+    ports = [f"S{i:02d} ({name})" for i, name in enumerate(config.MASTER_NAMES) if si_fan_ins[i] == max(si_fan_ins)]
+    ports += [f"M{i:02d} ({name})" for i, name in enumerate(config.RANGE_NAMES) if mi_fan_ins[i] == max(mi_fan_ins)]
+    return ports
+
+# Select the STRATEGY and R_REGISTER of a configuration for its bus clock (MHz), recording the rationale
+def select_crossbar_strategy(config : configuration.Configuration, clock_domain : int, coefficients : dict) -> configuration.Configuration:
+    # Nothing to select
+    if not (config.STRATEGY_AUTO or config.R_REGISTER_AUTO) or config.PROTOCOL == "DISABLE":
+        return config
+
+    required_mhz = clock_domain * (1 + TIMING_MARGIN)
+    multi_master = config.NUM_SI > 1 and config.PROTOCOL != "AXI4LITE"
+    candidates = [apply_candidate(config, strategy, r_register) for strategy, r_register in get_candidates(config)]
+    estimates = [(candidate, estimate_crossbar.estimate_crossbar(candidate, coefficients)) for candidate in candidates]
+
+    def meets_timing(estimate : dict) -> bool:
+        return estimate["FMAX_MHZ"] >= required_mhz
+
+    def fits(estimate : dict) -> bool:
+        return meets_timing(estimate) \
+            and (config.LUT_BUDGET == 0 or estimate["LUT"] <= config.LUT_BUDGET) \
+            and (config.FF_BUDGET == 0 or estimate["FF"] <= config.FF_BUDGET)
+
+    # Preferred mode first, then no register slice
+    preferred_mode = "SAMD" if multi_master else "SASD"
+    def preference(candidate : configuration.Configuration) -> tuple:
+        return (candidate.CONNECTIVITY_MODE != preferred_mode, candidate.R_REGISTER)
+
+    valid = sorted([e for e in estimates if fits(e[1])], key=lambda e: preference(e[0]))
+    rationale = []
+    if multi_master:
+        rationale.append(f"{config.NUM_SI} masters on a {config.DATA_WIDTH}-bit {config.PROTOCOL} bus: {preferred_mode} preferred for parallel paths")
+    else:
+        rationale.append(f"{'single master' if config.NUM_SI == 1 else config.PROTOCOL} bus: {preferred_mode} preferred, parallel paths would not be used")
+
+    if not coefficients["CALIBRATED"]:
+        # The default coefficients would select on made-up numbers: the preferred candidate, timing and budgets unchecked
+        selected = min(candidates, key=preference)
+        config.REGISTER_SLICES = []
+        rationale.append(f"{estimate_crossbar.UNCALIBRATED_NOTE}: timing ({round(required_mhz)} MHz) and budgets not checked")
+        print_warning(f"{config.CONFIG_NAME}: STRATEGY/R_REGISTER AUTO without calibrated estimates, the bus clock and the budgets are not checked")
+    elif valid != []:
+        selected, estimate = valid[0]
+        config.REGISTER_SLICES = []
+        rationale.append(f"Fmax ~{estimate['FMAX_MHZ']} MHz >= {round(required_mhz)} MHz ({clock_domain} MHz + {round(TIMING_MARGIN * 100)}% margin), ~{estimate['LUT']} LUT, ~{estimate['FF']} FF")
+        if selected.R_REGISTER == 1:
+            rationale.append("R_REGISTER 1: without the read register slice the estimated Fmax misses the clock")
+    elif any(meets_timing(e[1]) for e in estimates):
+        # Timing closes, but over budget: the smallest candidate
+        selected, estimate = min([e for e in estimates if meets_timing(e[1])], key=lambda e: (e[1]["LUT"], e[1]["FF"]))
+        config.REGISTER_SLICES = []
+        rationale.append(f"no candidate fits LUT_BUDGET {config.LUT_BUDGET} / FF_BUDGET {config.FF_BUDGET}, smallest selected: ~{estimate['LUT']} LUT, ~{estimate['FF']} FF, Fmax ~{estimate['FMAX_MHZ']} MHz")
+    else:
+        # Nothing closes timing: the fastest candidate, and the ports to cut with a register slice
+        selected, estimate = max(estimates, key=lambda e: (e[1]["FMAX_MHZ"], -e[1]["LUT"]))
+        config.REGISTER_SLICES = get_register_slices(selected)
+        rationale.append(f"no candidate reaches {round(required_mhz)} MHz ({clock_domain} MHz + {round(TIMING_MARGIN * 100)}% margin), fastest selected: Fmax ~{estimate['FMAX_MHZ']} MHz")
+        rationale.append(f"register slices suggested on the widest muxes: {', '.join(config.REGISTER_SLICES)}")
+
+    rationale.insert(0, f"STRATEGY {selected.STRATEGY} ({STRATEGY_NAMES[selected.STRATEGY]}), R_REGISTER {selected.R_REGISTER}, CONNECTIVITY_MODE {selected.CONNECTIVITY_MODE}")
+    config.STRATEGY = selected.STRATEGY
+    config.R_REGISTER = selected.R_REGISTER
+    config.CONNECTIVITY_MODE = selected.CONNECTIVITY_MODE
+    config.STRATEGY_RATIONALE = rationale
+    return config
+
+# Select the STRATEGY and R_REGISTER of all the bus configurations, each in its bus clock
+def select_crossbar_strategies(configs : list, coefficients : dict) -> list:
+    return [c if c.CONFIG_NAME == "SYS" else select_crossbar_strategy(c, get_bus_clock_domain(configs, c), coefficients) for c in configs]
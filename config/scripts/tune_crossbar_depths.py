@@ -0,0 +1,331 @@
+# Author: agent <agent@local>
+# Description:
+#   Tune the outstanding transactions depths (SI_READ/WRITE_ACCEPTANCE, MI_READ/WRITE_ISSUING) and the CONNECTIVITY_MODE
+#   of each crossbar, maximizing the throughput of an analytic model within an area budget, and write them back to the bus CSVs.
+#   Throughput model, for each direction (read, write):
+#       - each master demands READ/WRITE transactions per cycle (MASTER_TRAFFIC_PROFILE, or MASTER_TRAFFIC_PROFILES by name),
+#         split among the slaves it is connected to, weighted by their traffic class (see utils.get_traffic_class)
+#       - each slave has a latency (SLAVE_LATENCIES by name, plus CDC_LATENCY_CYCLES if in another clock domain)
+#       - by Little's law, a master with ACCEPTANCE outstanding transactions sustains at most ACCEPTANCE / latency transactions
+#         per cycle (mean latency of its slaves), and a slave with ISSUING outstanding transactions at most ISSUING / latency
+#       - in SASD, the crossbar serves a single transaction at a time
+#   Search, for each CONNECTIVITY_MODE allowed by STRATEGY:
+#       greedy, starting from all the depths at 1, double the depth with the best throughput gain, as long as the estimated
+#       crossbar area (see estimate_crossbar.py) fits the budget: LUT_BUDGET/FF_BUDGET if set, otherwise the area of the
+#       current configuration (i.e. the crossbar doesn't grow).
+#   Hence the depths grow on the long-latency paths (e.g. DDR, HBUS) and shrink on the others.
+#   Prints a report with the expected gain of each bus, and writes a machine-readable (JSON) summary.
+# Args:
+#   1: Input configuration file for system
+#   2+: Input configuration files for buses (tuned in place)
+#   Last: Output JSON summary file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars
+import os
+# Machine-readable summary
+import json
+# Copy the configurations
+import copy
+# Sub-scripts
+import configuration
+import infer_connectivity
+import estimate_crossbar
+import select_crossbar_strategy
+import property_store
+from utils import *
+from check_config import MAIN_CLOCK_DOMAIN_SLAVES
+from analyze_clock_domains import CDC_LATENCY_CYCLES
+
+# Read and write demand (transactions per cycle) of each class of master, matched as prefix of MASTER_NAMES.
+# Masters not listed here (SYS_MASTER, DBG_MASTER, etc.) are occasional.
+MASTER_TRAFFIC_PROFILES = {
+    "RV_SOCKET_INSTR" : (0.5, 0.0),     # Instruction fetches
+    "RV_SOCKET_DATA"  : (0.2, 0.1),     # Loads and stores
+    "CDMA"            : (0.5, 0.5),     # Memory-to-memory bursts
+    "s_acc"           : (0.5, 0.5),     # Accelerators attached to the HBUS
+    "HBUS"            : (0.25, 0.25),   # HBUS loopback, the accelerators' traffic to the MBUS
+    "MBUS"            : (0.25, 0.25),   # MBUS to HBUS, the MBUS masters' traffic to the DDR
+    "PROT_CONV"       : (0.1, 0.1),     # PBUS, the MBUS masters' traffic to the peripherals
+}
+DEFAULT_TRAFFIC_PROFILE = (0.01, 0.01)
+
+# Round-trip latency (cycles) of each class of slave, matched as prefix of RANGE_NAMES
+SLAVE_LATENCIES = {
+    "BRAM"    : 2,
+    "DM_mem"  : 2,
+    "DDR4CH"  : 30,
+    "HBM"     : 30,
+    "HBUS"    : 36,     # Loopback to the MBUS, or DDR behind the HBUS
+    "MBUS"    : 8,      # Loopback from the HBUS, mostly to the BRAM
+    "PBUS"    : 6,      # Protocol converter and peripheral crossbar
+}
+DEFAULT_SLAVE_LATENCY = 4
+
+# Weight of the traffic classes, to split the demand of a master among its slaves
+TRAFFIC_CLASS_WEIGHTS = {
+    "HIGH" : 4,
+    "LOW"  : 1,
+}
+
+# Searched depths
+MAX_DEPTH = 32
+DEPTH_PROPERTIES = ["SI_READ_ACCEPTANCE", "SI_WRITE_ACCEPTANCE", "MI_READ_ISSUING", "MI_WRITE_ISSUING"]
+
+#########
+# Model #
+#########
+
+# Get the value of a class of a name, matched as prefix
+def get_by_prefix(values : dict, name : str, default):
+    for prefix, value in values.items():
+        if name.startswith(prefix):
+            return value
+    return default
+
+# Get the (read, write) demand of a master
+def get_traffic_profile(config : configuration.Configuration, master_name : str) -> tuple:
+    if master_name in config.MASTER_TRAFFIC_PROFILE:
+        return config.MASTER_TRAFFIC_PROFILE[master_name]
+    return get_by_prefix(MASTER_TRAFFIC_PROFILES, master_name, DEFAULT_TRAFFIC_PROFILE)
+
+# Get the latency (cycles) of each slave
+def get_latencies(config : configuration.Configuration) -> list:
+    latencies = []
+    for mi_index, name in enumerate(config.RANGE_NAMES):
+        latency = get_by_prefix(SLAVE_LATENCIES, name, DEFAULT_SLAVE_LATENCY)
+        # Clock converter, for the MBUS slaves only
+        if config.RANGE_CLOCK_DOMAINS != [] and name not in MAIN_CLOCK_DOMAIN_SLAVES \
+                and config.RANGE_CLOCK_DOMAINS[mi_index] != config.MAIN_CLOCK_DOMAIN:
+            latency += CDC_LATENCY_CYCLES
+        latencies.append(latency)
+    return latencies
+
+# Get the demand matrix [si][mi] of a direction (0 read, 1 write)
+def get_demands(config : configuration.Configuration, direction : int) -> list:
+    connectivity = config.READ_CONNECTIVITY if direction == 0 else config.WRITE_CONNECTIVITY
+    if connectivity == []:
+        connectivity = [1] * (config.NUM_MI * config.NUM_SI)
+    weights = [TRAFFIC_CLASS_WEIGHTS[get_traffic_class(config, mi)] for mi in range(config.NUM_MI)]
+
+    demands = []
+    for si, master_name in enumerate(config.MASTER_NAMES):
+        demand = get_traffic_profile(config, master_name)[direction]
+        connected = [weights[mi] * connectivity[config.NUM_SI * mi + si] for mi in range(config.NUM_MI)]
+        total = sum(connected)
+        demands.append([demand * w / total if total > 0 else 0 for w in connected])
+    return demands
+
+# Throughput (transactions per cycle) of each slave in a direction, with the given acceptance and issuing depths
+def get_direction_slave_throughputs(config : configuration.Configuration, demands : list, latencies : list,
+                                    acceptance : list, issuing : list, shared : bool) -> list:
+    total_demand = sum(sum(row) for row in demands)
+    if total_demand == 0:
+        return [0] * config.NUM_MI
+
+    # SASD: a single transaction at a time, at the mean latency, split as the demand
+    if shared:
+        mean_latency = sum(d * latencies[mi] for row in demands for mi, d in enumerate(row)) / total_demand
+        throughput = min(total_demand, 1 / mean_latency)
+        return [throughput * sum(row[mi] for row in demands) / total_demand for mi in range(config.NUM_MI)]
+
+    # Masters limit
+    served = []
+    for si, row in enumerate(demands):
+        demand = sum(row)
+        scale = 1
+        if demand > 0:
+            mean_latency = sum(d * latencies[mi] for mi, d in enumerate(row)) / demand
+            scale = min(1, acceptance[si] / mean_latency / demand)
+        served.append([d * scale for d in row])
+    # Slaves limit, at most one transaction per cycle
+    return [min(sum(row[mi] for row in served), 1, issuing[mi] / latencies[mi]) for mi in range(config.NUM_MI)]
+
+# Throughput (transactions per cycle) of a direction, with the given acceptance and issuing depths
+def get_direction_throughput(config : configuration.Configuration, demands : list, latencies : list,
+                             acceptance : list, issuing : list, shared : bool) -> float:
+    return sum(get_direction_slave_throughputs(config, demands, latencies, acceptance, issuing, shared))
+
+# Throughput (read + write) of each slave of a configuration
+def get_slave_throughputs(config : configuration.Configuration) -> list:
+    latencies = get_latencies(config)
+    shared = estimate_crossbar.is_shared_datapath(config)
+    throughputs = [0] * config.NUM_MI
+    for direction, acceptance, issuing in [
+        (0, config.SI_READ_ACCEPTANCE, config.MI_READ_ISSUING),
+        (1, config.SI_WRITE_ACCEPTANCE, config.MI_WRITE_ISSUING),
+    ]:
+        acceptance = estimate_crossbar.get_depths(acceptance, config.NUM_SI, estimate_crossbar.DEFAULT_ACCEPTANCE)
+        issuing = estimate_crossbar.get_depths(issuing, config.NUM_MI, estimate_crossbar.DEFAULT_ISSUING)
+        direction_throughputs = get_direction_slave_throughputs(config, get_demands(config, direction), latencies, acceptance, issuing, shared)
+        throughputs = [t + d for t, d in zip(throughputs, direction_throughputs)]
+    return throughputs
+
+# Throughput (read + write) of a configuration
+def get_throughput(config : configuration.Configuration) -> float:
+    latencies = get_latencies(config)
+    shared = estimate_crossbar.is_shared_datapath(config)
+    throughput = 0
+    for direction, acceptance, issuing in [
+        (0, config.SI_READ_ACCEPTANCE, config.MI_READ_ISSUING),
+        (1, config.SI_WRITE_ACCEPTANCE, config.MI_WRITE_ISSUING),
+    ]:
+        acceptance = estimate_crossbar.get_depths(acceptance, config.NUM_SI, estimate_crossbar.DEFAULT_ACCEPTANCE)
+        issuing = estimate_crossbar.get_depths(issuing, config.NUM_MI, estimate_crossbar.DEFAULT_ISSUING)
+        throughput += get_direction_throughput(config, get_demands(config, direction), latencies, acceptance, issuing, shared)
+    return throughput
+
+##########
+# Search #
+##########
+
+# Get the depth properties that can be tuned, i.e. not forced by the CONNECTIVITY_MODE or the PROTOCOL
+def get_tunable_properties(config : configuration.Configuration) -> list:
+    properties = []
+    if not estimate_crossbar.is_shared_datapath(config):
+        properties += ["SI_READ_ACCEPTANCE", "SI_WRITE_ACCEPTANCE"]
+    if config.PROTOCOL not in ["AXI3", "AXI4LITE"]:
+        properties += ["MI_READ_ISSUING", "MI_WRITE_ISSUING"]
+    return properties
+
+# Check if the estimated area of a configuration fits the budget
+def fits_budget(config : configuration.Configuration, coefficients : dict, budget : dict) -> bool:
+    estimate = estimate_crossbar.estimate_crossbar(config, coefficients)
+    return estimate["LUT"] <= budget["LUT"] and estimate["FF"] <= budget["FF"]
+
+# Greedy search of the depths of a configuration, for its CONNECTIVITY_MODE
+def search_depths(config : configuration.Configuration, coefficients : dict, budget : dict) -> configuration.Configuration:
+    config = copy.deepcopy(config)
+    properties = get_tunable_properties(config)
+    for property_name in DEPTH_PROPERTIES:
+        num = config.NUM_SI if property_name.startswith("SI") else config.NUM_MI
+        setattr(config, property_name, [1] * num)
+    if not fits_budget(config, coefficients, budget):
+        return None
+
+    throughput = get_throughput(config)
+    while True:
+        best = None
+        for property_name in properties:
+            depths = getattr(config, property_name)
+            for i in range(len(depths)):
+                if depths[i] >= MAX_DEPTH:
+                    continue
+                depths[i] *= 2
+                candidate_throughput = get_throughput(config)
+                if candidate_throughput > throughput + 1e-9 and fits_budget(config, coefficients, budget) \
+                        and (best is None or candidate_throughput > best[2]):
+                    best = (property_name, i, candidate_throughput)
+                depths[i] //= 2
+        if best is None:
+            return config
+        getattr(config, best[0])[best[1]] *= 2
+        throughput = best[2]
+
+# Tune a bus configuration, returns (tuned configuration, summary)
+def tune_config(config : configuration.Configuration, coefficients : dict) -> tuple:
+    current = estimate_crossbar.estimate_crossbar(config, coefficients)
+    budget = {
+        "LUT": config.LUT_BUDGET if config.LUT_BUDGET != 0 else current["LUT"],
+        "FF": config.FF_BUDGET if config.FF_BUDGET != 0 else current["FF"],
+    }
+
+    # The CONNECTIVITY_MODE is forced by STRATEGY and R_REGISTER (see parse_CONNECTIVITY_MODE)
+    modes = ["SAMD", "SASD"] if config.STRATEGY == 0 and config.R_REGISTER == 0 else [config.CONNECTIVITY_MODE]
+    best = None
+    for mode in modes:
+        candidate = copy.deepcopy(config)
+        candidate.CONNECTIVITY_MODE = mode
+        candidate = search_depths(candidate, coefficients, budget)
+        if candidate is None:
+            continue
+        key = (round(get_throughput(candidate), 6), -estimate_crossbar.estimate_crossbar(candidate, coefficients)["LUT"])
+        if best is None or key > best[0]:
+            best = (key, candidate)
+    # Nothing fits the budget, keep the current configuration
+    tuned = best[1] if best is not None else config
+
+    before = get_throughput(config)
+    after = get_throughput(tuned)
+    summary = {
+        "bus": config.CONFIG_NAME,
+        "budget": budget,
+        "before": {"CONNECTIVITY_MODE": config.CONNECTIVITY_MODE, "throughput": round(before, 4), **current},
+        "after": {"CONNECTIVITY_MODE": tuned.CONNECTIVITY_MODE, "throughput": round(after, 4),
+                  **estimate_crossbar.estimate_crossbar(tuned, coefficients)},
+        "gain_percent": round(100 * (after - before) / before, 1) if before > 0 else 0,
+        "calibrated": coefficients["CALIBRATED"],
+        "settings": {name: getattr(tuned, name) for name in ["CONNECTIVITY_MODE"] + get_tunable_properties(tuned)},
+    }
+    return tuned, summary
+
+##############
+# Write back #
+##############
+
+# Write the tuned settings back to a bus CSV, replacing the existing properties or appending the missing ones
+def write_back(config_file_name : str, settings : dict) -> bool:
+    # The properties set by an overlay shadow the written values (see property_store.py)
+    store = property_store.load_store(config_file_name)
+    for name in settings:
+        if store.is_overridden(name):
+            print_warning(f"{name} is set in {store.get_provenance(name)}, the value written to {config_file_name} is shadowed")
+    property_store.invalidate_store(config_file_name)
+
+    with open(config_file_name, "r") as f:
+        lines = f.read().splitlines()
+    values = {name: value if isinstance(value, str) else " ".join(str(v) for v in value) for name, value in settings.items()}
+    for i, line in enumerate(lines):
+        name = line.split(",", 1)[0]
+        if name in values:
+            lines[i] = f"{name},{values.pop(name)}"
+    # The CONNECTIVITY_MODE is appended before the depths, as the acceptance depends on it
+    for name, value in values.items():
+        lines.append(f"{name},{value}")
+    return write_file_atomic(config_file_name, "\n".join(lines) + "\n")
+
+# Render the summaries as a human-readable report
+def render_report(summaries : list) -> str:
+    lines = [f"Note: {estimate_crossbar.UNCALIBRATED_NOTE}"] if not all(s["calibrated"] for s in summaries) else []
+    for s in summaries:
+        before, after = s["before"], s["after"]
+        lines.append(f"{s['bus']}: budget {s['budget']['LUT']} LUT, {s['budget']['FF']} FF")
+        lines.append(f"  before: {before['CONNECTIVITY_MODE']}, {before['throughput']} transactions/cycle, ~{before['LUT']} LUT, ~{before['FF']} FF")
+        lines.append(f"  after:  {after['CONNECTIVITY_MODE']}, {after['throughput']} transactions/cycle, ~{after['LUT']} LUT, ~{after['FF']} FF ({s['gain_percent']:+}%)")
+        for name, value in s["settings"].items():
+            lines.append(f"    {name}: {value if isinstance(value, str) else ' '.join(str(v) for v in value)}")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    config_file_names = sys.argv[1:-1]
+    output_json_file = sys.argv[-1]
+    configs = read_config(config_file_names)
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), os.getenv("SOC_CONFIG", "embedded"))
+
+    core_selector = next((c.CORE_SELECTOR for c in configs if c.CONFIG_NAME == "SYS"), "")
+    configs = [infer_connectivity.infer_connectivity(c, core_selector) for c in configs]
+    configs = select_crossbar_strategy.select_crossbar_strategies(configs, coefficients)
+    summaries = []
+    for config, config_file_name in zip(configs, config_file_names):
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        tuned, summary = tune_config(config, coefficients)
+        summaries.append(summary)
+        if write_back(config_file_name, summary["settings"]):
+            print(f"[CONFIG] Updated {config_file_name}")
+
+    print(render_report(summaries))
+
+    write_output_file(output_json_file, json.dumps(summaries, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
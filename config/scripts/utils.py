@@ -5,12 +5,18 @@
 ####################
 # Import libraries #
 ####################
-# Manipulate CSV
-import pandas as pd
 # Sub-modules
 import configuration
 import parse_properties_wrapper
-import csv
+import allocate_thread_ids
+import property_store
+# Atomic writes
+import os
+import fcntl
+import tempfile
+import contextlib
+# Outputs manifest
+import hashlib
 
 # Name of buses
 CONFIG_NAMES = {
@@ -20,6 +26,17 @@ CONFIG_NAMES = {
     "config_system.csv"              : "SYS"
 }
 
+# Get the name of a bus (or system) from its configuration file name, e.g. config_main_bus.csv -> MBUS
+# Additional buses of the same kind are numbered, e.g. config_peripheral_bus_1.csv -> PBUS1
+def get_config_name(file_name : str) -> str:
+    end_name = os.path.basename(file_name)
+    if end_name in CONFIG_NAMES:
+        return CONFIG_NAMES[end_name]
+    base_name, _, index = end_name.removesuffix(".csv").rpartition("_")
+    if f"{base_name}.csv" not in CONFIG_NAMES or not index.isdigit():
+        raise KeyError(f"Unknown configuration file {end_name}")
+    return f"{CONFIG_NAMES[f'{base_name}.csv']}{index}"
+
 ###############
 # Read config #
 ###############
@@ -30,21 +47,53 @@ def read_config(config_file_names : list) -> list:
         # Create a configuration object for each bus
         config = configuration.Configuration()
 
-        # Naming the actual bus
-        end_name = name.split("/")[-1]
-        # Parse name first
-        config.CONFIG_NAME = CONFIG_NAMES[end_name]
+        # Naming the actual bus, parse name first
+        config.CONFIG_NAME = get_config_name(name)
 
-        # Reading the CSV
-        for index, row in pd.read_csv(name, sep=",").iterrows():
+        # Reading the CSV, with its layers (see property_store.py)
+        for property_name, value in property_store.load_store(name).parse_items():
             # Update the config
-	        config = parse_properties_wrapper.parse_property(config, row["Property"], row["Value"])
+            config = parse_properties_wrapper.parse_property(config, property_name, value)
 
         # Append the config to the list
         configs.append(config)
 
-    return configs
+    # Partition the ID space among the slave interfaces, the bus-to-bus ones from the other buses
+    return allocate_thread_ids.allocate_bus_thread_ids(configs)
+
+
+
+###################
+# Traffic classes #
+###################
+
+# Slaves with high traffic by default: memories and buses leading to memories
+HIGH_TRAFFIC_PREFIXES = ["BRAM", "DDR4CH", "HBM", "HBUS"]
+
+# Get the traffic class (HIGH, LOW) of a slave, declared in RANGE_TRAFFIC_CLASSES or derived from its name
+def get_traffic_class(config : configuration.Configuration, mi_index : int) -> str:
+    if config.RANGE_TRAFFIC_CLASSES != []:
+        return config.RANGE_TRAFFIC_CLASSES[mi_index]
+    if any(config.RANGE_NAMES[mi_index].startswith(prefix) for prefix in HIGH_TRAFFIC_PREFIXES):
+        return "HIGH"
+    return "LOW"
+
+
+#################
+# Clock domains #
+#################
 
+# The DDR clock must have the same frequency of the DDR board clock
+DDR_FREQUENCY = 300
+
+# Get the clock frequency (MHz) of a bus
+def get_bus_clock_domain(configs : list, config : configuration.Configuration) -> int:
+    if config.CONFIG_NAME == "HBUS":
+        return DDR_FREQUENCY
+    mbus_config = next((c for c in configs if c.CONFIG_NAME == "MBUS"), None)
+    if config.CONFIG_NAME != "MBUS" and mbus_config is not None and config.CONFIG_NAME in mbus_config.RANGE_NAMES:
+        return mbus_config.RANGE_CLOCK_DOMAINS[mbus_config.RANGE_NAMES.index(config.CONFIG_NAME)]
+    return mbus_config.MAIN_CLOCK_DOMAIN if mbus_config is not None else config.MAIN_CLOCK_DOMAIN
 
 
 ############
@@ -73,8 +122,212 @@ def print_error(txt : str) -> None:
 # CSV Utils #
 #############
 
-# Retrieves the value of a property by the CSV Reader
-# @reader: a CSV reader object
+# Retrieves the value of a property of a CSV configuration, with its layers (see property_store.py)
+# @file_name: the CSV configuration file
 # @property_name: the name of a the property to retrieve
-def get_value_by_property(reader, property_name: str) -> str:
-    return next(value for property, value in reader if property == property_name)
+# @default: value returned if the property is missing (optional properties only)
+def get_value_by_property(file_name: str, property_name: str, default: str = None) -> str:
+    return property_store.load_store(file_name).get(property_name, default)
+
+
+##################
+# Address ranges #
+##################
+
+# Base address of unused address ranges (Xilinx AXI crossbar convention)
+UNUSED_BASE_ADDR = 0xffffffffffffffff
+
+# Compose the name of a single address range of a slave:
+# the first range keeps the slave name (e.g. DDR4CH0), the others are suffixed with the range index (e.g. DDR4CH0_A01)
+# @name: the slave name (from RANGE_NAMES)
+# @range_index: index of the range for this slave (0..ADDR_RANGES-1)
+def get_range_name(name: str, range_index: int) -> str:
+    if range_index == 0:
+        return name
+    return f"{name}_A{range_index:02d}"
+
+# Expand the per-slave lists in a list of address ranges, skipping unused ranges (0 width or UNUSED_BASE_ADDR)
+# @names: RANGE_NAMES, one per slave
+# @base_addrs: RANGE_BASE_ADDR, ADDR_RANGES hex strings per slave
+# @addr_widths: RANGE_ADDR_WIDTH, ADDR_RANGES values per slave
+# @addr_ranges: number of address ranges for each slave
+# Each range is defined as follows
+# {
+#   "device": slave name,
+#   "name": range name (see get_range_name),
+#   "mi_index": index of the slave,
+#   "range_index": index of the range for this slave,
+#   "base": base address,
+#   "width": address width,
+#   "end": last address of the range
+# }
+def get_address_ranges(names: list, base_addrs: list, addr_widths: list, addr_ranges: int = 1) -> list:
+    ranges = []
+    for mi_index, name in enumerate(names):
+        for range_index in range(addr_ranges):
+            base = int(str(base_addrs[addr_ranges * mi_index + range_index]), 16)
+            width = int(addr_widths[addr_ranges * mi_index + range_index])
+            if width == 0 or base == UNUSED_BASE_ADDR:
+                continue
+            ranges.append(
+                {
+                    "device": name,
+                    "name": get_range_name(name, range_index),
+                    "mi_index": mi_index,
+                    "range_index": range_index,
+                    "base": base,
+                    "width": width,
+                    "end": base + (1 << width) - 1,
+                }
+            )
+    return ranges
+
+# Memory devices (BRAM, HBM and the DDR channels DDR4CH*), i.e. the memory blocks of the linker script
+MEMORY_DEVICES = ["BRAM", "HBM"]
+MEMORY_DEVICE_PREFIX = "DDR4CH"
+
+# Check if a slave (from RANGE_NAMES) is a memory device
+def is_memory(name: str) -> bool:
+    return name in MEMORY_DEVICES or name.startswith(MEMORY_DEVICE_PREFIX)
+
+
+##############
+# Interrupts #
+##############
+
+# PLIC line 0 is reserved, the sources start from line 1
+PLIC_FIRST_LINE = 1
+# Number of PLIC lines, including the reserved one (see PLICOPT in hw/units/custom_rv_plic)
+PLIC_NUM_LINES = 32
+
+# Expand the MBUS interrupt sources in a list of PLIC sources
+# @names: INTERRUPT_NAMES of the MBUS, in line order
+# @priorities: INTERRUPT_PRIORITIES of the MBUS, one per source (1 for all if empty)
+# Each source is defined as follows
+# {
+#   "name": source name (a PBUS peripheral or an MBUS-level source),
+#   "line": PLIC line,
+#   "priority": PLIC priority
+# }
+def get_plic_sources(names: list, priorities: list) -> list:
+    return [
+        {
+            "name": name,
+            "line": PLIC_FIRST_LINE + index,
+            "priority": int(priorities[index]) if priorities != [] else 1,
+        }
+        for index, name in enumerate(names)
+    ]
+
+
+################
+# Output files #
+################
+
+# Generated files are written in-tree by default, i.e. OUTPUT_ROOT=ROOT_DIR.
+# With a different OUTPUT_ROOT (e.g. a per-build directory, see BUILD_ID in the Makefile), each output path under ROOT_DIR
+# is moved under OUTPUT_ROOT, keeping the same relative path (e.g. ${OUTPUT_ROOT}/hw/xilinx/rtl/mbus_buses.svinc).
+# Outputs outside ROOT_DIR are written as they are.
+ROOT_DIR = os.environ.get("ROOT_DIR", "")
+OUTPUT_ROOT = os.environ.get("OUTPUT_ROOT", ROOT_DIR)
+# Manifest of the produced outputs (optional), in sha256sum format, with paths relative to OUTPUT_ROOT
+OUTPUT_MANIFEST_FILE = os.environ.get("OUTPUT_MANIFEST_FILE", "")
+
+# Get the actual path of an output file under OUTPUT_ROOT
+# @file_name: path of the output file in the source tree
+def get_output_file_name(file_name: str) -> str:
+    if ROOT_DIR == "" or OUTPUT_ROOT == "":
+        return file_name
+    path = os.path.abspath(file_name)
+    root = os.path.abspath(ROOT_DIR)
+    if os.path.commonpath([path, root]) != root:
+        return file_name
+    return os.path.join(os.path.abspath(OUTPUT_ROOT), os.path.relpath(path, root))
+
+# Write a generated output file (see write_file_atomic) under OUTPUT_ROOT, and record it in the manifest
+# @file_name: path of the output file in the source tree
+# @content: the whole content of the file
+# Returns True if the file has been (re)written
+def write_output_file(file_name: str, content: str) -> bool:
+    file_name = get_output_file_name(file_name)
+    os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
+    written = write_file_atomic(file_name, content)
+    record_output_file(file_name, content)
+    return written
+
+# Add (or update) an output file in the manifest, if any
+def record_output_file(file_name: str, content: str) -> None:
+    if OUTPUT_MANIFEST_FILE == "":
+        return
+    path = os.path.abspath(file_name)
+    if OUTPUT_ROOT != "" and os.path.commonpath([path, os.path.abspath(OUTPUT_ROOT)]) == os.path.abspath(OUTPUT_ROOT):
+        path = os.path.relpath(path, os.path.abspath(OUTPUT_ROOT))
+    digest = hashlib.sha256(content.encode()).hexdigest()
+
+    os.makedirs(os.path.dirname(os.path.abspath(OUTPUT_MANIFEST_FILE)), exist_ok=True)
+    with lock_dir(OUTPUT_MANIFEST_FILE):
+        entries = {}
+        if os.path.isfile(OUTPUT_MANIFEST_FILE):
+            with open(OUTPUT_MANIFEST_FILE, "r") as f:
+                for line in f:
+                    entry_digest, entry_path = line.rstrip("\n").split("  ", 1)
+                    entries[entry_path] = entry_digest
+        entries[path] = digest
+        manifest = "".join(f"{entries[p]}  {p}\n" for p in sorted(entries))
+        write_file_atomic(OUTPUT_MANIFEST_FILE, manifest, locked=True)
+
+# Lock the directory of a file, serializing the writers of the files in the same directory (also across shell scripts, see utils.sh)
+@contextlib.contextmanager
+def lock_dir(file_name: str):
+    dir_fd = os.open(os.path.dirname(os.path.abspath(file_name)), os.O_RDONLY)
+    try:
+        fcntl.flock(dir_fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Also releases the lock
+        os.close(dir_fd)
+
+# Write a file, safe against concurrent generators (e.g. make -j on the config targets):
+#   1) the output directory is locked, serializing the writers of the same outputs (e.g. uninasoc_clk_assignments.svinc)
+#   2) if the file already holds the same content, it is left untouched (no timestamp update, no rebuild of the dependent IPs)
+#   3) otherwise, the content is written to a temporary file in the same directory and atomically renamed to the output,
+#      hence readers never see a half-written file
+# @file_name: path of the file
+# @content: the whole content of the file
+# @locked: the directory is already locked by the caller
+# Returns True if the file has been (re)written
+def write_file_atomic(file_name: str, content: str, locked: bool = False) -> bool:
+    if not locked:
+        with lock_dir(file_name):
+            return write_file_atomic(file_name, content, locked=True)
+
+    # Skip identical writes
+    if os.path.isfile(file_name):
+        with open(file_name, "r") as f:
+            if f.read() == content:
+                return False
+
+    # Write to a temporary file and rename it over the output
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    tmp_fd, tmp_name = tempfile.mkstemp(dir=dir_name, prefix=f".{os.path.basename(file_name)}.", suffix=".tmp")
+    try:
+        with os.fdopen(tmp_fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # Keep the permissions of the output file, if any
+        if os.path.isfile(file_name):
+            os.chmod(tmp_name, os.stat(file_name).st_mode)
+        else:
+            os.chmod(tmp_name, 0o666 & ~get_umask())
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return True
+
+# Get the current umask, without changing it
+def get_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
@@ -0,0 +1,114 @@
+#!/bin/bash
+# Author: agent <agent@local>
+# Description:
+#   Utility functions for the config shell scripts, to be sourced.
+#   The same conventions of the python generators apply (see utils.py):
+#     - the outputs under ROOT_DIR are written under OUTPUT_ROOT (in-tree by default)
+#     - the outputs are recorded in OUTPUT_MANIFEST_FILE, if any
+
+# Get the actual path of an output file under OUTPUT_ROOT
+# Args:
+#   $1: path of the output file in the source tree
+get_output_file_name () {
+    local file=$(realpath -m $1)
+    local root=$(realpath -m ${ROOT_DIR:-/})
+    local output_root=$(realpath -m ${OUTPUT_ROOT:-${ROOT_DIR:-/}})
+
+    if [[ -z "${ROOT_DIR}" || "${file}" != "${root}/"* ]]; then
+        echo ${file}
+    else
+        echo ${output_root}/${file#${root}/}
+    fi
+}
+
+# Add (or update) an output file in the manifest, if any
+# Args:
+#   $1: path of the output file
+record_output_file () {
+    local file=$(realpath -m $1)
+    local output_root=$(realpath -m ${OUTPUT_ROOT:-${ROOT_DIR:-/}})
+    local digest
+    local tmp_file
+
+    if [[ -z "${OUTPUT_MANIFEST_FILE}" ]]; then
+        return
+    fi
+    if [[ "${file}" == "${output_root}/"* ]]; then
+        file=${file#${output_root}/}
+    fi
+    digest=$(sha256sum "$1" | awk '{print $1}')
+
+    mkdir -p $(dirname ${OUTPUT_MANIFEST_FILE})
+    (
+        flock -x 9
+        tmp_file=$(mktemp "$(dirname ${OUTPUT_MANIFEST_FILE})/.$(basename ${OUTPUT_MANIFEST_FILE}).XXXXXX") || exit 1
+        { [[ -f ${OUTPUT_MANIFEST_FILE} ]] && awk -v path="${file}" 'substr($0, index($0, "  ") + 2) != path' ${OUTPUT_MANIFEST_FILE}; \
+          echo "${digest}  ${file}"; } | LC_ALL=C sort -t ' ' -k 3 > ${tmp_file}
+        mv -f ${tmp_file} ${OUTPUT_MANIFEST_FILE}
+    ) 9< "$(dirname ${OUTPUT_MANIFEST_FILE})"
+}
+
+# Apply a sed (-E) expression to a file, safe against concurrent config targets (e.g. make -j):
+#   - the output file is under OUTPUT_ROOT (see get_output_file_name), at the first update it is a copy of the source file
+#   - the output directory is locked, serializing the writers of the same files
+#   - the result is written to a temporary file in the same directory and atomically renamed to the file
+#   - if the content doesn't change, the file is left untouched (sed -i would always rewrite it, triggering the rebuild of the dependent IPs)
+# Args:
+#   $1: sed expression
+#   $2: file to update, in the source tree
+sed_atomic () {
+    local expression=$1
+    local source_file=$2
+    local file=$(get_output_file_name $2)
+    local tmp_file
+
+    mkdir -p $(dirname ${file})
+    (
+        flock -x 9
+        # The first update of an out-of-tree output starts from the source file
+        if [[ ! -f "${file}" ]]; then
+            cp "${source_file}" "${file}"
+        fi
+        tmp_file=$(mktemp "$(dirname ${file})/.$(basename ${file}).XXXXXX") || exit 1
+        if ! sed -E "${expression}" "${file}" > "${tmp_file}"; then
+            rm -f "${tmp_file}"
+            exit 1
+        fi
+        if cmp -s "${tmp_file}" "${file}"; then
+            rm -f "${tmp_file}"
+        else
+            chmod --reference="${file}" "${tmp_file}"
+            mv -f "${tmp_file}" "${file}"
+        fi
+    ) 9< "$(dirname ${file})"
+
+    record_output_file ${file}
+}
+
+# Get the value of a property of a CSV configuration, with its layers (see property_store.py), from the lowest priority:
+#   - the CSV of the same name in CONFIG_BASE_DIR, if any
+#   - the CSV configuration itself
+#   - the CSVs of the same name in each of CONFIG_OVERLAY_DIRS, if any
+# Args:
+#   $1: CSV configuration file
+#   $2: property name
+#   $3: default value, for optional properties (optional)
+get_property () {
+    local name=$(basename $1)
+    local layers=()
+    local layer
+    local overlay_dir
+
+    if [[ -n "${CONFIG_BASE_DIR}" && -f "${CONFIG_BASE_DIR}/${name}" && ! "${CONFIG_BASE_DIR}/${name}" -ef "$1" ]]; then
+        layers+=(${CONFIG_BASE_DIR}/${name})
+    fi
+    layers+=($1)
+    for overlay_dir in ${CONFIG_OVERLAY_DIRS}; do
+        if [[ -f "${overlay_dir}/${name}" && ! "${overlay_dir}/${name}" -ef "$1" ]]; then
+            layers+=(${overlay_dir}/${name})
+        fi
+    done
+
+    # The last layer setting the property wins
+    awk -F "," -v property="$2" -v value="$3" '$1 == property {value = $2} END {print value}' ${layers[*]}
+}
@@ -0,0 +1,540 @@
+# Author: agent <agent@local>
+# Description:
+#   Host-side virtual platform of the SoC, built from the address map of the bus configurations (see bus_graph.get_address_map),
+#   to test the HAL and the drivers logic without the FPGA.
+#   Each range of a leaf device (RANGE_NAMES, sized by RANGE_ADDR_WIDTH) is a region of the platform:
+#       - the memories (BRAM, HBM, DDR4CH*, see utils.is_memory) are backed by sparse memory-mapped files of the size of
+#         the range: only the written pages take host memory (and disk), hence the large windows (26 bits and more) are cheap.
+#         The files are anonymous temporary files, or <VP_BACKING_DIR>/<range name>.bin if set, kept across runs
+#       - the peripherals are register models, selected by name prefix (PERIPHERAL_MODELS, or the models of the caller first):
+#         UART (AXI UART Lite), TIM (AXI Timer), GPIO (AXI GPIO, GPIO_in for the input ones),
+#         and a plain register file for any other device (e.g. PLIC, CDMA)
+#   Each access is dispatched with an interval index, i.e. a binary search on the sorted base addresses of the regions,
+#   after a check on the region of the previous access. Unmapped accesses, and accesses across regions, raise a BusError,
+#   as the DECERR of the crossbars.
+#   The peripherals advance with the platform time (advance), each on the clock of its bus, and their interrupts are reported
+#   as PLIC lines (see get_plic_sources).
+#   ELF images are bulk-loaded (load_elf) at the physical addresses of their PT_LOAD segments, zeroing the .bss.
+#   Usage (e.g. from a test of a driver, with config/scripts in the Python path):
+#       with VirtualPlatform(read_config(config_file_names)) as platform:
+#           platform.load_elf("blinky.elf")
+#           platform.write(TIM0_BASE + 0x4, 1000)
+#           platform.advance(1000000)
+#           assert platform.get_pending_interrupts() == [PLIC_TIM0_INTERRUPT]
+# Args (to print the regions and load an ELF image):
+#   1: ELF image to load (none to skip)
+#   2: Input configuration file for system
+#   3+: Input configuration files for buses
+#   Last: Output JSON summary file
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars, file names
+import os
+# Sparse memories
+import mmap
+import tempfile
+# Parse the ELF images
+import struct
+# Interval index
+import bisect
+# Machine-readable summary
+import json
+import time
+# Sub-scripts
+import bus_graph
+from tune_crossbar_depths import get_by_prefix
+from utils import *
+
+# Constants
+
+# Directory of the memory backing files, anonymous temporary files if not set
+VP_BACKING_DIR = os.getenv("VP_BACKING_DIR", "")
+# Bytes of the peripheral registers
+REGISTER_BYTES = 4
+REGISTER_MASK = (1 << (8 * REGISTER_BYTES)) - 1
+
+# Raised on an access outside the address map, as the DECERR of the crossbars
+class BusError(Exception):
+    pass
+
+############
+# Memories #
+############
+
+# Memory, backed by a sparse memory-mapped file
+class Memory:
+    def __init__(self, name : str, size : int):
+        self.size = size
+        if VP_BACKING_DIR != "":
+            os.makedirs(VP_BACKING_DIR, exist_ok=True)
+            self.backing = os.path.join(VP_BACKING_DIR, f"{name}.bin")
+            self.file = open(self.backing, "a+b")
+        else:
+            self.backing = None
+            self.file = tempfile.TemporaryFile()
+        # The file is resized without writing it, i.e. it is a hole until written
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+    def read(self, offset : int, size : int) -> int:
+        return int.from_bytes(self.map[offset:offset + size], "little")
+
+    def write(self, offset : int, size : int, value : int) -> None:
+        self.map[offset:offset + size] = (value & ((1 << (8 * size)) - 1)).to_bytes(size, "little")
+
+    def read_bytes(self, offset : int, size : int) -> bytes:
+        return self.map[offset:offset + size]
+
+    def write_bytes(self, offset : int, data : bytes) -> None:
+        self.map[offset:offset + len(data)] = data
+
+    # Zero a range, releasing the whole pages in it (back to holes) rather than writing them
+    def clear(self, offset : int, size : int) -> None:
+        start = min(-(-offset // mmap.PAGESIZE) * mmap.PAGESIZE, offset + size)
+        end = max((offset + size) // mmap.PAGESIZE * mmap.PAGESIZE, start)
+        if not hasattr(mmap, "MADV_REMOVE"):
+            start = end = offset + size
+        self.map[offset:start] = bytes(start - offset)
+        self.map[end:offset + size] = bytes(offset + size - end)
+        if end > start:
+            self.map.madvise(mmap.MADV_REMOVE, start, end - start)
+
+    # Get the host bytes taken by the memory, i.e. the written pages
+    def get_resident_bytes(self) -> int:
+        return os.fstat(self.file.fileno()).st_blocks * 512
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+###############
+# Peripherals #
+###############
+
+# Register model of a peripheral, a plain register file by default
+# The models override read_register and write_register for the side effects, tick to advance and get_interrupt
+class Peripheral:
+    def __init__(self, name : str, size : int, clock_hz : int):
+        self.name = name
+        self.size = size
+        self.clock_hz = clock_hz
+        # Elapsed clock cycles
+        self.cycles = 0
+        # Register offset -> value, only the written registers
+        self.registers = {}
+
+    def read_register(self, offset : int) -> int:
+        return self.registers.get(offset, 0)
+
+    # Write the bytes of a register selected by the mask
+    def write_register(self, offset : int, value : int, mask : int) -> None:
+        self.registers[offset] = (self.read_register(offset) & ~mask) | (value & mask)
+
+    # Advance by a number of clock cycles
+    def tick(self, cycles : int) -> None:
+        pass
+
+    # Get the level of the interrupt line
+    def get_interrupt(self) -> bool:
+        return False
+
+    # Access of any size, split in the registers it spans, each register is accessed once
+    def read(self, offset : int, size : int) -> int:
+        value = 0
+        for register in range(offset - offset % REGISTER_BYTES, offset + size, REGISTER_BYTES):
+            shift = 8 * (register - offset)
+            register_value = self.read_register(register)
+            value |= register_value << shift if shift >= 0 else register_value >> -shift
+        return value & ((1 << (8 * size)) - 1)
+
+    def write(self, offset : int, size : int, value : int) -> None:
+        for register in range(offset - offset % REGISTER_BYTES, offset + size, REGISTER_BYTES):
+            shift = 8 * (register - offset)
+            first = max(offset, register) - register
+            last = min(offset + size, register + REGISTER_BYTES) - register
+            mask = ((1 << (8 * (last - first))) - 1) << (8 * first)
+            register_value = value << shift if shift >= 0 else value >> -shift
+            self.write_register(register, register_value & mask, mask)
+
+    def read_bytes(self, offset : int, size : int) -> bytes:
+        return self.read(offset, size).to_bytes(size, "little")
+
+    def write_bytes(self, offset : int, data : bytes) -> None:
+        self.write(offset, len(data), int.from_bytes(data, "little"))
+
+    def clear(self, offset : int, size : int) -> None:
+        self.write(offset, size, 0)
+
+# AXI UART Lite (https://docs.amd.com/v/u/en-US/pg142-axi-uartlite)
+# The transmitted bytes are collected in tx, the bytes to receive are queued with receive
+UART_RX_FIFO = 0x0
+UART_TX_FIFO = 0x4
+UART_STAT = 0x8
+UART_CTRL = 0xC
+UART_STAT_RX_VALID = (1 << 0)
+UART_STAT_RX_FULL = (1 << 1)
+UART_STAT_TX_EMPTY = (1 << 2)
+UART_STAT_INTR_ENABLED = (1 << 4)
+UART_CTRL_RST_RX = (1 << 1)
+UART_CTRL_ENABLE_INTR = (1 << 4)
+UART_FIFO_DEPTH = 16
+
+class UartLite(Peripheral):
+    def __init__(self, name : str, size : int, clock_hz : int):
+        super().__init__(name, size, clock_hz)
+        self.tx = bytearray()
+        self.rx = bytearray()
+        self.interrupt_enabled = False
+
+    # Queue bytes to receive
+    def receive(self, data : bytes) -> None:
+        self.rx += data
+
+    def read_register(self, offset : int) -> int:
+        if offset == UART_RX_FIFO:
+            return self.rx.pop(0) if self.rx else 0
+        if offset == UART_STAT:
+            return (UART_STAT_RX_VALID if self.rx else 0) \
+                | (UART_STAT_RX_FULL if len(self.rx) >= UART_FIFO_DEPTH else 0) \
+                | UART_STAT_TX_EMPTY \
+                | (UART_STAT_INTR_ENABLED if self.interrupt_enabled else 0)
+        return 0
+
+    def write_register(self, offset : int, value : int, mask : int) -> None:
+        if offset == UART_TX_FIFO:
+            self.tx.append(value & 0xFF)
+        elif offset == UART_CTRL:
+            if value & UART_CTRL_RST_RX:
+                self.rx.clear()
+            self.interrupt_enabled = bool(value & UART_CTRL_ENABLE_INTR)
+
+    # The transmission is immediate, hence the interrupt is pending while there are bytes to receive
+    def get_interrupt(self) -> bool:
+        return self.interrupt_enabled and len(self.rx) > 0
+
+# AXI Timer, two counters (https://docs.amd.com/v/u/en-US/pg079-axi-timer)
+# Counting down, the period of an auto-reload counter is the load value + 2 cycles (see TIM_RELOAD_VALUE in xlnx_tim.h)
+TIM_TCSR = 0x0
+TIM_TLR = 0x4
+TIM_TCR = 0x8
+TIM_COUNTER_STRIDE = 0x10
+TIM_NUM_COUNTERS = 2
+TIM_CSR_COUNT_DOWN = (1 << 1)
+TIM_CSR_RELOAD = (1 << 4)
+TIM_CSR_LOAD = (1 << 5)
+TIM_CSR_ENABLE_INTERRUPT = (1 << 6)
+TIM_CSR_ENABLE = (1 << 7)
+TIM_CSR_INTERRUPT = (1 << 8)
+
+class Timer(Peripheral):
+    def __init__(self, name : str, size : int, clock_hz : int):
+        super().__init__(name, size, clock_hz)
+        # The value is kept unwrapped, i.e. the terminal count is -1 counting down and REGISTER_MASK + 1 counting up
+        self.counters = [{"csr": 0, "load": 0, "value": 0, "held": False} for _ in range(TIM_NUM_COUNTERS)]
+
+    def read_register(self, offset : int) -> int:
+        index, register = divmod(offset, TIM_COUNTER_STRIDE)
+        if index >= TIM_NUM_COUNTERS:
+            return super().read_register(offset)
+        counter = self.counters[index]
+        return {TIM_TCSR: counter["csr"], TIM_TLR: counter["load"], TIM_TCR: counter["value"] & REGISTER_MASK}.get(register, 0)
+
+    def write_register(self, offset : int, value : int, mask : int) -> None:
+        index, register = divmod(offset, TIM_COUNTER_STRIDE)
+        if index >= TIM_NUM_COUNTERS:
+            return super().write_register(offset, value, mask)
+        counter = self.counters[index]
+        if register == TIM_TCSR:
+            value = (counter["csr"] & ~mask) | (value & mask)
+            # The interrupt bit is cleared by writing 1
+            interrupt = counter["csr"] & TIM_CSR_INTERRUPT & ~value
+            counter["csr"] = (value & ~TIM_CSR_INTERRUPT) | interrupt
+            if value & TIM_CSR_LOAD:
+                counter["value"] = counter["load"]
+                counter["held"] = False
+        elif register == TIM_TLR:
+            counter["load"] = (counter["load"] & ~mask) | (value & mask)
+
+    def tick(self, cycles : int) -> None:
+        for counter in self.counters:
+            csr = counter["csr"]
+            if not csr & TIM_CSR_ENABLE or csr & TIM_CSR_LOAD or counter["held"]:
+                continue
+            down = bool(csr & TIM_CSR_COUNT_DOWN)
+            # Cycles to the expiration, from the current value and from the load value
+            steps = counter["value"] + 2 if down else REGISTER_MASK - counter["value"] + 2
+            if cycles < steps:
+                counter["value"] = counter["value"] - cycles if down else counter["value"] + cycles
+                continue
+            counter["csr"] |= TIM_CSR_INTERRUPT
+            if not csr & TIM_CSR_RELOAD:
+                counter["value"] = 0 if down else REGISTER_MASK
+                counter["held"] = True
+                continue
+            period = counter["load"] + 2 if down else REGISTER_MASK - counter["load"] + 2
+            remaining = (cycles - steps) % period
+            counter["value"] = counter["load"] - remaining if down else counter["load"] + remaining
+
+    def get_interrupt(self) -> bool:
+        return any(c["csr"] & TIM_CSR_INTERRUPT and c["csr"] & TIM_CSR_ENABLE_INTERRUPT for c in self.counters)
+
+# AXI GPIO, two channels (https://docs.amd.com/v/u/en-US/pg144-axi-gpio)
+# The inputs are set with set_inputs, the values written to the outputs are collected in history, as (time in cycles, channel, value)
+GPIO_DATA = 0x0
+GPIO_TRI = 0x4
+GPIO_CHANNEL_STRIDE = 0x8
+GPIO_NUM_CHANNELS = 2
+GPIO_GIER = 0x11C
+GPIO_ISR = 0x120
+GPIO_IER = 0x128
+GPIO_GIER_ENABLE = (1 << 31)
+
+class Gpio(Peripheral):
+    # Reset value of the direction registers, i.e. 0 for outputs
+    TRI_RESET = 0
+
+    def __init__(self, name : str, size : int, clock_hz : int):
+        super().__init__(name, size, clock_hz)
+        self.tri = [self.TRI_RESET] * GPIO_NUM_CHANNELS
+        self.outputs = [0] * GPIO_NUM_CHANNELS
+        self.inputs = [0] * GPIO_NUM_CHANNELS
+        self.history = []
+
+    # Set the input pins of a channel, a change raises the channel interrupt status
+    def set_inputs(self, value : int, channel : int = 0) -> None:
+        if value != self.inputs[channel]:
+            self.registers[GPIO_ISR] = self.registers.get(GPIO_ISR, 0) | (1 << channel)
+        self.inputs[channel] = value
+
+    def read_register(self, offset : int) -> int:
+        channel, register = divmod(offset, GPIO_CHANNEL_STRIDE)
+        if channel >= GPIO_NUM_CHANNELS:
+            return super().read_register(offset)
+        if register == GPIO_TRI:
+            return self.tri[channel]
+        return (self.outputs[channel] & ~self.tri[channel]) | (self.inputs[channel] & self.tri[channel])
+
+    def write_register(self, offset : int, value : int, mask : int) -> None:
+        channel, register = divmod(offset, GPIO_CHANNEL_STRIDE)
+        if offset == GPIO_ISR:
+            # The interrupt status bits are toggled by writing 1
+            self.registers[GPIO_ISR] = self.registers.get(GPIO_ISR, 0) ^ (value & mask)
+        elif channel >= GPIO_NUM_CHANNELS:
+            super().write_register(offset, value, mask)
+        elif register == GPIO_TRI:
+            self.tri[channel] = (self.tri[channel] & ~mask) | (value & mask)
+        else:
+            self.outputs[channel] = (self.outputs[channel] & ~mask) | (value & mask)
+            self.history.append((self.cycles, channel, self.outputs[channel]))
+
+    def get_interrupt(self) -> bool:
+        return bool(self.registers.get(GPIO_GIER, 0) & GPIO_GIER_ENABLE and self.registers.get(GPIO_ISR, 0) & self.registers.get(GPIO_IER, 0))
+
+# AXI GPIO with all the pins as inputs
+class GpioIn(Gpio):
+    TRI_RESET = REGISTER_MASK
+
+# Peripheral models by device name prefix, the first match is used
+PERIPHERAL_MODELS = {
+    "UART": UartLite,
+    "TIM": Timer,
+    "GPIO_in": GpioIn,
+    "GPIO": Gpio,
+}
+
+#######
+# ELF #
+#######
+
+ELF_MAGIC = b"\x7fELF"
+ELF_CLASS_64 = 2
+ELF_DATA_LSB = 1
+PT_LOAD = 1
+# Header fields from e_type to e_shstrndx, and program header fields, for ELF32 and ELF64
+ELF_HEADER_FORMATS = {1: "HHIIIIIHHHHHH", ELF_CLASS_64: "HHIQQQIHHHHHH"}
+ELF_PROGRAM_HEADER_FORMATS = {1: "IIIIIIII", ELF_CLASS_64: "IIQQQQQQ"}
+ELF_IDENT_BYTES = 16
+
+# Read the loadable segments of an ELF image, returns (entry, [{"base", "offset", "file_size", "memory_size"}])
+def read_elf_segments(image : bytes) -> tuple:
+    if image[:4] != ELF_MAGIC or image[4] not in ELF_HEADER_FORMATS:
+        raise ValueError("Not an ELF32/ELF64 image")
+    elf_class = image[4]
+    endian = "<" if image[5] == ELF_DATA_LSB else ">"
+    header = struct.unpack_from(endian + ELF_HEADER_FORMATS[elf_class], image, ELF_IDENT_BYTES)
+    entry, phoff, phentsize, phnum = header[3], header[4], header[8], header[9]
+
+    segments = []
+    for index in range(phnum):
+        fields = struct.unpack_from(endian + ELF_PROGRAM_HEADER_FORMATS[elf_class], image, phoff + index * phentsize)
+        if elf_class == ELF_CLASS_64:
+            p_type, _, p_offset, _, p_paddr, p_filesz, p_memsz, _ = fields
+        else:
+            p_type, p_offset, _, p_paddr, p_filesz, p_memsz, _, _ = fields
+        if p_type == PT_LOAD and p_memsz > 0:
+            segments.append({"base": p_paddr, "offset": p_offset, "file_size": p_filesz, "memory_size": p_memsz})
+    return entry, segments
+
+############
+# Platform #
+############
+
+class VirtualPlatform:
+    # @configs: the configurations (system and buses), see read_config
+    # @models: peripheral models by device name prefix, before (and over) PERIPHERAL_MODELS
+    def __init__(self, configs : list, models : dict = None):
+        devices, graph = bus_graph.get_address_map(configs)
+        # The caller models first, as get_by_prefix takes the first match, and they replace the defaults of the same prefix
+        models = dict(models if models is not None else {})
+        for prefix, model in PERIPHERAL_MODELS.items():
+            models.setdefault(prefix, model)
+        mbus_config = graph["buses"][bus_graph.ROOT_BUS]
+        self.lines = {s["name"]: s["line"] for s in get_plic_sources(mbus_config.INTERRUPT_NAMES, mbus_config.INTERRUPT_PRIORITIES)}
+
+        # Regions, sorted by base address
+        self.regions = []
+        for device in devices:
+            size = device["end"] - device["base"] + 1
+            if is_memory(device["device"]):
+                model = Memory(device["name"], size)
+            else:
+                clock_hz = get_bus_clock_domain(configs, graph["buses"][device["bus"]]) * 1000000
+                model = get_by_prefix(models, device["device"], Peripheral)(device["name"], size, clock_hz)
+            self.regions.append({**device, "size": size, "model": model})
+        # Interval index
+        self.bases = [r["base"] for r in self.regions]
+        self.last_region = None
+        # Platform time (ns)
+        self.time_ns = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for region in self.regions:
+            if isinstance(region["model"], Memory):
+                region["model"].close()
+
+    # Get the region of an access, the previous region first
+    def get_region(self, address : int, size : int = 1) -> dict:
+        region = self.last_region
+        if region is not None and region["base"] <= address and address + size - 1 <= region["end"]:
+            return region
+        index = bisect.bisect_right(self.bases, address) - 1
+        if index < 0 or address + size - 1 > self.regions[index]["end"]:
+            raise BusError(f"Access to 0x{address:x} ({size} bytes) outside the address map")
+        self.last_region = self.regions[index]
+        return self.last_region
+
+    # Get the model of a region, by range or device name (e.g. UART, or DDR4CH0_1 for the second range of DDR4CH0)
+    def get_model(self, name : str):
+        return next(r["model"] for r in self.regions if r["name"] == name or r["device"] == name)
+
+    def read(self, address : int, size : int = REGISTER_BYTES) -> int:
+        region = self.get_region(address, size)
+        return region["model"].read(address - region["base"], size)
+
+    def write(self, address : int, value : int, size : int = REGISTER_BYTES) -> None:
+        region = self.get_region(address, size)
+        region["model"].write(address - region["base"], size, value)
+
+    def read_bytes(self, address : int, size : int) -> bytes:
+        region = self.get_region(address, size)
+        return region["model"].read_bytes(address - region["base"], size)
+
+    def write_bytes(self, address : int, data : bytes) -> None:
+        region = self.get_region(address, len(data))
+        region["model"].write_bytes(address - region["base"], data)
+
+    def clear(self, address : int, size : int) -> None:
+        region = self.get_region(address, size)
+        region["model"].clear(address - region["base"], size)
+
+    # Load an ELF image, returns {"entry", "segments": [{"base", "size", "bss", "region"}]}
+    def load_elf(self, elf_file_name : str) -> dict:
+        with open(elf_file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as image:
+            entry, segments = read_elf_segments(image)
+            loaded = []
+            for segment in segments:
+                region = self.get_region(segment["base"], segment["memory_size"])
+                self.write_bytes(segment["base"], image[segment["offset"]:segment["offset"] + segment["file_size"]])
+                bss = segment["memory_size"] - segment["file_size"]
+                if bss > 0:
+                    self.clear(segment["base"] + segment["file_size"], bss)
+                loaded.append({"base": segment["base"], "size": segment["file_size"], "bss": bss, "region": region["name"]})
+        return {"entry": entry, "segments": loaded}
+
+    # Advance the platform time, each peripheral by the cycles of its clock
+    def advance(self, ns : int) -> None:
+        self.time_ns += ns
+        for region in self.regions:
+            model = region["model"]
+            if isinstance(model, Peripheral):
+                cycles = self.time_ns * model.clock_hz // 1000000000 - model.cycles
+                model.cycles += cycles
+                model.tick(cycles)
+
+    # Get the PLIC lines of the pending interrupts
+    def get_pending_interrupts(self) -> list:
+        return sorted(self.lines[r["device"]] for r in self.regions
+                      if r["device"] in self.lines and isinstance(r["model"], Peripheral) and r["model"].get_interrupt())
+
+    # Get the summary of the regions
+    def get_summary(self) -> list:
+        summary = []
+        for region in self.regions:
+            model = region["model"]
+            entry = {"name": region["name"], "bus": region["bus"], "base": f"0x{region['base']:x}", "size": region["size"], "model": type(model).__name__}
+            if isinstance(model, Memory):
+                entry |= {"backing": model.backing, "resident_bytes": model.get_resident_bytes()}
+            else:
+                entry |= {"clock_hz": model.clock_hz, "plic_line": self.lines.get(region["device"])}
+            summary.append(entry)
+        return summary
+
+# Render the summary as a human-readable report
+def render_report(summary : dict) -> str:
+    lines = [f"{'Region':<12} {'Bus':<6} {'Base':>12} {'Size':>12}  Model"]
+    for region in summary["regions"]:
+        details = f"{region['resident_bytes']} bytes resident" if region["model"] == "Memory" else f"{region['clock_hz'] // 1000000} MHz"
+        if region.get("plic_line") is not None:
+            details += f", PLIC line {region['plic_line']}"
+        lines.append(f"{region['name']:<12} {region['bus']:<6} {region['base']:>12} {region['size']:>12}  {region['model']} ({details})")
+    if summary["image"] is not None:
+        lines.append(f"Loaded {summary['image']['file']}, entry 0x{summary['image']['entry']:x}")
+        for segment in summary["image"]["segments"]:
+            lines.append(f"    0x{segment['base']:x}: {segment['size']} bytes (+ {segment['bss']} bytes .bss) in {segment['region']}")
+    return "\n".join(lines)
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: <ELF_FILE|none> <CONFIG_SYSTEM_CSV> <CONFIG_BUS_CSVS> <OUTPUT_JSON_FILE>")
+        sys.exit(1)
+
+    elf_file_name = sys.argv[1]
+    config_file_names = sys.argv[2:-1]
+    output_json_file = sys.argv[-1]
+    configs = read_config(config_file_names)
+
+    start = time.perf_counter()
+    with VirtualPlatform(configs) as platform:
+        image = None
+        if elf_file_name != "none":
+            image = {"file": elf_file_name, **platform.load_elf(elf_file_name)}
+        summary = {"regions": platform.get_summary(), "image": image}
+
+    print(render_report(summary))
+    print_info(f"Virtual platform done in {time.perf_counter() - start:.3f}s")
+
+    write_output_file(output_json_file, json.dumps(summary, indent=4))
+    print(f"[CONFIG] Output file is at {get_output_file_name(output_json_file)}")
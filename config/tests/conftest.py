@@ -0,0 +1,177 @@
+# Author: agent <agent@local>
+# Description: Fixtures of the tests of the configuration scripts.
+#   Each test runs for each shipped SoC configuration (embedded, hpc), on a copy of the CSVs,
+#   with the generated files redirected out of the tree (OUTPUT_ROOT, see utils.py).
+#   The scripts are either run as the Makefile does (run), or imported (load) with the environment of the SoC:
+#   as the scripts read the environment at import, they are imported again in each test.
+
+####################
+# Import libraries #
+####################
+import importlib
+import os
+import shutil
+import struct
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+CONFIG_ROOT = f"{ROOT_DIR}/config"
+XILINX_ROOT = f"{ROOT_DIR}/hw/xilinx"
+SCRIPTS_DIR = f"{CONFIG_ROOT}/scripts"
+
+# Shipped SoC configurations, and a board of each
+SOC_CONFIGS = {
+    "embedded" : "Nexys-A7-100T-Master",
+    "hpc"      : "au250",
+}
+
+# Bus CSVs of a configuration directory, in the Makefile order (CONFIG_BUS_CSVS)
+BUS_CSVS = ["config_main_bus.csv", "config_peripheral_bus.csv", "config_highperformance_bus.csv"]
+
+class SocFlow:
+    def __init__(self, soc_config : str, tmp_path):
+        self.soc_config = soc_config
+        self.tmp_path = tmp_path
+        # Private copy of the CSVs, as some scripts write back to them
+        self.configs_dir = tmp_path / "configs"
+        shutil.copytree(f"{CONFIG_ROOT}/configs", self.configs_dir, ignore=shutil.ignore_patterns("local"))
+        self.local_dir = self.configs_dir / "local"
+        self.output_root = tmp_path / "output"
+        self.sys_csv = str(self.configs_dir / "common" / "config_system.csv")
+        self.bus_csvs = [str(self.configs_dir / soc_config / name) for name in BUS_CSVS]
+        self.mbus_csv = self.bus_csvs[0]
+        self.env = {
+            "ROOT_DIR": ROOT_DIR,
+            "CONFIG_ROOT": CONFIG_ROOT,
+            "XILINX_ROOT": XILINX_ROOT,
+            "XILINX_IPS_ROOT": f"{XILINX_ROOT}/ips",
+            "SW_ROOT": f"{ROOT_DIR}/sw",
+            "SOC_CONFIG": soc_config,
+            "BOARD": SOC_CONFIGS[soc_config],
+            "OUTPUT_ROOT": str(self.output_root),
+            "OUTPUT_MANIFEST_FILE": "",
+            "CONFIG_BASE_DIR": str(self.configs_dir / "common"),
+            "CONFIG_OVERLAY_DIRS": str(self.local_dir),
+            # Calibration of the crossbar estimates, empty unless a test fills it
+            "QOR_DATABASE_FILE": str(tmp_path / "qor.sqlite"),
+        }
+
+    # Get the path of a generated file, from its path in the source tree
+    def output(self, path : str) -> str:
+        return os.path.join(self.output_root, os.path.relpath(path, ROOT_DIR))
+
+    # Read a generated file, from its path in the source tree
+    def read_output(self, path : str) -> str:
+        with open(self.output(path), "r") as f:
+            return f.read()
+
+    # Run a script, returns the completed process (stdout and stderr merged)
+    def run(self, script : str, *args, env : dict = {}, check : bool = True) -> subprocess.CompletedProcess:
+        result = subprocess.run(
+            [sys.executable, script if os.path.isabs(script) else f"{SCRIPTS_DIR}/{script}", *[str(arg) for arg in args]],
+            cwd=SCRIPTS_DIR,
+            env={**os.environ, **self.env, **env},
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        if check:
+            assert result.returncode == 0, result.stdout
+        return result
+
+    # Import a script (module) with the environment of the SoC
+    def load(self, name : str):
+        return importlib.import_module(name)
+
+    # Read the system and bus configurations, as the config flow does
+    def read_config(self) -> list:
+        return self.load("utils").read_config([self.sys_csv] + self.bus_csvs)
+
+    # Get a configuration by name (e.g. MBUS)
+    def get_config(self, configs : list, name : str):
+        return next(c for c in configs if c.CONFIG_NAME == name)
+
+# Drop the imported scripts, so that the next import reads the environment again
+def unload_scripts() -> None:
+    for name, module in list(sys.modules.items()):
+        if os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or "")) == SCRIPTS_DIR:
+            del sys.modules[name]
+
+@pytest.fixture(params=list(SOC_CONFIGS))
+def flow(request, tmp_path, monkeypatch) -> SocFlow:
+    flow = SocFlow(request.param, tmp_path)
+    for name, value in flow.env.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.syspath_prepend(SCRIPTS_DIR)
+    monkeypatch.chdir(SCRIPTS_DIR)
+    unload_scripts()
+    yield flow
+    unload_scripts()
+
+# Replace a property in a CSV
+def set_property(file_name : str, name : str, value : str) -> None:
+    with open(file_name, "r") as f:
+        lines = [f"{name},{value}" if line.split(",")[0] == name else line for line in f.read().splitlines()]
+    with open(file_name, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+# Synthetic model of the results: LUT, FF, BRAM and the period (ns) from the features
+LUT_COEFFICIENTS = [100, 2, 3, 0.5]
+FF_COEFFICIENTS = [50, 1, 2]
+TIMING_COEFFICIENTS = [1, 0.3]
+
+# Features of the synthetic configurations (MUX_LUTS, DECODER_LUTS, TRACKING_BITS, REGISTER_BITS, LOGIC_LEVELS)
+FEATURES = [
+    (10, 4, 32, 0, 3),
+    (40, 6, 64, 100, 4),
+    (80, 10, 32, 200, 5),
+    (20, 12, 128, 50, 6),
+    (120, 8, 96, 300, 4),
+    (60, 2, 16, 10, 7),
+]
+
+def get_results(features : tuple) -> dict:
+    mux, decoder, tracking, register, levels = features
+    lut, ff, timing = LUT_COEFFICIENTS, FF_COEFFICIENTS, TIMING_COEFFICIENTS
+    return {
+        "LUT": lut[0] + lut[1] * mux + lut[2] * decoder + lut[3] * tracking,
+        "FF": ff[0] + ff[1] * register + ff[2] * tracking,
+        "BRAM": 0,
+        "FMAX_MHZ": 1000 / (timing[0] + timing[1] * levels),
+    }
+
+# Fill the QoR database with a result of each synthetic configuration, as ingested by qor_database.py
+def fill_database(flow) -> None:
+    qor_database = flow.load("qor_database")
+    estimate_crossbar = flow.load("estimate_crossbar")
+    db = qor_database.open_database(flow.env["QOR_DATABASE_FILE"])
+    for i, features in enumerate(FEATURES):
+        config = {"CONFIG_HASH": f"hash{i}", "BUS": "MBUS", "SOC_CONFIG": flow.soc_config, **dict(zip(estimate_crossbar.FEATURE_NAMES, features))}
+        db.execute(f"INSERT INTO configs ({', '.join(config)}) VALUES ({', '.join('?' * len(config))})", list(config.values()))
+        # The synthesis results of the first configurations are replaced by their implementation ones
+        stages = ["post_synth", "post_impl"] if i < 3 else ["post_synth"]
+        for stage in stages:
+            results = get_results(features)
+            if stage != stages[-1]:
+                results = {"LUT": 1, "FF": 1, "BRAM": 9, "FMAX_MHZ": 999}
+            row = {"CONFIG_HASH": f"hash{i}", "REPORT_HASH": f"{stage}{i}", "STAGE": stage, **results}
+            db.execute(f"INSERT INTO qor ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", list(row.values()))
+    db.commit()
+    db.close()
+
+# Write a little-endian RISC-V ELF32 image with a PT_LOAD segment for each (paddr, data, memsz)
+def write_elf(file_name : str, segments : list) -> None:
+    ehsize, phentsize = 52, 32
+    offset = ehsize + phentsize * len(segments)
+    headers = b""
+    contents = b""
+    for paddr, data, memsz in segments:
+        headers += struct.pack("<8I", 1, offset + len(contents), paddr, paddr, len(data), memsz, 7, 4)
+        contents += data
+    ident = b"\x7fELF" + bytes([1, 1, 1]) + bytes(9)
+    header = ident + struct.pack("<HHIIIIIHHHHHH", 2, 0xf3, 1, segments[0][0], ehsize, 0, 0, ehsize, phentsize, len(segments), 40, 0, 0)
+    with open(file_name, "wb") as f:
+        f.write(header + headers + contents)
@@ -0,0 +1,50 @@
+# Author: agent <agent@local>
+# Description: Tests of the thread ID allocation (allocate_thread_ids.py) and of its use in the crossbar TCL (create_crossbar_config.py).
+
+import shutil
+
+# Expected (BASE_ID, THREAD_ID_WIDTH) of each SI, by SoC and bus
+EXPECTED_IDS = {
+    "embedded" : {
+        # SYS_MASTER RV_SOCKET_DATA RV_SOCKET_INSTR DBG_MASTER CDMA
+        "MBUS" : [(0x4, 0), (0x5, 0), (0x6, 0), (0x7, 0), (0x0, 2)],
+    },
+    "hpc" : {
+        # SYS_MASTER RV_SOCKET_DATA RV_SOCKET_INSTR DBG_MASTER CDMA HBUS
+        "MBUS" : [(0x4, 0), (0x5, 0), (0x6, 0), (0x7, 0), (0x0, 2), (0x8, 2)],
+        # MBUS (the IDs of the 4 single-ID MBUS masters and of the CDMA), s_acc
+        "HBUS" : [(0x8, 3), (0x0, 2)],
+    },
+}
+
+def get_ids(config) -> list:
+    return [(int(base_id, 16), width) for base_id, width in zip(config.BASE_ID, config.THREAD_ID_WIDTH)]
+
+def test_allocated_ids(flow):
+    configs = flow.read_config()
+    for name, ids in EXPECTED_IDS[flow.soc_config].items():
+        assert get_ids(flow.get_config(configs, name)) == ids
+
+def test_ids_are_aligned_and_disjoint(flow):
+    for config in flow.read_config():
+        ids = sorted(get_ids(config))
+        for base_id, width in ids:
+            assert base_id % (1 << width) == 0
+        for (base_id, width), (next_base_id, _) in zip(ids, ids[1:]):
+            assert base_id + (1 << width) <= next_base_id
+        if ids != []:
+            assert ids[-1][0] + (1 << ids[-1][1]) <= 1 << config.ID_WIDTH
+
+def test_crossbar_tcl_ids(flow):
+    # The bus list is the one given, e.g. with a bus CSV out of the directory of the others
+    other_dir = flow.tmp_path / "other"
+    other_dir.mkdir()
+    bus_csvs = flow.bus_csvs[:2] + [str(shutil.copy(flow.bus_csvs[2], other_dir))]
+    for name, ids in EXPECTED_IDS[flow.soc_config].items():
+        tcl_file = flow.tmp_path / f"{name}.tcl"
+        bus_csv = bus_csvs[["MBUS", "PBUS", "HBUS"].index(name)]
+        flow.run("create_crossbar_config.py", flow.sys_csv, bus_csv, tcl_file, flow.mbus_csv, *bus_csvs)
+        tcl = tcl_file.read_text()
+        for i, (base_id, width) in enumerate(ids):
+            assert f"CONFIG.S{i:02d}_BASE_ID {{0x{base_id:08x}}}" in tcl
+            assert f"CONFIG.S{i:02d}_THREAD_ID_WIDTH {{{width}}}" in tcl
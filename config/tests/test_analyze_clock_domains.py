@@ -0,0 +1,23 @@
+# Author: agent <agent@local>
+# Description: Tests of the clock-domain crossing report (analyze_clock_domains.py).
+
+import json
+
+# Expected slaves by clock domain, and number of clock converters
+EXPECTED_DOMAINS = {
+    "embedded" : ({"10": ["PBUS"], "20": ["BRAM", "DM_mem", "CDMA", "PLIC"]}, 1),
+    # The HBUS has two converters (see CONVERTERS_PER_SLAVE)
+    "hpc"      : ({"100": ["BRAM", "DM_mem", "CDMA", "PLIC"], "250": ["PBUS"], "300": ["HLS_CONTROL", "DDR4CH1", "HBUS"]}, 5),
+}
+
+def test_report(flow):
+    report = flow.tmp_path / "clock_domains.json"
+    flow.run("analyze_clock_domains.py", flow.sys_csv, *flow.bus_csvs, report)
+    summary = json.loads(report.read_text())
+    domains, num_converters = EXPECTED_DOMAINS[flow.soc_config]
+    assert summary["domains"] == domains
+    assert summary["num_converters"] == num_converters
+    # A converter for each slave out of the main clock domain
+    assert sorted(c["slave"] for c in summary["converters"]) == sorted(
+        name for clock, names in domains.items() if int(clock) != summary["main_clock_domain"] for name in names
+    )
@@ -0,0 +1,91 @@
+# Author: agent <agent@local>
+# Description: Tests of the memory-access trace analysis (analyze_memory_trace.py), on synthetic traces.
+
+import json
+
+import pytest
+
+# Instructions of the synthetic text traces, all fetched from the BRAM: others, reads of the BRAM,
+# writes to a PBUS device, and an unmapped read
+NUM_OTHERS = 40
+NUM_READS = 20
+NUM_WRITES = 10
+NUM_FETCHES = NUM_OTHERS + NUM_READS + NUM_WRITES + 1
+
+# Get the BRAM, a PBUS device and an unmapped address of the address map
+def get_addresses(flow) -> tuple:
+    devices, _ = flow.load("bus_graph").get_address_map(flow.read_config())
+    bram = next(d for d in devices if d["name"] == "BRAM")
+    pbus_device = next(d for d in devices if d["bus"] == "PBUS")
+    unmapped = next(a for a in range(0, 1 << 32, 1 << 20) if not any(d["base"] <= a <= d["end"] for d in devices))
+    return bram, pbus_device, unmapped
+
+def render_spike(bram : dict, pbus_device : dict, unmapped : int) -> str:
+    lines = [f"core   0: 3 0x{bram['base'] + 4 * i:08x} (0x00000013)" for i in range(NUM_OTHERS)]
+    lines += [f"core   0: 3 0x{bram['base']:08x} (0x0002a303) x6  0x00000000 mem 0x{bram['base'] + 0x100 + 4 * i:08x}" for i in range(NUM_READS)]
+    lines += [f"core   0: 3 0x{bram['base']:08x} (0x0062a023) mem 0x{pbus_device['base']:08x} 0x00000001" for i in range(NUM_WRITES)]
+    lines += [f"core   0: 3 0x{bram['base']:08x} (0x0002a303) x6  0x00000000 mem 0x{unmapped:08x}"]
+    return "\n".join(lines) + "\n"
+
+def render_qemu(bram : dict, pbus_device : dict, unmapped : int) -> str:
+    lines = [f"0, 0x{bram['base'] + 4 * i:x}, 0x13, \"nop\"" for i in range(NUM_OTHERS)]
+    lines += [f"0, 0x{bram['base']:x}, 0x2a303, \"lw t1, 0(t0)\", load, 0x{bram['base'] + 0x100 + 4 * i:x}" for i in range(NUM_READS)]
+    lines += [f"0, 0x{bram['base']:x}, 0x62a023, \"sw t1, 0(t0)\", store, 0x{pbus_device['base']:x}" for i in range(NUM_WRITES)]
+    lines += [f"0, 0x{bram['base']:x}, 0x2a303, \"lw t1, 0(t0)\", load, 0x{unmapped:x}"]
+    return "\n".join(lines) + "\n"
+
+def get_device(summary : dict, name : str) -> dict:
+    return next(d for d in summary["devices"] if d["name"] == name)
+
+@pytest.mark.parametrize("trace_format, render", [("spike", render_spike), ("qemu", render_qemu)])
+def test_text_trace(flow, tmp_path, trace_format, render):
+    bram, pbus_device, unmapped = get_addresses(flow)
+    trace_file = tmp_path / f"trace.{trace_format}"
+    trace_file.write_text(render(bram, pbus_device, unmapped))
+    report = tmp_path / "memory_trace.json"
+    # Small chunks, split at the end of the lines
+    flow.run("analyze_memory_trace.py", trace_format, trace_file, flow.sys_csv, *flow.bus_csvs, report, env={"CHUNK_BYTES": "100"})
+    summary = json.loads(report.read_text())
+    mbus_config = flow.get_config(flow.read_config(), "MBUS")
+    data_bytes = mbus_config.DATA_WIDTH // 8
+
+    assert summary["accesses"] == NUM_FETCHES + NUM_READS + NUM_WRITES + 1
+    assert summary["samples"] == NUM_FETCHES
+    assert {k: get_device(summary, "BRAM")[k] for k in ["fetch", "read", "write", "bytes"]} == \
+        {"fetch": NUM_FETCHES, "read": NUM_READS, "write": 0, "bytes": 4 * NUM_FETCHES + data_bytes * NUM_READS}
+    assert {k: get_device(summary, pbus_device["name"])[k] for k in ["fetch", "read", "write"]} == {"fetch": 0, "read": 0, "write": NUM_WRITES}
+    assert {k: get_device(summary, "UNMAPPED")[k] for k in ["fetch", "read", "write"]} == {"fetch": 0, "read": 1, "write": 0}
+    # The PBUS accesses traverse the MBUS
+    assert summary["buses"]["PBUS"]["write"] == NUM_WRITES
+    assert summary["buses"]["MBUS"]["write"] == NUM_WRITES
+    assert summary["buses"]["MBUS"]["fetch"] == NUM_FETCHES
+    # The fetches and the reads of the BRAM are in its first region
+    assert summary["hot_regions"][0] == {"base": f"0x{bram['base']:x}", "size": 4096, "device": "BRAM", "accesses": NUM_FETCHES + NUM_READS}
+
+def test_binary_trace(flow, tmp_path):
+    bram, pbus_device, unmapped = get_addresses(flow)
+    addresses = [bram["base"]] * 3 + [pbus_device["base"]] * 2 + [unmapped]
+    trace_file = tmp_path / "trace.bin"
+    trace_file.write_bytes(b"".join(a.to_bytes(4, "little") for a in addresses))
+    report = tmp_path / "memory_trace.json"
+    flow.run("analyze_memory_trace.py", "bin", trace_file, flow.sys_csv, *flow.bus_csvs, report, env={"TRACE_ADDR_BYTES": "4", "CHUNK_BYTES": "6"})
+    summary = json.loads(report.read_text())
+    assert (summary["samples"], summary["accesses"]) == (6, 6)
+    assert [get_device(summary, name)["read"] for name in ["BRAM", pbus_device["name"], "UNMAPPED"]] == [3, 2, 1]
+
+def test_ila_trace(flow, tmp_path):
+    bram, pbus_device, _ = get_addresses(flow)
+    trace_file = tmp_path / "trace.csv"
+    trace_file.write_text("\n".join([
+        "Sample in Buffer,m_araddr[31:0],m_arvalid,m_arready,m_arlen[7:0],m_arsize[2:0],m_awaddr[31:0],m_awvalid,m_awready",
+        "Radix - UNSIGNED,HEX,HEX,HEX,HEX,HEX,HEX,HEX,HEX",
+        f"0,{bram['base']:08x},1,1,3,2,{pbus_device['base']:08x},1,0",
+        f"1,{bram['base']:08x},1,0,3,2,{pbus_device['base']:08x},1,1",
+        f"2,{bram['base'] + 16:08x},1,1,0,3,00000000,0,0",
+    ]) + "\n")
+    report = tmp_path / "memory_trace.json"
+    flow.run("analyze_memory_trace.py", "ila", trace_file, flow.sys_csv, *flow.bus_csvs, report)
+    summary = json.loads(report.read_text())
+    # Only the handshakes, with the burst bytes if probed
+    assert {k: get_device(summary, "BRAM")[k] for k in ["read", "write", "bytes"]} == {"read": 2, "write": 0, "bytes": 4 * 4 + 1 * 8}
+    assert get_device(summary, pbus_device["name"])["write"] == 1
@@ -0,0 +1,68 @@
+# Author: agent <agent@local>
+# Description: Tests of the bus graph (bus_graph.py), on the shipped configurations and on synthetic bus graphs.
+
+# Depth-first order of the enabled buses, and the tree edges (child: parent)
+EXPECTED_GRAPHS = {
+    "embedded" : (["MBUS", "PBUS"], {"PBUS": "MBUS"}),
+    "hpc"      : (["MBUS", "PBUS", "HBUS"], {"PBUS": "MBUS", "HBUS": "MBUS"}),
+}
+
+# Build a bus configuration, with a (name, base, width) for each slave
+def make_bus(flow, name : str, masters : list, slaves : list):
+    config = flow.load("configuration").Configuration()
+    config.CONFIG_NAME = name
+    config.PROTOCOL = "AXI4"
+    config.MASTER_NAMES = masters
+    config.RANGE_NAMES = [slave for slave, _, _ in slaves]
+    config.BASE_ADDR = [hex(base) for _, base, _ in slaves]
+    config.RANGE_ADDR_WIDTH = [width for _, _, width in slaves]
+    return config
+
+def test_shipped_graph(flow):
+    bus_graph = flow.load("bus_graph")
+    graph = bus_graph.get_bus_graph(flow.read_config())
+    order, parents = EXPECTED_GRAPHS[flow.soc_config]
+    assert graph["errors"] == []
+    assert graph["order"] == order
+    assert {child: edge["parent"] for child, edge in graph["parent"].items() if edge is not None} == parents
+    if flow.soc_config == "hpc":
+        # The HBUS reaches back to the MBUS, one of its masters
+        assert [(e["child"], e["kind"]) for e in graph["edges"]["HBUS"]] == [("MBUS", "LOOPBACK")]
+        assert bus_graph.get_bus_path(graph, "HBUS") == ["MBUS", "HBUS"]
+
+def test_address_map(flow):
+    devices, graph = flow.load("bus_graph").get_address_map(flow.read_config())
+    names = [d["name"] for d in devices]
+    # The leaf devices only, sorted by base address
+    assert not any(name in graph["buses"] for name in names)
+    assert [d["base"] for d in devices] == sorted(d["base"] for d in devices)
+    assert {"BRAM", "DM_mem", "UART"} <= set(names)
+    if flow.soc_config == "hpc":
+        assert next(d for d in devices if d["name"] == "DDR4CH0")["bus"] == "HBUS"
+
+def test_errors(flow):
+    bus_graph = flow.load("bus_graph")
+    mbus = make_bus(flow, "MBUS", ["CORE"], [("BRAM", 0x0, 16), ("PBUS", 0x10000, 16)])
+    pbus = make_bus(flow, "PBUS", ["MBUS"], [("UART", 0x10000, 8)])
+    assert bus_graph.get_bus_graph([mbus, pbus])["errors"] == []
+
+    # Out of the MI range in the parent
+    pbus.BASE_ADDR = ["0x20000"]
+    assert bus_graph.get_bus_graph([mbus, pbus])["errors"] == ["Address of PBUS (UART) is not properly contained in MBUS"]
+    pbus.BASE_ADDR = ["0x10000"]
+
+    # Back to the MBUS without being one of its masters
+    pbus_cycle = make_bus(flow, "PBUS", ["MBUS"], [("UART", 0x10000, 8), ("MBUS", 0x0, 16)])
+    errors = bus_graph.get_bus_graph([mbus, pbus_cycle])["errors"]
+    assert errors == ["Cycle in the bus graph: MBUS is an ancestor of PBUS, but MBUS has no PBUS master for a loopback"]
+    mbus_loopback = make_bus(flow, "MBUS", ["CORE", "PBUS"], [("BRAM", 0x0, 16), ("PBUS", 0x10000, 16)])
+    assert bus_graph.get_bus_graph([mbus_loopback, pbus_cycle])["errors"] == []
+
+    # A bus under two parents, and an unreachable bus
+    hbus = make_bus(flow, "HBUS", ["MBUS"], [("PBUS", 0x10000, 16)])
+    mbus_hbus = make_bus(flow, "MBUS", ["CORE"], [("PBUS", 0x10000, 16), ("HBUS", 0x10000, 16)])
+    assert bus_graph.get_bus_graph([mbus_hbus, hbus, pbus])["errors"] == ["PBUS is a slave of multiple buses (MBUS, HBUS)"]
+    assert bus_graph.get_bus_graph([mbus, pbus, hbus])["errors"] == ["HBUS is not reachable from MBUS"]
+
+    # No root
+    assert bus_graph.get_bus_graph([pbus])["errors"] == ["No MBUS configuration found"]
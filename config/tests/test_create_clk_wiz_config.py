@@ -0,0 +1,57 @@
+# Author: agent <agent@local>
+# Description: Tests of the clock wizard generation (create_clk_wiz_config.py).
+
+import re
+
+from conftest import XILINX_ROOT
+
+# Clock wizard IP and input frequency (MHz) of each SoC
+CLK_WIZ = {
+    "embedded" : ("xlnx_clk_wiz", 100),
+    "hpc"      : ("xlnx_clk_wiz_hpc", 250),
+}
+
+def get_properties(tcl : str) -> dict:
+    return dict(re.findall(r"CONFIG\.(\w+) \{([^}]*)\}", tcl))
+
+def generate(flow) -> tuple:
+    ip_name, _ = CLK_WIZ[flow.soc_config]
+    out = flow.run("create_clk_wiz_config.py", flow.mbus_csv).stdout
+    tcl = flow.read_output(f"{XILINX_ROOT}/ips/{flow.soc_config}/{ip_name}/config.tcl")
+    svinc = flow.read_output(f"{XILINX_ROOT}/rtl/sys_master_clk_wiz.svinc")
+    return out, get_properties(tcl), svinc
+
+def test_tuned_mmcm(flow):
+    _, properties, _ = generate(flow)
+    _, input_freq = CLK_WIZ[flow.soc_config]
+    # The tuned 1000 MHz VCO
+    assert input_freq * float(properties["MMCM_CLKFBOUT_MULT_F"]) / int(properties["MMCM_DIVCLK_DIVIDE"]) == 1000
+    # An output for each clock domain in use, from the fastest, each with its tuned divider
+    clocks = {"embedded": [20, 10], "hpc": [250, 100]}[flow.soc_config]
+    assert int(properties["NUM_OUT_CLKS"]) == len(clocks)
+    for i, clock in enumerate(clocks):
+        assert properties[f"CLK_OUT{i + 1}_PORT"] == f"clk_{clock}"
+        divide = properties["MMCM_CLKOUT0_DIVIDE_F"] if i == 0 else properties[f"MMCM_CLKOUT{i}_DIVIDE"]
+        assert 1000 / float(divide) == clock
+    assert properties["CLKOUT1_JITTER"] == {"embedded": "162.167", "hpc": "89.528"}[flow.soc_config]
+
+def test_instance(flow):
+    _, _, svinc = generate(flow)
+    used = {"embedded": [10, 20], "hpc": [100, 250]}[flow.soc_config]
+    # Each clock output of the sys_master is either generated, with its reset synchronizer, or tied to zero
+    for clock in [10, 20, 50, 100, 250]:
+        if clock in used:
+            assert f".clk_{clock}  ( clk_{clock}MHz_o )" in svinc
+            assert f"xpm_cdc_async_rst_{clock}MHz_u" in svinc
+        else:
+            assert f"assign clk_{clock}MHz_o = 1'b0;" in svinc
+            assert f"assign rstn_{clock}MHz_o = 1'b0;" in svinc
+
+def test_unknown_clock(flow):
+    # A clock domain which is not an output of the sys_master
+    mbus_csv = open(flow.mbus_csv).read()
+    with open(flow.mbus_csv, "w") as f:
+        f.write(re.sub(r"^MAIN_CLOCK_DOMAIN,\d+", "MAIN_CLOCK_DOMAIN,30", mbus_csv, flags=re.M))
+    result = flow.run("create_clk_wiz_config.py", flow.mbus_csv, check=False)
+    assert result.returncode == 1
+    assert "not clock outputs of the sys_master" in result.stdout
@@ -0,0 +1,50 @@
+# Author: agent <agent@local>
+# Description: Tests of the CVA6 physical memory attributes (create_cva6_pma_rtl.py).
+
+import re
+
+from conftest import XILINX_ROOT
+
+# Rules of each attribute, as (base, end): the memories are cached and executable, with the debug memory,
+# the other slaves (PBUS, CDMA, HLS_CONTROL, PLIC) are non-idempotent
+EXPECTED_RULES = {
+    "embedded" : {
+        "CACHED"         : [(0x0, 0xffff)],
+        "EXECUTE"        : [(0x0, 0x1ffff)],
+        "NON_IDEMPOTENT" : [(0x20000, 0x3ffff), (0x4000000, 0x7ffffff)],
+    },
+    "hpc" : {
+        # BRAM, DDR4CH1 on the MBUS, and DDR4CH0 on the HBUS
+        "CACHED"         : [(0x0, 0xffff), (0x50000, 0x5ffff), (0x80000, 0x8ffff)],
+        "EXECUTE"        : [(0x0, 0x1ffff), (0x50000, 0x5ffff), (0x80000, 0x8ffff)],
+        "NON_IDEMPOTENT" : [(0x20000, 0x4ffff), (0x4000000, 0x7ffffff)],
+    },
+}
+
+def test_is_memory(flow):
+    utils = flow.load("utils")
+    assert [utils.is_memory(name) for name in ["BRAM", "HBM", "DDR4CH0", "DDR4CH1"]] == [True] * 4
+    assert [utils.is_memory(name) for name in ["DM_mem", "HBUS", "HBM_CTRL", "BRAM_CTRL", "PLIC"]] == [False] * 5
+
+def test_rules(flow):
+    create_cva6_pma_rtl = flow.load("create_cva6_pma_rtl")
+    assert create_cva6_pma_rtl.get_pma_rules(flow.read_config()) == EXPECTED_RULES[flow.soc_config]
+
+def test_rtl(flow):
+    flow.run("create_cva6_pma_rtl.py", *flow.bus_csvs)
+    rtl = flow.read_output(f"{XILINX_ROOT}/rtl/uninasoc_pma.svinc")
+    for attribute, rules in EXPECTED_RULES[flow.soc_config].items():
+        assert f"localparam int unsigned PMA_NR_{attribute}_RULES = {len(rules)};" in rtl
+        # Rule 0 in the LSBs
+        bases = re.search(rf"PMA_{attribute}_ADDR_BASE = 1024'\(\{{(.*)\}}\);", rtl).group(1)
+        lengths = re.search(rf"PMA_{attribute}_LENGTH = 1024'\(\{{(.*)\}}\);", rtl).group(1)
+        assert bases == ", ".join(f"64'h{base:016x}" for base, _ in reversed(rules))
+        assert lengths == ", ".join(f"64'h{end - base + 1:016x}" for base, end in reversed(rules))
+
+def test_cached_regions_are_the_linker_memories(flow, tmp_path):
+    # The cached regions are the memory blocks of the linker script
+    ld_file = tmp_path / "user.ld"
+    flow.run("create_linker_script.py", flow.sys_csv, flow.mbus_csv, flow.bus_csvs[2], ld_file)
+    memories = re.findall(r"(\w+) \(\w+\)\s*: ORIGIN = (0x[0-9a-fA-F]+), LENGTH = (0x[0-9a-fA-F]+)", ld_file.read_text())
+    assert sorted((int(base, 16), int(base, 16) + int(length, 16) - 1) for _, base, length in memories) == \
+        EXPECTED_RULES[flow.soc_config]["CACHED"]
@@ -0,0 +1,71 @@
+# Author: agent <agent@local>
+# Description: Tests of the FreeRTOS port header and linker script fragment (create_freertos_config.py).
+
+import re
+
+from conftest import set_property
+
+# CPU clock (Hz), heap memory and size, and tick timer (base address, clock in Hz, PLIC line)
+EXPECTED_CONFIGS = {
+    # TIM0 on the 10 MHz PBUS, after the GPIO_in line
+    "embedded" : (20000000, "BRAM", 0x4000, (0x20600, 10000000, 2)),
+    # The BRAM and the DDR4CH1 have the same bandwidth from the core, the BRAM is faster to reach
+    "hpc"      : (100000000, "BRAM", 0x4000, (0x20020, 250000000, 1)),
+}
+
+def get_property(file_name : str, name : str) -> str:
+    with open(file_name, "r") as f:
+        return next(line.split(",")[1] for line in f.read().splitlines() if line.split(",")[0] == name)
+
+# Generate the header and the linker script fragment, returns the stdout, the #defines and the linker script
+def run(flow, tmp_path) -> tuple:
+    header_file = tmp_path / "uninasoc_freertos.h"
+    ld_file = tmp_path / "uninasoc_freertos.ld"
+    result = flow.run("create_freertos_config.py", flow.sys_csv, *flow.bus_csvs, header_file, ld_file)
+    defines = dict(re.findall(r"#define (config\w+)\s+(.+)", header_file.read_text()))
+    return result.stdout, defines, ld_file.read_text()
+
+def test_config(flow, tmp_path):
+    stdout, defines, ld = run(flow, tmp_path)
+    cpu_clock_hz, heap_memory, heap_size, (timer_base, timer_clock_hz, timer_line) = EXPECTED_CONFIGS[flow.soc_config]
+    assert defines == {
+        "configCPU_CLOCK_HZ": f"( ( unsigned long ) {cpu_clock_hz} )",
+        "configTOTAL_HEAP_SIZE": str(heap_size),
+        "configAPPLICATION_ALLOCATED_HEAP": "1",
+        "configMINIMAL_STACK_SIZE": "256",
+        "configUNINASOC_TIMER_BASE_ADDRESS": f"0x{timer_base:x}",
+        "configUNINASOC_TIMER_CLOCK_HZ": str(timer_clock_hz),
+        "configUNINASOC_TIMER_INTERRUPT": str(timer_line),
+    }
+    assert f"FreeRTOS heap: {heap_size} bytes in {heap_memory}, the fastest memory for RV_SOCKET_DATA" in stdout
+    # The heap is placed in its memory, with the size of the header
+    assert f"        . += 0x{heap_size:x};\n        __freertos_heap_end = .;\n    }}> {heap_memory}" in ld
+    assert "__freertos_irq_stack_size = 0x1000;" in ld
+
+def test_tick_timer_matches_interrupts(flow, tmp_path):
+    # The timer line is the PLIC line of the HAL, and its base address the one in the address map
+    _, defines, _ = run(flow, tmp_path)
+    devices, _ = flow.load("bus_graph").get_address_map(flow.read_config())
+    assert next(d["base"] for d in devices if d["name"] == "TIM0") == int(defines["configUNINASOC_TIMER_BASE_ADDRESS"], 16)
+    hal_file = tmp_path / "uninasoc_conf.h"
+    flow.run("create_uninasoc_conf_header.py", flow.sys_csv, *flow.bus_csvs, hal_file)
+    assert f"#define PLIC_TIM0_INTERRUPT {defines['configUNINASOC_TIMER_INTERRUPT']}" in hal_file.read_text()
+
+def test_xlen64(flow, tmp_path):
+    set_property(flow.sys_csv, "XLEN", "64")
+    _, defines, ld = run(flow, tmp_path)
+    # The same words, twice the bytes
+    assert defines["configMINIMAL_STACK_SIZE"] == "256"
+    assert "__freertos_irq_stack_size = 0x2000;" in ld
+    assert "i.e. 2048 bytes" in (tmp_path / "uninasoc_freertos.h").read_text()
+
+def test_no_tick_timer(flow, tmp_path):
+    # Without the TIM interrupts, there is no tick timer
+    names = get_property(flow.mbus_csv, "INTERRUPT_NAMES").split()
+    kept = [name for name in names if not name.startswith("TIM")]
+    set_property(flow.mbus_csv, "INTERRUPT_NAMES", " ".join(kept))
+    set_property(flow.mbus_csv, "INTERRUPT_PRIORITIES", " ".join(["1"] * len(kept)))
+    stdout, defines, _ = run(flow, tmp_path)
+    assert "No PBUS TIM with a PLIC line for the FreeRTOS tick" in stdout
+    assert not any(name.startswith("configUNINASOC_TIMER") for name in defines)
+    assert "// No PBUS TIM with a PLIC line, the tick timer is up to the application" in (tmp_path / "uninasoc_freertos.h").read_text()
@@ -0,0 +1,48 @@
+# Author: agent <agent@local>
+# Description: Tests of the interrupts mapping (create_interrupts_rtl.py), and of its HAL counterpart.
+
+import re
+
+from conftest import XILINX_ROOT
+
+# PLIC line of each source (line 0 is reserved), and PBUS line of each peripheral interrupt
+EXPECTED_LINES = {
+    "embedded" : ({"GPIO_in": 1, "TIM0": 2, "TIM1": 3, "UART": 4, "CDMA": 5}, {"GPIO_in": 0, "TIM0": 1, "TIM1": 2, "UART": 3}),
+    "hpc"      : ({"TIM0": 1, "TIM1": 2, "UART": 3, "HLS": 4, "CDMA": 5}, {"TIM0": 0, "TIM1": 1, "UART": 2}),
+}
+# Signal of each MBUS-level source
+MBUS_SIGNALS = {
+    "CDMA" : "irq_cdma_to_plic",
+    "HLS"  : "hls_interrupt_to_plic",
+}
+
+def get_params(text : str, pattern : str) -> dict:
+    return {name: int(value) for name, value in re.findall(pattern, text)}
+
+def test_rtl(flow):
+    flow.run("create_interrupts_rtl.py", *flow.bus_csvs)
+    plic_lines, pbus_lines = EXPECTED_LINES[flow.soc_config]
+    declarations = flow.read_output(f"{XILINX_ROOT}/rtl/uninasoc_interrupts.svinc")
+    params = get_params(declarations, r"localparam int unsigned (\w+) = (\d+);")
+    assert params == {
+        "PBUS_NUM_INTERRUPTS": len(pbus_lines),
+        "PLIC_NUM_INTERRUPTS": len(plic_lines),
+        "PLIC_RESERVED_INTERRUPT": 0,
+        **{f"PBUS_{name.upper()}_INTERRUPT": line for name, line in pbus_lines.items()},
+        **{f"PLIC_{name.upper()}_INTERRUPT": line for name, line in plic_lines.items()},
+    }
+
+    pbus_assignments = flow.read_output(f"{XILINX_ROOT}/rtl/pbus_interrupts.svinc")
+    assert re.findall(r"pbus_int\[PBUS_(\w+)_INTERRUPT\] = (\w+);", pbus_assignments) == \
+        [(name.upper(), f"{name.lower()}_int") for name in pbus_lines]
+
+    plic_assignments = flow.read_output(f"{XILINX_ROOT}/rtl/mbus_interrupts.svinc")
+    expected = [("RESERVED", "1'b0")] + [(name.upper(), f"pbus_int_line[PBUS_{name.upper()}_INTERRUPT]" if name in pbus_lines else MBUS_SIGNALS[name]) for name in plic_lines]
+    assert re.findall(r"plic_int_line\[PLIC_(\w+)_INTERRUPT\] = (\S+);", plic_assignments) == expected
+
+def test_hal_lines(flow, tmp_path):
+    hal_file = tmp_path / "uninasoc_conf.h"
+    flow.run("create_uninasoc_conf_header.py", flow.sys_csv, *flow.bus_csvs, hal_file)
+    plic_lines, _ = EXPECTED_LINES[flow.soc_config]
+    defines = get_params(hal_file.read_text(), r"#define (PLIC_\w+_INTERRUPT) (\d+)")
+    assert defines == {f"PLIC_{name.upper()}_INTERRUPT": line for name, line in plic_lines.items()}
@@ -0,0 +1,81 @@
+# Author: agent <agent@local>
+# Description: Tests of the DMA buffer pools (dma_pools.py), and of their placement by the linker script.
+#   The generated linker script is linked with the host binutils (if any), as it is architecture-neutral.
+
+import re
+import shutil
+import subprocess
+
+import pytest
+
+# Pools (memory, alignment, DMA masters) and pool of each DMA master: everything on hpc is reached through a 512-bit link
+EXPECTED_POOLS = {
+    "embedded" : ([("BRAM", 4, ["CDMA"])], {"CDMA": "BRAM"}),
+    "hpc"      : ([("BRAM", 64, ["CDMA", "s_acc"]), ("DDR4CH0", 64, ["CDMA", "s_acc"]), ("DDR4CH1", 64, ["CDMA", "s_acc"])],
+                  {"CDMA": "BRAM", "s_acc": "DDR4CH0"}),
+}
+# Statically allocated DMA buffer, placed before the pool of its memory
+STATIC_BUFFER_BYTES = 100
+
+def set_pool_size(flow, value : str) -> None:
+    # The shipped CSV has no trailing newline, the empty row is skipped
+    with open(flow.sys_csv, "a") as f:
+        f.write(f"\nDMA_POOL_SIZE,{value}\n")
+
+def get_pools(flow) -> dict:
+    return flow.load("dma_pools").get_dma_pools(flow.read_config())
+
+def write_linker_script(flow, tmp_path) -> str:
+    ld_file = tmp_path / "user.ld"
+    flow.run("create_linker_script.py", flow.sys_csv, flow.mbus_csv, flow.bus_csvs[2], ld_file)
+    return ld_file
+
+def test_pools(flow):
+    pools = get_pools(flow)
+    expected_pools, expected_masters = EXPECTED_POOLS[flow.soc_config]
+    assert [(p["memory"], p["align"], p["masters"]) for p in pools["pools"]] == expected_pools
+    assert all(p["size"] == 0x1000 for p in pools["pools"])
+    assert pools["masters"] == expected_masters
+
+def test_pool_size(flow, tmp_path):
+    set_pool_size(flow, "0x2000")
+    assert {p["size"] for p in get_pools(flow)["pools"]} == {0x2000}
+    assert "        . += 0x2000;" in write_linker_script(flow, tmp_path).read_text()
+
+def test_no_pools(flow, tmp_path):
+    set_pool_size(flow, "0")
+    assert get_pools(flow) == {"pools": [], "masters": {}}
+    assert ".dma_pool_" not in write_linker_script(flow, tmp_path).read_text()
+
+def test_hal_defines(flow, tmp_path):
+    hal_file = tmp_path / "uninasoc_conf.h"
+    flow.run("create_uninasoc_conf_header.py", flow.sys_csv, *flow.bus_csvs, hal_file)
+    hal = hal_file.read_text()
+    expected_pools, expected_masters = EXPECTED_POOLS[flow.soc_config]
+    assert dict(re.findall(r"#define DMA_POOL_(\w+)_ALIGN (\d+)u", hal)) == {memory: str(align) for memory, align, _ in expected_pools}
+    assert dict(re.findall(r"#define (\w+)_DMA_POOL (\w+)", hal)) == {master.upper(): memory for master, memory in expected_masters.items()}
+
+@pytest.mark.skipif(any(shutil.which(tool) is None for tool in ["as", "ld", "nm"]), reason="binutils not available")
+def test_linked_pools(flow, tmp_path):
+    ld_file = write_linker_script(flow, tmp_path)
+    memories = {name: (int(base, 16), int(length, 16)) for name, base, length in re.findall(r"(\w+) \(\w+\)\s*: ORIGIN = (0x[0-9a-fA-F]+), LENGTH = (0x[0-9a-fA-F]+)", ld_file.read_text())}
+    expected_pools, _ = EXPECTED_POOLS[flow.soc_config]
+
+    # Some code, and a static buffer in the first pool section
+    first_memory = expected_pools[0][0]
+    source = tmp_path / "app.s"
+    source.write_text(f".text\n.globl _start\n_start:\n.byte 0\n.section .dma_pool_{first_memory},\"aw\",@nobits\n.globl static_buffer\nstatic_buffer:\n.space {STATIC_BUFFER_BYTES}\n")
+    subprocess.run(["as", source, "-o", tmp_path / "app.o"], check=True)
+    subprocess.run(["ld", "-T", ld_file, tmp_path / "app.o", "-o", tmp_path / "app.elf"], check=True, capture_output=True)
+    nm = subprocess.run(["nm", tmp_path / "app.elf"], check=True, capture_output=True, text=True).stdout
+    symbols = {fields[2]: int(fields[0], 16) for fields in (line.split() for line in nm.splitlines()) if len(fields) == 3}
+
+    for memory, align, _ in expected_pools:
+        start, end = symbols[f"_dma_pool_{memory}_start"], symbols[f"_dma_pool_{memory}_end"]
+        base, length = memories[memory]
+        # Aligned, sized and in its memory
+        assert start % align == 0
+        assert end - start == 0x1000
+        assert base <= start and end <= base + length
+    # After the static buffers
+    assert symbols[f"_dma_pool_{first_memory}_start"] >= symbols["static_buffer"] + STATIC_BUFFER_BYTES
@@ -0,0 +1,69 @@
+# Author: agent <agent@local>
+# Description: Tests of the crossbar estimate calibration (estimate_crossbar.py) and of the paths depending on it.
+
+from conftest import FF_COEFFICIENTS, FEATURES, LUT_COEFFICIENTS, TIMING_COEFFICIENTS, fill_database
+
+def assert_close(values : list, expected : list) -> None:
+    assert len(values) == len(expected)
+    assert all(abs(v - e) < 1e-6 for v, e in zip(values, expected)), (values, expected)
+
+def test_uncalibrated(flow):
+    estimate_crossbar = flow.load("estimate_crossbar")
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), flow.soc_config)
+    assert not coefficients["CALIBRATED"]
+    assert coefficients["LUT"] == estimate_crossbar.DEFAULT_LUT_COEFFICIENTS
+
+def test_calibration_from_qor_database(flow):
+    fill_database(flow)
+    estimate_crossbar = flow.load("estimate_crossbar")
+    rows = estimate_crossbar.read_calibration()
+    # One row for each configuration, the implementation one if any
+    assert len(rows) == len(FEATURES)
+    coefficients = estimate_crossbar.calibrate(rows, flow.soc_config)
+    assert coefficients["CALIBRATED"]
+    assert_close(coefficients["LUT"], LUT_COEFFICIENTS)
+    assert_close(coefficients["FF"], FF_COEFFICIENTS)
+    assert_close(coefficients["BRAM"], [0])
+    assert_close(coefficients["TIMING"], TIMING_COEFFICIENTS)
+    # The timing is per SoC
+    other_soc = "hpc" if flow.soc_config == "embedded" else "embedded"
+    assert not estimate_crossbar.calibrate(rows, other_soc)["CALIBRATED"]
+
+def test_invalid_qor_database(flow, tmp_path):
+    (tmp_path / "invalid.sqlite").write_bytes(b"not a database")
+    estimate_crossbar = flow.load("estimate_crossbar")
+    assert estimate_crossbar.read_qor_calibration(str(tmp_path / "invalid.sqlite")) == []
+
+def test_budget_check_requires_calibration(flow):
+    result = flow.run("check_config.py", flow.sys_csv, *flow.bus_csvs, env={"CHECK_BUDGET": "1"}, check=False)
+    assert result.returncode != 0
+    assert "CHECK_BUDGET requires calibrated crossbar estimates" in result.stdout
+    fill_database(flow)
+    flow.run("check_config.py", flow.sys_csv, *flow.bus_csvs, env={"CHECK_BUDGET": "1"})
+
+def test_auto_selection_without_calibration(flow):
+    configs = flow.read_config()
+    mbus_config = flow.get_config(configs, "MBUS")
+    mbus_config.STRATEGY_AUTO = True
+    mbus_config.R_REGISTER_AUTO = True
+    estimate_crossbar = flow.load("estimate_crossbar")
+    select_crossbar_strategy = flow.load("select_crossbar_strategy")
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), flow.soc_config)
+    config = select_crossbar_strategy.select_crossbar_strategy(mbus_config, 100, coefficients)
+    # The preferred candidate: parallel paths for the masters, no read register slice
+    assert (config.STRATEGY, config.R_REGISTER, config.CONNECTIVITY_MODE) == (2, 0, "SAMD")
+    assert config.REGISTER_SLICES == []
+    assert any(line.startswith(estimate_crossbar.UNCALIBRATED_NOTE) for line in config.STRATEGY_RATIONALE)
+    assert not any("Fmax" in line for line in config.STRATEGY_RATIONALE)
+
+def test_auto_selection_with_calibration(flow):
+    fill_database(flow)
+    configs = flow.read_config()
+    mbus_config = flow.get_config(configs, "MBUS")
+    mbus_config.STRATEGY_AUTO = True
+    estimate_crossbar = flow.load("estimate_crossbar")
+    select_crossbar_strategy = flow.load("select_crossbar_strategy")
+    coefficients = estimate_crossbar.calibrate(estimate_crossbar.read_calibration(), flow.soc_config)
+    config = select_crossbar_strategy.select_crossbar_strategy(mbus_config, 100, coefficients)
+    assert not any(estimate_crossbar.UNCALIBRATED_NOTE in line for line in config.STRATEGY_RATIONALE)
+    assert any("Fmax" in line for line in config.STRATEGY_RATIONALE)
@@ -0,0 +1,63 @@
+# Author: agent <agent@local>
+# Description: Tests of the topology search (explore_topologies.py), on a short search with the synthetic calibration.
+
+import json
+
+from conftest import fill_database, set_property
+
+# A short search, reproducible
+SEARCH_ENV = {"SEARCH_GENERATIONS": "2", "SEARCH_POPULATION": "4", "SEARCH_JOBS": "1", "SEARCH_SEED": "1"}
+
+def run_search(flow, tmp_path, check : bool = True):
+    report = tmp_path / "topology_search.json"
+    result = flow.run("explore_topologies.py", flow.sys_csv, *flow.bus_csvs, tmp_path / "topologies", report, env=SEARCH_ENV, check=check)
+    return result, report
+
+def test_uncalibrated(flow, tmp_path):
+    result, report = run_search(flow, tmp_path, check=False)
+    assert result.returncode == 1
+    assert "The area and Fmax objectives require calibrated crossbar estimates" in result.stdout
+    assert not report.exists()
+
+def test_search(flow, tmp_path):
+    fill_database(flow)
+    _, report = run_search(flow, tmp_path)
+    summary = json.loads(report.read_text())
+    assert summary["evaluated"] >= 1 and summary["front"] != []
+    utils = flow.load("utils")
+    for point in summary["front"]:
+        # The buildable points have a complete CSV set, which reads back with the changes of the point
+        if point["build_errors"] != []:
+            assert point["csv_files"] == []
+            continue
+        csv_files = sorted(point["csv_files"])
+        assert [f.rsplit("/", 1)[1] for f in csv_files] == sorted(["config_system.csv", "config_main_bus.csv", "config_peripheral_bus.csv", "config_highperformance_bus.csv"])
+        configs = utils.read_config([f for f in point["csv_files"]])
+        mbus_config = flow.get_config(configs, "MBUS")
+        assert mbus_config.MAIN_CLOCK_DOMAIN == point["changes"].get("MBUS.MAIN_CLOCK_DOMAIN", flow.get_config(flow.read_config(), "MBUS").MAIN_CLOCK_DOMAIN)
+
+def test_sub_bus_point(flow, tmp_path):
+    explore_topologies = flow.load("explore_topologies")
+    if flow.soc_config == "hpc":
+        # The CDMA and the HLS_CONTROL in the same clock domain
+        set_property(flow.mbus_csv, "RANGE_CLOCK_DOMAINS", "100 100 250 100 100 300 300 100")
+    context = explore_topologies.get_context([flow.sys_csv, *flow.bus_csvs])
+    moves = [i for i, knob in enumerate(context["knobs"]) if knob["name"].endswith(".BUS")]
+    assert [context["knobs"][i]["name"] for i in moves] == {"embedded": ["MBUS.CDMA.BUS"], "hpc": ["MBUS.CDMA.BUS", "MBUS.HLS_CONTROL.BUS"]}[flow.soc_config]
+    result = {"key": "test", "objectives": {}, "buses": {}}
+
+    # The current configuration is written
+    point = explore_topologies.write_point(context, result | {"genome": context["genome"]}, str(tmp_path))
+    assert (point["changes"], point["build_errors"], len(point["csv_files"])) == ({}, [], 4)
+
+    # All the candidates on a sub-bus: a single one is not enough for a sub-bus, else the shipped RTL is not wired for it
+    genome = tuple("SUB_BUS" if i in moves else gene for i, gene in enumerate(context["genome"]))
+    point = explore_topologies.write_point(context, result | {"key": "moved", "genome": genome}, str(tmp_path))
+    if flow.soc_config == "embedded":
+        assert point["build_errors"] == [] and len(point["csv_files"]) == 4
+    else:
+        assert "PBUS1 has no crossbar IP (xlnx_pbus1_crossbar)" in point["build_errors"]
+        assert point["csv_files"] == []
+        assert not (tmp_path / "topology_moved").exists()
+        report = explore_topologies.render_report({"evaluated": 1, "pruned": 0, "front": [point | {"objectives": {"bandwidth_mbps": 0, "lut": 0, "ff": 0, "fmax_margin_mhz": 0}}]})
+        assert "proposal only, no CSV set" in report
@@ -0,0 +1,41 @@
+# Author: agent <agent@local>
+# Description: Tests of the connectivity inference (infer_connectivity.py).
+
+def get_reachable(flow, core_selector : str) -> dict:
+    infer_connectivity = flow.load("infer_connectivity")
+    mbus_config = flow.get_config(flow.read_config(), "MBUS")
+    mbus_config = infer_connectivity.infer_connectivity(mbus_config, core_selector)
+    return {
+        master: sorted(
+            slave for slave in mbus_config.RANGE_NAMES
+            if infer_connectivity.is_connected(mbus_config, mbus_config.READ_CONNECTIVITY, master, slave)
+        )
+        for master in mbus_config.MASTER_NAMES
+    }
+
+def test_default_rules(flow):
+    reachable = get_reachable(flow, "CORE_CV32E40P")
+    memories = {"embedded": ["BRAM"], "hpc": ["BRAM", "DDR4CH1", "HBUS"]}[flow.soc_config]
+    assert reachable["RV_SOCKET_INSTR"] == sorted(memories + ["DM_mem"])
+    assert reachable["CDMA"] == sorted(memories)
+    assert reachable["DBG_MASTER"] == sorted(flow.get_config(flow.read_config(), "MBUS").RANGE_NAMES)
+
+def test_no_loop_paths(flow):
+    # The HBUS master doesn't reach the HBUS slave (HBUS -> MBUS -> HBUS)
+    reachable = get_reachable(flow, "CORE_CV32E40P")
+    for master, slaves in reachable.items():
+        assert master not in slaves
+    if flow.soc_config == "hpc":
+        assert "DDR4CH1" in reachable["HBUS"]
+
+def test_single_port_core(flow):
+    # The instruction port of CVA6 is tied off, the data port fetches
+    reachable = get_reachable(flow, "CORE_CV64A6")
+    assert reachable["RV_SOCKET_INSTR"] == []
+    assert "BRAM" in reachable["RV_SOCKET_DATA"]
+
+def test_report(flow):
+    out = flow.run("infer_connectivity.py", flow.sys_csv, *flow.bus_csvs).stdout
+    assert "MBUS: " in out
+    if flow.soc_config == "hpc":
+        assert "    - HBUS -> HBUS" in out
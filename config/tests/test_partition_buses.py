@@ -0,0 +1,91 @@
+# Author: agent <agent@local>
+# Description: Tests of the MBUS partitioning (partition_buses.py), with the shipped RTL and with a synthetic RTL wiring the sub-bus.
+
+import json
+
+import pytest
+
+from conftest import set_property
+
+# On the hpc MBUS, the CDMA and the HLS_CONTROL share a clock domain once the HLS_CONTROL runs at the main clock (100 MHz)
+HPC_CLOCK_DOMAINS = "100 100 250 100 100 300 300 100"
+SUB_BUS_SLAVES = ["CDMA", "HLS_CONTROL"]
+
+# Share the clock domain of the candidate slaves (hpc only, the embedded MBUS has a single candidate)
+def share_clock_domain(flow) -> str:
+    if flow.soc_config != "hpc":
+        pytest.skip("a single candidate slave (CDMA) on the embedded MBUS")
+    set_property(flow.mbus_csv, "RANGE_CLOCK_DOMAINS", HPC_CLOCK_DOMAINS)
+    with open(flow.mbus_csv, "r") as f:
+        return f.read()
+
+# Write a synthetic RTL wiring the sub-bus PBUS1 (or the slaves to the MBUS, as the shipped RTL), and its crossbar IP
+def write_xilinx_root(tmp_path, wired : bool) -> str:
+    xilinx_root = tmp_path / "xilinx"
+    (xilinx_root / "rtl").mkdir(parents=True)
+    links = ["MBUS_to_PBUS1"] + [f"PBUS1_to_{slave}" for slave in SUB_BUS_SLAVES] if wired else [f"MBUS_to_{slave}" for slave in SUB_BUS_SLAVES]
+    (xilinx_root / "rtl" / "uninasoc.sv").write_text("\n".join(f"    .s_axi_awaddr ( {link}_axi_awaddr )," for link in links) + "\n")
+    if wired:
+        (xilinx_root / "ips" / "common" / "xlnx_pbus1_crossbar").mkdir(parents=True)
+    return str(xilinx_root)
+
+def test_candidates(flow, tmp_path):
+    partition_buses = flow.load("partition_buses")
+    configs = flow.read_config()
+    mbus_config = flow.get_config(configs, "MBUS")
+    # The PLIC is a full AXI4 slave
+    candidates = [mbus_config.RANGE_NAMES[i] for i in partition_buses.get_candidate_slaves(mbus_config, [c.CONFIG_NAME for c in configs])]
+    assert candidates == {"embedded": ["CDMA"], "hpc": SUB_BUS_SLAVES}[flow.soc_config]
+
+    # No group of candidates in the same clock domain
+    report = tmp_path / "bus_partition.json"
+    result = flow.run("partition_buses.py", flow.sys_csv, *flow.bus_csvs, report, env={"PARTITION_APPLY": "1"})
+    assert "MBUS: no slaves to offload" in result.stdout
+    assert json.loads(report.read_text())["sub_buses"] == []
+
+def test_apply_refused(flow, tmp_path):
+    mbus_csv = share_clock_domain(flow)
+    report = tmp_path / "bus_partition.json"
+    result = flow.run("partition_buses.py", flow.sys_csv, *flow.bus_csvs, report, env={"PARTITION_APPLY": "1"}, check=False)
+    assert result.returncode == 1
+    assert "PARTITION_APPLY refused" in result.stdout
+    # The shipped RTL wires the slaves to the MBUS, and there is no sub-bus
+    summary = json.loads(report.read_text())
+    assert [(s["name"], s["clock_domain"], s["slaves"]) for s in summary["sub_buses"]] == [("PBUS1", 100, SUB_BUS_SLAVES)]
+    errors = summary["build_errors"]
+    assert any(e.startswith("CDMA is still wired to the MBUS (uninasoc.sv:") for e in errors)
+    assert "PBUS1 is not wired to the MBUS (MBUS_to_PBUS1 not found in the RTL)" in errors
+    assert "PBUS1 has no crossbar IP (xlnx_pbus1_crossbar)" in errors
+    # Nothing written
+    with open(flow.mbus_csv, "r") as f:
+        assert f.read() == mbus_csv
+    assert not (flow.configs_dir / "hpc" / "config_peripheral_bus_1.csv").exists()
+    assert not (flow.output_root / "hw" / "xilinx" / "rtl" / "pbus1_buses.svinc").exists()
+
+def test_build_errors(flow, tmp_path):
+    partition_buses = flow.load("partition_buses")
+    for wired in [False, True]:
+        xilinx_root = write_xilinx_root(tmp_path / str(wired), wired)
+        errors = partition_buses.get_build_errors({"PBUS1": SUB_BUS_SLAVES}, [f"{xilinx_root}/rtl/uninasoc.sv"], [f"{xilinx_root}/ips/common/xlnx_pbus1_crossbar"] if wired else [])
+        assert errors == ([] if wired else [
+            "CDMA is still wired to the MBUS (uninasoc.sv:1), instead of PBUS1_to_CDMA",
+            "HLS_CONTROL is still wired to the MBUS (uninasoc.sv:2), instead of PBUS1_to_HLS_CONTROL",
+            "PBUS1 is not wired to the MBUS (MBUS_to_PBUS1 not found in the RTL)",
+            "PBUS1 has no crossbar IP (xlnx_pbus1_crossbar)",
+        ])
+
+def test_apply(flow, tmp_path):
+    share_clock_domain(flow)
+    xilinx_root = write_xilinx_root(tmp_path, True)
+    report = tmp_path / "bus_partition.json"
+    flow.run("partition_buses.py", flow.sys_csv, *flow.bus_csvs, report, env={"PARTITION_APPLY": "1", "XILINX_ROOT": xilinx_root})
+    # A single MI with the ranges of the moved slaves, at the same addresses
+    mbus_config = flow.get_config(flow.read_config(), "MBUS")
+    assert mbus_config.RANGE_NAMES == ["BRAM", "DM_mem", "PBUS", "DDR4CH1", "HBUS", "PLIC", "PBUS1"]
+    assert mbus_config.ADDR_RANGES == 2
+    assert mbus_config.BASE_ADDR[-2:] == ["0x30000", "0x40000"]
+    configs = flow.load("utils").read_config([flow.sys_csv, *flow.bus_csvs, str(flow.configs_dir / "hpc" / "config_peripheral_bus_1.csv")])
+    pbus1_config = flow.get_config(configs, "PBUS1")
+    assert (pbus1_config.PROTOCOL, pbus1_config.RANGE_NAMES) == ("AXI4LITE", SUB_BUS_SLAVES)
+    assert "PBUS1_to_CDMA" in (tmp_path / "xilinx" / "rtl" / "pbus1_buses.svinc").read_text()
+    assert "MBUS_to_CDMA" not in (tmp_path / "xilinx" / "rtl" / "mbus_buses.svinc").read_text()
@@ -0,0 +1,72 @@
+# Author: agent <agent@local>
+# Description: Tests of the data-width converters plan (plan_dwidth_converters.py), on the shipped configurations.
+
+import json
+
+# Width (bits) and clock (MHz) of each bus, converters (location, kind, SI width, MI width) and narrowed high-traffic paths
+EXPECTED_PLANS = {
+    "embedded" : {
+        "buses"      : {"MBUS": {"width": 32, "clock": 20}, "PBUS": {"width": 32, "clock": 10}},
+        "converters" : [],
+        "narrowed"   : [],
+    },
+    "hpc" : {
+        "buses"      : {"MBUS": {"width": 32, "clock": 100}, "PBUS": {"width": 32, "clock": 250}, "HBUS": {"width": 512, "clock": 300}},
+        "converters" : [
+            ("MBUS -> HBUS", "upsizer", 32, 512),
+            ("MBUS -> DDR4CH1", "upsizer", 32, 512),
+            ("SYS_MASTER -> MBUS", "downsizer", 64, 32),
+            ("HBUS -> MBUS", "downsizer", 512, 32),
+        ],
+        "narrowed"   : ["SYS_MASTER -> DDR4CH0", "SYS_MASTER -> DDR4CH1", "s_acc -> DDR4CH1"],
+    },
+}
+
+def get_plan(flow) -> dict:
+    plan_dwidth_converters = flow.load("plan_dwidth_converters")
+    configs = flow.read_config()
+    core_selector = flow.get_config(configs, "SYS").CORE_SELECTOR
+    configs = [flow.load("infer_connectivity").infer_connectivity(c, core_selector) for c in configs]
+    return plan_dwidth_converters.plan_dwidth_converters(configs)
+
+def get_path(summary : dict, master : str, slave : str) -> dict:
+    return next(p for p in summary["paths"] if p["master"] == master and p["slave"] == slave)
+
+def test_plan(flow):
+    summary = get_plan(flow)
+    expected = EXPECTED_PLANS[flow.soc_config]
+    assert summary["buses"] == expected["buses"]
+    assert [(c["location"], c["kind"], c["si_width"], c["mi_width"]) for c in summary["converters"]] == expected["converters"]
+    assert summary["narrowed"] == expected["narrowed"]
+
+    # The PBUS is reached through the MBUS, and capped by the slower PBUS clock on embedded
+    uart = get_path(summary, "RV_SOCKET_DATA", "UART")
+    assert uart["route"] == ["MBUS", "PBUS"]
+    assert (uart["bandwidth_mbps"], uart["bottleneck"]) == {"embedded": (40, "PBUS"), "hpc": (400, "RV_SOCKET_DATA")}[flow.soc_config]
+    # The instruction port only reaches the memories
+    assert {p["slave"] for p in summary["paths"] if p["master"] == "RV_SOCKET_INSTR"} == \
+        {"embedded": {"BRAM", "DM_mem"}, "hpc": {"BRAM", "DM_mem", "DDR4CH0", "DDR4CH1"}}[flow.soc_config]
+
+def test_loopback_paths(flow):
+    summary = get_plan(flow)
+    if flow.soc_config != "hpc":
+        assert summary["proposals"] == []
+        return
+    # The accelerator reaches the MBUS slaves through the HBUS loopback, narrowed by the MBUS
+    ddr = get_path(summary, "s_acc", "DDR4CH1")
+    assert ddr["route"] == ["HBUS", "MBUS"]
+    assert (ddr["bandwidth_mbps"], ddr["bottleneck"], ddr["narrowed_to"]) == (400, "MBUS", 32)
+    assert get_path(summary, "s_acc", "DDR4CH0")["bandwidth_mbps"] == 512 // 8 * 300
+    # Moving the DDR channel to the HBUS lifts the accelerator cap, and keeps the others
+    [proposal] = summary["proposals"]
+    assert (proposal["slave"], proposal["from_bus"], proposal["to_bus"]) == ("DDR4CH1", "MBUS", "HBUS")
+    masters = {m["master"]: (m["before_mbps"], m["after_mbps"]) for m in proposal["masters"]}
+    assert masters["s_acc"] == (400, 19200)
+    assert all(before == after for name, (before, after) in masters.items() if name != "s_acc")
+
+def test_report(flow, tmp_path):
+    report = tmp_path / "dwidth_plan.json"
+    result = flow.run("plan_dwidth_converters.py", flow.sys_csv, *flow.bus_csvs, report)
+    summary = json.loads(report.read_text())
+    assert summary["narrowed"] == EXPECTED_PLANS[flow.soc_config]["narrowed"]
+    assert f"Data-width converters: {len(summary['converters'])}" in result.stdout
@@ -0,0 +1,64 @@
+# Author: agent <agent@local>
+# Description: Tests of the layered property store (property_store.py), with an overlay adding properties.
+
+from conftest import XILINX_ROOT
+
+# Second address range of the BRAM, above the address map
+BRAM_SECOND_RANGE = (0x10000000, 16)
+
+# Write a local overlay of the MBUS adding ADDR_RANGES 2, with the second range of the BRAM and an unused one for the others
+def write_overlay(flow) -> dict:
+    mbus_config = flow.get_config(flow.read_config(), "MBUS")
+    base_addrs = []
+    addr_widths = []
+    for name, base, width in zip(mbus_config.RANGE_NAMES, mbus_config.BASE_ADDR, mbus_config.RANGE_ADDR_WIDTH):
+        second_base, second_width = BRAM_SECOND_RANGE if name == "BRAM" else (0xffffffffffffffff, 0)
+        base_addrs += [base, hex(second_base)]
+        addr_widths += [str(width), str(second_width)]
+    overlay = {
+        "RANGE_BASE_ADDR": " ".join(base_addrs),
+        "RANGE_ADDR_WIDTH": " ".join(addr_widths),
+        # Added after the ranges it sizes
+        "ADDR_RANGES": "2",
+    }
+    flow.local_dir.mkdir(exist_ok=True)
+    (flow.local_dir / "config_main_bus.csv").write_text("Property,Value\n" + "".join(f"{name},{value}\n" for name, value in overlay.items()))
+    flow.load("property_store").invalidate_store(flow.mbus_csv)
+    return overlay
+
+def test_parse_order(flow):
+    property_store = flow.load("property_store")
+    items = [("RANGE_BASE_ADDR", "0x0"), ("NUM_MI", "1"), ("RANGE_NAMES", "BRAM"), ("ADDR_RANGES", "1"), ("CONNECTIVITY_MODE", "SASD"), ("STRATEGY", "1")]
+    # The dependencies first, in PARSE_ORDER, then the others in their order
+    assert property_store.get_parse_order(items) == [
+        ("NUM_MI", "1"), ("ADDR_RANGES", "1"), ("STRATEGY", "1"), ("CONNECTIVITY_MODE", "SASD"), ("RANGE_BASE_ADDR", "0x0"), ("RANGE_NAMES", "BRAM"),
+    ]
+
+def test_overlay_adds_properties(flow):
+    overlay = write_overlay(flow)
+    store = flow.load("property_store").load_store(flow.mbus_csv)
+    # Overridden properties keep their position, added properties are appended, all from the overlay
+    names = [name for name, _ in store.items()]
+    assert names[-1] == "ADDR_RANGES"
+    assert names.index("RANGE_BASE_ADDR") < names.index("ADDR_RANGES")
+    assert all(store.is_overridden(name) and store.get(name) == value for name, value in overlay.items())
+    assert store.get_provenance("ADDR_RANGES") == f"{flow.local_dir / 'config_main_bus.csv'}:4"
+    assert [name for name, _ in store.parse_items()].index("ADDR_RANGES") < names.index("RANGE_BASE_ADDR")
+
+    # The ranges are parsed with the overlay ADDR_RANGES
+    mbus_config = flow.get_config(flow.read_config(), "MBUS")
+    assert mbus_config.ADDR_RANGES == 2
+    assert mbus_config.BASE_ADDR == overlay["RANGE_BASE_ADDR"].split()
+    assert mbus_config.RANGE_ADDR_WIDTH == [int(width) for width in overlay["RANGE_ADDR_WIDTH"].split()]
+
+def test_overlay_flow(flow):
+    write_overlay(flow)
+    flow.run("check_config.py", flow.sys_csv, *flow.bus_csvs)
+    # The crossbar and the linker script follow the second range
+    tcl_file = f"{XILINX_ROOT}/ips/common/xlnx_main_crossbar/config.tcl"
+    flow.run("create_crossbar_config.py", flow.sys_csv, flow.mbus_csv, tcl_file, flow.mbus_csv, *flow.bus_csvs)
+    tcl = flow.read_output(tcl_file)
+    assert "CONFIG.ADDR_RANGES {2}" in tcl
+    assert f"CONFIG.M00_A01_BASE_ADDR {{{hex(BRAM_SECOND_RANGE[0])}}}" in tcl
+    devices, _ = flow.load("bus_graph").get_address_map(flow.read_config())
+    assert any(d["base"] == BRAM_SECOND_RANGE[0] for d in devices)
@@ -0,0 +1,114 @@
+# Author: agent <agent@local>
+# Description: Tests of the config-to-QoR database (qor_database.py), on synthetic Vivado reports.
+
+import sqlite3
+
+# Crossbar results of the synthetic reports: LUT, FF, RAMB36, RAMB18
+RESULTS = {
+    "MBUS" : (1500, 900, 1, 2),
+    "PBUS" : (300, 200, 0, 0),
+}
+# Slack of each clock in the synthetic timing summary (ns)
+CLOCK_WNS_NS = 1.5
+
+def render_utilization(results : dict) -> str:
+    ips = {"MBUS": "xlnx_main_crossbar", "PBUS": "xlnx_peripheral_crossbar"}
+    lines = [
+        "+----------+--------+------------+-----+--------+--------+",
+        "| Instance | Module | Total LUTs | FFs | RAMB36 | RAMB18 |",
+        "+----------+--------+------------+-----+--------+--------+",
+        "| uninasoc | (top)  | 99999 | 99999 | 99 | 99 |",
+    ]
+    for bus, (lut, ff, ramb36, ramb18) in results.items():
+        lines.append(f"|   {ips[bus]}_u | {ips[bus]} | {lut} | {ff} | {ramb36} | {ramb18} |")
+    return "\n".join(lines) + "\n"
+
+def render_timing_summary(clocks : list) -> str:
+    lines = [
+        "| Design Timing Summary",
+        "| ---------------------",
+        "------------------------------------",
+        "",
+        "    WNS(ns)      TNS(ns)  TNS Failing Endpoints  TNS Total Endpoints      WHS(ns)",
+        "    -------      -------  ---------------------  -------------------      -------",
+        "      0.250        0.000                      0                 1234        0.030",
+        "",
+        "| Clock Summary",
+        "| -------------",
+        "------------------------------------",
+        "",
+        "Clock        Waveform(ns)       Period(ns)      Frequency(MHz)",
+        "-----        ------------       ----------      --------------",
+    ]
+    lines += [f"clk_{clock}  {{0.000 {500 / clock:.3f}}}  {1000 / clock:.3f}  {clock:.3f}" for clock in clocks]
+    lines += [
+        "",
+        "| Intra Clock Table",
+        "| -----------------",
+        "------------------------------------",
+        "",
+        "Clock  WNS(ns)  TNS(ns)  TNS Failing Endpoints  TNS Total Endpoints  WHS(ns)  THS(ns)  THS Failing Endpoints  THS Total Endpoints",
+        "-----  -------  -------  ---------------------  -------------------  -------  -------  ---------------------  -------------------",
+    ]
+    lines += [f"clk_{clock}  {CLOCK_WNS_NS:.3f}  0.000  0  100  0.050  0.000  0  100" for clock in clocks]
+    return "\n".join(lines) + "\n"
+
+# Write the reports of a build, with a clock for each bus
+def write_reports(flow, reports_dir) -> dict:
+    utils = flow.load("utils")
+    configs = flow.read_config()
+    clocks = {bus: utils.get_bus_clock_domain(configs, flow.get_config(configs, bus)) for bus in RESULTS}
+    reports_dir.mkdir(parents=True)
+    (reports_dir / "post_impl_utilization.rpt").write_text(render_utilization(RESULTS))
+    (reports_dir / "post_impl_timing_summary.rpt").write_text(render_timing_summary(sorted(set(clocks.values()))))
+    return clocks
+
+def test_ingest(flow, tmp_path):
+    clocks = write_reports(flow, tmp_path / "reports")
+    database_file = tmp_path / "qor.sqlite"
+    result = flow.run("qor_database.py", database_file, "ingest", flow.sys_csv, *flow.bus_csvs, tmp_path / "reports")
+    assert f"Ingested {len(RESULTS)} new results" in result.stdout
+
+    db = sqlite3.connect(database_file)
+    db.row_factory = sqlite3.Row
+    rows = {row["BUS"]: row for row in db.execute("SELECT * FROM qor_view")}
+    assert sorted(rows) == sorted(RESULTS)
+    for bus, (lut, ff, ramb36, ramb18) in RESULTS.items():
+        row = rows[bus]
+        assert (row["STAGE"], row["SOC_CONFIG"], row["CLOCK_MHZ"]) == ("post_impl", flow.soc_config, clocks[bus])
+        assert (row["LUT"], row["FF"], row["BRAM"]) == (lut, ff, ramb36 + ramb18 / 2)
+        assert (row["WNS_NS"], row["WHS_NS"], row["CLOCK_NAME"]) == (0.25, 0.03, f"clk_{clocks[bus]}")
+        assert row["CLOCK_WNS_NS"] == CLOCK_WNS_NS
+        assert row["FMAX_MHZ"] == round(1000 / (1000 / clocks[bus] - CLOCK_WNS_NS), 1)
+        # The estimate features, for the calibration
+        assert row["LOGIC_LEVELS"] > 0
+    db.close()
+
+    # Ingesting the same reports again is a no-op
+    result = flow.run("qor_database.py", database_file, "ingest", flow.sys_csv, *flow.bus_csvs, tmp_path / "reports")
+    assert "Ingested 0 new results" in result.stdout
+
+    result = flow.run("qor_database.py", database_file, "query", "SELECT BUS, LUT FROM qor_view ORDER BY BUS")
+    assert result.stdout.splitlines() == ["BUS,LUT"] + [f"{bus},{RESULTS[bus][0]}" for bus in sorted(RESULTS)]
+
+def test_ambiguous_timing_summary(flow, tmp_path):
+    write_reports(flow, tmp_path / "reports" / "run_1")
+    (tmp_path / "reports" / "run_2").mkdir()
+    (tmp_path / "reports" / "run_2" / "post_impl_timing_summary.rpt").write_text(render_timing_summary([100]))
+    (tmp_path / "reports" / "run_1" / "post_impl_timing_summary.rpt").rename(tmp_path / "reports" / "post_impl_timing_summary.rpt")
+    result = flow.run("qor_database.py", tmp_path / "qor.sqlite", "ingest", flow.sys_csv, *flow.bus_csvs, tmp_path / "reports", check=False)
+    assert result.returncode == 1
+    assert "Ambiguous reports" in result.stdout
+
+def test_out_of_context_utilization(flow, tmp_path):
+    report_file = tmp_path / "xlnx_main_crossbar_utilization_synth.rpt"
+    report_file.write_text("\n".join([
+        "| Site Type | Used | Fixed |",
+        "| Slice LUTs* | 1234 | 0 |",
+        "| Slice Registers | 567 | 0 |",
+        "| Block RAM Tile | 0.5 | 0 |",
+        "| Slice LUTs | 1 | 0 |",
+    ]))
+    qor_database = flow.load("qor_database")
+    assert qor_database.get_stage(str(report_file)) == "synth"
+    assert qor_database.parse_utilization(str(report_file)) == {"MBUS": {"LUT": 1234, "FF": 567, "BRAM": 0.5}}
@@ -0,0 +1,27 @@
+# Author: agent <agent@local>
+# Description: Tests of the configuration matrix (run_config_matrix.py), checks only (the generation runs make).
+
+def get_cell(run_config_matrix, soc_config : str, core : str, xlen : int) -> dict:
+    return next(
+        c for c in run_config_matrix.get_cells()
+        if c["soc_config"] == soc_config and c["core"] == core and c["xlen"] == xlen
+    )
+
+def test_cells(flow):
+    run_config_matrix = flow.load("run_config_matrix")
+    cells = run_config_matrix.get_cells()
+    boards = {c["board"] for c in cells if c["soc_config"] == flow.soc_config}
+    assert {"embedded": "Nexys-A7-100T-Master", "hpc": "au250"}[flow.soc_config] in boards
+    # A cell for each board, core and XLEN
+    assert len(cells) == len({c["id"] for c in cells})
+    assert len(cells) == len({(c["soc_config"], c["board"]) for c in cells}) * len({c["core"] for c in cells}) * 2
+
+def test_checks(flow):
+    run_config_matrix = flow.load("run_config_matrix")
+    assert run_config_matrix.check_cell(get_cell(run_config_matrix, flow.soc_config, "CORE_CV32E40P", 32))["valid"]
+    assert run_config_matrix.check_cell(get_cell(run_config_matrix, flow.soc_config, "CORE_CV64A6", 64))["valid"]
+    # XLEN must match the core
+    for core, xlen in [("CORE_CV32E40P", 64), ("CORE_CV64A6", 32)]:
+        result = run_config_matrix.check_cell(get_cell(run_config_matrix, flow.soc_config, core, xlen))
+        assert not result["valid"]
+        assert any(f"XLEN={xlen} doesn't match {core}" in error for error in result["errors"])
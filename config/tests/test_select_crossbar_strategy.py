@@ -0,0 +1,80 @@
+# Author: agent <agent@local>
+# Description: Tests of the STRATEGY/R_REGISTER selection (select_crossbar_strategy.py), with synthetic calibrated coefficients.
+
+from conftest import XILINX_ROOT
+
+# Synthetic calibration: the period (ns) is the number of logic levels, i.e. ~167 MHz for 6 levels, 250 MHz with the
+# read register slice (4 levels), on both the MBUS and the embedded PBUS
+COEFFICIENTS = {
+    "LUT": [0, 1, 1, 0],
+    "FF": [0, 1, 1],
+    "BRAM": [0],
+    "TIMING": [0, 1],
+    "CALIBRATED": True,
+}
+
+# Get a bus configuration with STRATEGY and R_REGISTER AUTO
+def get_auto_config(flow, name : str, r_register_auto : bool = True):
+    configs = flow.read_config()
+    config = flow.load("infer_connectivity").infer_connectivity(flow.get_config(configs, name), flow.get_config(configs, "SYS").CORE_SELECTOR)
+    config.STRATEGY_AUTO = True
+    config.R_REGISTER_AUTO = r_register_auto
+    return config
+
+def select(flow, config, clock_domain : int):
+    return flow.load("select_crossbar_strategy").select_crossbar_strategy(config, clock_domain, COEFFICIENTS)
+
+def test_candidates(flow):
+    select_crossbar_strategy = flow.load("select_crossbar_strategy")
+    # STRATEGY 2 forces R_REGISTER 0
+    assert select_crossbar_strategy.get_candidates(get_auto_config(flow, "MBUS")) == [(1, 0), (1, 1), (2, 0)]
+    assert select_crossbar_strategy.get_candidates(get_auto_config(flow, "MBUS", r_register_auto=False)) == [(1, 0), (2, 0)]
+
+def test_preferred(flow):
+    # All the candidates reach 100 MHz + 10%: parallel paths for the masters of the MBUS, a shared datapath for the single PBUS master
+    mbus_config = select(flow, get_auto_config(flow, "MBUS"), 100)
+    assert (mbus_config.STRATEGY, mbus_config.R_REGISTER, mbus_config.CONNECTIVITY_MODE) == (2, 0, "SAMD")
+    assert mbus_config.STRATEGY_RATIONALE[0] == "STRATEGY 2 (maximize performance), R_REGISTER 0, CONNECTIVITY_MODE SAMD"
+    assert "SAMD preferred for parallel paths" in mbus_config.STRATEGY_RATIONALE[1]
+    pbus_config = select(flow, get_auto_config(flow, "PBUS"), 100)
+    assert (pbus_config.STRATEGY, pbus_config.R_REGISTER, pbus_config.CONNECTIVITY_MODE) == (1, 0, "SASD")
+    assert pbus_config.STRATEGY_RATIONALE[1].startswith("single master bus: SASD preferred")
+
+def test_register_slice_for_timing(flow):
+    # Only the read register slice reaches 200 MHz + 10%
+    config = select(flow, get_auto_config(flow, "MBUS"), 200)
+    assert (config.STRATEGY, config.R_REGISTER, config.CONNECTIVITY_MODE) == (1, 1, "SASD")
+    assert config.STRATEGY_RATIONALE[-1] == "R_REGISTER 1: without the read register slice the estimated Fmax misses the clock"
+    assert config.REGISTER_SLICES == []
+
+def test_over_budget(flow):
+    config = get_auto_config(flow, "MBUS")
+    config.LUT_BUDGET = 1
+    config = select(flow, config, 100)
+    # The smallest candidate, without the FF of the register slice
+    assert (config.STRATEGY, config.R_REGISTER) == (1, 0)
+    assert config.STRATEGY_RATIONALE[-1].startswith("no candidate fits LUT_BUDGET 1 / FF_BUDGET 0, smallest selected")
+
+def test_timing_missed(flow):
+    # Nothing reaches 300 MHz + 10%: the fastest candidate, and the ports on the widest muxes
+    config = select(flow, get_auto_config(flow, "MBUS"), 300)
+    assert (config.STRATEGY, config.R_REGISTER) == (1, 1)
+    assert config.REGISTER_SLICES != []
+    assert all(port.startswith(("S", "M")) for port in config.REGISTER_SLICES)
+    assert config.STRATEGY_RATIONALE[-1] == f"register slices suggested on the widest muxes: {', '.join(config.REGISTER_SLICES)}"
+
+def test_not_auto(flow):
+    configs = flow.read_config()
+    config = flow.get_config(configs, "MBUS")
+    assert select(flow, config, 300).STRATEGY_RATIONALE == config.STRATEGY_RATIONALE == []
+
+def test_crossbar_config_rationale(flow):
+    with open(flow.mbus_csv, "a") as f:
+        f.write("STRATEGY,AUTO\nR_REGISTER,AUTO\n")
+    tcl_file = f"{XILINX_ROOT}/ips/common/xlnx_main_crossbar/config.tcl"
+    result = flow.run("create_crossbar_config.py", flow.sys_csv, flow.mbus_csv, tcl_file, flow.mbus_csv, *flow.bus_csvs)
+    # Uncalibrated: the preferred candidate, recorded at the end of the TCL
+    assert "MBUS: STRATEGY 2 (maximize performance), R_REGISTER 0, CONNECTIVITY_MODE SAMD" in result.stdout
+    tcl = flow.read_output(tcl_file)
+    assert "CONFIG.STRATEGY {2}" in tcl
+    assert "\n# STRATEGY 2 (maximize performance), R_REGISTER 0, CONNECTIVITY_MODE SAMD" in tcl
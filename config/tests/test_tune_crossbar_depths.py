@@ -0,0 +1,47 @@
+# Author: agent <agent@local>
+# Description: Tests of the crossbar depths tuning (tune_crossbar_depths.py).
+
+import json
+
+def test_littles_law(flow):
+    configuration = flow.load("configuration")
+    tune_crossbar_depths = flow.load("tune_crossbar_depths")
+    config = configuration.Configuration()
+    config.NUM_SI, config.NUM_MI = 1, 1
+    # A master demanding 0.5 transactions per cycle to a slave with a 30-cycle latency
+    get_throughputs = lambda acceptance, issuing, shared: tune_crossbar_depths.get_direction_slave_throughputs(
+        config, [[0.5]], [30], [acceptance], [issuing], shared)
+    assert get_throughputs(4, 32, False) == [4 / 30]
+    assert get_throughputs(32, 3, False) == [3 / 30]
+    # Enough depth for the demand
+    assert get_throughputs(32, 32, False) == [0.5]
+    # A single transaction at a time
+    assert get_throughputs(32, 32, True) == [1 / 30]
+
+def test_tune(flow, tmp_path):
+    report = tmp_path / "crossbar_depths.json"
+    flow.run("tune_crossbar_depths.py", flow.sys_csv, *flow.bus_csvs, report)
+    summaries = {s["bus"]: s for s in json.loads(report.read_text())}
+    configs = flow.read_config()
+    assert sorted(summaries) == sorted(c.CONFIG_NAME for c in configs if c.CONFIG_NAME != "SYS" and c.PROTOCOL != "DISABLE")
+    for bus, s in summaries.items():
+        # Within the budget, the area of the current configuration
+        assert s["after"]["LUT"] <= s["budget"]["LUT"] and s["after"]["FF"] <= s["budget"]["FF"]
+        assert (s["budget"]["LUT"], s["budget"]["FF"]) == (s["before"]["LUT"], s["before"]["FF"])
+        assert s["after"]["throughput"] >= s["before"]["throughput"]
+        # The settings are written back to the bus CSVs
+        config = flow.get_config(configs, bus)
+        for name, value in s["settings"].items():
+            assert getattr(config, name) == value, name
+    # The MBUS to HBUS and DDR paths are the long-latency ones
+    if flow.soc_config == "hpc":
+        mbus_config = flow.get_config(configs, "MBUS")
+        issuing = dict(zip(mbus_config.RANGE_NAMES, mbus_config.MI_READ_ISSUING))
+        assert issuing["HBUS"] > issuing["BRAM"]
+
+def test_write_back(flow, tmp_path):
+    csv_file = tmp_path / "config_bus.csv"
+    csv_file.write_text("PROTOCOL,AXI4\nNUM_SI,2\nSI_READ_ACCEPTANCE,2 2\n")
+    tune_crossbar_depths = flow.load("tune_crossbar_depths")
+    assert tune_crossbar_depths.write_back(str(csv_file), {"SI_READ_ACCEPTANCE": [4, 8], "CONNECTIVITY_MODE": "SAMD"})
+    assert csv_file.read_text() == "PROTOCOL,AXI4\nNUM_SI,2\nSI_READ_ACCEPTANCE,4 8\nCONNECTIVITY_MODE,SAMD\n"
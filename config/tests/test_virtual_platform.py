@@ -0,0 +1,180 @@
+# Author: agent <agent@local>
+# Description: Tests of the host-side virtual platform (virtual_platform.py): the regions of the address map,
+#   the ELF loader, the peripheral models and their interrupts, and the sparse memories.
+
+import json
+import re
+
+import pytest
+
+from conftest import write_elf
+
+# Two adjacent segments in the BRAM, the second one with a .bss part
+TEXT = bytes(range(256)) * 3
+DATA = b"\x5a" * 100
+BSS_BYTES = 60
+SEGMENTS = [(0x100, TEXT, len(TEXT)), (0x100 + len(TEXT), DATA, len(DATA) + BSS_BYTES)]
+
+# Large sparse memory, as a 30-bit window, and the host bytes allowed for a few written words
+LARGE_MEMORY_BYTES = 1 << 30
+RESIDENT_BYTES_LIMIT = 1 << 20
+
+def get_platform(flow, models : dict = None):
+    virtual_platform = flow.load("virtual_platform")
+    return virtual_platform, virtual_platform.VirtualPlatform(flow.read_config(), models)
+
+# Get the PLIC line of a device in the HAL header
+def get_hal_line(flow, tmp_path, name : str) -> int:
+    hal_file = tmp_path / "uninasoc_conf.h"
+    flow.run("create_uninasoc_conf_header.py", flow.sys_csv, *flow.bus_csvs, hal_file)
+    return int(re.search(rf"#define PLIC_{name.upper()}_INTERRUPT (\d+)", hal_file.read_text()).group(1))
+
+def test_regions(flow):
+    devices, _ = flow.load("bus_graph").get_address_map(flow.read_config())
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        regions = {r["name"]: r for r in platform.get_summary()}
+    # A region for each range of the address map, a model for each device
+    assert [(r["name"], int(r["base"], 16), r["size"]) for r in regions.values()] == [(d["name"], d["base"], d["end"] - d["base"] + 1) for d in devices]
+    assert regions["BRAM"]["model"] == "Memory" and regions["BRAM"]["resident_bytes"] == 0
+    assert (regions["UART"]["model"], regions["TIM0"]["model"], regions["PLIC"]["model"]) == ("UartLite", "Timer", "Peripheral")
+    if flow.soc_config == "embedded":
+        assert (regions["GPIO_out"]["model"], regions["GPIO_in"]["model"]) == ("Gpio", "GpioIn")
+    else:
+        assert regions["DDR4CH0"]["model"] == regions["DDR4CH1"]["model"] == "Memory"
+
+def test_load_elf(flow, tmp_path):
+    elf_file = tmp_path / "app.elf"
+    write_elf(elf_file, SEGMENTS)
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        # A previous image, to be overwritten and zeroed by the .bss
+        platform.write_bytes(0x100, b"\xff" * (len(TEXT) + len(DATA) + BSS_BYTES + 1))
+        image = platform.load_elf(str(elf_file))
+        assert image == {"entry": 0x100, "segments": [
+            {"base": 0x100, "size": len(TEXT), "bss": 0, "region": "BRAM"},
+            {"base": 0x100 + len(TEXT), "size": len(DATA), "bss": BSS_BYTES, "region": "BRAM"},
+        ]}
+        assert platform.read_bytes(0x100, len(TEXT) + len(DATA) + BSS_BYTES + 1) == TEXT + DATA + bytes(BSS_BYTES) + b"\xff"
+        assert platform.read(0x100) == int.from_bytes(TEXT[:4], "little")
+
+def test_load_elf_out_of_map(flow, tmp_path):
+    # The image runs past the BRAM, into the DM_mem
+    elf_file = tmp_path / "app.elf"
+    write_elf(elf_file, [(0xff00, TEXT, len(TEXT))])
+    virtual_platform, platform = get_platform(flow)
+    with platform, pytest.raises(virtual_platform.BusError):
+        platform.load_elf(str(elf_file))
+
+def test_bus_errors(flow):
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        # Unmapped, and across the BRAM and the DM_mem
+        for address in [0x1000000, 0xfffe]:
+            with pytest.raises(virtual_platform.BusError, match=f"0x{address:x}"):
+                platform.read(address)
+        platform.write(0xfffc, 0x12345678)
+        assert platform.read(0xfffc) == 0x12345678
+
+def test_timer_interrupt(flow, tmp_path):
+    line = get_hal_line(flow, tmp_path, "TIM0")
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        timer = next(r for r in platform.regions if r["name"] == "TIM0")
+        load = 1000
+        platform.write(timer["base"] + virtual_platform.TIM_TLR, load)
+        platform.write(timer["base"] + virtual_platform.TIM_TCSR, virtual_platform.TIM_CSR_LOAD)
+        platform.write(timer["base"] + virtual_platform.TIM_TCSR, virtual_platform.TIM_CSR_COUNT_DOWN | virtual_platform.TIM_CSR_RELOAD
+                       | virtual_platform.TIM_CSR_ENABLE_INTERRUPT | virtual_platform.TIM_CSR_ENABLE)
+        # The period is the load value + 2 cycles, on the clock of the PBUS
+        period_ns = (load + 2) * 1000000000 // timer["model"].clock_hz
+        platform.advance(period_ns - 10)
+        assert platform.get_pending_interrupts() == []
+        platform.advance(20)
+        assert platform.get_pending_interrupts() == [line]
+        # Cleared by writing 1 to the interrupt bit, the counter keeps running
+        tcsr = platform.read(timer["base"] + virtual_platform.TIM_TCSR)
+        platform.write(timer["base"] + virtual_platform.TIM_TCSR, tcsr)
+        assert platform.get_pending_interrupts() == []
+        assert platform.read(timer["base"] + virtual_platform.TIM_TCR) <= load
+
+def test_uart(flow, tmp_path):
+    line = get_hal_line(flow, tmp_path, "UART")
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        base = next(r["base"] for r in platform.regions if r["name"] == "UART")
+        uart = platform.get_model("UART")
+        for byte in b"hi":
+            platform.write(base + virtual_platform.UART_TX_FIFO, byte)
+        assert uart.tx == b"hi"
+
+        platform.write(base + virtual_platform.UART_CTRL, virtual_platform.UART_CTRL_ENABLE_INTR)
+        uart.receive(b"x")
+        assert platform.read(base + virtual_platform.UART_STAT) & virtual_platform.UART_STAT_RX_VALID
+        assert platform.get_pending_interrupts() == [line]
+        assert platform.read(base + virtual_platform.UART_RX_FIFO) == ord("x")
+        assert platform.get_pending_interrupts() == []
+
+def test_gpio(flow, tmp_path):
+    if flow.soc_config != "embedded":
+        pytest.skip("no GPIO on the hpc PBUS")
+    line = get_hal_line(flow, tmp_path, "GPIO_in")
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        bases = {r["name"]: r["base"] for r in platform.regions}
+        platform.write(bases["GPIO_out"] + virtual_platform.GPIO_DATA, 0xa5)
+        assert platform.get_model("GPIO_out").history == [(0, 0, 0xa5)]
+
+        # The inputs read back, and their change raises the interrupt once enabled
+        platform.write(bases["GPIO_in"] + virtual_platform.GPIO_GIER, virtual_platform.GPIO_GIER_ENABLE)
+        platform.write(bases["GPIO_in"] + virtual_platform.GPIO_IER, 1)
+        platform.get_model("GPIO_in").set_inputs(0x3)
+        assert platform.read(bases["GPIO_in"] + virtual_platform.GPIO_DATA) == 0x3
+        assert platform.get_pending_interrupts() == [line]
+        platform.write(bases["GPIO_in"] + virtual_platform.GPIO_ISR, 1)
+        assert platform.get_pending_interrupts() == []
+
+def test_caller_models(flow):
+    virtual_platform = flow.load("virtual_platform")
+    class Counter(virtual_platform.Peripheral):
+        def read_register(self, offset : int) -> int:
+            return self.cycles
+    # The caller model replaces the default one of the same prefix
+    with virtual_platform.VirtualPlatform(flow.read_config(), {"TIM": Counter}) as platform:
+        assert type(platform.get_model("TIM0")) is Counter
+        assert type(platform.get_model("UART")) is virtual_platform.UartLite
+
+def test_sparse_memory(flow):
+    virtual_platform = flow.load("virtual_platform")
+    memory = virtual_platform.Memory("DDR", LARGE_MEMORY_BYTES)
+    try:
+        memory.write(LARGE_MEMORY_BYTES - 4, 4, 0xdeadbeef)
+        memory.write(0, 4, 1)
+        assert memory.read(LARGE_MEMORY_BYTES - 4, 4) == 0xdeadbeef
+        # Only the written pages take host memory
+        assert 0 < memory.get_resident_bytes() <= RESIDENT_BYTES_LIMIT
+        memory.clear(0, LARGE_MEMORY_BYTES)
+        assert memory.read(LARGE_MEMORY_BYTES - 4, 4) == 0
+    finally:
+        memory.close()
+
+def test_backing_dir(flow, tmp_path, monkeypatch):
+    # The backing files are kept across platforms
+    monkeypatch.setenv("VP_BACKING_DIR", str(tmp_path / "backing"))
+    virtual_platform, platform = get_platform(flow)
+    with platform:
+        platform.write(0x100, 0x1234)
+    with virtual_platform.VirtualPlatform(flow.read_config()) as platform:
+        assert platform.read(0x100) == 0x1234
+        assert platform.get_summary()[0]["backing"] == str(tmp_path / "backing" / "BRAM.bin")
+
+def test_script(flow, tmp_path):
+    elf_file = tmp_path / "app.elf"
+    write_elf(elf_file, SEGMENTS)
+    report = tmp_path / "virtual_platform.json"
+    result = flow.run("virtual_platform.py", elf_file, flow.sys_csv, *flow.bus_csvs, report)
+    assert f"Loaded {elf_file}, entry 0x100" in result.stdout
+    summary = json.loads(report.read_text())
+    assert [s["region"] for s in summary["image"]["segments"]] == ["BRAM", "BRAM"]
+    # The loaded pages only
+    assert 0 < summary["regions"][0]["resident_bytes"] <= RESIDENT_BYTES_LIMIT
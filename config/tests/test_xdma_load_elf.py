@@ -0,0 +1,69 @@
+# Author: agent <agent@local>
+# Description: Tests of the ELF loader through the XDMA BAR (xdma_load_elf.py), with a regular file standing in for the BAR.
+
+from conftest import ROOT_DIR, write_elf
+
+LOAD_ELF_SCRIPT = f"{ROOT_DIR}/hw/xilinx/scripts/load_binary/xdma_load_elf.py"
+
+# BAR window in the device, and size of the device (covering the BRAM)
+PCIE_BAR = 0x2000
+BAR_FILE_BYTES = PCIE_BAR + 0x10000
+
+# Two adjacent segments in the BRAM, the second one with a zero-fill (.bss) part
+TEXT = bytes(range(256)) * 3
+DATA = b"\x5a" * 100
+BSS_BYTES = 60
+SEGMENTS = [(0x100, TEXT, len(TEXT)), (0x100 + len(TEXT), DATA, len(DATA) + BSS_BYTES)]
+
+# Write the ELF and a BAR file filled with 0xff
+def write_files(tmp_path, segments : list = SEGMENTS) -> tuple:
+    elf_file = tmp_path / "app.elf"
+    write_elf(elf_file, segments)
+    bar_file = tmp_path / "bar"
+    bar_file.write_bytes(b"\xff" * BAR_FILE_BYTES)
+    return elf_file, bar_file
+
+def read_bar(bar_file, address : int, size : int) -> bytes:
+    with open(bar_file, "rb") as f:
+        f.seek(PCIE_BAR + address)
+        return f.read(size)
+
+def test_load(flow, tmp_path):
+    elf_file, bar_file = write_files(tmp_path)
+    # Small chunks, to split the block
+    result = flow.run(LOAD_ELF_SCRIPT, elf_file, bar_file, hex(PCIE_BAR), "true", *flow.bus_csvs, env={"LOAD_ELF_CHUNK_BYTES": "0x100"})
+    assert "2 segments coalesced in 1 blocks" in result.stdout
+    assert f"{BSS_BYTES} zero-fill bytes skipped" in result.stdout
+    assert "Test passed" in result.stdout
+    assert read_bar(bar_file, 0x100, len(TEXT) + len(DATA)) == TEXT + DATA
+    # The zero-fill part is not written, nor anything out of the segments
+    assert read_bar(bar_file, 0x100 + len(TEXT) + len(DATA), BSS_BYTES) == b"\xff" * BSS_BYTES
+    assert read_bar(bar_file, 0, 0x100) == b"\xff" * 0x100
+
+def test_zero_fill(flow, tmp_path):
+    elf_file, bar_file = write_files(tmp_path)
+    flow.run(LOAD_ELF_SCRIPT, elf_file, bar_file, hex(PCIE_BAR), "true", *flow.bus_csvs, env={"LOAD_ELF_ZERO_FILL": "1"})
+    assert read_bar(bar_file, 0x100 + len(TEXT) + len(DATA), BSS_BYTES + 1) == bytes(BSS_BYTES) + b"\xff"
+
+def test_missing_device(flow, tmp_path):
+    elf_file, _ = write_files(tmp_path)
+    result = flow.run(LOAD_ELF_SCRIPT, elf_file, tmp_path / "xdma0_user", hex(PCIE_BAR), "true", *flow.bus_csvs, check=False)
+    assert result.returncode == 1
+    assert "doesn't exist" in result.stdout
+    assert not (tmp_path / "xdma0_user").exists()
+
+def test_segment_out_of_memory(flow, tmp_path):
+    # The DM_mem range follows the BRAM, but it is not a memory region
+    elf_file, bar_file = write_files(tmp_path, [(0xff00, TEXT, len(TEXT))])
+    result = flow.run(LOAD_ELF_SCRIPT, elf_file, bar_file, hex(PCIE_BAR), "true", *flow.bus_csvs, check=False)
+    assert result.returncode == 1
+    assert "doesn't fit any memory region" in result.stdout
+    assert read_bar(bar_file, 0xff00, 0x100) == b"\xff" * 0x100
+
+def test_small_device(flow, tmp_path):
+    elf_file, bar_file = write_files(tmp_path)
+    bar_file.write_bytes(b"\xff" * 0x200)
+    result = flow.run(LOAD_ELF_SCRIPT, elf_file, bar_file, hex(PCIE_BAR), "true", *flow.bus_csvs, check=False)
+    assert result.returncode == 1
+    assert "smaller than the address space" in result.stdout
+    assert bar_file.stat().st_size == 0x200
@@ -56,8 +56,10 @@ package cva6_config_pkg;
   localparam CVA6ConfigDataUserEn = 0;
   localparam CVA6ConfigDataUserWidth = CVA6ConfigXlen;
 
+  // Physical memory attributes (cached, execute and non-idempotent regions), generated from the address map
+  `include "uninasoc_pma.svinc"
+
   // L1 Caches
-  localparam CachedAddrBeg = 64'h8000_0000; // TODO121: align this with config
   localparam CVA6ConfigIcacheByteSize = 16384;
   localparam CVA6ConfigIcacheSetAssoc = 4;
   localparam CVA6ConfigIcacheLineWidth = 128;
@@ -151,15 +153,15 @@ package cva6_config_pkg;
       PMPNapotEn: bit'(1),
       NOCType: config_pkg::NOC_TYPE_AXI4_ATOP,
       // CLICNumInterruptSrc: unsigned'(0),
-      NrNonIdempotentRules: unsigned'(2),
-      NonIdempotentAddrBase: 1024'({64'b0, 64'b0}),
-      NonIdempotentLength: 1024'({64'b0, 64'b0}),
-      NrExecuteRegionRules: unsigned'(1),
-      ExecuteRegionAddrBase: 1024'({64'h0}), // Regions here could be tweaked depending on the system config
-      ExecuteRegionLength: 1024'({64'hffff_ffff_ffff_ffff}), // Regions here could be tweaked depending on the system config
-      NrCachedRegionRules: unsigned'(1),
-      CachedRegionAddrBase: 1024'(CachedAddrBeg),
-      CachedRegionLength: 1024'({64'h40000000}),
+      NrNonIdempotentRules: unsigned'(PMA_NR_NON_IDEMPOTENT_RULES),
+      NonIdempotentAddrBase: PMA_NON_IDEMPOTENT_ADDR_BASE,
+      NonIdempotentLength: PMA_NON_IDEMPOTENT_LENGTH,
+      NrExecuteRegionRules: unsigned'(PMA_NR_EXECUTE_RULES),
+      ExecuteRegionAddrBase: PMA_EXECUTE_ADDR_BASE,
+      ExecuteRegionLength: PMA_EXECUTE_LENGTH,
+      NrCachedRegionRules: unsigned'(PMA_NR_CACHED_RULES),
+      CachedRegionAddrBase: PMA_CACHED_ADDR_BASE,
+      CachedRegionLength: PMA_CACHED_LENGTH,
       MaxOutstandingStores: unsigned'(7),
       DebugEn: bit'(1),
       AxiBurstWriteEn: bit'(0),
@@ -64,13 +64,10 @@ int main() {
     // Init platform
     uninasoc_init();
 
-    // Pre-allocate tensors, aligned to power of two
-    #define ALIGN_I 2048
-    #define ALIGN_W 1024
-    #define ALIGN_O 1024
-    target_type_t I       [N][C][ Y][ X]__attribute__((aligned(ALIGN_I)));
-    target_type_t W       [K][C][ R][ S]__attribute__((aligned(ALIGN_W)));
-    target_type_t O       [N][K][Y1][X1]__attribute__((aligned(ALIGN_O)));
+    // Pre-allocate tensors in the accelerator pool, aligned to the HBUS data width
+    static target_type_t I[N][C][ Y][ X] DMA_BUFFER(S_ACC_DMA_POOL);
+    static target_type_t W[K][C][ R][ S] DMA_BUFFER(S_ACC_DMA_POOL);
+    static target_type_t O[N][K][Y1][X1] DMA_BUFFER(S_ACC_DMA_POOL);
     target_type_t expected[N][K][Y1][X1] = {0};
 
     printf("\n\r");
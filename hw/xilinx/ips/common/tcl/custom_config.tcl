@@ -13,12 +13,16 @@ set unina_soc_dir $::env(XILINX_ROOT)/rtl
 set mem_macro_path ${unina_soc_dir}/uninasoc_mem.svh
 set axi_macro_path ${unina_soc_dir}/uninasoc_axi.svh
 set pkg_path ${unina_soc_dir}/uninasoc_pkg.sv
+set pkg_interrupts_path ${unina_soc_dir}/uninasoc_interrupts.svinc
+set pma_path ${unina_soc_dir}/uninasoc_pma.svinc
 set top_module_path ${dir_name}/${top_module}.sv
 
 # Append svh files and top module
 set src_file_list {}
 lappend src_file_list ${mem_macro_path}
 lappend src_file_list ${axi_macro_path}
+lappend src_file_list ${pkg_interrupts_path}
+lappend src_file_list ${pma_path}
 lappend src_file_list ${pkg_path}
 lappend src_file_list ${top_module_path}
 
@@ -71,6 +71,22 @@ openocd_run:
 	@echo "[INFO] Make sure to kill any instance of hw_server running on the target USB device"
 	${OPENOCD} -f ${OPENOCD_SCRIPT}
 
+#################
+# Load ELF XDMA #
+#################
+
+# For HPC, load the ELF segments directly into BRAM/DDR/HBM through the PCIe BAR of the XDMA (AXI Bridge),
+# validated against the memory map of the bus CSVs, with no debugger involved
+# BAR device: /dev/mem at PCIE_BAR, as xdma_load_binary.sh (or the BAR resource file, with LOAD_ELF_BAR_ADDRESS=0)
+LOAD_ELF_BAR_DEVICE ?= /dev/mem
+LOAD_ELF_BAR_ADDRESS ?= ${PCIE_BAR}
+# Bus configuration files
+LOAD_ELF_CONFIG_CSVS ?= $(addprefix ${CONFIG_ROOT}/configs/${SOC_CONFIG}/config_,main_bus.csv peripheral_bus.csv highperformance_bus.csv)
+
+load_elf_xdma: ${ELF_PATH}
+	sudo -E python3 ${XILINX_SCRIPTS_LOAD_ROOT}/xdma_load_elf.py \
+		${ELF_PATH} ${LOAD_ELF_BAR_DEVICE} ${LOAD_ELF_BAR_ADDRESS} ${LOAD_BINARY_READBACK} ${LOAD_ELF_CONFIG_CSVS}
+
 ##################################
 # Load ELF - Debugger and Loader #
 ##################################
@@ -88,4 +104,4 @@ xsdb_run_elf:
 # PHONIES #
 ###########
 
-.PHONY: load_binary load_binary_embedded load_binary_hpc xsdb_run openocd_run gdb_run
+.PHONY: load_binary load_binary_embedded load_binary_hpc load_elf_xdma xsdb_run openocd_run gdb_run
@@ -42,7 +42,7 @@ module peripheral_bus #(
     parameter int unsigned    LOCAL_DATA_WIDTH  = 32,
     parameter int unsigned    LOCAL_ADDR_WIDTH  = 32,
     parameter int unsigned    LOCAL_ID_WIDTH    = 2,
-    parameter int unsigned    NUM_IRQ           = 4
+    parameter int unsigned    NUM_IRQ           = PBUS_NUM_INTERRUPTS
 )(
     input logic main_clock_i,
     input logic main_reset_ni,
@@ -83,6 +83,13 @@ module peripheral_bus #(
     // EMBEDDED ONLY
     logic gpio_in_int;
 
+    // Assign the peripherals interrupts to the PBUS lines (generated by config)
+    logic [NUM_IRQ-1:0] pbus_int;
+    always_comb begin
+        pbus_int = '0;
+        `include "pbus_interrupts.svinc"
+    end
+
     //////////////////////
     // Clock Converters //
     //////////////////////
@@ -188,13 +195,7 @@ module peripheral_bus #(
 
         // Assign interrupt pins (input to the cdc)
         logic [NUM_IRQ-1:0] cdc_src_in;
-        always_comb begin
-            cdc_src_in = '0;
-            cdc_src_in[PBUS_GPIOIN_INTERRUPT] = gpio_in_int;
-            cdc_src_in[PBUS_TIM0_INTERRUPT]   = tim0_int;
-            cdc_src_in[PBUS_TIM1_INTERRUPT]   = tim1_int;
-            cdc_src_in[PBUS_UART_INTERRUPT]   = uart_int;
-        end
+        assign cdc_src_in = pbus_int;
 
 
         // Output clock converter - convert from PBUS_DOMAIN to MAIN_DOMAIN (mainly used for interrupts)
@@ -216,13 +217,7 @@ module peripheral_bus #(
         `ASSIGN_AXI_BUS (to_dwidth_conv, s)
 
         // Assign interrupt pins
-        always_comb begin
-            int_o = '0;
-            int_o[PBUS_GPIOIN_INTERRUPT] = gpio_in_int;
-            int_o[PBUS_TIM0_INTERRUPT]   = tim0_int;
-            int_o[PBUS_TIM1_INTERRUPT]   = tim1_int;
-            int_o[PBUS_UART_INTERRUPT]   = uart_int;
-        end
+        assign int_o = pbus_int;
     `endif
 
     //////////////////////////
@@ -115,62 +115,6 @@ module sys_master # (
         endcase
     endgenerate
 
-    //////////////////////////
-    // Resets synchronizers //
-    //////////////////////////
-    // Use locked signal as resets generator
-    // NOTE: this is temporary until we introduce a reset generation logic here
-
-    // Reset sync for 10 MHz clock
-    xpm_cdc_async_rst #(
-        .DEST_SYNC_FF    ( 4 ), // Use 4 sync registers
-        .RST_ACTIVE_HIGH ( 0 )  // Use active low reset
-    ) xpm_cdc_async_rst_10MHz_u (
-        .src_arst  ( locked       ),
-        .dest_clk  ( clk_10MHz_o  ),
-        .dest_arst ( rstn_10MHz_o )
-    );
-
-    // Reset sync for 20 MHz clock
-    xpm_cdc_async_rst #(
-        .DEST_SYNC_FF    ( 4 ), // Use 4 sync registers
-        .RST_ACTIVE_HIGH ( 0 )  // Use active low reset
-    ) xpm_cdc_async_rst_20MHz_u (
-        .src_arst  ( locked       ),
-        .dest_clk  ( clk_20MHz_o  ),
-        .dest_arst ( rstn_20MHz_o )
-    );
-
-    // Reset sync for 50 MHz clock
-    xpm_cdc_async_rst #(
-        .DEST_SYNC_FF    ( 4 ), // Use 4 sync registers
-        .RST_ACTIVE_HIGH ( 0 )  // Use active low reset
-    ) xpm_cdc_async_rst_50MHz_u (
-        .src_arst  ( locked       ),
-        .dest_clk  ( clk_50MHz_o  ),
-        .dest_arst ( rstn_50MHz_o )
-    );
-
-    // Reset sync for 100 MHz clock
-    xpm_cdc_async_rst #(
-        .DEST_SYNC_FF    ( 4 ), // Use 4 sync registers
-        .RST_ACTIVE_HIGH ( 0 )  // Use active low reset
-    ) xpm_cdc_async_rst_100MHz_u (
-        .src_arst  ( locked        ),
-        .dest_clk  ( clk_100MHz_o  ),
-        .dest_arst ( rstn_100MHz_o )
-    );
-
-    // Reset sync for 250M Hz clock
-    xpm_cdc_async_rst #(
-        .DEST_SYNC_FF    ( 4 ), // Use 4 sync registers
-        .RST_ACTIVE_HIGH ( 0 )  // Use active low reset
-    ) xpm_cdc_async_rst_250MHz_u (
-        .src_arst  ( locked        ),
-        .dest_clk  ( clk_250MHz_o  ),
-        .dest_arst ( rstn_250MHz_o )
-    );
-
 `ifdef HPC
     // ALVEO
 
@@ -193,17 +137,10 @@ module sys_master # (
     `DECLARE_AXI_BUS(xdma_to_axi_dwidth_converter, XDMA_DATA_WIDTH, LOCAL_ADDR_WIDTH, LOCAL_ID_WIDTH);
     `DECLARE_AXI_BUS(axi_dwidth_converter_to_clock_converter, LOCAL_DATA_WIDTH, LOCAL_ADDR_WIDTH, LOCAL_ID_WIDTH);
 
-    // Clock Wizard
-    xlnx_clk_wiz_hpc clkwiz_u (
-        .clk_in1  ( axi_aclk     ),
-        .resetn   ( axi_aresetn  ),
-        .locked   ( locked       ),
-        .clk_250  ( clk_250MHz_o ),
-        .clk_100  ( clk_100MHz_o ),
-        .clk_50   ( clk_50MHz_o  ),
-        .clk_20   ( clk_20MHz_o  ),
-        .clk_10   ( clk_10MHz_o  )
-    );
+    // Clock Wizard and resets synchronizers (only for the clock domains in use)
+    // Use locked signal as resets generator
+    // NOTE: this is temporary until we introduce a reset generation logic here
+    `include "sys_master_clk_wiz.svinc"
 
     // XDMA Master
     xlnx_xdma xlnx_xdma_u (
@@ -489,16 +426,10 @@ module sys_master # (
     assign m_axi_awregion = '0;
     assign m_axi_arregion = '0;
 
-    // PLL
-    xlnx_clk_wiz clkwiz_u (
-        .clk_in1  ( sys_clock_i  ),
-        .resetn   ( ~sys_reset_i ),
-        .locked   ( locked       ),
-        .clk_100  ( clk_100MHz_o ),
-        .clk_50   ( clk_50MHz_o  ),
-        .clk_20   ( clk_20MHz_o  ),
-        .clk_10   ( clk_10MHz_o  )
-    );
+    // PLL and resets synchronizers (only for the clock domains in use)
+    // Use locked signal as resets generator
+    // NOTE: this is temporary until we introduce a reset generation logic here
+    `include "sys_master_clk_wiz.svinc"
 
     // The JTAG2AXI ip is always built with a 32-bits DWIDTH. We use a DWIDTH
     // converter if the SoC is built at 64 bits. While it is possible to build
@@ -109,7 +109,6 @@ module uninasoc (
     // Local variables //
     /////////////////////
 
-    localparam peripherals_interrupts_num = 4;
     localparam HBUS_AXI_DATAWIDTH = 512;
 
     ///////////////////
@@ -139,7 +138,7 @@ module uninasoc (
     logic [31:0] rv_socket_interrupt_line;
 
     // Peripheral bus interrupts
-    logic [peripherals_interrupts_num-1:0] pbus_int_line;
+    logic [PBUS_NUM_INTERRUPTS-1:0] pbus_int_line;
 
     /////////////////////////////////////////
     // Buses declaration and concatenation //
@@ -646,16 +645,9 @@ module uninasoc (
         plic_int_line = '0;
         rv_socket_interrupt_line = '0;
 
-        // Mapping PLIC input interrupts (only from pbus at the moment)
-        // Mapping is static (refer to uninasoc_pkg.sv)
-        // TODO154: generate by config
-        plic_int_line[PLIC_RESERVED_INTERRUPT]  = 1'b0;
-        plic_int_line[PLIC_GPIOIN_INTERRUPT]    = pbus_int_line[PBUS_GPIOIN_INTERRUPT];
-        plic_int_line[PLIC_TIM0_INTERRUPT]      = pbus_int_line[PBUS_TIM0_INTERRUPT];
-        plic_int_line[PLIC_TIM1_INTERRUPT]      = pbus_int_line[PBUS_TIM1_INTERRUPT];
-        plic_int_line[PLIC_UART_INTERRUPT]      = pbus_int_line[PBUS_UART_INTERRUPT];
-        plic_int_line[PLIC_HLS_INTERRUPT]       = hls_interrupt_to_plic;
-        plic_int_line[PLIC_CDMA_INTERRUPT]      = irq_cdma_to_plic;
+        // Mapping PLIC input interrupts, from the PBUS and the MBUS-level sources
+        // Mapping is generated by config (refer to uninasoc_interrupts.svinc)
+        `include "mbus_interrupts.svinc"
         // Map system-interrupts pins to socket interrupts
         rv_socket_interrupt_line[CORE_EXT_INTERRUPT] = plic_int_irq_o;
 
@@ -720,7 +712,8 @@ module uninasoc (
 
         .LOCAL_DATA_WIDTH   ( PBUS_DATA_WIDTH ),
         .LOCAL_ADDR_WIDTH   ( PBUS_ADDR_WIDTH ),
-        .LOCAL_ID_WIDTH     ( PBUS_ID_WIDTH   )
+        .LOCAL_ID_WIDTH     ( PBUS_ID_WIDTH   ),
+        .NUM_IRQ            ( PBUS_NUM_INTERRUPTS )
 
         ) peripheral_bus_u (
 
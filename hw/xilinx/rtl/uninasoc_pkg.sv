@@ -83,23 +83,10 @@ package uninasoc_pkg;
     localparam int unsigned CORE_TIM_INTERRUPT = 7;     // Real-time Clock Timer
     localparam int unsigned CORE_EXT_INTERRUPT = 11;    // PLIC-to-hart interrupts
 
-    // Peripheral Bus interrupts
-    localparam int unsigned PBUS_GPIOIN_INTERRUPT = 0;      // GPIO In [embedded only]
-    localparam int unsigned PBUS_TIM0_INTERRUPT = 1;        // Timer 0
-    localparam int unsigned PBUS_TIM1_INTERRUPT = 2;        // Timer 1
-    localparam int unsigned PBUS_UART_INTERRUPT = 3;        // UART
-
-    // PLIC Interrupts mapping
-    // We support 32 possible sources of platform interrupts, which are statically mapped
-    // regardless of the configuration.
-    // TODO154: this is static for now, must generate by config
-    localparam int unsigned PLIC_RESERVED_INTERRUPT = 0;    // PLIC line 0 is reserved
-    localparam int unsigned PLIC_GPIOIN_INTERRUPT = 1;      // GPIO In (From PBUS)[embedded only]
-    localparam int unsigned PLIC_TIM0_INTERRUPT = 2;        // Timer 0 (From PBUS)
-    localparam int unsigned PLIC_TIM1_INTERRUPT = 3;        // Timer 1 (From PBUS)
-    localparam int unsigned PLIC_UART_INTERRUPT = 4;        // UART    (From PBUS)
-    localparam int unsigned PLIC_HLS_INTERRUPT = 5;         // HLS     (From HLS core) [HPC only]
-    localparam int unsigned PLIC_CDMA_INTERRUPT = 6;        // CDMA    (From DMA IP)
+    // Peripheral Bus and PLIC interrupts mapping
+    // The PBUS_<NAME>_INTERRUPT and PLIC_<NAME>_INTERRUPT lines are generated by config
+    // (INTERRUPT_NAMES of the PBUS and MBUS), the same mapping is used by the HAL (uninasoc_conf.h)
+    `include "uninasoc_interrupts.svinc"
 
     ///////////////
     // Functions //
@@ -0,0 +1,245 @@
+# Author: agent <agent@local>
+# Description: Load an ELF into the SoC memories through the PCIe BAR of the XDMA (AXI Bridge mode)
+#   1) the PT_LOAD segments of the ELF are validated against the memory regions of the bus CSVs
+#      (BRAM, HBM, DDR4CH*, the same of the linker script): each segment must fit a single region, without overlaps
+#   2) the adjacent segments are coalesced in blocks, and the zero-fill part of the segments (e.g. .bss) is not transferred,
+#      as it is not in the file (set LOAD_ELF_ZERO_FILL=1 to write it anyway)
+#   3) each block is split in CHUNK_BYTES-aligned chunks, each copied into a mapping of the BAR window
+#      at PCIE_BAR + SoC address, as busybox devmem in xdma_load_binary.sh, but in bulk
+#   4) optionally, each block is read back through the BAR and verified against the ELF with streaming hashes (sha256)
+#   The XDMA IP is configured as AXI Bridge (hw/xilinx/ips/hpc/xlnx_xdma/config.tcl), hence there are no DMA channels
+#   (/dev/xdma0_h2c_*): the host accesses the SoC address space through the BAR only.
+#   The device must exist: /dev/mem with the BAR physical address, or the BAR resource file
+#   (/sys/bus/pci/devices/<BDF>/resource0) with address 0. A regular file of the size of the address space
+#   can stand in for the BAR (e.g. for testing), the file offset being the SoC address.
+# Args:
+#   1: ELF file
+#   2: BAR device (e.g. /dev/mem)
+#   3: BAR physical address in the device (e.g. PCIE_BAR for /dev/mem, 0 for a resource file)
+#   4: Whether to read-back data after writing (true, false)
+#   5+: Input configuration files for buses
+
+####################
+# Import libraries #
+####################
+# Parse args
+import sys
+# Get env vars, open the device
+import os
+# Parse the ELF
+import struct
+# Map the ELF and the BAR
+import mmap
+# Timings
+import time
+# Read-back verification
+import hashlib
+# Config scripts (address map)
+sys.path.append(os.environ.get("CONFIG_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../../config")) + "/scripts")
+from utils import read_config, get_address_ranges, is_memory
+
+# Transfer chunk size, and alignment (also the size of the BAR mappings)
+CHUNK_BYTES = int(os.getenv("LOAD_ELF_CHUNK_BYTES", str(4 << 20)), 0)
+# Also write the zero-fill part of the segments
+ZERO_FILL = os.getenv("LOAD_ELF_ZERO_FILL", "0") == "1"
+
+# ELF constants
+ELF_MAGIC = b"\x7fELF"
+ELFCLASS32, ELFCLASS64 = 1, 2
+ELFDATA2LSB = 1
+PT_LOAD = 1
+
+# Print utils
+def print_info(txt : str) -> None:
+    print(f"[LOAD_ELF] {txt}")
+
+def print_error(txt : str) -> None:
+    print(f"[LOAD_ELF][ERROR] {txt}", file=sys.stderr)
+
+###############
+# Parse input #
+###############
+
+# Get the memory regions of the SoC from the bus CSVs, as {name, base, end}
+def get_memory_regions(config_file_names : list) -> list:
+    regions = []
+    for config in read_config(config_file_names):
+        if config.CONFIG_NAME == "SYS" or config.PROTOCOL == "DISABLE":
+            continue
+        for r in get_address_ranges(config.RANGE_NAMES, config.BASE_ADDR, config.RANGE_ADDR_WIDTH, config.ADDR_RANGES):
+            if is_memory(r["device"]):
+                regions.append({"name": r["name"], "base": r["base"], "end": r["end"] + 1})
+    return regions
+
+# Parse the PT_LOAD segments of an ELF, as {offset, paddr, filesz, memsz}
+def get_segments(elf : mmap.mmap) -> list:
+    if elf[:4] != ELF_MAGIC or elf[5] != ELFDATA2LSB or elf[4] not in [ELFCLASS32, ELFCLASS64]:
+        raise ValueError("not a little-endian ELF32/ELF64 file")
+    if elf[4] == ELFCLASS32:
+        phoff, = struct.unpack_from("<I", elf, 0x1c)
+        phentsize, phnum = struct.unpack_from("<HH", elf, 0x2a)
+        header_format, fields = "<IIIIIIII", ["type", "offset", "vaddr", "paddr", "filesz", "memsz", "flags", "align"]
+    else:
+        phoff, = struct.unpack_from("<Q", elf, 0x20)
+        phentsize, phnum = struct.unpack_from("<HH", elf, 0x36)
+        header_format, fields = "<IIQQQQQQ", ["type", "flags", "offset", "vaddr", "paddr", "filesz", "memsz", "align"]
+
+    segments = []
+    for i in range(phnum):
+        header = dict(zip(fields, struct.unpack_from(header_format, elf, phoff + i * phentsize)))
+        if header["type"] == PT_LOAD and header["memsz"] > 0:
+            segments.append({k: header[k] for k in ["offset", "paddr", "filesz", "memsz"]})
+    return sorted(segments, key=lambda s: s["paddr"])
+
+# Validate the segments against the memory regions, returns the region of each segment
+def validate_segments(segments : list, regions : list) -> list:
+    segment_regions = []
+    for i, s in enumerate(segments):
+        region = next((r for r in regions if r["base"] <= s["paddr"] and s["paddr"] + s["memsz"] <= r["end"]), None)
+        if region is None:
+            raise ValueError(f"segment {i} [0x{s['paddr']:x}, 0x{s['paddr'] + s['memsz']:x}) doesn't fit any memory region")
+        if i > 0 and segments[i - 1]["paddr"] + segments[i - 1]["memsz"] > s["paddr"]:
+            raise ValueError(f"segment {i} at 0x{s['paddr']:x} overlaps the previous one")
+        segment_regions.append(region)
+    return segment_regions
+
+# Coalesce the adjacent segments of the same region in blocks, as {region, paddr, size, parts: [(offset, size) or (None, size)]}
+#   - parts with an offset are copied from the ELF, the others are zero-filled
+def coalesce_segments(segments : list, segment_regions : list) -> tuple:
+    blocks = []
+    skipped = 0
+    for s, region in zip(segments, segment_regions):
+        parts = [(s["offset"], s["filesz"])] if s["filesz"] > 0 else []
+        if s["memsz"] > s["filesz"]:
+            if ZERO_FILL:
+                parts.append((None, s["memsz"] - s["filesz"]))
+            else:
+                skipped += s["memsz"] - s["filesz"]
+        size = sum(p[1] for p in parts)
+        if size == 0:
+            continue
+        last = blocks[-1] if blocks != [] else None
+        # Adjacent, in the same region, and not after a skipped zero-fill
+        if last is not None and last["region"] is region and last["paddr"] + last["size"] == s["paddr"]:
+            last["parts"] += parts
+            last["size"] += size
+        else:
+            blocks.append({"region": region, "paddr": s["paddr"], "size": size, "parts": parts})
+    return blocks, skipped
+
+############
+# Transfer #
+############
+
+# Get a view of a block range [start, end) (relative to the block), copying only the zero-filled parts
+def get_block_data(elf : mmap.mmap, block : dict, start : int, end : int):
+    views = []
+    position = 0
+    for offset, size in block["parts"]:
+        lo, hi = max(start, position), min(end, position + size)
+        if lo < hi:
+            views.append(memoryview(elf)[offset + lo - position:offset + hi - position] if offset is not None else bytes(hi - lo))
+        position += size
+    return views[0] if len(views) == 1 else b"".join(views)
+
+# Split a block in chunks, aligned to CHUNK_BYTES in the SoC address space, as (start, end) relative to the block
+def get_chunks(block : dict) -> list:
+    chunks = []
+    start = 0
+    while start < block["size"]:
+        address = block["paddr"] + start
+        end = min(block["size"], start + CHUNK_BYTES - address % CHUNK_BYTES)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+# Map the BAR window of a chunk [start, end) of a block, returns the mapping and the offset of the chunk in it
+def map_chunk(fd : int, bar : int, block : dict, start : int, end : int) -> tuple:
+    address = bar + block["paddr"] + start
+    offset = address % mmap.ALLOCATIONGRANULARITY
+    window = mmap.mmap(fd, offset + end - start, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE, offset=address - offset)
+    return window, offset
+
+# Write a chunk of a block
+def write_chunk(fd : int, bar : int, elf : mmap.mmap, block : dict, start : int, end : int) -> int:
+    window, offset = map_chunk(fd, bar, block, start, end)
+    with window:
+        window[offset:offset + end - start] = get_block_data(elf, block, start, end)
+        # Regular files only, the BAR writes are posted straight to the SoC
+        window.flush()
+    return end - start
+
+# Read back a block and verify it against the ELF, with streaming hashes
+def verify_block(fd : int, bar : int, elf : mmap.mmap, block : dict) -> bool:
+    expected = hashlib.sha256()
+    actual = hashlib.sha256()
+    for start, end in get_chunks(block):
+        expected.update(get_block_data(elf, block, start, end))
+        window, offset = map_chunk(fd, bar, block, start, end)
+        with window:
+            actual.update(window[offset:offset + end - start])
+    return expected.digest() == actual.digest()
+
+########
+# MAIN #
+########
+if __name__ == "__main__":
+    if len(sys.argv) < 6:
+        print("Usage: <ELF_FILE> <BAR_DEVICE> <PCIE_BAR> <READ_BACK> <CONFIG_BUS_CSVS>")
+        sys.exit(1)
+
+    elf_file = sys.argv[1]
+    bar_device = sys.argv[2]
+    bar = int(sys.argv[3], 0)
+    read_back = sys.argv[4] == "true"
+    config_file_names = sys.argv[5:]
+
+    # Never create the device: a missing one is a missing driver/board, or a typo
+    if not os.path.exists(bar_device):
+        print_error(f"BAR device {bar_device} doesn't exist")
+        sys.exit(1)
+
+    with open(elf_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as elf:
+        try:
+            segments = get_segments(elf)
+            segment_regions = validate_segments(segments, get_memory_regions(config_file_names))
+        except (ValueError, struct.error) as e:
+            print_error(f"Invalid ELF {elf_file}: {e}")
+            sys.exit(1)
+        blocks, skipped = coalesce_segments(segments, segment_regions)
+        total = sum(b["size"] for b in blocks)
+        print_info(f"{len(segments)} segments coalesced in {len(blocks)} blocks, {total} bytes to write, {skipped} zero-fill bytes skipped")
+        for block in blocks:
+            print_info(f"  0x{block['paddr']:x} +0x{block['size']:x} ({block['region']['name']})")
+
+        # A regular file must already cover the address space, the mappings don't extend it
+        if os.path.isfile(bar_device) and blocks != [] and os.path.getsize(bar_device) < bar + max(b["paddr"] + b["size"] for b in blocks):
+            print_error(f"BAR device {bar_device} is smaller than the address space of the ELF")
+            sys.exit(1)
+
+        try:
+            fd = os.open(bar_device, os.O_RDWR | os.O_SYNC)
+        except OSError as e:
+            print_error(f"Can't open BAR device {bar_device}: {e.strerror}")
+            sys.exit(1)
+        try:
+            # Write
+            start_time = time.perf_counter()
+            for block in blocks:
+                for start, end in get_chunks(block):
+                    write_chunk(fd, bar, elf, block, start, end)
+            elapsed = time.perf_counter() - start_time
+            print_info(f"Write complete: {total} bytes in {elapsed:.3f}s ({total / max(elapsed, 1e-9) / (1 << 20):.1f} MiB/s)")
+
+            # Read-back
+            if read_back:
+                results = [verify_block(fd, bar, elf, block) for block in blocks]
+                for block, passed in zip(blocks, results):
+                    if not passed:
+                        print_error(f"Read-back mismatch in block 0x{block['paddr']:x} +0x{block['size']:x}")
+                if not all(results):
+                    print_info("Test failed :(")
+                    sys.exit(1)
+                print_info("Test passed :)")
+        finally:
+            os.close(fd)
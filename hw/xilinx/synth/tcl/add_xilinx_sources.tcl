@@ -3,6 +3,7 @@
 
 # Define a list of all the source files
 set src_file_list [ list \
+    $::env(XILINX_ROOT)/rtl/uninasoc_interrupts.svinc        \
     $::env(XILINX_ROOT)/rtl/uninasoc_pkg.sv                  \
     $::env(XILINX_ROOT)/rtl/uninasoc_axi.svh                 \
     $::env(XILINX_ROOT)/rtl/uninasoc_pcie.svh                \
@@ -10,9 +11,12 @@ set src_file_list [ list \
     $::env(XILINX_ROOT)/rtl/mbus_buses.svinc                 \
     $::env(XILINX_ROOT)/rtl/pbus_buses.svinc                 \
     $::env(XILINX_ROOT)/rtl/hbus_buses.svinc                 \
+    $::env(XILINX_ROOT)/rtl/pbus_interrupts.svinc            \
+    $::env(XILINX_ROOT)/rtl/mbus_interrupts.svinc            \
     $::env(XILINX_ROOT)/rtl/highperformance_bus.sv           \
     $::env(XILINX_ROOT)/rtl/hls_conv2d_wrapper.sv            \
     $::env(XILINX_ROOT)/rtl/uninasoc_clk_assignments.svinc   \
+    $::env(XILINX_ROOT)/rtl/sys_master_clk_wiz.svinc         \
     $::env(XILINX_ROOT)/rtl/axi_clock_converter_wrapper.sv   \
     $::env(XILINX_ROOT)/rtl/sys_master.sv                    \
     $::env(XILINX_ROOT)/rtl/rv_socket.sv                     \
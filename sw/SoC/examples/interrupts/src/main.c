@@ -3,7 +3,7 @@
 // Author: Salvatore Santoro <sal.santoro@studenti.unina.it>
 // Description:
 //      This code demonstrates the usage of PLIC and interrupts.
-//      Physically, three interrupt lines are connected (in addition to line 0, which is reserved).
+//      The interrupt lines are connected as configured in the INTERRUPT_NAMES of the MBUS (line 0 is reserved).
 //      Logically, two interrupt sources are utilized: a timer and gpio_in (embedded only).
 //          - GPIO_IN interrupts trigger a toggle on led 0.
 //          - TIM0 timer interrupts trigger a toggle on led 1.
@@ -17,8 +17,6 @@
 #include "uninasoc.h"
 #include <stdint.h>
 
-#define SOURCES_NUM 3 // regardless of embedded/hpc
-
 #ifdef IS_EMBEDDED
 xlnx_gpio_in_t gpio_in = {
     .base_addr = GPIO_IN_BASEADDR,
@@ -32,7 +30,7 @@ xlnx_gpio_out_t gpio_out = {
 
 xlnx_tim_t timer = {
     .base_addr = TIM0_BASEADDR,
-    .counter = 20000000,
+    .counter = TIM0_RELOAD_1HZ,
     .reload_mode = TIM_RELOAD_AUTO,
     .count_direction = TIM_COUNT_DOWN
 };
@@ -64,36 +62,32 @@ void _ext_handler(void)
     // Interrupts are automatically re-enabled by the microarchitecture when the MRET instruction is executed.
 
     // In this example, the core is connected to PLIC target 1 line.
-    // Therefore, we need to access the PLIC claim/complete register 1 (base_addr + 0x200004).
-    // The interrupt source ID is obtained from the claim register.
-
-    uint32_t interrupt_id = plic_claim();
-    switch (interrupt_id) {
-    case 0x0: // unused
-        break;
-    case 0x1:
-        printf("Handiling GPIO_IN interrupt!\r\n");
-        #ifdef GPIO_OUT_IS_ENABLED
-        xlnx_gpio_out_toggle(&gpio_out, PIN_0);
-        #endif // GPIO_OUT_IS_ENABLED
-        #ifdef GPIO_IN_IS_ENABLED
-        xlnx_gpio_in_clear_int(&gpio_in);
-        #endif // GPIO_IN_IS_ENABLED
-        break;
-    case 0x2:
-        // Timer interrupt
-        printf("Handiling TIM0 interrupt!\r\n");
-        #ifdef GPIO_OUT_IS_ENABLED
-        xlnx_gpio_out_toggle(&gpio_out, PIN_1);
-        #endif // GPIO_OUT_IS_ENABLED
-        xlnx_tim_clear_int(&timer);
-        break;
-    default:
-        break;
-    }
-
-    // To notify the handler completion, a write-back on the claim/complete register is required.
-    plic_complete(interrupt_id);
+    // The interrupt source ID is claimed, dispatched to the _plic_<SOURCE>_handler functions below
+    // through the jump table generated by config (see uninasoc_conf.h), and completed.
+    // Hence, no PLIC line is hardcoded here.
+    plic_dispatch();
+}
+
+// PLIC handlers, plain functions: the claim/complete of the interrupt is done by plic_dispatch()
+#ifdef GPIO_IN_IS_ENABLED
+void _plic_GPIO_in_handler(void)
+{
+    printf("Handiling GPIO_IN interrupt!\r\n");
+    #ifdef GPIO_OUT_IS_ENABLED
+    xlnx_gpio_out_toggle(&gpio_out, PIN_0);
+    #endif // GPIO_OUT_IS_ENABLED
+    xlnx_gpio_in_clear_int(&gpio_in);
+}
+#endif // GPIO_IN_IS_ENABLED
+
+void _plic_TIM0_handler(void)
+{
+    // Timer interrupt
+    printf("Handiling TIM0 interrupt!\r\n");
+    #ifdef GPIO_OUT_IS_ENABLED
+    xlnx_gpio_out_toggle(&gpio_out, PIN_1);
+    #endif // GPIO_OUT_IS_ENABLED
+    xlnx_tim_clear_int(&timer);
 }
 
 
@@ -105,11 +99,9 @@ int main()
 
     printf("Interrupts Example\r\n");
 
-    // Configure the PLIC
-    uint32_t priorities[SOURCES_NUM] = { 1, 1, 1 };
+    // Configure the PLIC, with the priorities and sources from config
     plic_init();
-    plic_configure_set_array(priorities, SOURCES_NUM);
-    plic_enable_all();
+    plic_configure_default();
 
     #ifdef GPIO_IN_IS_ENABLED
     if (xlnx_gpio_in_init(&gpio_in) != UNINASOC_OK)
@@ -121,7 +113,7 @@ int main()
         printf("ERROR GPIOOUT\r\n");
     #endif // GPIO_OUT_IS_ENABLED
 
-    // Configure the timer for one interrupt each second (assuming a 20MHz clock)
+    // Configure the timer for one interrupt each second (reload value from the TIM0 clock, see uninasoc_conf.h)
     xlnx_tim_init(&timer);
 
     if (xlnx_tim_configure(&timer) != UNINASOC_OK)
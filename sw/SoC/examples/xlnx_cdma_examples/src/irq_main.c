@@ -19,8 +19,7 @@
 #define TRANSFER_SIZE (NUM_WORDS * sizeof(uint32_t))
 #define BUFFER_SIZE (NUM_ROUNDS * TRANSFER_SIZE)
 
-// TODO: import this from config
-#define CDMA_IRQ_ID  6
+#define CDMA_IRQ_ID  PLIC_CDMA_INTERRUPT
 #define CDMA_INT_PRIORITY 1
 
 // Global variable for ISR/main synchronization
@@ -73,9 +72,10 @@ void _ext_handler(void) {
 
 int main(void) {
 
-    // Source and destination buffers
-    uint32_t src [NUM_ROUNDS][NUM_WORDS];
-    uint32_t dst [NUM_ROUNDS][NUM_WORDS];
+    // Source and destination buffers, aligned in the CDMA pool
+    dma_pool_t pool = DMA_POOL_INIT(CDMA_DMA_POOL);
+    uint32_t (*src)[NUM_WORDS] = dma_pool_alloc(&pool, BUFFER_SIZE);
+    uint32_t (*dst)[NUM_WORDS] = dma_pool_alloc(&pool, BUFFER_SIZE);
     uint32_t errors = 0;
 
     // Initialize platform
@@ -83,6 +83,11 @@ int main(void) {
 
     printf("\n\r[CDMA IRQ] CDMA Interrupt Test\n\r");
 
+    if (src == NULL || dst == NULL) {
+        printf("[CDMA IRQ] DMA pool exhausted\n\r");
+        return -1;
+    }
+
     // Init CDMA
     if (XAxiCdma_CfgInitialize(&cdma_handle, &CdmaCfg, CdmaCfg.BaseAddress) != 0) {
         printf("[CDMA IRQ] XAxiCdma_CfgInitialize failed\n");
@@ -111,9 +111,10 @@ uint32_t cdma_do_one_round (
 
 int main(void) {
 
-    // Source and destination buffers
-    uint32_t src [BUFFER_SIZE];
-    uint32_t dst [BUFFER_SIZE];
+    // Source and destination buffers, aligned in the CDMA pool
+    dma_pool_t pool = DMA_POOL_INIT(CDMA_DMA_POOL);
+    uint32_t * src = dma_pool_alloc(&pool, BUFFER_SIZE * sizeof(uint32_t));
+    uint32_t * dst = dma_pool_alloc(&pool, BUFFER_SIZE * sizeof(uint32_t));
 
     // CDMA Struct and config
     XAxiCdma cdma_handle;
@@ -132,6 +133,11 @@ int main(void) {
 
     printf("\n[CDMA SIMPLE] CDMA multi-round transfer test start\n\r");
 
+    if (src == NULL || dst == NULL) {
+        printf("[CDMA SIMPLE] DMA pool exhausted\n\r");
+        return -1;
+    }
+
     // Initialize CDMA core
     if (XAxiCdma_CfgInitialize(&cdma_handle, &CdmaCfg, CDMA_BASEADDR) != 0) {
         printf("[CDMA SIMPLE] Initialization failed\n\r");
@@ -0,0 +1,56 @@
+// Author: agent <agent@local>
+// Description:
+//  This file defines a bump allocator on the DMA buffer pools.
+//  The pools are generated in the linker script, in the memories reachable by the DMA masters,
+//  and aligned to the widest data width on their paths (see DMA_POOL_<MEMORY>_ALIGN in uninasoc_conf.h).
+//  Usage:
+//      dma_pool_t pool = DMA_POOL_INIT(CDMA_DMA_POOL);
+//      uint32_t * src = dma_pool_alloc(&pool, TRANSFER_SIZE);
+//  Buffers can also be allocated statically (uninitialized) with DMA_BUFFER, e.g.
+//      uint8_t buffer [SIZE] DMA_BUFFER(S_ACC_DMA_POOL);
+
+#ifndef DMA_POOL_H
+#define DMA_POOL_H
+
+#include <stddef.h>
+#include <stdint.h>
+#include "uninasoc_conf.h"
+
+// Bump allocator state
+typedef struct {
+    uintptr_t start;
+    uintptr_t next;
+    uintptr_t end;
+    uintptr_t align;
+} dma_pool_t;
+
+// Initialize the allocator on the pool of a memory, e.g. DMA_POOL_INIT(DDR4CH0) or DMA_POOL_INIT(S_ACC_DMA_POOL)
+#define DMA_POOL_INIT(memory) _DMA_POOL_INIT(memory)
+#define _DMA_POOL_INIT(memory) {                \
+    .start = (uintptr_t)_dma_pool_##memory##_start, \
+    .next  = (uintptr_t)_dma_pool_##memory##_start, \
+    .end   = (uintptr_t)_dma_pool_##memory##_end,   \
+    .align = DMA_POOL_##memory##_ALIGN              \
+}
+
+// Place a static buffer in the pool section of a memory, aligned for the DMA
+#define DMA_BUFFER(memory) _DMA_BUFFER(memory)
+#define _DMA_BUFFER(memory) __attribute__((section(".dma_pool_" #memory), aligned(DMA_POOL_##memory##_ALIGN)))
+
+// Allocate an aligned buffer, returns NULL if the pool is exhausted
+static inline void * dma_pool_alloc(dma_pool_t * pool, size_t size)
+{
+    uintptr_t base = (pool->next + pool->align - 1) & ~(pool->align - 1);
+    if ( base > pool->end || size > pool->end - base )
+        return NULL;
+    pool->next = base + size;
+    return (void *)base;
+}
+
+// Release all the buffers of the pool
+static inline void dma_pool_reset(dma_pool_t * pool)
+{
+    pool->next = pool->start;
+}
+
+#endif // DMA_POOL_H
@@ -35,6 +35,10 @@ void plic_configure_set_array(uint32_t* priorities, size_t source_num);
 // Configure a single line
 void plic_configure_set_one(uint32_t priority, size_t source);
 
+// This function configures the priorities of the configured sources (PLIC_PRIORITIES)
+// and enables their interrupts (PLIC_ENABLE_MASK), as generated in uninasoc_conf.h
+void plic_configure_default();
+
 // This function enables the interrupts of each external peripheral
 void plic_enable_all();
 
@@ -48,4 +52,9 @@ uint32_t plic_claim();
 // It's supposed to be used inside the external interrupts handler
 void plic_complete(uint32_t interrupt_id);
 
+// This function claims the interrupt, calls its handler through the generated jump table
+// (PLIC_HANDLERS, e.g. _plic_TIM0_handler) and completes it
+// It's supposed to be used inside the external interrupts handler
+void plic_dispatch();
+
 #endif
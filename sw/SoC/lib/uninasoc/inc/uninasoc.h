@@ -6,6 +6,7 @@
 // This header is autogenerated based on project configuration
 #include "uninasoc_conf.h"
 
+#include "dma_pool.h"
 #include "irq_handlers.h"
 #include "plic.h"
 #ifdef GPIO_IN_IS_ENABLED
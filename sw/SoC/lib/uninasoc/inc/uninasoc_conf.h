@@ -31,4 +31,51 @@
 #define TIM_IS_ENABLED 1
 #define UART_IS_ENABLED 1
 
+// Clock frequencies (Hz), from the configured clock domains
+#define CPU_CLOCK_HZ 20000000u
+#define PBUS_CLOCK_HZ 10000000u
+#define UART_CLOCK_HZ 10000000u
+#define GPIO_OUT_CLOCK_HZ 10000000u
+#define GPIO_IN_CLOCK_HZ 10000000u
+#define TIM0_CLOCK_HZ 10000000u
+#define TIM1_CLOCK_HZ 10000000u
+#define TIM0_RELOAD_1HZ 9999998u
+#define TIM0_RELOAD_10HZ 999998u
+#define TIM0_RELOAD_50HZ 199998u
+#define TIM0_RELOAD_100HZ 99998u
+#define TIM0_RELOAD_1000HZ 9998u
+#define TIM1_RELOAD_1HZ 9999998u
+#define TIM1_RELOAD_10HZ 999998u
+#define TIM1_RELOAD_50HZ 199998u
+#define TIM1_RELOAD_100HZ 99998u
+#define TIM1_RELOAD_1000HZ 9998u
+#define UART_DIVISOR_9600 65u
+#define UART_DIVISOR_19200 33u
+#define UART_DIVISOR_57600 11u
+
+// DMA buffer pools (see dma_pool.h), from the linker script
+#define DMA_POOL_BRAM_ALIGN 4u
+extern uint8_t _dma_pool_BRAM_start[];
+extern uint8_t _dma_pool_BRAM_end[];
+#define CDMA_DMA_POOL BRAM
+
+// PLIC interrupt sources (line 0 is reserved)
+#define PLIC_NUM_INTERRUPTS 5
+#define PLIC_GPIO_IN_INTERRUPT 1
+#define PLIC_TIM0_INTERRUPT 2
+#define PLIC_TIM1_INTERRUPT 3
+#define PLIC_UART_INTERRUPT 4
+#define PLIC_CDMA_INTERRUPT 5
+#define PLIC_ENABLE_MASK 0x0000003eu
+#define PLIC_PRIORITIES { 0, 1, 1, 1, 1, 1 }
+
+// PLIC handlers, dispatched by plic_dispatch() through PLIC_HANDLERS
+// Weak references: the handlers that are not defined are NULL, and their interrupts are just completed
+void _plic_GPIO_in_handler(void) __attribute__((weak));
+void _plic_TIM0_handler(void) __attribute__((weak));
+void _plic_TIM1_handler(void) __attribute__((weak));
+void _plic_UART_handler(void) __attribute__((weak));
+void _plic_CDMA_handler(void) __attribute__((weak));
+#define PLIC_HANDLERS { 0, _plic_GPIO_in_handler, _plic_TIM0_handler, _plic_TIM1_handler, _plic_UART_handler, _plic_CDMA_handler }
+
 #endif // __UNINASOC_CONF_H__
@@ -25,6 +25,11 @@
 // The timer counts from 0 to the specified value
 #define TIM_COUNT_UP 1
 
+// Reload value (counter) for a tick rate, with TIM_RELOAD_AUTO and TIM_COUNT_DOWN, the timer period being counter + 2 cycles
+// The common tick rates are precomputed from the timer clock in uninasoc_conf.h (e.g. TIM0_RELOAD_1000HZ),
+// otherwise use constant arguments, e.g. TIM_RELOAD_VALUE(TIM0_CLOCK_HZ, configTICK_RATE_HZ), to fold it at compile time
+#define TIM_RELOAD_VALUE(clock_hz, rate_hz) ((clock_hz) / (rate_hz) - 2)
+
 typedef struct {
     uintptr_t base_addr;
     uint32_t counter;
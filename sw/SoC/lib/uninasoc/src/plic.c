@@ -10,13 +10,15 @@
 #include "io.h"
 #include <stdint.h>
 
-// TODO: import from config
-#define MAX_SOURCES 6
-
-// In this example, only 4 interrupts sources are supported in the SoC
+// Interrupt sources of the SoC, from config (uninasoc_conf.h)
+#define MAX_SOURCES PLIC_NUM_INTERRUPTS
 
 static size_t sources = MAX_SOURCES;
 
+// Priorities and handlers of the sources, indexed by PLIC line (line 0 is reserved)
+static const uint32_t plic_priorities[PLIC_NUM_INTERRUPTS + 1] = PLIC_PRIORITIES;
+static void (* const plic_handlers[PLIC_NUM_INTERRUPTS + 1])(void) = PLIC_HANDLERS;
+
 int plic_init()
 {
     // Reset priorities
@@ -56,6 +58,14 @@ void plic_configure_set_array(uint32_t* priorities, size_t source_num){
 
 }
 
+void plic_configure_default(){
+
+    for (int i = 1; i <= MAX_SOURCES; i++) {
+        plic_configure_set_one(plic_priorities[i], i);
+    }
+    iowrite32(PLIC_INT_ENABLE_CTX0, PLIC_ENABLE_MASK);
+}
+
 void plic_enable_all(){
 
     uint32_t enable = 0;
@@ -76,3 +86,14 @@ uint32_t plic_claim(){
 void plic_complete(uint32_t interrupt_id){
     iowrite32(PLIC_COMPLETE_CTX0, interrupt_id);
 }
+
+void plic_dispatch(){
+
+    uint32_t interrupt_id = plic_claim();
+
+    // Constant-time dispatch, the sources without a handler are just completed
+    if (interrupt_id != 0 && interrupt_id <= MAX_SOURCES && plic_handlers[interrupt_id] != NULL)
+        plic_handlers[interrupt_id]();
+
+    plic_complete(interrupt_id);
+}
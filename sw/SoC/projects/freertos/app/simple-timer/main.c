@@ -13,8 +13,8 @@
 #include "task.h"
 #include "uninasoc.h"
 
-static xlnx_tim_t timer = {.base_addr = TIM0_BASEADDR,
-                           .counter = 200000,
+static xlnx_tim_t timer = {.base_addr = (uintptr_t)configUNINASOC_TIMER_BASE_ADDRESS,
+                           .counter = TIM_RELOAD_VALUE(configUNINASOC_TIMER_CLOCK_HZ, configTICK_RATE_HZ),
                            .reload_mode = TIM_RELOAD_AUTO,
                            .count_direction = TIM_COUNT_DOWN};
 
@@ -75,7 +75,7 @@ void freertos_risc_v_application_interrupt_handler(uint32_t mcause) {
   uint32_t interrupt_id = plic_claim();
 
   switch (interrupt_id) {
-  case 0x2:
+  case configUNINASOC_TIMER_INTERRUPT:
     vExternalTickIncrement();
     break;
   default:
@@ -116,7 +116,7 @@ void vPortSetupTimerInterrupt(void) {
   int ret;
 
   plic_init();
-  plic_configure_set_one(1, 2);
+  plic_configure_set_one(1, configUNINASOC_TIMER_INTERRUPT);
   plic_enable_all();
 
   xlnx_tim_init(&timer);
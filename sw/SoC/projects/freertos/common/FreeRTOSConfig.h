@@ -43,7 +43,8 @@
 /******************************************************************************/
 /* Hardware description related definitions. **********************************/
 /******************************************************************************/
-#define configCPU_CLOCK_HZ                        ( ( unsigned long ) 20000000 )
+/* The CPU clock, heap, stack sizes and tick timer are generated by config (uninasoc_freertos.h) */
+#include "uninasoc_freertos.h"
 
 /* See https://www.freertos.org/Using-FreeRTOS-on-RISC-V.html */
 #define configMTIME_BASE_ADDRESS                   ( 0 )
@@ -58,7 +59,6 @@
 #define configUSE_PORT_OPTIMISED_TASK_SELECTION    0
 #define configUSE_TICKLESS_IDLE                    0
 #define configMAX_PRIORITIES                       5U
-#define configMINIMAL_STACK_SIZE                   256U
 #define configMAX_TASK_NAME_LEN                    8U
 #define configTICK_TYPE_WIDTH_IN_BITS              TICK_TYPE_WIDTH_64_BITS
 #define configIDLE_SHOULD_YIELD                    1
@@ -84,8 +84,6 @@
 /******************************************************************************/
 #define configSUPPORT_STATIC_ALLOCATION              1
 #define configSUPPORT_DYNAMIC_ALLOCATION             1
-#define configTOTAL_HEAP_SIZE                        4096U
-#define configAPPLICATION_ALLOCATED_HEAP             0
 #define configSTACK_ALLOCATION_FROM_SEPARATE_HEAP    0
 #define configUSE_MINI_LIST_ITEM                     0
 
@@ -0,0 +1,21 @@
+/* File generated by create_freertos_config.py */
+
+#ifndef __UNINASOC_FREERTOS_H__
+#define __UNINASOC_FREERTOS_H__
+
+// CPU clock, from the MAIN_CLOCK_DOMAIN (20 MHz)
+#define configCPU_CLOCK_HZ                  ( ( unsigned long ) 20000000 )
+
+// Heap in BRAM, the fastest memory for RV_SOCKET_DATA (80 MB/s, 2 cycles), placed by uninasoc_freertos.ld
+#define configTOTAL_HEAP_SIZE               16384
+#define configAPPLICATION_ALLOCATED_HEAP    1
+
+// Minimal task stack, in words of XLEN (32) bits, i.e. 1024 bytes
+#define configMINIMAL_STACK_SIZE            256
+
+// System tick timer: TIM0 on PBUS
+#define configUNINASOC_TIMER_BASE_ADDRESS   0x20600
+#define configUNINASOC_TIMER_CLOCK_HZ       10000000
+#define configUNINASOC_TIMER_INTERRUPT      2
+
+#endif // __UNINASOC_FREERTOS_H__